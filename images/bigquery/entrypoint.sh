@@ -9,9 +9,15 @@ set -euo pipefail
 readonly ORIGINAL_ENTRYPOINT="/toolbox"
 readonly SHARED_CREDS_SCRIPT="/usr/local/bin/setup-google-credentials.sh"
 
-# Function to log messages with timestamp
+# Function to log messages as logfmt lines: ts=... level=... component=... msg="..."
 log() {
-    echo "[$(date '+%Y-%m-%d %H:%M:%S')] [BIGQUERY-TOOLBOX] $*" >&2
+    local level=info msg="$*"
+    case "$msg" in
+        "ERROR: "*) level=error msg="${msg#ERROR: }" ;;
+        "WARNING: "*) level=warn msg="${msg#WARNING: }" ;;
+    esac
+    msg="${msg//\\/\\\\}"
+    echo "ts=$(date -u '+%Y-%m-%dT%H:%M:%S.%3NZ') level=$level component=BIGQUERY-TOOLBOX msg=\"${msg//\"/\\\"}\"" >&2
 }
 
 # Source the shared Google credentials setup script
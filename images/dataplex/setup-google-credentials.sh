@@ -3,23 +3,37 @@
 # Google Cloud Credentials Setup Script
 # Shared utility for custom Google AI Toolbox images
 # Handles Google Cloud service account credentials passed via environment variables
+# With GOOGLE_CREDS_CACHE_DIR set (a mounted volume), the key is kept there as
+# sa-<private_key_id>.json, so later containers sharing the volume reuse it as written
 
 set -euo pipefail
 
 # Constants
 readonly TEMP_SA_FILE="${GOOGLE_CREDS_TEMP_FILE:-/tmp/sa.json}"
 readonly DEBUG_MODE="${DEBUG_GOOGLE_CREDS:-false}"
+readonly CACHE_DIR="${GOOGLE_CREDS_CACHE_DIR:-}"
 
-# Function to log messages with timestamp (only if debug enabled)
+# Function to write one logfmt line: ts=... level=... component=GOOGLE-CREDS msg="..."
+log_line() {
+    local level="$1" msg="$2"
+    case "$msg" in
+        "ERROR: "*) level=error msg="${msg#ERROR: }" ;;
+        "WARNING: "*) level=warn msg="${msg#WARNING: }" ;;
+    esac
+    msg="${msg//\\/\\\\}"
+    echo "ts=$(date -u '+%Y-%m-%dT%H:%M:%S.%3NZ') level=$level component=GOOGLE-CREDS msg=\"${msg//\"/\\\"}\"" >&2
+}
+
+# Function to log messages (only if debug enabled)
 log_debug() {
     if [[ "$DEBUG_MODE" == "true" ]]; then
-        echo "[$(date '+%Y-%m-%d %H:%M:%S')] [GOOGLE-CREDS] $*" >&2
+        log_line debug "$*"
     fi
 }
 
 # Function to log important messages (always shown)
 log_info() {
-    echo "[$(date '+%Y-%m-%d %H:%M:%S')] [GOOGLE-CREDS] $*" >&2
+    log_line info "$*"
 }
 
 # Function to cleanup temporary files
@@ -30,6 +44,47 @@ cleanup_google_credentials() {
     fi
 }
 
+# Function to print the milliseconds since an $EPOCHREALTIME value
+elapsed_ms() {
+    local start="${1//[.,]/}" now="${EPOCHREALTIME//[.,]/}"
+    echo $(( (10#$now - 10#$start) / 1000 ))
+}
+
+# Function to print the cache path of a key, $CACHE_DIR/sa-<private_key_id>.json
+# (fails when the key has no id that is safe in a file name)
+cached_key_path() {
+    local json_content="$1"
+    [[ "$json_content" == *'"private_key_id"'* ]] || return 1
+    local temp="${json_content#*\"private_key_id\"}"
+    temp="${temp#*\"}"
+    local key_id="${temp%%\"*}"
+    [[ "$key_id" =~ ^[A-Za-z0-9_-]{1,128}$ ]] || return 1
+    echo "$CACHE_DIR/sa-$key_id.json"
+}
+
+# Function to check whether a cached key file holds exactly this key
+cached_key_matches() {
+    local path="$1" json_content="$2"
+    [[ -f "$path" && -O "$path" ]] && [[ "$(<"$path")" == "$json_content" ]]
+}
+
+# Function to put a key in the cache directory; written under a private name and renamed
+# into place, so containers sharing the volume never read a partial key
+store_cached_key() {
+    local path="$1" json_content="$2"
+    local partial="$path.$$.partial"
+    if ! mkdir -p -m 700 "$CACHE_DIR" 2>/dev/null; then
+        log_info "WARNING: Could not create GOOGLE_CREDS_CACHE_DIR $CACHE_DIR"
+        return 1
+    fi
+    if ! (umask 077 && echo "$json_content" > "$partial") 2>/dev/null || ! mv -f "$partial" "$path" 2>/dev/null; then
+        log_info "WARNING: Could not write $path"
+        rm -f "$partial"
+        return 1
+    fi
+    return 0
+}
+
 # Function to validate JSON format (basic check)
 validate_service_account_json() {
     local json_content="$1"
@@ -61,25 +116,44 @@ validate_service_account_json() {
 
 # Main function to setup Google Cloud credentials
 setup_google_credentials() {
+    local started="$EPOCHREALTIME"
     log_debug "Starting Google Cloud credentials setup"
     
     if [[ -n "${GOOGLE_SERVICE_ACCOUNT_JSON:-}" ]]; then
         log_info "Setting up Google Cloud credentials from GOOGLE_SERVICE_ACCOUNT_JSON environment variable"
         
-        # Validate JSON format and content
-        if ! validate_service_account_json "$GOOGLE_SERVICE_ACCOUNT_JSON"; then
-            log_info "ERROR: Failed to validate service account JSON"
-            return 1
+        local cached="" source="temp file"
+        if [[ -n "$CACHE_DIR" ]]; then
+            if ! cached="$(cached_key_path "$GOOGLE_SERVICE_ACCOUNT_JSON")"; then
+                cached=""
+                log_info "WARNING: Service account JSON has no usable private_key_id; not caching it in $CACHE_DIR"
+            elif cached_key_matches "$cached" "$GOOGLE_SERVICE_ACCOUNT_JSON"; then
+                source="reused cached key"
+            fi
         fi
         
-        # Write JSON to temporary file with restrictive permissions
-        echo "$GOOGLE_SERVICE_ACCOUNT_JSON" > "$TEMP_SA_FILE"
-        
-        # Set restrictive permissions (readable only by owner)
-        chmod 600 "$TEMP_SA_FILE"
+        # A cached key was validated by the container that wrote it
+        if [[ "$source" != "reused cached key" ]]; then
+            # Validate JSON format and content
+            if ! validate_service_account_json "$GOOGLE_SERVICE_ACCOUNT_JSON"; then
+                log_info "ERROR: Failed to validate service account JSON"
+                return 1
+            fi
+            
+            if [[ -n "$cached" ]] && store_cached_key "$cached" "$GOOGLE_SERVICE_ACCOUNT_JSON"; then
+                source="cached new key"
+            else
+                cached=""
+                # Write JSON to temporary file with restrictive permissions
+                echo "$GOOGLE_SERVICE_ACCOUNT_JSON" > "$TEMP_SA_FILE"
+                
+                # Set restrictive permissions (readable only by owner)
+                chmod 600 "$TEMP_SA_FILE"
+            fi
+        fi
         
         # Set the Google Application Credentials environment variable
-        export GOOGLE_APPLICATION_CREDENTIALS="$TEMP_SA_FILE"
+        export GOOGLE_APPLICATION_CREDENTIALS="${cached:-$TEMP_SA_FILE}"
         
         log_info "Google Cloud credentials configured successfully"
         log_debug "GOOGLE_APPLICATION_CREDENTIALS set to: $GOOGLE_APPLICATION_CREDENTIALS"
@@ -95,6 +169,7 @@ setup_google_credentials() {
                 log_debug "GOOGLE_CLOUD_PROJECT set to: $project_id"
             fi
         fi
+        log_info "Google Cloud credentials ready in $(elapsed_ms "$started") ms ($source)"
         
     else
         log_debug "No GOOGLE_SERVICE_ACCOUNT_JSON environment variable found"
@@ -103,8 +178,10 @@ setup_google_credentials() {
         # Check if GOOGLE_APPLICATION_CREDENTIALS is already set
         if [[ -n "${GOOGLE_APPLICATION_CREDENTIALS:-}" ]]; then
             log_info "Using existing GOOGLE_APPLICATION_CREDENTIALS: $GOOGLE_APPLICATION_CREDENTIALS"
+            log_info "Google Cloud credentials ready in $(elapsed_ms "$started") ms (existing file)"
         else
             log_debug "No Google Cloud credentials configured - relying on default authentication"
+            log_info "Google Cloud credentials ready in $(elapsed_ms "$started") ms (default)"
         fi
     fi
     
@@ -134,6 +211,11 @@ check_google_auth_status() {
 export -f setup_google_credentials
 export -f cleanup_google_credentials  
 export -f check_google_auth_status
+export -f log_line
+export -f elapsed_ms
+export -f cached_key_path
+export -f cached_key_matches
+export -f store_cached_key
 export -f log_debug
 export -f log_info
 
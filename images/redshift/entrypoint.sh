@@ -9,9 +9,18 @@ set -euo pipefail
 readonly ORIGINAL_ENTRYPOINT="/toolbox"
 readonly REDSHIFT_TOOLS_FILE="/config/redshift.yaml"
 
-# Function to log messages with timestamp
+# Schema index read by lookup_schema; mount a refreshed snapshot over it or point elsewhere
+export REDSHIFT_SCHEMA_INDEX="${REDSHIFT_SCHEMA_INDEX:-/config/schema-index.sqlite}"
+
+# Function to log messages as logfmt lines: ts=... level=... component=... msg="..."
 log() {
-    echo "[$(date '+%Y-%m-%d %H:%M:%S')] [REDSHIFT-TOOLBOX] $*" >&2
+    local level=info msg="$*"
+    case "$msg" in
+        "ERROR: "*) level=error msg="${msg#ERROR: }" ;;
+        "WARNING: "*) level=warn msg="${msg#WARNING: }" ;;
+    esac
+    msg="${msg//\\/\\\\}"
+    echo "ts=$(date -u '+%Y-%m-%dT%H:%M:%S.%3NZ') level=$level component=REDSHIFT-TOOLBOX msg=\"${msg//\"/\\\"}\"" >&2
 }
 
 # Function to check if original toolbox exists
@@ -30,6 +39,13 @@ check_redshift_tools_file() {
     fi
 }
 
+# Function to check the schema index; lookup_schema is the only tool that needs it
+check_schema_index() {
+    if [[ ! -f "$REDSHIFT_SCHEMA_INDEX" ]]; then
+        log "WARNING: Schema index not found at $REDSHIFT_SCHEMA_INDEX; lookup_schema will fail"
+    fi
+}
+
 # Main execution
 main() {
     log "Starting Redshift custom toolbox entrypoint"
@@ -39,6 +55,9 @@ main() {
     
     # Check if Redshift tools file exists
     check_redshift_tools_file
+
+    # Check the schema index used by lookup_schema
+    check_schema_index
     
     # Execute the original toolbox with Redshift tools file and passed arguments
     log "Executing Redshift toolbox with arguments: $*"
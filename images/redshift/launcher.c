@@ -0,0 +1,457 @@
+/*
+ * Static launcher for the custom toolbox images
+ *
+ * Does what entrypoint.sh + setup-google-credentials.sh do, without bash, date(1) or the
+ * shared libraries they need: validates GOOGLE_SERVICE_ACCOUNT_JSON and writes it to
+ * GOOGLE_CREDS_TEMP_FILE (default /tmp/sa.json), logs logfmt lines, then execs /toolbox.
+ * With GOOGLE_CREDS_CACHE_DIR set (a mounted volume), the key is kept there as
+ * sa-<private_key_id>.json instead, so later containers sharing the volume find it already
+ * written and validated.
+ * The source is identical in every image; per-image behaviour comes from the arguments in
+ * the Dockerfile ENTRYPOINT:
+ *
+ *   toolbox-launcher [--name NAME] [--tag TAG] [--google-credentials] [--require FILE]...
+ *                    [--default-env NAME=VALUE]... [--warn-missing-env-file NAME]...
+ *                    [--http-address ADDR] -- TOOLBOX_ARGS...
+ *
+ * Arguments given to `docker run` after the image name are appended to TOOLBOX_ARGS.
+ * With --http-address, a toolbox started in HTTP mode (no --stdio) listens on ADDR unless
+ * the arguments choose an --address; the toolbox default, 127.0.0.1, is unreachable from
+ * outside the container.
+ * Build: gcc -static -Os -s -o toolbox-launcher launcher.c
+ */
+
+#define _GNU_SOURCE
+#include <errno.h>
+#include <fcntl.h>
+#include <stdarg.h>
+#include <stdio.h>
+#include <stdlib.h>
+#include <string.h>
+#include <sys/stat.h>
+#include <time.h>
+#include <unistd.h>
+
+#ifndef ORIGINAL_ENTRYPOINT
+#define ORIGINAL_ENTRYPOINT "/toolbox"
+#endif
+#define MAX_OPTIONS 16
+
+static long elapsed_ms_since(const struct timespec *from)
+{
+    struct timespec now;
+
+    clock_gettime(CLOCK_MONOTONIC, &now);
+    return (now.tv_sec - from->tv_sec) * 1000 + (now.tv_nsec - from->tv_nsec) / 1000000;
+}
+
+static int has_flag(char **args, int count, const char *long_name, const char *short_name)
+{
+    size_t length = strlen(long_name);
+    int n;
+
+    for (n = 0; n < count; n++) {
+        if (strncmp(args[n], long_name, length) == 0 && (args[n][length] == '\0' || args[n][length] == '='))
+            return 1;
+        if (short_name != NULL && strcmp(args[n], short_name) == 0)
+            return 1;
+    }
+    return 0;
+}
+
+static const char *tag = "TOOLBOX";
+static struct timespec started;
+
+/*
+ * One logfmt line per message, e.g.
+ *   ts=2024-05-01T12:00:00.123Z level=info component=SPANNER-TOOLBOX elapsed_ms=4 msg="Starting ..."
+ * A leading "ERROR: " / "WARNING: " in the message becomes the level. elapsed_ms counts from
+ * launcher start, so the lines time the container's own startup.
+ */
+static void vlog_tagged(const char *log_tag, const char *fmt, va_list args)
+{
+    char stamp[32], text[4096];
+    const char *level = "info", *msg = text, *p;
+    struct timespec wall;
+    struct tm tm;
+    long elapsed_ms = elapsed_ms_since(&started);
+
+    clock_gettime(CLOCK_REALTIME, &wall);
+    gmtime_r(&wall.tv_sec, &tm);
+    strftime(stamp, sizeof stamp, "%Y-%m-%dT%H:%M:%S", &tm);
+    vsnprintf(text, sizeof text, fmt, args);
+    if (strncmp(text, "ERROR: ", 7) == 0) {
+        level = "error";
+        msg += 7;
+    } else if (strncmp(text, "WARNING: ", 9) == 0) {
+        level = "warn";
+        msg += 9;
+    }
+    fprintf(stderr, "ts=%s.%03ldZ level=%s component=%s elapsed_ms=%ld msg=\"",
+            stamp, wall.tv_nsec / 1000000, level, log_tag, elapsed_ms);
+    for (p = msg; *p; p++) {
+        if (*p == '"' || *p == '\\')
+            fputc('\\', stderr);
+        if (*p == '\n')
+            fputs("\\n", stderr);
+        else
+            fputc(*p, stderr);
+    }
+    fputs("\"\n", stderr);
+}
+
+static void log_msg(const char *fmt, ...)
+{
+    va_list args;
+    va_start(args, fmt);
+    vlog_tagged(tag, fmt, args);
+    va_end(args);
+}
+
+static void log_creds(const char *fmt, ...)
+{
+    va_list args;
+    va_start(args, fmt);
+    vlog_tagged("GOOGLE-CREDS", fmt, args);
+    va_end(args);
+}
+
+static int debug_creds(void)
+{
+    const char *debug = getenv("DEBUG_GOOGLE_CREDS");
+    return debug != NULL && strcmp(debug, "true") == 0;
+}
+
+/* Same checks as validate_service_account_json in setup-google-credentials.sh */
+static int validate_service_account_json(const char *json)
+{
+    const char *start = json;
+    const char *end = json + strlen(json);
+    const char *type;
+
+    while (*start == ' ' || (*start >= '\t' && *start <= '\r'))
+        start++;
+    while (end > start && (end[-1] == ' ' || (end[-1] >= '\t' && end[-1] <= '\r')))
+        end--;
+    if (end - start < 2 || *start != '{' || end[-1] != '}') {
+        log_creds("ERROR: Invalid JSON format in GOOGLE_SERVICE_ACCOUNT_JSON - must be a JSON object");
+        return -1;
+    }
+    type = strstr(json, "\"type\"");
+    if (type == NULL || strstr(type, "\"service_account\"") == NULL) {
+        log_creds("ERROR: JSON does not appear to be a service account - missing 'type: service_account'");
+        return -1;
+    }
+    if (strstr(json, "\"project_id\"") == NULL) {
+        log_creds("ERROR: Service account JSON missing required 'project_id' field");
+        return -1;
+    }
+    if (strstr(json, "\"private_key\"") == NULL) {
+        log_creds("ERROR: Service account JSON missing required 'private_key' field");
+        return -1;
+    }
+    return 0;
+}
+
+static int write_all(int fd, const char *data, size_t length)
+{
+    while (length > 0) {
+        ssize_t written = write(fd, data, length);
+        if (written < 0) {
+            if (errno == EINTR)
+                continue;
+            return -1;
+        }
+        data += written;
+        length -= (size_t)written;
+    }
+    return 0;
+}
+
+/* First quoted value after "project_id", as the bash parameter expansion extracts it */
+static void export_project_id(const char *json)
+{
+    const char *value = strstr(json, "\"project_id\"");
+    const char *close;
+    char *project_id;
+
+    if (value == NULL)
+        return;
+    value = strchr(value + strlen("\"project_id\""), '"');
+    if (value == NULL)
+        return;
+    value++;
+    close = strchr(value, '"');
+    if (close == NULL || close == value)
+        return;
+    project_id = strndup(value, (size_t)(close - value));
+    if (project_id != NULL && strcmp(project_id, "project_id") != 0) {
+        setenv("GOOGLE_CLOUD_PROJECT", project_id, 1);
+        if (debug_creds())
+            log_creds("GOOGLE_CLOUD_PROJECT set to: %s", project_id);
+    }
+    free(project_id);
+}
+
+/* Write the key plus a newline to `path`, created owner-only so it is never briefly world-readable */
+static int write_key_file(const char *path, const char *json)
+{
+    int fd = open(path, O_WRONLY | O_CREAT | O_TRUNC | O_CLOEXEC, 0600);
+
+    if (fd < 0 || fchmod(fd, 0600) != 0 || write_all(fd, json, strlen(json)) != 0 || write_all(fd, "\n", 1) != 0) {
+        int saved = errno;
+        if (fd >= 0)
+            close(fd);
+        unlink(path);
+        errno = saved;
+        return -1;
+    }
+    return close(fd);
+}
+
+/* <dir>/sa-<private_key_id>.json, or NULL when the key has no id that is safe in a file name */
+static char *cached_key_path(const char *dir, const char *json)
+{
+    const char *value = strstr(json, "\"private_key_id\"");
+    const char *p;
+    char *path;
+
+    if (value == NULL)
+        return NULL;
+    value = strchr(value + strlen("\"private_key_id\""), '"');
+    if (value == NULL)
+        return NULL;
+    value++;
+    for (p = value; (*p >= 'a' && *p <= 'z') || (*p >= 'A' && *p <= 'Z') || (*p >= '0' && *p <= '9') || *p == '-' || *p == '_'; p++)
+        ;
+    if (*p != '"' || p == value || p - value > 128)
+        return NULL;
+    if (asprintf(&path, "%s/sa-%.*s.json", dir, (int)(p - value), value) < 0)
+        return NULL;
+    return path;
+}
+
+/* Whether `path` is owner-only and holds exactly what write_key_file would write */
+static int cached_key_matches(const char *path, const char *json)
+{
+    size_t length = strlen(json), got = 0;
+    struct stat st;
+    char *buffer;
+    int fd, match = 0;
+
+    fd = open(path, O_RDONLY | O_CLOEXEC);
+    if (fd < 0)
+        return 0;
+    if (fstat(fd, &st) == 0 && S_ISREG(st.st_mode) && (st.st_mode & 077) == 0 && st.st_size == (off_t)length + 1 &&
+        (buffer = malloc(length + 1)) != NULL) {
+        while (got < length + 1) {
+            ssize_t n = read(fd, buffer + got, length + 1 - got);
+            if (n < 0 && errno == EINTR)
+                continue;
+            if (n <= 0)
+                break;
+            got += (size_t)n;
+        }
+        match = got == length + 1 && memcmp(buffer, json, length) == 0 && buffer[length] == '\n';
+        free(buffer);
+    }
+    close(fd);
+    return match;
+}
+
+/*
+ * Put the key at `path` in the cache directory. Concurrent containers on one volume each
+ * write a private temp name and rename it into place, so none ever reads a partial key.
+ */
+static int store_cached_key(const char *dir, const char *path, const char *json)
+{
+    char *partial;
+
+    if (mkdir(dir, 0700) != 0 && errno != EEXIST) {
+        log_creds("WARNING: Could not create GOOGLE_CREDS_CACHE_DIR %s: %s", dir, strerror(errno));
+        return -1;
+    }
+    if (asprintf(&partial, "%s.%ld.partial", path, (long)getpid()) < 0)
+        return -1;
+    if (write_key_file(partial, json) != 0 || rename(partial, path) != 0) {
+        log_creds("WARNING: Could not write %s: %s", path, strerror(errno));
+        unlink(partial);
+        free(partial);
+        return -1;
+    }
+    free(partial);
+    return 0;
+}
+
+static void credentials_ready(const struct timespec *begin, const char *source)
+{
+    log_creds("Google Cloud credentials ready in %ld ms (%s)", elapsed_ms_since(begin), source);
+}
+
+static int setup_google_credentials(void)
+{
+    const char *json = getenv("GOOGLE_SERVICE_ACCOUNT_JSON");
+    const char *temp_file = getenv("GOOGLE_CREDS_TEMP_FILE");
+    const char *cache_dir = getenv("GOOGLE_CREDS_CACHE_DIR");
+    const char *existing = getenv("GOOGLE_APPLICATION_CREDENTIALS");
+    struct timespec begin;
+    char *cached = NULL;
+    int reused = 0;
+
+    clock_gettime(CLOCK_MONOTONIC, &begin);
+    if (temp_file == NULL || *temp_file == '\0')
+        temp_file = "/tmp/sa.json";
+    if (debug_creds())
+        log_creds("Starting Google Cloud credentials setup");
+
+    if (json == NULL || *json == '\0') {
+        if (debug_creds())
+            log_creds("No GOOGLE_SERVICE_ACCOUNT_JSON environment variable found");
+        log_creds("Proceeding with existing authentication configuration");
+        if (existing != NULL && *existing != '\0')
+            log_creds("Using existing GOOGLE_APPLICATION_CREDENTIALS: %s", existing);
+        else if (debug_creds())
+            log_creds("No Google Cloud credentials configured - relying on default authentication");
+        credentials_ready(&begin, existing != NULL && *existing != '\0' ? "existing file" : "default");
+        return 0;
+    }
+
+    log_creds("Setting up Google Cloud credentials from GOOGLE_SERVICE_ACCOUNT_JSON environment variable");
+    if (cache_dir != NULL && *cache_dir != '\0') {
+        cached = cached_key_path(cache_dir, json);
+        if (cached == NULL)
+            log_creds("WARNING: Service account JSON has no usable private_key_id; not caching it in %s", cache_dir);
+        else
+            reused = cached_key_matches(cached, json);
+    }
+    /* A cached key was validated by the container that wrote it */
+    if (!reused) {
+        if (validate_service_account_json(json) != 0) {
+            log_creds("ERROR: Failed to validate service account JSON");
+            free(cached);
+            return -1;
+        }
+        if (cached != NULL && store_cached_key(cache_dir, cached, json) != 0) {
+            free(cached);
+            cached = NULL;
+        }
+        if (cached == NULL && write_key_file(temp_file, json) != 0) {
+            log_creds("ERROR: Could not write %s: %s", temp_file, strerror(errno));
+            return -1;
+        }
+    }
+    setenv("GOOGLE_APPLICATION_CREDENTIALS", cached != NULL ? cached : temp_file, 1);
+
+    log_creds("Google Cloud credentials configured successfully");
+    if (debug_creds())
+        log_creds("GOOGLE_APPLICATION_CREDENTIALS set to: %s", getenv("GOOGLE_APPLICATION_CREDENTIALS"));
+    export_project_id(json);
+    credentials_ready(&begin, reused ? "reused cached key" : cached != NULL ? "cached new key" : "temp file");
+    free(cached);
+    return 0;
+}
+
+static void usage(void)
+{
+    fprintf(stderr,
+            "usage: toolbox-launcher [--name NAME] [--tag TAG] [--google-credentials] [--require FILE]...\n"
+            "                        [--default-env NAME=VALUE]... [--warn-missing-env-file NAME]...\n"
+            "                        [--http-address ADDR] -- TOOLBOX_ARGS...\n");
+    exit(2);
+}
+
+int main(int argc, char **argv)
+{
+    const char *name = "toolbox";
+    const char *http_address = NULL;
+    const char *requires[MAX_OPTIONS];
+    const char *warn_env_files[MAX_OPTIONS];
+    int n_requires = 0, n_warn_env_files = 0, google_credentials = 0;
+    int i = 1, toolbox_args, n;
+    char **exec_argv;
+    size_t length = 0;
+    char *joined;
+
+    clock_gettime(CLOCK_MONOTONIC, &started);
+    for (; i < argc && strcmp(argv[i], "--") != 0; i++) {
+        if (strcmp(argv[i], "--google-credentials") == 0) {
+            google_credentials = 1;
+        } else if (i + 1 >= argc) {
+            usage();
+        } else if (strcmp(argv[i], "--name") == 0) {
+            name = argv[++i];
+        } else if (strcmp(argv[i], "--tag") == 0) {
+            tag = argv[++i];
+        } else if (strcmp(argv[i], "--http-address") == 0) {
+            http_address = argv[++i];
+        } else if (strcmp(argv[i], "--require") == 0 && n_requires < MAX_OPTIONS) {
+            requires[n_requires++] = argv[++i];
+        } else if (strcmp(argv[i], "--warn-missing-env-file") == 0 && n_warn_env_files < MAX_OPTIONS) {
+            warn_env_files[n_warn_env_files++] = argv[++i];
+        } else if (strcmp(argv[i], "--default-env") == 0 && strchr(argv[i + 1], '=') != NULL) {
+            char *assignment = argv[++i];
+            char *equals = strchr(assignment, '=');
+            *equals = '\0';
+            setenv(assignment, equals + 1, 0);
+            *equals = '=';
+        } else {
+            usage();
+        }
+    }
+    if (i >= argc)
+        usage();
+    toolbox_args = i + 1;
+
+    log_msg("Starting %s custom toolbox entrypoint", name);
+
+    if (access(ORIGINAL_ENTRYPOINT, X_OK) != 0) {
+        log_msg("ERROR: Original toolbox entrypoint not found at %s", ORIGINAL_ENTRYPOINT);
+        return 1;
+    }
+    for (n = 0; n < n_requires; n++) {
+        if (access(requires[n], F_OK) != 0) {
+            log_msg("ERROR: Required file not found at %s", requires[n]);
+            return 1;
+        }
+    }
+    for (n = 0; n < n_warn_env_files; n++) {
+        const char *path = getenv(warn_env_files[n]);
+        if (path == NULL || access(path, F_OK) != 0)
+            log_msg("WARNING: %s not found at %s", warn_env_files[n], path ? path : "(unset)");
+    }
+    if (google_credentials && setup_google_credentials() != 0) {
+        log_msg("ERROR: Failed to setup Google Cloud credentials");
+        return 1;
+    }
+
+    if (http_address != NULL && (has_flag(argv + toolbox_args, argc - toolbox_args, "--stdio", NULL) ||
+                                 has_flag(argv + toolbox_args, argc - toolbox_args, "--address", "-a")))
+        http_address = NULL;
+
+    /* The image's own arguments come first, then whatever `docker run` passed */
+    exec_argv = calloc((size_t)(argc - toolbox_args) + 4, sizeof *exec_argv);
+    if (exec_argv == NULL)
+        return 1;
+    exec_argv[0] = ORIGINAL_ENTRYPOINT;
+    for (n = toolbox_args; n < argc; n++)
+        exec_argv[n - toolbox_args + 1] = argv[n];
+    if (http_address != NULL) {
+        exec_argv[argc - toolbox_args + 1] = "--address";
+        exec_argv[argc - toolbox_args + 2] = (char *)http_address;
+    }
+
+    for (n = 1; exec_argv[n] != NULL; n++)
+        length += strlen(exec_argv[n]) + 1;
+    joined = calloc(length + 1, 1);
+    for (n = 1; joined != NULL && exec_argv[n] != NULL; n++) {
+        strcat(joined, exec_argv[n]);
+        if (exec_argv[n + 1] != NULL)
+            strcat(joined, " ");
+    }
+    log_msg("Executing %s toolbox with arguments: %s", name, joined ? joined : "");
+    free(joined);
+
+    execv(ORIGINAL_ENTRYPOINT, exec_argv);
+    log_msg("ERROR: Could not execute %s: %s", ORIGINAL_ENTRYPOINT, strerror(errno));
+    return 1;
+}
@@ -0,0 +1,30 @@
+-- Local snapshot of the Redshift catalog, served by the lookup_schema tool
+-- Built empty into the image; filled by `python3 -m mcp_client.schema_index` from tests/
+
+CREATE TABLE IF NOT EXISTS index_meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+) WITHOUT ROWID;
+
+-- One row per table, for by-table lookups without touching columns
+CREATE TABLE IF NOT EXISTS tables (
+    table_name TEXT NOT NULL,
+    schema_name TEXT NOT NULL,
+    column_count INTEGER NOT NULL,
+    PRIMARY KEY (table_name, schema_name)
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS columns (
+    table_name TEXT NOT NULL,
+    schema_name TEXT NOT NULL,
+    column_position INTEGER NOT NULL,
+    column_name TEXT NOT NULL,
+    data_type TEXT,
+    is_nullable TEXT,
+    column_default TEXT,
+    PRIMARY KEY (table_name, schema_name, column_position)
+) WITHOUT ROWID;
+
+CREATE INDEX IF NOT EXISTS columns_by_schema ON columns (schema_name, table_name, column_position);
+
+INSERT OR IGNORE INTO index_meta (key, value) VALUES ('refreshed_at', '');
@@ -0,0 +1,71 @@
+"""
+Shared asyncio MCP client for the toolbox test suites
+"""
+
+from .backends import backend_params, discover_backends, load_backend
+from .base import McpClient
+from .cache import CacheStats, TTLCache
+from .client import StdioClient, make_client
+from .codec import Codec, RowDecoder, get_codec
+from .columnar import ColumnarResult
+from .errors import ConfigError, McpError, RequestTimeout, TransportClosed
+from .export import ExportInterceptor, ExportSummary, export_tool
+from .fanout import FanoutResult, FanoutSession, merge_rows
+from .http_client import HttpClient
+from .intercept import Interceptor
+from .params import DOCKER_IMAGE, ServerParams, docker_run, load_env_file, write_temp_file
+from .pool import PoolManager, ProcessPool
+from .recording import Recorder, read_recording
+from .result_cache import ResultCacheInterceptor
+from .row_budget import RowBudgetInterceptor
+from .schema_cache import SchemaCachingClient
+from .smoke import export_test, run_export_test, run_smoke_test, smoke_test
+from .streaming import ResultStream
+from .telemetry import Telemetry
+from .tool_catalog import ToolCatalog
+
+__all__ = [
+    "DOCKER_IMAGE",
+    "CacheStats",
+    "Codec",
+    "ColumnarResult",
+    "ConfigError",
+    "ExportInterceptor",
+    "ExportSummary",
+    "FanoutResult",
+    "FanoutSession",
+    "HttpClient",
+    "Interceptor",
+    "McpClient",
+    "McpError",
+    "PoolManager",
+    "ProcessPool",
+    "Recorder",
+    "RequestTimeout",
+    "ResultCacheInterceptor",
+    "ResultStream",
+    "RowBudgetInterceptor",
+    "RowDecoder",
+    "SchemaCachingClient",
+    "ServerParams",
+    "StdioClient",
+    "TTLCache",
+    "Telemetry",
+    "ToolCatalog",
+    "TransportClosed",
+    "backend_params",
+    "discover_backends",
+    "docker_run",
+    "export_test",
+    "export_tool",
+    "get_codec",
+    "load_backend",
+    "load_env_file",
+    "make_client",
+    "merge_rows",
+    "read_recording",
+    "run_export_test",
+    "run_smoke_test",
+    "smoke_test",
+    "write_temp_file",
+]
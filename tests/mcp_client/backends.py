@@ -0,0 +1,33 @@
+"""
+Discovery of the per-backend test directories
+Each tests/<db>/test_mcp.py exposes `server_params()`; tools in this package reuse those
+launch configurations instead of duplicating docker commands.
+"""
+
+import importlib.util
+from pathlib import Path
+from types import ModuleType
+
+from .params import ServerParams
+
+TESTS_DIR = Path(__file__).resolve().parent.parent
+
+
+def discover_backends() -> list[str]:
+    """Names of every tests/<db> directory that has a test_mcp.py"""
+    return sorted(p.parent.name for p in TESTS_DIR.glob("*/test_mcp.py"))
+
+
+def load_backend(name: str) -> ModuleType:
+    path = TESTS_DIR / name / "test_mcp.py"
+    if not path.exists():
+        raise ValueError(f"Unknown backend '{name}' (expected {path})")
+    spec = importlib.util.spec_from_file_location(f"backend_{name}", path)
+    assert spec is not None and spec.loader is not None
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def backend_params(name: str) -> ServerParams:
+    return load_backend(name).server_params()
@@ -0,0 +1,324 @@
+"""
+Transport-independent part of the MCP client
+StdioClient and HttpClient implement start/close/request/notify; the MCP methods on top
+of those are shared, so callers can take either one.
+
+Every request has a deadline: `timeout` on the client (MCP_CLIENT_TIMEOUT, else
+REQUEST_TIMEOUT), or per call. A request past it raises RequestTimeout, and the server is sent
+`notifications/cancelled`. A server still working on the request at `hard_timeout`
+(MCP_CLIENT_HARD_TIMEOUT, else HARD_TIMEOUT) is stuck: StdioClient replaces its process. A
+value of 0 turns a deadline off.
+
+With telemetry on (see telemetry.py), every request is recorded as a Span. With a tool
+catalog (see tool_catalog.py), handshake() reuses the tools cached for the same image and
+tools file instead of sending tools/list.
+"""
+
+import abc
+import collections
+import contextlib
+import os
+import secrets
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, AsyncIterator, Callable, Optional, Sequence, Union
+
+from .codec import Codec, RowDecoder, get_codec
+from .columnar import ColumnarResult
+from .errors import McpError
+from .params import ServerParams
+from .streaming import ResultStream
+from .telemetry import Span, Telemetry, default_telemetry
+from .tool_catalog import ToolCatalog, default_tool_catalog
+
+if TYPE_CHECKING:
+    from .export import ExportSummary
+
+PROTOCOL_VERSION = "1.0.0"
+CLIENT_INFO = {"name": "test-client", "version": "1.0.0"}
+
+TIMEOUT_ENV = "MCP_CLIENT_TIMEOUT"
+HARD_TIMEOUT_ENV = "MCP_CLIENT_HARD_TIMEOUT"
+REQUEST_TIMEOUT = 300.0
+HARD_TIMEOUT = 600.0
+
+NotificationHandler = Callable[[str, dict], None]
+
+# (method, params) for request_many; methods under notifications/ are sent without an id
+Call = tuple[str, Optional[dict]]
+
+
+def is_notification(method: str) -> bool:
+    return method.startswith("notifications/")
+
+
+def deadline(value: Optional[float], env: str, default: float) -> Optional[float]:
+    """Seconds from an argument, else the environment, else `default`; 0 means none"""
+    if value is None:
+        value = float(os.environ[env]) if os.environ.get(env) else default
+    return value if value > 0 else None
+
+
+def cancel_notification(request_id: Any, reason: str) -> dict:
+    return {"jsonrpc": "2.0", "method": "notifications/cancelled", "params": {"requestId": request_id, "reason": reason}}
+
+
+class McpClient(abc.ABC):
+    """MCP tool-calling methods over an abstract JSON-RPC transport"""
+
+    transport = ""
+
+    def __init__(
+        self,
+        params: ServerParams,
+        *,
+        codec: Union[Codec, str, None] = None,
+        on_notification: Optional[NotificationHandler] = None,
+        timeout: Optional[float] = None,
+        hard_timeout: Optional[float] = None,
+        telemetry: Optional[Telemetry] = None,
+        tool_catalog: Optional[ToolCatalog] = None,
+    ):
+        self.params = params
+        self.codec = get_codec(codec)
+        self.telemetry = telemetry if telemetry is not None else default_telemetry()
+        self.tool_catalog = tool_catalog if tool_catalog is not None else default_tool_catalog()
+        self._catalog_key: Optional[str] = None  # worked out on the first handshake
+        # One trace per client, so a session's start, handshake and calls show up together
+        self.trace_id = secrets.token_hex(16)
+        self.on_notification = on_notification
+        self.timeout = deadline(timeout, TIMEOUT_ENV, REQUEST_TIMEOUT)
+        self.hard_timeout = deadline(hard_timeout, HARD_TIMEOUT_ENV, HARD_TIMEOUT)
+        self.server_info: dict = {}
+        self.protocol_version: Optional[str] = None
+        self.initialized = False
+        self.requests_sent = 0
+        self.timeouts = 0
+        self.recycles = 0
+        self.stray_lines: collections.deque = collections.deque(maxlen=50)
+
+    async def __aenter__(self) -> "McpClient":
+        await self.start()
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.close()
+
+    @property
+    @abc.abstractmethod
+    def running(self) -> bool:
+        """Whether the transport is up and can take requests"""
+
+    @property
+    def stderr(self) -> str:
+        return ""
+
+    @abc.abstractmethod
+    async def start(self) -> None:
+        """Open the transport (launch the server process, open the HTTP session)"""
+
+    @abc.abstractmethod
+    async def close(self, timeout: float = 5.0) -> None:
+        """Release the transport; `timeout` bounds a graceful shutdown"""
+
+    @abc.abstractmethod
+    async def request(self, method: str, params: Optional[dict] = None, *, timeout: Optional[float] = None) -> Any:
+        """Send one request and wait for its result; raises McpError on an error response
+
+        `timeout` overrides the client's deadline for this request (0: none).
+        """
+
+    @abc.abstractmethod
+    async def notify(self, method: str, params: Optional[dict] = None) -> None:
+        """Send one notification; there is no response to wait for"""
+
+    async def request_many(
+        self,
+        calls: Sequence[Call],
+        *,
+        batch: bool = False,
+        return_exceptions: bool = False,
+        timeout: Optional[float] = None,
+    ) -> list[Any]:
+        """Send several requests and notifications in order; results come back in the same order
+
+        Notifications get None. With `return_exceptions`, a failed request's McpError takes
+        its place instead of being raised. This implementation goes in lockstep and ignores
+        `batch`; StdioClient writes every message before reading any response. `timeout`
+        applies to each request here, and to all of them together in StdioClient.
+        """
+        results: list[Any] = []
+        for method, params in calls:
+            if is_notification(method):
+                await self.notify(method, params)
+                results.append(None)
+                continue
+            try:
+                results.append(await self.request(method, params, timeout=timeout))
+            except McpError as e:
+                if not return_exceptions:
+                    raise
+                results.append(e)
+        return results
+
+    def _span(self, method: str, params: Optional[dict] = None, bytes_out: int = 0) -> Optional[Span]:
+        """A started Span for one request, or None with telemetry off"""
+        if self.telemetry is None:
+            return None
+        tool = params.get("name", "") if method == "tools/call" and params else ""
+        return self.telemetry.start(
+            method,
+            backend=self.params.name,
+            transport=self.transport,
+            tool=tool,
+            trace_id=self.trace_id,
+            bytes_out=bytes_out,
+        )
+
+    def _finish(self, span: Optional[Span], outcome: Any, rows: Optional[int] = None) -> None:
+        """Record a span with its request's result or exception"""
+        if span is not None and self.telemetry is not None:
+            self.telemetry.finish(span, outcome, rows=rows)
+
+    # -- MCP methods ------------------------------------------------------
+
+    async def initialize(
+        self,
+        protocol_version: str = PROTOCOL_VERSION,
+        client_info: Optional[dict] = None,
+    ) -> dict:
+        result = await self.request(*self.initialize_call(protocol_version, client_info))
+        self._initialized(result)
+        await self.notify("notifications/initialized")
+        return result
+
+    async def handshake(self, *, pipelined: bool = True, batch: bool = False) -> list[dict]:
+        """initialize + notifications/initialized + tools/list; returns the tools
+
+        Pipelined, all three go out in one write and the session is ready after a single
+        round trip instead of two. With a tool catalog holding this server's tools, tools/list
+        is only sent if the server reports a different serverInfo than when they were cached.
+        The catalog key (an image inspect and tools file hashes) is worked out once per client.
+        """
+        if self._catalog_key is None and self.tool_catalog is not None:
+            self._catalog_key = await self.tool_catalog.key_for(self.params)
+        key = self._catalog_key
+        cached = self.tool_catalog.get(key) if key is not None and self.tool_catalog is not None else None
+        if cached is not None:
+            if pipelined:
+                result, _ = await self.request_many(
+                    [self.initialize_call(), ("notifications/initialized", None)], batch=batch
+                )
+                self._initialized(result)
+            else:
+                await self.initialize()
+            if cached.server_info == self.server_info:
+                return cached.tools
+            tools = await self.list_tools()
+        elif not pipelined:
+            await self.initialize()
+            tools = await self.list_tools()
+        else:
+            result, _, listed = await self.request_many(
+                [self.initialize_call(), ("notifications/initialized", None), ("tools/list", None)],
+                batch=batch,
+            )
+            self._initialized(result)
+            tools = listed.get("tools", [])
+        if key is not None and self.tool_catalog is not None:
+            self.tool_catalog.put(key, self.params.name, tools, self.server_info)
+        return tools
+
+    def initialize_call(self, protocol_version: str = PROTOCOL_VERSION, client_info: Optional[dict] = None) -> Call:
+        """The initialize request as a request_many entry, for pipelining it with others"""
+        return "initialize", {
+            "protocolVersion": protocol_version,
+            "capabilities": {},
+            "clientInfo": client_info or CLIENT_INFO,
+        }
+
+    def _initialized(self, result: Any) -> None:
+        self.initialized = True
+        if isinstance(result, dict):
+            self.server_info = result.get("serverInfo", {})
+            self.protocol_version = result.get("protocolVersion")
+
+    async def ping(self) -> None:
+        await self.request("ping")
+
+    async def list_tools(self) -> list[dict]:
+        result = await self.request("tools/list")
+        return result.get("tools", [])
+
+    async def call_tool(self, name: str, arguments: Optional[dict] = None, *, timeout: Optional[float] = None) -> dict:
+        return await self.request("tools/call", {"name": name, "arguments": arguments or {}}, timeout=timeout)
+
+    async def call_rows(self, name: str, arguments: Optional[dict] = None, row_type: Optional[type] = None) -> list:
+        """call_tool, returning the result rows decoded (into row_type instances when given)
+
+        Raises McpError when the tool reports an error.
+        """
+        result = await self.call_tool(name, arguments)
+        if result.get("isError"):
+            raise McpError(-32000, f"{name} returned an error result", result)
+        return RowDecoder(self.codec, row_type).rows(result)
+
+    async def call_columnar(
+        self,
+        name: str,
+        arguments: Optional[dict] = None,
+        *,
+        max_rows: Optional[int] = None,
+        max_bytes: Optional[int] = None,
+    ) -> ColumnarResult:
+        """call_tool, returning the rows as a ColumnarResult built while they stream in
+
+        Raises McpError when the tool reports an error.
+        """
+        async with self.stream_tool(name, arguments, max_rows=max_rows, max_bytes=max_bytes) as rows:
+            result = await ColumnarResult.from_stream(rows)
+        if rows.is_error:
+            raise McpError(-32000, f"{name} returned an error result", {"content": result.extra})
+        return result
+
+    async def export_tool(
+        self,
+        name: str,
+        arguments: Optional[dict],
+        path: Union[str, Path],
+        *,
+        format: str = "parquet",
+        batch_rows: int = 65536,
+        max_rows: Optional[int] = None,
+        max_bytes: Optional[int] = None,
+    ) -> "ExportSummary":
+        """Stream a tool's rows into an Arrow IPC or Parquet file; see export.export_tool"""
+        from .export import export_tool
+
+        return await export_tool(
+            self, name, arguments, path, format=format, batch_rows=batch_rows, max_rows=max_rows, max_bytes=max_bytes
+        )
+
+    @contextlib.asynccontextmanager
+    async def stream_tool(
+        self,
+        name: str,
+        arguments: Optional[dict] = None,
+        *,
+        max_rows: Optional[int] = None,
+        max_bytes: Optional[int] = None,
+        max_queued: int = 1000,
+        row_type: Optional[type] = None,
+        timeout: Optional[float] = None,
+    ) -> AsyncIterator[ResultStream]:
+        """Call a tool and iterate its result rows; see StdioClient.stream_tool
+
+        This fallback receives the whole response first and applies the caps afterwards.
+        """
+        stream = ResultStream(max_rows, max_bytes, max(max_queued, 1 << 30), RowDecoder(self.codec, row_type))
+        result = await self.call_tool(name, arguments, timeout=timeout)
+        for item in result.get("content", []):
+            if not stream.accepting:
+                break
+            await stream.put_item(item)
+        stream.finish({k: v for k, v in result.items() if k != "content"})
+        yield stream
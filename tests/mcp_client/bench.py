@@ -0,0 +1,281 @@
+#!/usr/bin/env python3
+"""
+Load generation and latency benchmark for the toolbox images
+Reuses each backend's server_params() from tests/<db>/test_mcp.py, seeds a benchmark table
+through execute_sql, and sweeps concurrency, query shape and payload size.
+
+Usage (from tests/, with the backend's docker-compose database already up):
+    python3 -m mcp_client.bench --backend postgres --backend sqlite \\
+        --concurrency 1,8,32 --payload 16,1024 --json bench.json --csv bench.csv
+"""
+
+import argparse
+import asyncio
+import csv
+import json
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any, Optional
+
+from .backends import load_backend
+from .base import McpClient
+from .client import make_client
+from .dialects import BENCH_TABLE, SCHEMA_TABLE_PREFIX, Dialect, dialect_for
+from .errors import McpError, TransportClosed
+from .params import DOCKER_IMAGE, ServerParams
+from .stats import summarize
+
+SHAPES = ("point", "scan", "list_tables")
+LOCAL_BACKENDS = ["postgres", "mysql", "sqlserver", "spanner", "sqlite", "redshift"]
+
+
+@dataclass
+class BenchConfig:
+    concurrency: list[int] = field(default_factory=lambda: [1, 8, 32])
+    shapes: list[str] = field(default_factory=lambda: list(SHAPES))
+    payloads: list[int] = field(default_factory=lambda: [16, 1024])
+    requests: int = 200
+    warmup: int = 20
+    rows: int = 10000
+    scan_rows: int = 1000
+    schema_tables: int = 200
+    schema_columns: int = 20
+    processes: int = 1
+    seed: bool = True
+
+
+@dataclass
+class BenchResult:
+    backend: str
+    shape: str
+    payload: int
+    concurrency: int
+    requests: int
+    errors: int
+    duration_s: float
+    throughput_rps: float
+    latency: dict[str, float]
+
+
+def is_error(result: Any) -> bool:
+    return isinstance(result, dict) and bool(result.get("isError"))
+
+
+def generate_sqlite_db(path: Path, config: BenchConfig) -> Path:
+    """Build the SQLite benchmark file locally instead of seeding it through the server"""
+    path.unlink(missing_ok=True)
+    conn = sqlite3.connect(path)
+    with conn:
+        conn.execute(f"CREATE TABLE {BENCH_TABLE} (id INTEGER PRIMARY KEY, name TEXT, payload TEXT)")
+        payload = "x" * max(config.payloads)
+        conn.executemany(
+            f"INSERT INTO {BENCH_TABLE} VALUES (?, ?, ?)",
+            ((i, f"item-{i}", payload) for i in range(1, config.rows + 1)),
+        )
+        columns = ", ".join(f"c{c} INTEGER" for c in range(max(1, config.schema_columns)))
+        for t in range(config.schema_tables):
+            conn.execute(f"CREATE TABLE {SCHEMA_TABLE_PREFIX}{t} ({columns})")
+    conn.close()
+    return path
+
+
+def shape_request(shape: str, dialect: Dialect, payload: int, config: BenchConfig, rng: random.Random) -> tuple[str, dict]:
+    if shape == "point":
+        return "execute_sql", {"sql": dialect.point_lookup(rng.randint(1, config.rows), payload)}
+    if shape == "scan":
+        return "execute_sql", {"sql": dialect.scan(config.scan_rows, payload)}
+    return "list_tables", {"table_names": ""}
+
+
+async def seed(client: McpClient, dialect: Dialect, config: BenchConfig) -> None:
+    statements = dialect.seed_statements(config.rows, max(config.payloads), config.schema_tables, config.schema_columns)
+    for statement in statements:
+        result = await client.call_tool("execute_sql", {"sql": statement})
+        if is_error(result):
+            raise McpError(-32000, f"Seeding failed on: {statement[:120]}", result)
+
+
+async def run_point(
+    clients: list[McpClient],
+    backend: str,
+    shape: str,
+    dialect: Dialect,
+    payload: int,
+    concurrency: int,
+    config: BenchConfig,
+) -> BenchResult:
+    rng = random.Random(42)
+    latencies: list[float] = []
+    errors = 0
+    remaining = 0
+
+    async def worker(index: int, measured: bool) -> None:
+        nonlocal remaining, errors
+        client = clients[index % len(clients)]
+        while remaining > 0:
+            remaining -= 1
+            tool, arguments = shape_request(shape, dialect, payload, config, rng)
+            started = time.perf_counter()
+            try:
+                failed = is_error(await client.call_tool(tool, arguments))
+            except McpError:
+                failed = True
+            if measured:
+                latencies.append(time.perf_counter() - started)
+                errors += failed
+
+    # Warmup runs to completion first, so the measured window holds only measured requests
+    remaining = config.warmup
+    await asyncio.gather(*[worker(i, False) for i in range(concurrency)])
+    remaining = config.requests
+    started = time.perf_counter()
+    await asyncio.gather(*[worker(i, True) for i in range(concurrency)])
+    duration = time.perf_counter() - started
+    return BenchResult(
+        backend=backend,
+        shape=shape,
+        payload=payload,
+        concurrency=concurrency,
+        requests=len(latencies),
+        errors=errors,
+        duration_s=duration,
+        throughput_rps=len(latencies) / duration if duration else 0.0,
+        latency=summarize(latencies),
+    )
+
+
+async def bench_backend(backend: str, params: ServerParams, config: BenchConfig) -> dict:
+    dialect = dialect_for(backend)
+    report: dict[str, Any] = {"backend": backend, "results": [], "skipped": []}
+    if dialect is None:
+        report["skipped"].append(f"No SQL dialect known for {backend}")
+        return report
+
+    started = time.perf_counter()
+    clients = [make_client(params) for _ in range(config.processes)]
+    try:
+        await asyncio.gather(*[c.start() for c in clients])
+        await asyncio.gather(*[c.initialize() for c in clients])
+        report["cold_start_s"] = time.perf_counter() - started
+        tool_names = {t.get("name") for t in await clients[0].list_tools()}
+
+        if config.seed and backend != "sqlite" and "execute_sql" in tool_names:
+            seed_started = time.perf_counter()
+            await seed(clients[0], dialect, config)
+            report["seed_s"] = time.perf_counter() - seed_started
+
+        for shape in config.shapes:
+            tool = "list_tables" if shape == "list_tables" else "execute_sql"
+            if tool not in tool_names:
+                report["skipped"].append(f"{shape}: server has no {tool} tool")
+                continue
+            # list_tables doesn't depend on payload size
+            payloads = config.payloads[:1] if shape == "list_tables" else config.payloads
+            for payload in payloads:
+                for concurrency in config.concurrency:
+                    result = await run_point(clients, backend, shape, dialect, payload, concurrency, config)
+                    report["results"].append(asdict(result))
+                    print(format_result(result))
+    finally:
+        await asyncio.gather(*[c.close() for c in clients])
+    return report
+
+
+def format_result(result: BenchResult) -> str:
+    lat = result.latency
+    return (
+        f"  {result.backend:<10} {result.shape:<12} payload={result.payload:<6} c={result.concurrency:<4} "
+        f"{result.throughput_rps:8.1f} req/s  p50={lat.get('p50_ms', 0):7.1f}ms  "
+        f"p95={lat.get('p95_ms', 0):7.1f}ms  p99={lat.get('p99_ms', 0):7.1f}ms  errors={result.errors}"
+    )
+
+
+def write_csv(path: Path, reports: list[dict]) -> None:
+    fields = ["backend", "shape", "payload", "concurrency", "requests", "errors", "duration_s", "throughput_rps",
+              "mean_ms", "p50_ms", "p95_ms", "p99_ms", "max_ms"]
+    with path.open("w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=fields, extrasaction="ignore")
+        writer.writeheader()
+        for report in reports:
+            for result in report["results"]:
+                writer.writerow({**result, **result["latency"]})
+
+
+def backend_params_for_bench(backend: str, config: BenchConfig, workdir: Path) -> ServerParams:
+    module = load_backend(backend)
+    if backend == "sqlite":
+        return module.server_params(str(generate_sqlite_db(workdir / "bench.sqlite", config)))
+    return module.server_params()
+
+
+async def run(backends: list[str], config: BenchConfig) -> list[dict]:
+    reports = []
+    with tempfile.TemporaryDirectory(prefix="toolbox-bench-") as tmp:
+        for backend in backends:
+            print(f"Benchmarking {backend}...")
+            try:
+                params = backend_params_for_bench(backend, config, Path(tmp))
+                reports.append(await bench_backend(backend, params, config))
+            except (McpError, TransportClosed, OSError, ValueError) as e:
+                print(f"✗ {backend}: {e}")
+                reports.append({"backend": backend, "results": [], "error": str(e)})
+    return reports
+
+
+def int_list(value: str) -> list[int]:
+    return [int(v) for v in value.split(",") if v]
+
+
+def parse_args(argv: Optional[list[str]] = None) -> tuple[argparse.Namespace, BenchConfig]:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--backend", action="append", help=f"Backend to benchmark (default: {', '.join(LOCAL_BACKENDS)})")
+    parser.add_argument("--concurrency", type=int_list, default=BenchConfig().concurrency)
+    parser.add_argument("--shape", action="append", choices=SHAPES, help="Query shape (default: all)")
+    parser.add_argument("--payload", type=int_list, default=BenchConfig().payloads, help="Payload bytes per row")
+    parser.add_argument("--requests", type=int, default=BenchConfig.requests)
+    parser.add_argument("--warmup", type=int, default=BenchConfig.warmup)
+    parser.add_argument("--rows", type=int, default=BenchConfig.rows, help="Rows seeded into the benchmark table")
+    parser.add_argument("--scan-rows", type=int, default=BenchConfig.scan_rows)
+    parser.add_argument("--schema-tables", type=int, default=BenchConfig.schema_tables)
+    parser.add_argument("--schema-columns", type=int, default=BenchConfig.schema_columns)
+    parser.add_argument("--processes", type=int, default=BenchConfig.processes, help="Toolbox processes per backend")
+    parser.add_argument("--no-seed", action="store_true", help="Reuse tables from a previous run")
+    parser.add_argument("--json", type=Path, help="Write the full report as JSON")
+    parser.add_argument("--csv", type=Path, help="Write one row per result as CSV")
+    args = parser.parse_args(argv)
+    config = BenchConfig(
+        concurrency=args.concurrency,
+        shapes=args.shape or list(SHAPES),
+        payloads=args.payload,
+        requests=args.requests,
+        warmup=args.warmup,
+        rows=args.rows,
+        scan_rows=args.scan_rows,
+        schema_tables=args.schema_tables,
+        schema_columns=args.schema_columns,
+        processes=args.processes,
+        seed=not args.no_seed,
+    )
+    return args, config
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    args, config = parse_args(argv)
+    reports = asyncio.run(run(args.backend or LOCAL_BACKENDS, config))
+    output = {"image": DOCKER_IMAGE, "timestamp": time.time(), "config": asdict(config), "backends": reports}
+    if args.json:
+        args.json.write_text(json.dumps(output, indent=2))
+        print(f"✓ Wrote {args.json}")
+    if args.csv:
+        write_csv(args.csv, reports)
+        print(f"✓ Wrote {args.csv}")
+    return 1 if any("error" in r for r in reports) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
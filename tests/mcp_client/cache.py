@@ -0,0 +1,93 @@
+"""
+In-memory LRU cache with per-entry TTL and hit/miss counters
+"""
+
+import collections
+import time
+from dataclasses import asdict, dataclass
+from typing import Any, Callable, Hashable, Optional
+
+
+@dataclass
+class CacheStats:
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+    expirations: int = 0
+    invalidations: int = 0
+    coalesced: int = 0  # misses that waited on an identical call already in flight
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def as_dict(self) -> dict:
+        return {**asdict(self), "hit_rate": self.hit_rate}
+
+
+class TTLCache:
+    """Least-recently-used cache whose entries also expire `ttl` seconds after insertion
+
+    With `max_bytes`, callers pass each entry's size to put() and the least recently used
+    entries are evicted until the total fits.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 256,
+        ttl: float = 300.0,
+        clock: Callable[[], float] = time.monotonic,
+        max_bytes: Optional[int] = None,
+    ):
+        if max_entries < 1:
+            raise ValueError("max_entries must be at least 1")
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.stats = CacheStats()
+        self.size_bytes = 0
+        # Invalidations per scope (e.g. a source), for callers sharing the cache that must not
+        # store a value fetched across an invalidation of its scope
+        self.generations: collections.Counter = collections.Counter()
+        self._clock = clock
+        self._entries: collections.OrderedDict = collections.OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        entry = self._entries.get(key)
+        if entry is not None and entry[0] <= self._clock():
+            self._remove(key)
+            self.stats.expirations += 1
+            entry = None
+        if entry is None:
+            self.stats.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.stats.hits += 1
+        return entry[1]
+
+    def put(self, key: Hashable, value: Any, ttl: Optional[float] = None, size: int = 0) -> None:
+        if self.max_bytes is not None and size > self.max_bytes:
+            return
+        if key in self._entries:
+            self._remove(key)
+        expires = self._clock() + (self.ttl if ttl is None else ttl)
+        self._entries[key] = (expires, value, size)
+        self.size_bytes += size
+        while len(self._entries) > self.max_entries or (self.max_bytes is not None and self.size_bytes > self.max_bytes):
+            self._remove(next(iter(self._entries)))
+            self.stats.evictions += 1
+
+    def invalidate(self, predicate: Optional[Callable[[Hashable], bool]] = None) -> int:
+        """Drop every entry whose key matches `predicate` (all entries when omitted)"""
+        keys = [k for k in self._entries if predicate is None or predicate(k)]
+        for key in keys:
+            self._remove(key)
+        self.stats.invalidations += len(keys)
+        return len(keys)
+
+    def _remove(self, key: Hashable) -> None:
+        self.size_bytes -= self._entries.pop(key)[2]
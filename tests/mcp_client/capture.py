@@ -0,0 +1,63 @@
+"""
+Workload capture for the stdio proxy
+CaptureInterceptor appends every tools/call the client sends to a JSON-lines file:
+{"ts": ..., "tool": ..., "arguments": {...}}. Placed first, it sees a request as it arrives,
+before any other interceptor answers or rewrites it, so calls answered from the result cache
+count too. The file is buffered and complete once the proxy exits; workload.py reads it back.
+"""
+
+import json
+import time
+from pathlib import Path
+from typing import IO, Any, Iterator, Optional, Union
+
+from .intercept import Interceptor
+
+
+class CaptureInterceptor(Interceptor):
+    name = "capture"
+
+    def __init__(self, path: Union[str, Path], *, tools: Optional[frozenset] = None):
+        self.path = Path(path)
+        self.tools = tools
+        self.captured = 0
+        self._file: Optional[IO[str]] = None
+
+    async def on_request(self, request: dict) -> None:
+        params = request.get("params") or {}
+        if self.tools is None or params.get("name") in self.tools:
+            if self._file is None:
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                self._file = self.path.open("a")
+            record = {"ts": round(time.time(), 3), "tool": params.get("name"), "arguments": params.get("arguments") or {}}
+            self._file.write(json.dumps(record, default=str) + "\n")
+            self.captured += 1
+
+    def report(self) -> dict:
+        return {"captured": self.captured, "path": str(self.path)}
+
+    async def close(self) -> None:
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+def read_capture(path: Union[str, Path]) -> Iterator[tuple[str, dict]]:
+    """(tool, arguments) of every call in a capture file
+
+    Lines may also be JSON-RPC tools/call requests, as logged by other MCP tooling. Lines that
+    are neither are skipped.
+    """
+    with Path(path).open() as lines:
+        for line in lines:
+            try:
+                record: Any = json.loads(line)
+            except ValueError:
+                continue
+            if not isinstance(record, dict):
+                continue
+            if record.get("method") == "tools/call":
+                record = record.get("params") or {}
+                record = {"tool": record.get("name"), "arguments": record.get("arguments")}
+            if isinstance(record.get("tool"), str) and isinstance(record.get("arguments") or {}, dict):
+                yield record["tool"], record.get("arguments") or {}
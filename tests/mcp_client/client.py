@@ -0,0 +1,626 @@
+"""
+Asyncio MCP client for toolbox servers running over stdio
+Many requests can be in flight on one process; responses are matched back to
+their callers by JSON-RPC id, so callers never wait on each other's round trips.
+
+A request that passes its deadline is cancelled (see base). Its id stays watched until
+hard_timeout: a late response settles it, and if none comes the process is recycled, i.e.
+replaced by a fresh one.
+
+With a `recorder` (or MCP_CLIENT_RECORD_DIR set), every byte written to and read from the
+server is also appended to a recording, one session per process (see recording).
+"""
+
+import asyncio
+import collections
+import contextlib
+import functools
+import itertools
+from typing import Any, AsyncIterator, Optional, Sequence, Union
+
+from .base import Call, McpClient, NotificationHandler, cancel_notification, is_notification
+from .codec import Codec, RowDecoder
+from .errors import McpError, RequestTimeout, TransportClosed
+from .params import ServerParams
+from .recording import Recorder, default_recorder
+from .streaming import IncrementalResponseParser, ResultStream
+from .telemetry import Span, Telemetry
+from .tool_catalog import ToolCatalog
+
+# Lines longer than CHUNK_SIZE are read in chunks of that size; a non-streamed response
+# is buffered up to MAX_MESSAGE_BYTES, beyond which the request fails instead of the client
+# running out of memory (use stream_tool() for results that large)
+CHUNK_SIZE = 256 * 1024
+MAX_MESSAGE_BYTES = 64 * 1024 * 1024
+STDERR_TAIL_LINES = 200
+
+
+class StdioClient(McpClient):
+    """JSON-RPC client multiplexing concurrent requests over one toolbox process"""
+
+    transport = "stdio"
+
+    def __init__(
+        self,
+        params: ServerParams,
+        *,
+        chunk_size: int = CHUNK_SIZE,
+        max_message_bytes: int = MAX_MESSAGE_BYTES,
+        codec: Union[Codec, str, None] = None,
+        on_notification: Optional[NotificationHandler] = None,
+        timeout: Optional[float] = None,
+        hard_timeout: Optional[float] = None,
+        telemetry: Optional[Telemetry] = None,
+        tool_catalog: Optional[ToolCatalog] = None,
+        recorder: Optional[Recorder] = None,
+    ):
+        super().__init__(
+            params,
+            codec=codec,
+            on_notification=on_notification,
+            timeout=timeout,
+            hard_timeout=hard_timeout,
+            telemetry=telemetry,
+            tool_catalog=tool_catalog,
+        )
+        self.chunk_size = chunk_size
+        self.max_message_bytes = max_message_bytes
+        self.recorder = recorder if recorder is not None else default_recorder(params.name)
+        self._process: Optional[asyncio.subprocess.Process] = None
+        self._pending: dict[int, asyncio.Future] = {}
+        self._batched: set[int] = set()
+        self._streams: dict[int, ResultStream] = {}
+        # Spans of requests in flight, with telemetry on
+        self._spans: dict[int, Span] = {}
+        # Timed-out requests the server may still be working on, until their hard deadline
+        self._abandoned: dict[int, asyncio.TimerHandle] = {}
+        self._recycling: Optional[asyncio.Task] = None
+        self._ids = itertools.count(1)
+        self._write_lock = asyncio.Lock()
+        self._stderr_tail: collections.deque = collections.deque(maxlen=STDERR_TAIL_LINES)
+        self._tasks: list[asyncio.Task] = []
+        self._closed: Optional[TransportClosed] = None
+
+    @property
+    def running(self) -> bool:
+        return self._process is not None and self._closed is None
+
+    @property
+    def stderr(self) -> str:
+        return "\n".join(self._stderr_tail)
+
+    async def start(self) -> None:
+        span = self._span("start")
+        try:
+            self._process = await asyncio.create_subprocess_exec(
+                *self.params.command,
+                stdin=asyncio.subprocess.PIPE,
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.PIPE,
+                env=self.params.full_env(),
+                limit=self.chunk_size,
+            )
+        except BaseException as e:
+            self._finish(span, e)
+            raise
+        self._finish(span, None)
+        if self.recorder is not None:
+            self.recorder.start(self.params.name, self.params.command)
+        self._tasks = [
+            asyncio.create_task(self._read_stdout()),
+            asyncio.create_task(self._read_stderr()),
+        ]
+
+    async def close(self, timeout: float = 5.0) -> None:
+        recycling = self._recycling
+        if recycling is not None and recycling is not asyncio.current_task():
+            recycling.cancel()
+            await asyncio.gather(recycling, return_exceptions=True)
+        await self._shutdown(TransportClosed("Client closed"), timeout)
+        if self.recorder is not None:
+            self.recorder.close()
+
+    async def recycle(self, reason: str = "recycled") -> None:
+        """Replace the server process with a fresh one, initialized again if this one was
+
+        Requests still in flight on the old process fail with TransportClosed.
+        """
+        self.recycles += 1
+        await self._shutdown(TransportClosed(f"Server process recycled: {reason}", None, self.stderr))
+        self._closed = None
+        await self.start()
+        if self.initialized:
+            await self.initialize()
+
+    async def _shutdown(self, error: TransportClosed, timeout: float = 5.0) -> None:
+        for handle in self._abandoned.values():
+            handle.cancel()
+        self._abandoned.clear()
+        process = self._process
+        if process is None:
+            return
+        self._fail_pending(error)
+        if process.returncode is None:
+            if process.stdin is not None:
+                process.stdin.close()
+            process.terminate()
+            try:
+                await asyncio.wait_for(process.wait(), timeout)
+            except asyncio.TimeoutError:
+                process.kill()
+                await process.wait()
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    # -- JSON-RPC ---------------------------------------------------------
+
+    async def request(self, method: str, params: Optional[dict] = None, *, timeout: Optional[float] = None) -> Any:
+        """Send one request and wait for its result; raises McpError on an error response
+
+        Raises RequestTimeout once `timeout` (default: the client's) has passed.
+        """
+        await self._ready()
+        request_id = next(self._ids)
+        self.requests_sent += 1
+        future = asyncio.get_running_loop().create_future()
+        self._pending[request_id] = future
+        data = self.codec.dumps({"jsonrpc": "2.0", "method": method, "params": params or {}, "id": request_id}) + b"\n"
+        self._trace(request_id, future, method, params, len(data))
+        try:
+            await self._write(data)
+            await self._wait({request_id: (method, future)}, timeout)
+            return future.result()
+        finally:
+            self._pending.pop(request_id, None)
+            # A caller that gave up still ends the request's span
+            future.cancel()
+
+    async def notify(self, method: str, params: Optional[dict] = None) -> None:
+        message: dict = {"jsonrpc": "2.0", "method": method}
+        if params is not None:
+            message["params"] = params
+        await self._send(message)
+
+    async def request_many(
+        self,
+        calls: Sequence[Call],
+        *,
+        batch: bool = False,
+        return_exceptions: bool = False,
+        timeout: Optional[float] = None,
+    ) -> list[Any]:
+        """Write every request before reading any response; results come back in call order
+
+        Responses are matched by id, so the server may answer them in any order. By default
+        the messages are pipelined as separate lines in one write; `batch` sends them as a
+        single JSON-RPC batch array instead, for servers that accept batches. Requests still
+        unanswered at `timeout` fail with RequestTimeout.
+        """
+        await self._ready()
+        loop = asyncio.get_running_loop()
+        messages: list[bytes] = []
+        futures: dict[int, asyncio.Future] = {}
+        methods: dict[int, str] = {}
+        for method, params in calls:
+            message: dict = {"jsonrpc": "2.0", "method": method}
+            if is_notification(method):
+                if params is not None:
+                    message["params"] = params
+                messages.append(self.codec.dumps(message))
+                continue
+            request_id = next(self._ids)
+            message.update(params=params or {}, id=request_id)
+            futures[request_id] = self._pending[request_id] = loop.create_future()
+            methods[request_id] = method
+            if batch:
+                self._batched.add(request_id)
+            messages.append(self.codec.dumps(message))
+            self._trace(request_id, futures[request_id], method, params, len(messages[-1]))
+        self.requests_sent += len(futures)
+        try:
+            if batch:
+                await self._write(b"[" + b",".join(messages) + b"]\n")
+            else:
+                await self._write(b"".join(m + b"\n" for m in messages))
+            await self._wait({i: (methods[i], f) for i, f in futures.items()}, timeout)
+            # Gathered with return_exceptions so no failed future is left unretrieved
+            outcomes = iter(await asyncio.gather(*futures.values(), return_exceptions=True))
+        finally:
+            for request_id, future in futures.items():
+                self._pending.pop(request_id, None)
+                self._batched.discard(request_id)
+                future.cancel()
+        results: list[Any] = []
+        for method, _ in calls:
+            if is_notification(method):
+                results.append(None)
+                continue
+            outcome = next(outcomes)
+            if isinstance(outcome, BaseException) and not (return_exceptions and isinstance(outcome, McpError)):
+                raise outcome
+            results.append(outcome)
+        return results
+
+    async def _ready(self) -> None:
+        recycling = self._recycling
+        # Requests wait for a recycle in progress, except the ones it makes itself
+        if recycling is not None and recycling is not asyncio.current_task():
+            await asyncio.shield(recycling)
+        if self._closed is not None:
+            raise self._closed
+
+    async def _wait(self, requests: dict[int, tuple[str, asyncio.Future]], timeout: Optional[float]) -> None:
+        """Wait for the futures; those still pending at the deadline fail with RequestTimeout"""
+        timeout = self.timeout if timeout is None else (timeout or None)
+        futures = [future for _, future in requests.values()]
+        if not futures:
+            return
+        try:
+            if timeout is None:
+                await asyncio.wait(futures)
+                return
+            await asyncio.wait(futures, timeout=timeout)
+        except asyncio.CancelledError:
+            # The caller gave up (task cancelled, outer wait_for): tell the server too
+            for request_id, (method, future) in requests.items():
+                if not future.done():
+                    self._cancel(request_id, method, "Client cancelled the request")
+            raise
+        for request_id, (method, future) in requests.items():
+            if not future.done():
+                self.timeouts += 1
+                future.set_exception(RequestTimeout(method, timeout))
+                self._cancel(request_id, method, f"Client deadline of {timeout:g}s passed", timeout)
+
+    def _trace(self, request_id: int, future: asyncio.Future, method: str, params: Optional[dict], size: int) -> None:
+        """With telemetry on, time the request until its future is done"""
+        span = self._span(method, params, size)
+        if span is not None:
+            self._spans[request_id] = span
+            future.add_done_callback(functools.partial(self._traced, request_id))
+
+    def _traced(self, request_id: int, future: asyncio.Future) -> None:
+        span = self._spans.pop(request_id, None)
+        if future.cancelled():
+            self._finish(span, asyncio.CancelledError())
+        else:
+            self._finish(span, future.exception() or future.result())
+
+    def _received(self, request_id: Any, size: int) -> None:
+        """Note a response's size on its span"""
+        span = self._spans.get(request_id) if self._spans and request_id is not None else None
+        if span is not None:
+            span.bytes_in = size
+
+    def _cancel(self, request_id: int, method: str, reason: str, elapsed: float = 0.0) -> None:
+        """Send notifications/cancelled and watch for the hard deadline"""
+        # initialize must not be cancelled (MCP spec); a stuck one is still recycled
+        if method != "initialize":
+            asyncio.ensure_future(self._reply(cancel_notification(request_id, reason)))
+        if self.hard_timeout is not None:
+            self._abandoned[request_id] = asyncio.get_running_loop().call_later(
+                max(self.hard_timeout - elapsed, 0.0), self._hard_deadline_passed, request_id, method
+            )
+
+    def _settle(self, request_id: Any) -> None:
+        """A response arrived; a timed-out request needs no recycling after all"""
+        handle = self._abandoned.pop(request_id, None)
+        if handle is not None:
+            handle.cancel()
+
+    def _hard_deadline_passed(self, request_id: int, method: str) -> None:
+        if self._abandoned.pop(request_id, None) is None or self._closed is not None or self._recycling is not None:
+            return
+        self._recycling = asyncio.ensure_future(
+            self._recycle_stuck(f"{method} (id {request_id}) still running after {self.hard_timeout:g}s")
+        )
+
+    async def _recycle_stuck(self, reason: str) -> None:
+        try:
+            await self.recycle(reason)
+        except (OSError, McpError, TransportClosed) as e:
+            self._closed = TransportClosed(f"Recycling failed: {e}", None, self.stderr)
+        finally:
+            self._recycling = None
+
+    async def _send(self, message: Any) -> None:
+        await self._write(self.codec.dumps(message) + b"\n")
+
+    async def _write(self, data: bytes) -> None:
+        process = self._process
+        if process is None or process.stdin is None:
+            raise TransportClosed("Client not started")
+        async with self._write_lock:
+            try:
+                process.stdin.write(data)
+                if self.recorder is not None:
+                    self.recorder.sent(data)
+                await process.stdin.drain()
+            except (BrokenPipeError, ConnectionResetError) as e:
+                raise TransportClosed(f"Write failed: {e}", process.returncode, self.stderr) from e
+
+    # -- Streaming ----------------------------------------------------------
+
+    @contextlib.asynccontextmanager
+    async def stream_tool(
+        self,
+        name: str,
+        arguments: Optional[dict] = None,
+        *,
+        max_rows: Optional[int] = None,
+        max_bytes: Optional[int] = None,
+        max_queued: int = 1000,
+        row_type: Optional[type] = None,
+        timeout: Optional[float] = None,
+    ) -> AsyncIterator[ResultStream]:
+        """Call a tool and iterate its result rows as they are decoded
+
+            async with client.stream_tool("execute_sql", {"sql": "SELECT * FROM big"}, max_rows=10_000) as rows:
+                async for row in rows:
+                    ...
+            rows.truncated  # True if the caps cut the result short
+
+        Rows past `max_rows` / `max_bytes` are discarded unparsed while the rest of the
+        response is drained from the pipe. Leaving the block early does the same. Rows are
+        dicts, or instances of `row_type` (see codec.RowDecoder). A response not complete by
+        `timeout` ends the iteration with RequestTimeout, after the rows already received.
+        """
+        await self._ready()
+        request_id = next(self._ids)
+        self.requests_sent += 1
+        stream = ResultStream(max_rows, max_bytes, max_queued, RowDecoder(self.codec, row_type))
+        self._streams[request_id] = stream
+        params = {"name": name, "arguments": arguments or {}}
+        data = self.codec.dumps({"jsonrpc": "2.0", "method": "tools/call", "params": params, "id": request_id}) + b"\n"
+        span = self._span("tools/call", params, len(data))
+        if span is not None:
+            self._spans[request_id] = span
+        try:
+            await self._write(data)
+        except BaseException as e:
+            self._streams.pop(request_id, None)
+            self._spans.pop(request_id, None)
+            self._finish(span, e)
+            raise
+        timeout = self.timeout if timeout is None else (timeout or None)
+        timer = None
+        if timeout is not None:
+            timer = asyncio.get_running_loop().call_later(timeout, self._expire_stream, request_id, stream, timeout)
+        try:
+            yield stream
+        finally:
+            if timer is not None:
+                timer.cancel()
+            if span is not None:
+                self._spans.pop(request_id, None)
+                if not stream.finished:
+                    # Left early: the rest of the response is dropped unmeasured
+                    span.bytes_in = span.bytes_in or stream.bytes_seen
+                self._finish(span, stream.error or stream.result, stream.rows_seen)
+            # Releases a reader parked on the full queue, even after a deadline finished the
+            # stream. A stream still registered stays so, and the rest of its response is
+            # recognised and dropped when it arrives; an expired one is already unregistered.
+            stream.abandon()
+
+    def _expire_stream(self, request_id: int, stream: ResultStream, timeout: float) -> None:
+        if stream.finished:
+            return
+        self.timeouts += 1
+        # Unregistered now, as the server may never answer; a late answer has no taker and is dropped
+        self._streams.pop(request_id, None)
+        stream.finish(error=RequestTimeout("tools/call", timeout))
+        self._cancel(request_id, "tools/call", f"Client deadline of {timeout:g}s passed", timeout)
+
+    # -- Reader side ------------------------------------------------------
+
+    async def _read_stdout(self) -> None:
+        assert self._process is not None and self._process.stdout is not None
+        stdout = self._process.stdout
+        while True:
+            try:
+                line = self._tee(await stdout.readuntil(b"\n"))
+            except asyncio.IncompleteReadError as e:
+                if e.partial:
+                    await self._dispatch_line(self._tee(e.partial))
+                break
+            except asyncio.LimitOverrunError as e:
+                await self._read_large_message(stdout, self._tee(await stdout.read(e.consumed)))
+                continue
+            await self._dispatch_line(line)
+        await self._wait_exit()
+        self._fail_pending(TransportClosed("Server closed stdout", self._returncode(), self.stderr))
+
+    async def _next_chunk(self, stdout: asyncio.StreamReader) -> bytes:
+        try:
+            return self._tee(await stdout.readuntil(b"\n"))
+        except asyncio.LimitOverrunError as e:
+            return self._tee(await stdout.read(e.consumed))
+        except asyncio.IncompleteReadError as e:
+            return self._tee(e.partial) + b"\n"
+
+    def _tee(self, data: bytes) -> bytes:
+        if self.recorder is not None:
+            self.recorder.received(data)
+        return data
+
+    async def _read_large_message(self, stdout: asyncio.StreamReader, chunk: bytes) -> None:
+        """Handle a message longer than chunk_size without holding more of it than needed
+
+        The first chunk is parsed to find the response id. Streamed requests get their rows
+        decoded chunk by chunk; everything else is buffered up to max_message_bytes.
+        """
+        parser = IncrementalResponseParser()
+        buffered = bytearray()
+        stream: Optional[ResultStream] = None
+        mode = "probe"  # -> stream | buffer | discard
+        request_id = None
+        size = 0
+        while True:
+            final = chunk.endswith(b"\n")
+            size += len(chunk)
+            try:
+                if mode == "probe":
+                    items = parser.feed(chunk, final)
+                    request_id = parser.envelope.get("id")
+                    stream = self._streams.get(request_id) if request_id is not None else None
+                    if stream is not None:
+                        mode = "stream"
+                    elif request_id is not None and request_id not in self._pending:
+                        mode = "discard"  # a late answer to an expired request
+                    else:
+                        mode = "buffer"
+                elif mode == "stream" and stream is not None and stream.accepting:
+                    items = parser.feed(chunk, final)
+                else:
+                    items = []
+            except ValueError as e:
+                # Not a single JSON-RPC object (or malformed): fall back to buffering it whole
+                if stream is not None:
+                    stream.finish(error=McpError(-32700, f"Malformed streamed response: {e}"))
+                    mode = "discard"
+                else:
+                    mode, items = "buffer", []
+            if mode == "stream" and stream is not None:
+                for item in items:
+                    await stream.put_item(item)
+            elif mode == "buffer":
+                if size > self.max_message_bytes:
+                    buffered, mode = bytearray(), "discard"
+                else:
+                    buffered += chunk
+            if final:
+                break
+            chunk = await self._next_chunk(stdout)
+
+        self._settle(request_id)
+        self._received(request_id, size)
+        if stream is not None:
+            self._streams.pop(request_id, None)
+            envelope = parser.envelope if parser.done else {}
+            if "error" in envelope:
+                stream.finish(error=McpError.from_response(envelope["error"]))
+            else:
+                stream.finish(parser.result)
+        elif mode == "buffer":
+            await self._dispatch_line(bytes(buffered))
+        else:
+            future = self._pending.get(request_id)
+            if future is not None and not future.done():
+                future.set_exception(McpError(
+                    -32000,
+                    f"Response of {size} bytes exceeds max_message_bytes={self.max_message_bytes}; "
+                    "use stream_tool() to read it incrementally",
+                ))
+
+    async def _read_stderr(self) -> None:
+        assert self._process is not None and self._process.stderr is not None
+        # Drain continuously so a chatty server can never block on a full stderr pipe
+        try:
+            async for line in self._process.stderr:
+                self._stderr_tail.append(line.decode(errors="replace").rstrip())
+        except ValueError:
+            pass
+
+    async def _wait_exit(self) -> None:
+        assert self._process is not None
+        try:
+            await asyncio.wait_for(self._process.wait(), 1.0)
+        except asyncio.TimeoutError:
+            pass
+
+    def _returncode(self) -> Optional[int]:
+        return self._process.returncode if self._process is not None else None
+
+    async def _dispatch_line(self, line: bytes) -> None:
+        stripped = line.strip()
+        if not stripped:
+            return
+        try:
+            message = self.codec.loads(stripped)
+        except ValueError:
+            # Some servers log to stdout before the first response; keep it for diagnostics
+            self.stray_lines.append(stripped.decode(errors="replace"))
+            return
+        items = message if isinstance(message, list) else [message]
+        for item in items:
+            if isinstance(item, dict):
+                if self._spans:
+                    # A batch's line is shared out evenly among its responses
+                    self._received(item.get("id"), len(stripped) // len(items))
+                await self._dispatch_message(item)
+
+    async def _dispatch_message(self, message: dict) -> None:
+        if "method" in message:
+            if "id" in message:
+                # Server-to-client request; ping is the only one a tools client must answer
+                reply: dict = {"jsonrpc": "2.0", "id": message["id"]}
+                if message["method"] == "ping":
+                    reply["result"] = {}
+                else:
+                    reply["error"] = {"code": -32601, "message": f"Method not found: {message['method']}"}
+                asyncio.create_task(self._reply(reply))
+            elif self.on_notification is not None:
+                self.on_notification(message["method"], message.get("params") or {})
+            return
+        if message.get("id") is None and "error" in message and self._batched:
+            # A server that rejects a batch answers it with one error and no id
+            self._fail_batched(McpError.from_response(message["error"]))
+            return
+        self._settle(message.get("id"))
+        stream = self._streams.pop(message.get("id"), None) if message.get("id") is not None else None
+        if stream is not None:
+            await self._deliver_stream(stream, message)
+            return
+        future = self._pending.get(message.get("id"))
+        if future is None or future.done():
+            return
+        if "error" in message:
+            future.set_exception(McpError.from_response(message["error"]))
+        else:
+            future.set_result(message.get("result"))
+
+    async def _deliver_stream(self, stream: ResultStream, message: dict) -> None:
+        """A streamed request whose whole response fit in one chunk"""
+        if "error" in message:
+            stream.finish(error=McpError.from_response(message["error"]))
+            return
+        result = message.get("result") or {}
+        for item in result.get("content", []):
+            if not stream.accepting:
+                break
+            await stream.put_item(item)
+        stream.finish({k: v for k, v in result.items() if k != "content"})
+
+    async def _reply(self, message: dict) -> None:
+        try:
+            await self._send(message)
+        except TransportClosed:
+            pass
+
+    def _fail_batched(self, error: McpError) -> None:
+        for request_id in self._batched:
+            future = self._pending.get(request_id)
+            if future is not None and not future.done():
+                future.set_exception(error)
+        self._batched.clear()
+
+    def _fail_pending(self, error: TransportClosed) -> None:
+        if self._closed is None:
+            self._closed = error
+        for future in self._pending.values():
+            if not future.done():
+                future.set_exception(error)
+        for stream in self._streams.values():
+            stream.finish(error=error)
+        self._streams.clear()
+
+
+def make_client(params: ServerParams, **kwargs: Any) -> McpClient:
+    """StdioClient for a command, HttpClient when params.url points at a shared server"""
+    if params.url:
+        from .http_client import HttpClient
+
+        return HttpClient(params, **kwargs)
+    return StdioClient(params, **kwargs)
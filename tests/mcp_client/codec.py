@@ -0,0 +1,159 @@
+"""
+Pluggable JSON codecs for the MCP clients and the proxy
+Messages are encoded to and decoded from bytes directly, without a str round trip. The
+stdlib json codec is the default and always works. orjson and msgspec are faster but opt-in:
+orjson reads integers beyond 64 bits (large NUMERIC values) as floats. Select one with
+`codec=` on a client, or MCP_CLIENT_CODEC=json|orjson|msgspec|auto (fastest installed).
+
+RowDecoder turns the `{"type": "text", "text": "<row json>"}` content items of a tools/call
+result into rows: dicts by default, or a dataclass, NamedTuple, msgspec.Struct or `tuple`
+given as `row_type`. With msgspec, typed rows are decoded from the text in one pass.
+"""
+
+import dataclasses
+import json
+import os
+from typing import Any, Callable, Optional, Union
+
+from .errors import ConfigError
+
+CODEC_ENV = "MCP_CLIENT_CODEC"
+PREFERENCE = ("orjson", "msgspec", "json")
+
+
+class Codec:
+    """stdlib json; subclasses swap in a faster library"""
+
+    name = "json"
+
+    def dumps(self, obj: Any) -> bytes:
+        return json.dumps(obj, separators=(",", ":")).encode()
+
+    def loads(self, data: Union[bytes, str]) -> Any:
+        return json.loads(data)
+
+    def decode_typed(self, data: Union[bytes, str], row_type: type) -> Any:
+        """Decode straight into row_type; None when this codec can't, so the caller converts"""
+        return None
+
+
+class OrjsonCodec(Codec):
+    name = "orjson"
+
+    def __init__(self) -> None:
+        import orjson
+
+        self._orjson = orjson
+
+    def dumps(self, obj: Any) -> bytes:
+        return self._orjson.dumps(obj)
+
+    def loads(self, data: Union[bytes, str]) -> Any:
+        return self._orjson.loads(data)
+
+
+class MsgspecCodec(Codec):
+    name = "msgspec"
+
+    def __init__(self) -> None:
+        import msgspec
+
+        self._msgspec = msgspec
+        self._encoder = msgspec.json.Encoder()
+        self._decoder = msgspec.json.Decoder()
+        self._typed: dict[type, Any] = {}
+
+    def dumps(self, obj: Any) -> bytes:
+        return self._encoder.encode(obj)
+
+    def loads(self, data: Union[bytes, str]) -> Any:
+        try:
+            return self._decoder.decode(data)
+        except self._msgspec.DecodeError as e:
+            raise ValueError(str(e)) from e
+
+    def decode_typed(self, data: Union[bytes, str], row_type: type) -> Any:
+        # Rows are JSON objects: msgspec maps those onto Structs and dataclasses only
+        if not (issubclass(row_type, self._msgspec.Struct) or dataclasses.is_dataclass(row_type)):
+            return None
+        decoder = self._typed.get(row_type)
+        if decoder is None:
+            # strict=False accepts "42" for an int column, as databases often send numerics as text
+            decoder = self._typed[row_type] = self._msgspec.json.Decoder(row_type, strict=False)
+        try:
+            return decoder.decode(data)
+        except self._msgspec.ValidationError as e:
+            raise ValueError(f"Row does not match {row_type.__name__}: {e}") from e
+        except self._msgspec.DecodeError:
+            return None
+
+
+CODECS: dict[str, Callable[[], Codec]] = {"json": Codec, "orjson": OrjsonCodec, "msgspec": MsgspecCodec}
+
+
+def available_codecs() -> list[str]:
+    names = []
+    for name in PREFERENCE:
+        try:
+            CODECS[name]()
+        except ImportError:
+            continue
+        names.append(name)
+    return names
+
+
+def get_codec(codec: Union[Codec, str, None] = None) -> Codec:
+    """A Codec instance from a name, "auto", or None (MCP_CLIENT_CODEC, else "json")"""
+    if isinstance(codec, Codec):
+        return codec
+    name = codec or os.environ.get(CODEC_ENV) or "json"
+    if name == "auto":
+        return CODECS[available_codecs()[0]]()
+    if name not in CODECS:
+        raise ConfigError(f"Unknown codec {name!r}; expected one of: auto, {', '.join(CODECS)}")
+    try:
+        return CODECS[name]()
+    except ImportError as e:
+        raise ConfigError(f"Codec {name!r} is not installed (pip install {name})") from e
+
+
+class RowDecoder:
+    """Content item -> row; text that isn't JSON is returned as the string itself"""
+
+    def __init__(self, codec: Optional[Codec] = None, row_type: Optional[type] = None):
+        self.codec = codec or Codec()
+        self.row_type = row_type if row_type is not dict else None
+        self._convert = _converter(self.row_type) if self.row_type is not None else None
+
+    def __call__(self, item: Any) -> Any:
+        if not (isinstance(item, dict) and item.get("type") == "text"):
+            return item
+        text = item.get("text", "")
+        if self.row_type is not None:
+            typed = self.codec.decode_typed(text, self.row_type)
+            if typed is not None:
+                return typed
+        try:
+            value = self.codec.loads(text)
+        except (ValueError, TypeError):
+            return text
+        if self._convert is not None and isinstance(value, dict):
+            return self._convert(value)
+        return value
+
+    def rows(self, result: Any) -> list:
+        content = result.get("content", []) if isinstance(result, dict) else []
+        return [self(item) for item in content]
+
+
+def _converter(row_type: type) -> Callable[[dict], Any]:
+    if row_type is tuple:
+        return lambda row: tuple(row.values())
+    if dataclasses.is_dataclass(row_type):
+        names = {f.name for f in dataclasses.fields(row_type) if f.init}
+        return lambda row: row_type(**{k: v for k, v in row.items() if k in names})
+    fields = getattr(row_type, "_fields", None) or getattr(row_type, "__struct_fields__", None)
+    if fields is not None:
+        # NamedTuple or msgspec.Struct decoded by a codec that can't build it directly
+        return lambda row: row_type(*(row.get(f) for f in fields))
+    raise TypeError(f"Unsupported row_type {row_type!r}: use dict, tuple, a dataclass, NamedTuple or msgspec.Struct")
@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+"""
+Decode-time comparison of the installed JSON codecs
+Builds one synthetic tools/call response shaped like an execute_sql result (one text
+content item per row) and times decoding the message, then the message plus its rows as
+dicts and as tuples, with every codec in codec.available_codecs().
+
+Usage (from tests/):
+    python3 -m mcp_client.codec_bench --rows 100000 --columns 12
+"""
+
+import argparse
+import json
+import sys
+import time
+from typing import Optional
+
+from .codec import RowDecoder, available_codecs, get_codec
+
+
+def synthetic_response(rows: int, columns: int) -> bytes:
+    content = [
+        {"type": "text", "text": json.dumps({f"column_{c}": (i * c if c % 3 else f"value-{i}-{c}") for c in range(columns)})}
+        for i in range(rows)
+    ]
+    return json.dumps({"jsonrpc": "2.0", "id": 1, "result": {"content": content}}).encode()
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=50000)
+    parser.add_argument("--columns", type=int, default=12)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args(argv)
+
+    line = synthetic_response(args.rows, args.columns)
+    print(f"{len(line) / 1e6:.1f} MB response, {args.rows} rows x {args.columns} columns")
+    print(f"{'codec':<10} {'decode (ms)':>12} {'rows (ms)':>10} {'tuple rows (ms)':>16}")
+    for name in available_codecs():
+        codec = get_codec(name)
+        timings = []
+        for decoder in (None, RowDecoder(codec), RowDecoder(codec, tuple)):
+            best = float("inf")
+            for _ in range(args.repeat):
+                started = time.perf_counter()
+                message = codec.loads(line)
+                if decoder is not None:
+                    decoder.rows(message["result"])
+                best = min(best, time.perf_counter() - started)
+            timings.append(best * 1000)
+        print(f"{name:<10} {timings[0]:>12.1f} {timings[1]:>10.1f} {timings[2]:>16.1f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,235 @@
+"""
+Columnar container for tools/call result rows
+A list of row dicts repeats every column name in every row and boxes every number.
+ColumnarResult keeps one column per name instead:
+- integer and float columns are `array.array` buffers, with a bitmap for NULLs;
+- other columns are lists whose repeated strings share one object (schema names, data types);
+- column names are interned.
+Rows are built up one at a time, so a streamed result never exists as a list of dicts.
+Row access goes through lazy RowView mappings. to_numpy/to_arrow/to_pandas convert when
+those libraries are installed (numeric columns without copying where they allow it).
+"""
+
+import sys
+from array import array
+from collections.abc import Mapping
+from typing import Any, Iterable, Iterator, Optional
+
+from .codec import RowDecoder
+from .streaming import ResultStream
+
+INT, FLOAT, OBJECT = "int", "float", "object"
+_INT_MIN, _INT_MAX = -(2**63), 2**63 - 1
+
+
+class Column:
+    """Values of one column: typed while every value is int (then float), a list otherwise"""
+
+    __slots__ = ("name", "kind", "values", "nulls", "_strings")
+
+    def __init__(self, name: str, length: int = 0):
+        self.name = sys.intern(name)
+        self.kind = INT
+        self.values: Any = array("q", bytes(8 * length))
+        self.nulls: Optional[bytearray] = None
+        self._strings: dict[str, str] = {}
+        for i in range(length):
+            self._set_null(i)
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+    def append(self, value: Any) -> None:
+        index = len(self.values)
+        if value is None:
+            self.values.append(None if self.kind == OBJECT else 0)
+            if self.kind != OBJECT:
+                self._set_null(index)
+            return
+        if self.kind == INT and not (type(value) is int and _INT_MIN <= value <= _INT_MAX):
+            self._widen(FLOAT if type(value) is float else OBJECT)
+        elif self.kind == FLOAT and type(value) not in (int, float):
+            self._widen(OBJECT)
+        if self.kind == OBJECT and type(value) is str:
+            value = self._strings.setdefault(value, value)
+        self.values.append(value)
+
+    def __getitem__(self, index: int) -> Any:
+        return None if self.is_null(index) else self.values[index]
+
+    def __iter__(self) -> Iterator[Any]:
+        for i in range(len(self.values)):
+            yield self[i]
+
+    def is_null(self, index: int) -> bool:
+        # The bitmap only grows as far as the last NULL
+        nulls = self.nulls
+        return nulls is not None and index >> 3 < len(nulls) and bool(nulls[index >> 3] & (1 << (index & 7)))
+
+    @property
+    def null_count(self) -> int:
+        return sum(bin(b).count("1") for b in self.nulls) if self.nulls is not None else 0
+
+    def nbytes(self) -> int:
+        """Approximate memory held: the buffers plus distinct objects for object columns"""
+        size = sys.getsizeof(self.values) + (len(self.nulls) if self.nulls is not None else 0)
+        if self.kind == OBJECT:
+            seen: set[int] = set()
+            for value in self.values:
+                if value is not None and id(value) not in seen:
+                    seen.add(id(value))
+                    size += sys.getsizeof(value)
+        return size
+
+    def _set_null(self, index: int) -> None:
+        if self.nulls is None:
+            self.nulls = bytearray()
+        while len(self.nulls) <= index >> 3:
+            self.nulls.append(0)
+        self.nulls[index >> 3] |= 1 << (index & 7)
+
+    def _widen(self, kind: str) -> None:
+        values = [self[i] for i in range(len(self.values))]
+        if kind == FLOAT:
+            self.values = array("d", (0.0 if v is None else float(v) for v in values))
+        else:
+            self.values = values
+            self.nulls = None
+        self.kind = kind
+
+
+class RowView(Mapping):
+    """One row of a ColumnarResult, read from the columns on access"""
+
+    __slots__ = ("_result", "_index")
+
+    def __init__(self, result: "ColumnarResult", index: int):
+        self._result = result
+        self._index = index
+
+    def __getitem__(self, name: str) -> Any:
+        return self._result.columns[name][self._index]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._result.columns)
+
+    def __len__(self) -> int:
+        return len(self._result.columns)
+
+    def __repr__(self) -> str:
+        return f"RowView({dict(self)!r})"
+
+
+class ColumnarResult:
+    """Rows of one result stored by column; index or iterate it for RowViews"""
+
+    def __init__(self) -> None:
+        self.columns: dict[str, Column] = {}
+        self.length = 0
+        self.extra: list[Any] = []
+        self.truncated = False
+
+    @classmethod
+    def from_rows(cls, rows: Iterable[Any]) -> "ColumnarResult":
+        result = cls()
+        for row in rows:
+            result.append(row)
+        return result
+
+    @classmethod
+    def from_result(cls, result: dict, decoder: Optional[RowDecoder] = None) -> "ColumnarResult":
+        """From a tools/call result, decoding one content item at a time"""
+        decoder = decoder or RowDecoder()
+        return cls.from_rows(decoder(item) for item in result.get("content", []))
+
+    @classmethod
+    async def from_stream(cls, stream: ResultStream) -> "ColumnarResult":
+        result = cls()
+        async for row in stream:
+            result.append(row)
+        result.truncated = stream.truncated
+        return result
+
+    def append(self, row: Any) -> None:
+        """Add a row dict; rows that aren't objects (plain text lines) are kept in `extra`"""
+        if not isinstance(row, Mapping):
+            self.extra.append(row)
+            return
+        for name, value in row.items():
+            column = self.columns.get(name)
+            if column is None:
+                # A column first seen now is NULL in the rows before
+                column = self.columns[name] = Column(name, self.length)
+            column.append(value)
+        self.length += 1
+        for column in self.columns.values():
+            if len(column) < self.length:
+                column.append(None)
+
+    @property
+    def column_names(self) -> list[str]:
+        return list(self.columns)
+
+    def __len__(self) -> int:
+        return self.length
+
+    def __getitem__(self, index: int) -> RowView:
+        if index < 0:
+            index += self.length
+        if not 0 <= index < self.length:
+            raise IndexError(index)
+        return RowView(self, index)
+
+    def __iter__(self) -> Iterator[RowView]:
+        for i in range(self.length):
+            yield RowView(self, i)
+
+    def column(self, name: str) -> list:
+        return list(self.columns[name])
+
+    def to_rows(self) -> list[dict]:
+        return [dict(row) for row in self]
+
+    def nbytes(self) -> int:
+        return sum(c.nbytes() for c in self.columns.values())
+
+    # -- Conversions (optional dependencies) --------------------------------
+
+    def to_numpy(self, name: str) -> Any:
+        """A column as a NumPy array: numeric columns share the buffer, NULLs become a mask"""
+        import numpy as np
+
+        column = self.columns[name]
+        if column.kind == OBJECT:
+            return np.array(column.values, dtype=object)
+        data = np.frombuffer(column.values, dtype=np.int64 if column.kind == INT else np.float64)
+        if column.nulls is None:
+            return data
+        return np.ma.masked_array(data, mask=[column.is_null(i) for i in range(len(column))])
+
+    def to_arrow(self) -> Any:
+        import pyarrow as pa
+
+        arrays = {}
+        for name, column in self.columns.items():
+            if column.kind == OBJECT:
+                arrays[name] = pa.array(column.values)
+                continue
+            validity = None
+            if column.nulls is not None:
+                # Arrow's validity bitmap is the inverse of the null bitmap, same bit order
+                nulls = column.nulls + bytes((len(column) + 7) // 8 - len(column.nulls))
+                validity = pa.py_buffer(bytes(~b & 0xFF for b in nulls))
+            arrow_type = pa.int64() if column.kind == INT else pa.float64()
+            arrays[name] = pa.Array.from_buffers(
+                arrow_type, len(column), [validity, pa.py_buffer(column.values)], null_count=column.null_count
+            )
+        return pa.table(arrays)
+
+    def to_pandas(self) -> Any:
+        try:
+            return self.to_arrow().to_pandas()
+        except ImportError:
+            import pandas as pd
+
+            return pd.DataFrame({name: self.column(name) for name in self.columns})
@@ -0,0 +1,87 @@
+"""
+SQL dialect details needed to generate benchmark data and queries per backend
+"""
+
+from dataclasses import dataclass
+from typing import Optional
+
+BENCH_TABLE = "bench_items"
+SCHEMA_TABLE_PREFIX = "bench_schema_"
+INSERT_BATCH = 500
+
+
+@dataclass(frozen=True)
+class Dialect:
+    name: str
+    text_type: str
+    repeat: str  # SQL function producing a string of n copies of a character
+    substring: str
+    top_n: bool = False  # SELECT TOP n instead of LIMIT n
+    supports_ddl: bool = True
+
+    def limit(self, select: str, rows: int) -> str:
+        """Apply a row limit to a `SELECT ...` statement"""
+        if self.top_n:
+            return select.replace("SELECT", f"SELECT TOP {rows}", 1)
+        return f"{select} LIMIT {rows}"
+
+    def seed_statements(self, rows: int, payload: int, schema_tables: int = 0, schema_columns: int = 0) -> list[str]:
+        """DDL and batched inserts creating the benchmark tables"""
+        if not self.supports_ddl:
+            return []
+        statements = [
+            f"DROP TABLE IF EXISTS {BENCH_TABLE}",
+            f"CREATE TABLE {BENCH_TABLE} (id INT PRIMARY KEY, name VARCHAR(64), payload {self.text_type})",
+        ]
+        for start in range(1, rows + 1, INSERT_BATCH):
+            values = ", ".join(
+                f"({i}, 'item-{i}', {self.repeat}('x', {payload}))"
+                for i in range(start, min(start + INSERT_BATCH, rows + 1))
+            )
+            statements.append(f"INSERT INTO {BENCH_TABLE} (id, name, payload) VALUES {values}")
+        for t in range(schema_tables):
+            columns = ", ".join(f"c{c} INT" for c in range(max(1, schema_columns)))
+            statements.append(f"DROP TABLE IF EXISTS {SCHEMA_TABLE_PREFIX}{t}")
+            statements.append(f"CREATE TABLE {SCHEMA_TABLE_PREFIX}{t} ({columns})")
+        return statements
+
+    def point_lookup(self, key: int, payload: int) -> str:
+        if not self.supports_ddl:
+            return f"SELECT {key} AS id, {self.repeat}('x', {payload}) AS payload"
+        return f"SELECT id, name, {self.substring}(payload, 1, {payload}) AS payload FROM {BENCH_TABLE} WHERE id = {key}"
+
+    def scan(self, rows: int, payload: int) -> str:
+        if not self.supports_ddl:
+            return (
+                f"SELECT x AS id, {self.repeat}('x', {payload}) AS payload "
+                f"FROM UNNEST(GENERATE_ARRAY(1, {rows})) AS x"
+            )
+        select = f"SELECT id, name, {self.substring}(payload, 1, {payload}) AS payload FROM {BENCH_TABLE}"
+        if self.top_n:
+            return self.limit(select, rows) + " ORDER BY id"
+        return self.limit(select + " ORDER BY id", rows)
+
+
+DIALECTS = {
+    "postgres": Dialect("postgres", "VARCHAR(65535)", "REPEAT", "SUBSTRING"),
+    "mysql": Dialect("mysql", "TEXT", "REPEAT", "SUBSTRING"),
+    "sqlserver": Dialect("sqlserver", "VARCHAR(MAX)", "REPLICATE", "SUBSTRING", top_n=True),
+    "sqlite": Dialect("sqlite", "TEXT", "REPEAT", "substr"),
+    # Spanner and BigQuery: no DDL through execute_sql, so data is generated inline
+    "googlesql": Dialect("googlesql", "STRING(MAX)", "REPEAT", "SUBSTR", supports_ddl=False),
+}
+
+BACKEND_DIALECTS = {
+    "postgres": "postgres",
+    "redshift": "postgres",
+    "mysql": "mysql",
+    "sqlserver": "sqlserver",
+    "sqlite": "sqlite",
+    "spanner": "googlesql",
+    "bigquery": "googlesql",
+}
+
+
+def dialect_for(backend: str) -> Optional[Dialect]:
+    name = BACKEND_DIALECTS.get(backend)
+    return DIALECTS[name] if name else None
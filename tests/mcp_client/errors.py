@@ -0,0 +1,48 @@
+"""
+Exceptions raised by the MCP test client
+"""
+
+from typing import Any, Optional
+
+
+class McpError(Exception):
+    """JSON-RPC error object returned by the server for a request"""
+
+    def __init__(self, code: int, message: str, data: Any = None):
+        super().__init__(f"[{code}] {message}")
+        self.code = code
+        self.message = message
+        self.data = data
+
+    @classmethod
+    def from_response(cls, error: Any) -> "McpError":
+        if not isinstance(error, dict):
+            return cls(-32603, str(error))
+        return cls(int(error.get("code", -32603)), str(error.get("message", "Unknown error")), error.get("data"))
+
+
+class RequestTimeout(McpError):
+    """A request passed its deadline; the client stopped waiting and asked the server to cancel it"""
+
+    def __init__(self, method: str, timeout: float):
+        super().__init__(-32001, f"{method} timed out after {timeout:g}s")
+        self.method = method
+        self.timeout = timeout
+
+
+class TransportClosed(ConnectionError):
+    """The toolbox process exited or closed its stdout while requests were in flight"""
+
+    def __init__(self, message: str, returncode: Optional[int] = None, stderr: str = ""):
+        detail = message
+        if returncode is not None:
+            detail += f" (exit code {returncode})"
+        if stderr:
+            detail += f"\nStderr: {stderr}"
+        super().__init__(detail)
+        self.returncode = returncode
+        self.stderr = stderr
+
+
+class ConfigError(ValueError):
+    """A backend's launch configuration is incomplete (usually a missing .env value)"""
@@ -0,0 +1,340 @@
+"""
+Export tool results to Arrow IPC or Parquet files
+Rows are taken from a streamed tools/call, gathered into ColumnarResult chunks of
+`batch_rows` and written as record batches (Parquet: one row group per batch), so at most one
+chunk is in memory at a time. The file is written under a temporary name and renamed when
+complete. Needs pyarrow.
+
+ExportInterceptor gives the stdio proxy an `export_sql` tool: the proxy runs the statement on a
+connection of its own and writes the file, and the agent gets back the file's path and a
+summary instead of the rows. Only read-only statements are exported (see sqltext.is_read_only):
+the export's connection is the proxy's own, so a write there would go unseen by the result cache.
+Arrow and Parquet writes run in a worker thread so the proxy keeps relaying other traffic.
+
+The first batch fixes the schema. Columns that are NULL throughout it are typed as strings;
+a later value that can't be cast to the fixed type fails the export with ExportError, and a
+larger batch_rows usually avoids that.
+"""
+
+import asyncio
+import importlib.util
+import json
+import os
+import time
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Optional, Union
+
+from .base import McpClient
+from .client import make_client
+from .columnar import ColumnarResult
+from .errors import McpError, TransportClosed
+from .intercept import Interceptor
+from .params import ServerParams
+from .sqltext import is_read_only
+
+FORMATS = {"arrow": ".arrow", "parquet": ".parquet"}
+BATCH_ROWS = 65536
+
+
+class ExportError(ValueError):
+    """The rows couldn't be written in the requested format"""
+
+
+@dataclass
+class ExportSummary:
+    path: str
+    format: str
+    rows: int = 0
+    batches: int = 0
+    bytes: int = 0
+    columns: list[dict[str, str]] = field(default_factory=list)
+    truncated: bool = False
+    seconds: float = 0.0
+
+    def as_dict(self) -> dict:
+        return asdict(self)
+
+
+async def _in_thread(function: Callable[..., Any], *args: Any) -> Any:
+    """Run a blocking write off the event loop; a cancelled caller still waits for it to stop"""
+    work = asyncio.ensure_future(asyncio.to_thread(function, *args))
+    try:
+        return await asyncio.shield(work)
+    except asyncio.CancelledError:
+        # The thread can't be interrupted; let it finish before the writer is aborted
+        await asyncio.wait([work])
+        raise
+
+
+class BatchWriter:
+    """Writes ColumnarResult chunks to one Arrow IPC or Parquet file"""
+
+    def __init__(self, path: Union[str, Path], format: str = "parquet", compression: Optional[str] = None):
+        # Fail before any rows are fetched; pyarrow itself is imported where it's used
+        if importlib.util.find_spec("pyarrow") is None:
+            raise ModuleNotFoundError("Exporting needs pyarrow (pip install pyarrow)", name="pyarrow")
+        if format not in FORMATS:
+            raise ExportError(f"Unknown export format {format!r}; expected one of: {', '.join(FORMATS)}")
+        self.path = Path(path)
+        self.format = format
+        self.compression = compression
+        self.schema: Any = None
+        self.rows = 0
+        self.batches = 0
+        self._partial = self.path.with_name(self.path.name + ".partial")
+        self._writer: Any = None
+
+    def write(self, chunk: ColumnarResult) -> None:
+        import pyarrow as pa
+
+        if not len(chunk):
+            return
+        try:
+            table = chunk.to_arrow()
+        except (pa.ArrowInvalid, pa.ArrowTypeError) as e:
+            raise ExportError(f"Rows after row {self.rows} don't convert to Arrow: {e}") from e
+        if self._writer is None:
+            self.schema = pa.schema([
+                pa.field(f.name, pa.string()) if table.column(f.name).null_count == table.num_rows else f
+                for f in table.schema
+            ])
+            self._open()
+        table = self._conform(table)
+        if self.format == "parquet":
+            self._writer.write_table(table, row_group_size=table.num_rows)
+        else:
+            self._writer.write_table(table)
+        self.rows += table.num_rows
+        self.batches += 1
+
+    def close(self) -> int:
+        """Finish the file and move it into place; returns its size in bytes"""
+        if self._writer is None:
+            # No rows: still produce a valid, empty file
+            import pyarrow as pa
+
+            self.schema = pa.schema([])
+            self._open()
+        self._writer.close()
+        os.replace(self._partial, self.path)
+        return self.path.stat().st_size
+
+    def abort(self) -> None:
+        if self._writer is not None:
+            try:
+                self._writer.close()
+            except Exception:
+                pass
+        self._partial.unlink(missing_ok=True)
+
+    def _open(self) -> None:
+        import pyarrow as pa
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        if self.format == "arrow":
+            options = pa.ipc.IpcWriteOptions(compression=self.compression) if self.compression else None
+            self._writer = pa.ipc.new_file(str(self._partial), self.schema, options=options)
+        else:
+            import pyarrow.parquet as pq
+
+            self._writer = pq.ParquetWriter(str(self._partial), self.schema, compression=self.compression or "snappy")
+
+    def _conform(self, table: Any) -> Any:
+        import pyarrow as pa
+
+        extra = [name for name in table.column_names if self.schema.get_field_index(name) < 0]
+        if extra:
+            raise ExportError(f"Column(s) {', '.join(extra)} first appeared after row {self.rows}")
+        columns = []
+        for f in self.schema:
+            if f.name not in table.column_names:
+                columns.append(pa.nulls(table.num_rows, f.type))
+                continue
+            column = table.column(f.name)
+            try:
+                columns.append(column if column.type == f.type else column.cast(f.type))
+            except (pa.ArrowInvalid, pa.ArrowNotImplementedError) as e:
+                raise ExportError(
+                    f"Column {f.name!r} changed from {f.type} to {column.type} after row {self.rows}: {e}"
+                ) from e
+        return pa.Table.from_arrays(columns, schema=self.schema)
+
+
+async def export_tool(
+    client: Any,
+    name: str,
+    arguments: Optional[dict],
+    path: Union[str, Path],
+    *,
+    format: str = "parquet",
+    batch_rows: int = BATCH_ROWS,
+    max_rows: Optional[int] = None,
+    max_bytes: Optional[int] = None,
+    compression: Optional[str] = None,
+) -> ExportSummary:
+    """Stream one tool call's rows into `path`; the rows never exist as a whole in memory
+
+    `client` is anything with stream_tool (StdioClient, HttpClient, a pool lease). Each batch is
+    written in a worker thread while the event loop carries on.
+    """
+    started = time.perf_counter()
+    writer = BatchWriter(path, format, compression)
+    chunk = ColumnarResult()
+    try:
+        async with client.stream_tool(name, arguments, max_rows=max_rows, max_bytes=max_bytes) as rows:
+            async for row in rows:
+                chunk.append(row)
+                if len(chunk) >= batch_rows:
+                    await _in_thread(writer.write, chunk)
+                    chunk = ColumnarResult()
+            if rows.is_error:
+                detail = " ".join(str(item) for item in chunk.extra)
+                raise McpError(-32000, f"{name} returned an error result: {detail}", {"content": chunk.extra})
+            await _in_thread(writer.write, chunk)
+        size = await _in_thread(writer.close)
+    except BaseException:
+        writer.abort()
+        raise
+    schema = writer.schema
+    return ExportSummary(
+        path=str(Path(path).resolve()),
+        format=format,
+        rows=writer.rows,
+        batches=writer.batches,
+        bytes=size,
+        columns=[{"name": f.name, "type": str(f.type)} for f in schema],
+        truncated=rows.truncated,
+        seconds=time.perf_counter() - started,
+    )
+
+
+class ExportInterceptor(Interceptor):
+    """Adds `export_sql` to tools/list and answers it by exporting `tool`'s rows to a file"""
+
+    name = "export"
+    methods = ("tools/list", "tools/call")
+
+    def __init__(
+        self,
+        params: ServerParams,
+        directory: Union[str, Path],
+        *,
+        format: str = "parquet",
+        batch_rows: int = BATCH_ROWS,
+        max_rows: Optional[int] = None,
+        tool: str = "execute_sql",
+        export_tool: str = "export_sql",
+    ):
+        if format not in FORMATS:
+            raise ExportError(f"Unknown export format {format!r}; expected one of: {', '.join(FORMATS)}")
+        self.params = params
+        self.directory = Path(directory)
+        self.format = format
+        self.batch_rows = batch_rows
+        self.max_rows = max_rows
+        self.tool = tool
+        self.export_tool = export_tool
+        self.exports = 0
+        self.failures = 0
+        self.rows = 0
+        self.bytes = 0
+        self._sequence = 0
+        self._client: Optional[McpClient] = None
+        self._starting: Optional[asyncio.Lock] = None  # created on the proxy's loop
+
+    def definition(self) -> dict:
+        return {
+            "name": self.export_tool,
+            "description": (
+                f"Run a read-only SQL statement like {self.tool} but write the rows to an Arrow IPC or Parquet file "
+                "instead of returning them. Returns the file path, row count and column types."
+            ),
+            "inputSchema": {
+                "type": "object",
+                "properties": {
+                    "sql": {"type": "string", "description": "The statement to run"},
+                    "format": {"type": "string", "enum": list(FORMATS), "default": self.format},
+                    "batch_rows": {"type": "integer", "description": "Rows per record batch / row group", "default": self.batch_rows},
+                    "max_rows": {"type": "integer", "description": "Stop after this many rows"},
+                },
+                "required": ["sql"],
+            },
+        }
+
+    async def on_request(self, request: dict) -> Optional["asyncio.Future[dict]"]:
+        params = request.get("params") or {}
+        if request.get("method") != "tools/call" or params.get("name") != self.export_tool:
+            return None
+        return asyncio.ensure_future(self._export(request["id"], params.get("arguments") or {}))
+
+    def on_response(self, request: dict, response: dict, size: int) -> dict:
+        if request.get("method") != "tools/list":
+            return response
+        tools = (response.get("result") or {}).get("tools")
+        if not isinstance(tools, list) or not any(t.get("name") == self.tool for t in tools):
+            return response
+        if any(t.get("name") == self.export_tool for t in tools):
+            return response
+        return {**response, "result": {**response["result"], "tools": [*tools, self.definition()]}}
+
+    async def _export(self, request_id: Any, arguments: dict) -> dict:
+        format = arguments.get("format") or self.format
+        try:
+            if not isinstance(arguments.get("sql"), str):
+                raise ExportError("sql is required")
+            if not is_read_only(arguments["sql"]):
+                raise ExportError("Only read-only statements can be exported")
+            if format not in FORMATS:
+                raise ExportError(f"Unknown export format {format!r}; expected one of: {', '.join(FORMATS)}")
+            self._sequence += 1
+            path = self.directory / f"{self.export_tool}-{time.strftime('%Y%m%d-%H%M%S')}-{self._sequence}{FORMATS[format]}"
+            max_rows = arguments.get("max_rows", self.max_rows)
+            client = await self._connect()
+            summary = await export_tool(
+                client,
+                self.tool,
+                {"sql": arguments["sql"]},
+                path,
+                format=format,
+                batch_rows=int(arguments.get("batch_rows") or self.batch_rows),
+                max_rows=int(max_rows) if max_rows is not None else None,
+            )
+        except (McpError, ExportError, ImportError, OSError, ValueError) as e:
+            if isinstance(e, (TransportClosed, ConnectionError)):
+                await self._disconnect()
+            self.failures += 1
+            content = [{"type": "text", "text": f"Export failed: {e}"}]
+            return {"jsonrpc": "2.0", "id": request_id, "result": {"content": content, "isError": True}}
+        self.exports += 1
+        self.rows += summary.rows
+        self.bytes += summary.bytes
+        content = [{"type": "text", "text": json.dumps(summary.as_dict())}]
+        return {"jsonrpc": "2.0", "id": request_id, "result": {"content": content}}
+
+    async def _connect(self) -> McpClient:
+        """The interceptor's own server connection, so exported rows never cross the proxy's pipe"""
+        if self._starting is None:
+            self._starting = asyncio.Lock()
+        async with self._starting:
+            if self._client is None or not self._client.running:
+                client = make_client(self.params)
+                try:
+                    await client.start()
+                    await client.handshake()
+                except BaseException:
+                    await client.close()
+                    raise
+                self._client = client
+            return self._client
+
+    async def _disconnect(self) -> None:
+        client, self._client = self._client, None
+        if client is not None:
+            await client.close()
+
+    async def close(self) -> None:
+        await self._disconnect()
+
+    def report(self) -> dict:
+        return {"exports": self.exports, "failures": self.failures, "rows": self.rows, "bytes": self.bytes}
@@ -0,0 +1,278 @@
+"""
+One session over several toolbox servers at once
+FanoutSession starts a client per server and runs tools/call against several of them
+concurrently, so a turn that queries Postgres, BigQuery and Spanner takes as long as the
+slowest query rather than all three added together. Calls to one server are capped by a
+semaphore (BACKEND_CONCURRENCY, or `limits=`); calls to different servers never wait on each
+other.
+
+Tools are exposed as one list with namespaced names, `<server>__<tool>` (e.g.
+postgres__execute_sql), since every server has its own execute_sql. A failed call doesn't
+fail the others: each comes back as a FanoutResult holding its result or its error, and
+merge_rows() joins the successful ones' rows, tagged with the server they came from.
+"""
+
+import asyncio
+import time
+from dataclasses import dataclass, field
+from typing import Any, Mapping, Optional, Sequence, Union
+
+from .base import McpClient
+from .client import make_client
+from .codec import RowDecoder
+from .errors import McpError, TransportClosed
+from .params import ServerParams
+
+SEPARATOR = "__"
+DEFAULT_CONCURRENCY = 8
+
+# Warehouses queue concurrent queries against slot and connection quotas; past a few in
+# flight, more only wait server-side
+BACKEND_CONCURRENCY = {
+    "bigquery": 4,
+    "redshift": 4,
+    "spanner": 8,
+    "postgres": 16,
+    "mysql": 16,
+    "sqlserver": 16,
+    "sqlite": 1,
+}
+
+# (server, tool, arguments) for call_many
+FanoutCall = tuple[str, str, Optional[dict]]
+
+
+def concurrency_for(backend: str) -> int:
+    return BACKEND_CONCURRENCY.get(backend, DEFAULT_CONCURRENCY)
+
+
+@dataclass
+class FanoutResult:
+    server: str
+    tool: str
+    result: Optional[dict] = None
+    error: Optional[Exception] = None
+    seconds: float = 0.0
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None and not (self.result or {}).get("isError")
+
+    def rows(self, decoder: Optional[RowDecoder] = None) -> list:
+        return (decoder or RowDecoder()).rows(self.result) if self.ok else []
+
+
+@dataclass
+class ServerStats:
+    calls: int = 0
+    failures: int = 0
+    seconds: float = 0.0
+    max_in_flight: int = 0
+    in_flight: int = field(default=0, repr=False)
+
+
+class _Server:
+    def __init__(self, name: str, params: ServerParams, limit: int):
+        self.name = name
+        self.params = params
+        self.limit = limit
+        self.client: Optional[McpClient] = None
+        self.tools: list[dict] = []
+        self.stats = ServerStats()
+        self._slots = asyncio.Semaphore(limit)
+
+    async def call(self, tool: str, arguments: Optional[dict], timeout: Optional[float]) -> FanoutResult:
+        outcome = FanoutResult(self.name, tool)
+        async with self._slots:
+            stats = self.stats
+            stats.calls += 1
+            stats.in_flight += 1
+            stats.max_in_flight = max(stats.max_in_flight, stats.in_flight)
+            started = time.perf_counter()
+            try:
+                if self.client is None:
+                    raise TransportClosed(f"{self.name} is not connected")
+                outcome.result = await self.client.call_tool(tool, arguments, timeout=timeout)
+            except (McpError, TransportClosed, OSError) as e:
+                outcome.error = e
+            finally:
+                outcome.seconds = time.perf_counter() - started
+                stats.in_flight -= 1
+                stats.seconds += outcome.seconds
+        if not outcome.ok:
+            stats.failures += 1
+        return outcome
+
+
+class FanoutSession:
+    """Clients for several servers, called concurrently under per-server limits
+
+        async with FanoutSession({"pg": pg_params, "bq": bq_params}) as session:
+            results = await session.fan_out("execute_sql", per_server={"pg": {"sql": q1}, "bq": {"sql": q2}})
+            rows = merge_rows(results)
+
+    `servers` maps a namespace to its ServerParams; a plain list uses each ServerParams.name.
+    `limits` overrides BACKEND_CONCURRENCY per namespace. With `allow_partial`, servers that
+    fail to start are left out (see `unavailable`) instead of failing start().
+    """
+
+    def __init__(
+        self,
+        servers: Union[Mapping[str, ServerParams], Sequence[ServerParams]],
+        *,
+        limits: Optional[Mapping[str, int]] = None,
+        allow_partial: bool = False,
+        separator: str = SEPARATOR,
+        **client_options: Any,
+    ):
+        named = dict(servers) if isinstance(servers, Mapping) else {p.name: p for p in servers}
+        if not isinstance(servers, Mapping) and len(named) != len(servers):
+            raise ValueError("Servers need distinct names; pass a mapping of namespace -> ServerParams")
+        for name in named:
+            if not name or separator in name:
+                raise ValueError(f"Invalid server namespace {name!r} (must be non-empty, without {separator!r})")
+        limits = limits or {}
+        self.separator = separator
+        self.allow_partial = allow_partial
+        self.client_options = client_options
+        self.unavailable: dict[str, BaseException] = {}
+        self._servers = {
+            name: _Server(name, params, limits.get(name) or concurrency_for(params.name))
+            for name, params in named.items()
+        }
+
+    async def __aenter__(self) -> "FanoutSession":
+        await self.start()
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.close()
+
+    @property
+    def servers(self) -> list[str]:
+        """Namespaces of the connected servers"""
+        return [name for name, server in self._servers.items() if server.client is not None]
+
+    def client(self, server: str) -> McpClient:
+        client = self._servers[server].client
+        if client is None:
+            raise TransportClosed(f"{server} is not connected")
+        return client
+
+    async def start(self) -> None:
+        """Start and handshake every server concurrently"""
+        names = list(self._servers)
+        outcomes = await asyncio.gather(*[self._connect(self._servers[n]) for n in names], return_exceptions=True)
+        failed = {n: e for n, e in zip(names, outcomes) if isinstance(e, BaseException)}
+        if failed and not self.allow_partial:
+            await self.close()
+            raise next(iter(failed.values()))
+        self.unavailable.update(failed)
+
+    async def close(self) -> None:
+        servers = [s for s in self._servers.values() if s.client is not None]
+        await asyncio.gather(*[s.client.close() for s in servers if s.client is not None], return_exceptions=True)
+        for server in servers:
+            server.client = None
+
+    async def _connect(self, server: _Server) -> None:
+        client = make_client(server.params, **self.client_options)
+        try:
+            await client.start()
+            server.tools = await client.handshake()
+        except BaseException:
+            await client.close()
+            raise
+        server.client = client
+
+    # -- Tools ------------------------------------------------------------
+
+    def qualified(self, server: str, tool: str) -> str:
+        return f"{server}{self.separator}{tool}"
+
+    def route(self, name: str) -> tuple[str, str]:
+        """(server, tool) of a namespaced tool name"""
+        server, separator, tool = name.partition(self.separator)
+        if not separator or server not in self._servers:
+            raise McpError(-32602, f"Unknown tool {name!r}: expected <server>{self.separator}<tool> with a server in {list(self._servers)}")
+        return server, tool
+
+    async def list_tools(self, *, refresh: bool = False) -> list[dict]:
+        """Every connected server's tools, renamed <server>__<tool>, descriptions prefixed [server]"""
+        if refresh:
+            connected = [self._servers[name] for name in self.servers]
+            lists = await asyncio.gather(*[s.client.list_tools() for s in connected if s.client is not None])
+            for server, tools in zip(connected, lists):
+                server.tools = tools
+        return [
+            {
+                **tool,
+                "name": self.qualified(name, tool["name"]),
+                "description": f"[{name}] {tool.get('description', '')}".rstrip(),
+            }
+            for name in self.servers
+            for tool in self._servers[name].tools
+        ]
+
+    async def call_tool(self, name: str, arguments: Optional[dict] = None, *, timeout: Optional[float] = None) -> dict:
+        """Call one namespaced tool; raises like McpClient.call_tool"""
+        server, tool = self.route(name)
+        outcome = await self._servers[server].call(tool, arguments, timeout)
+        if outcome.error is not None:
+            raise outcome.error
+        return outcome.result or {}
+
+    async def call_many(self, calls: Sequence[FanoutCall], *, timeout: Optional[float] = None) -> list[FanoutResult]:
+        """Run (server, tool, arguments) calls concurrently; results in call order, errors included"""
+        for server, _, _ in calls:
+            if server not in self._servers:
+                raise McpError(-32602, f"Unknown server {server!r}; expected one of {list(self._servers)}")
+        return list(await asyncio.gather(*[
+            self._servers[server].call(tool, arguments, timeout) for server, tool, arguments in calls
+        ]))
+
+    async def fan_out(
+        self,
+        tool: str,
+        arguments: Optional[dict] = None,
+        *,
+        servers: Optional[Sequence[str]] = None,
+        per_server: Optional[Mapping[str, dict]] = None,
+        timeout: Optional[float] = None,
+    ) -> list[FanoutResult]:
+        """The same tool on several servers: `servers` (default: all connected ones) with the
+        same `arguments`, or each server in `per_server` with its own arguments
+        """
+        if per_server is not None:
+            targets: list[FanoutCall] = [(name, tool, args) for name, args in per_server.items()]
+        else:
+            targets = [(name, tool, arguments) for name in (servers if servers is not None else self.servers)]
+        return await self.call_many(targets, timeout=timeout)
+
+    def report(self) -> dict:
+        return {
+            name: {"limit": server.limit, "connected": server.client is not None, **vars(server.stats)}
+            for name, server in self._servers.items()
+        }
+
+
+def merge_rows(
+    results: Sequence[FanoutResult],
+    *,
+    server_key: str = "_server",
+    decoder: Optional[RowDecoder] = None,
+) -> list:
+    """Rows of every successful result, in result order; dict rows get `server_key` set
+
+    Raises ValueError when a row already has a `server_key` column; pick another key then.
+    """
+    merged: list = []
+    for outcome in results:
+        for row in outcome.rows(decoder):
+            if not isinstance(row, dict):
+                merged.append(row)
+                continue
+            if server_key in row:
+                raise ValueError(f"Rows from {outcome.server} have a {server_key!r} column; pass another server_key")
+            merged.append({**row, server_key: outcome.server})
+    return merged
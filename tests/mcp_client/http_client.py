@@ -0,0 +1,352 @@
+"""
+MCP client for a toolbox server running in HTTP mode (streamable HTTP transport)
+One long-lived server is shared by many sessions; each client keeps a small pool of
+keep-alive connections to it, so a request costs a round trip rather than a TCP handshake
+or a container start. Stdlib only: HTTP/1.1 is spoken directly over asyncio streams.
+A request past its deadline drops its connection and is cancelled on the server; the server is
+shared, so there is no hard deadline recycling here.
+"""
+
+import asyncio
+import collections
+import itertools
+import json
+import ssl
+from typing import Any, Callable, Optional, Union
+from urllib.parse import urlsplit
+
+from .base import McpClient, NotificationHandler, cancel_notification
+from .codec import Codec
+from .errors import McpError, RequestTimeout, TransportClosed
+from .params import ServerParams
+from .telemetry import Span, Telemetry
+from .tool_catalog import ToolCatalog
+
+MAX_CONNECTIONS = 8
+MAX_MESSAGE_BYTES = 64 * 1024 * 1024
+SESSION_HEADER = "mcp-session-id"
+# Safe to send twice, so a request whose reused connection closed without any reply is retried
+IDEMPOTENT_METHODS = frozenset({"initialize", "ping", "tools/list", "prompts/list", "resources/list"})
+
+Connection = tuple[asyncio.StreamReader, asyncio.StreamWriter]
+
+
+class NoResponse(ConnectionError):
+    """The connection ended before a single byte of the response arrived"""
+
+
+class HttpResponse:
+    def __init__(self, status: int, reason: str, headers: dict[str, str], body: bytes):
+        self.status = status
+        self.reason = reason
+        self.headers = headers
+        self.body = body
+
+    @property
+    def content_type(self) -> str:
+        return self.headers.get("content-type", "").split(";")[0].strip().lower()
+
+    @property
+    def keep_alive(self) -> bool:
+        return self.headers.get("connection", "").lower() != "close"
+
+
+def parse_sse(body: bytes, loads: Callable[[str], Any] = json.loads) -> list[Any]:
+    """JSON payloads of the `data:` fields of an event stream, one per event"""
+    messages = []
+    data: list[str] = []
+    for raw in body.decode(errors="replace").splitlines() + [""]:
+        if not raw:
+            if data:
+                try:
+                    messages.append(loads("\n".join(data)))
+                except ValueError:
+                    pass
+                data = []
+        elif raw.startswith("data:"):
+            data.append(raw[5:].lstrip(" "))
+    return messages
+
+
+class HttpClient(McpClient):
+    """JSON-RPC over HTTP POST to a shared toolbox server, reusing keep-alive connections
+
+    Requests may run concurrently; each one borrows an idle connection or opens a new one,
+    up to `max_connections`.
+    """
+
+    transport = "http"
+
+    def __init__(
+        self,
+        params: ServerParams,
+        *,
+        max_connections: int = MAX_CONNECTIONS,
+        timeout: Optional[float] = None,
+        max_message_bytes: int = MAX_MESSAGE_BYTES,
+        codec: Union[Codec, str, None] = None,
+        on_notification: Optional[NotificationHandler] = None,
+        telemetry: Optional[Telemetry] = None,
+        tool_catalog: Optional[ToolCatalog] = None,
+    ):
+        super().__init__(
+            params,
+            codec=codec,
+            on_notification=on_notification,
+            timeout=timeout,
+            telemetry=telemetry,
+            tool_catalog=tool_catalog,
+        )
+        if not params.url:
+            raise ValueError(f"{params.name}: HttpClient needs ServerParams.url")
+        url = urlsplit(params.url)
+        if url.scheme not in ("http", "https") or not url.hostname:
+            raise ValueError(f"{params.name}: unsupported MCP url {params.url!r}")
+        self.host = url.hostname
+        self.port = url.port or (443 if url.scheme == "https" else 80)
+        self.path = url.path or "/"
+        if url.query:
+            self.path += "?" + url.query
+        self.ssl = ssl.create_default_context() if url.scheme == "https" else None
+        self.max_connections = max_connections
+        self.max_message_bytes = max_message_bytes
+        self.session_id: Optional[str] = None
+        self.connections_opened = 0
+        self.connections_reused = 0
+        self._idle: collections.deque = collections.deque()
+        self._slots = asyncio.Semaphore(max_connections)
+        self._ids = itertools.count(1)
+        self._started = False
+        self._closed: Optional[TransportClosed] = None
+
+    @property
+    def running(self) -> bool:
+        return self._started and self._closed is None
+
+    async def start(self) -> None:
+        span = self._span("start")
+        # Fail fast when nothing is listening, like a stdio client whose process won't start
+        try:
+            self._idle.append(await self._connect())
+        except BaseException as e:
+            self._finish(span, e)
+            raise
+        self._finish(span, None)
+        self._started = True
+
+    async def close(self, timeout: float = 5.0) -> None:
+        if not self._started or self._closed is not None:
+            return
+        if self.session_id is not None:
+            # Lets the server free the session now instead of when it times out
+            try:
+                await asyncio.wait_for(self._exchange("DELETE", b"", idempotent=True), timeout)
+            except (OSError, asyncio.TimeoutError, TransportClosed, McpError):
+                pass
+        self._closed = TransportClosed("Client closed")
+        while self._idle:
+            _, writer = self._idle.popleft()
+            writer.close()
+
+    # -- JSON-RPC ---------------------------------------------------------
+
+    async def request(self, method: str, params: Optional[dict] = None, *, timeout: Optional[float] = None) -> Any:
+        """Send one request and wait for its result; raises McpError on an error response"""
+        request_id = next(self._ids)
+        self.requests_sent += 1
+        body = self.codec.dumps({"jsonrpc": "2.0", "method": method, "params": params or {}, "id": request_id})
+        span = self._span(method, params, len(body))
+        try:
+            result = await self._request(method, request_id, body, timeout, span)
+        except BaseException as e:
+            self._finish(span, e)
+            raise
+        self._finish(span, result)
+        return result
+
+    async def _request(
+        self, method: str, request_id: int, body: bytes, timeout: Optional[float], span: Optional[Span]
+    ) -> Any:
+        timeout = self.timeout if timeout is None else (timeout or None)
+        try:
+            exchange = self._exchange("POST", body, idempotent=method in IDEMPOTENT_METHODS)
+            response = await asyncio.wait_for(exchange, timeout)
+        except asyncio.TimeoutError:
+            self.timeouts += 1
+            if method != "initialize":
+                asyncio.ensure_future(self._cancel(request_id, f"Client deadline of {timeout:g}s passed"))
+            raise RequestTimeout(method, timeout or 0.0) from None
+        if span is not None:
+            span.bytes_in = len(response.body)
+        if response.status >= 400:
+            raise self._http_error(response)
+        if method == "initialize" and SESSION_HEADER in response.headers:
+            self.session_id = response.headers[SESSION_HEADER]
+        if response.content_type == "text/event-stream":
+            messages = parse_sse(response.body, self.codec.loads)
+        else:
+            try:
+                payload = self.codec.loads(response.body)
+            except ValueError as e:
+                self.stray_lines.append(response.body[:200].decode(errors="replace"))
+                raise McpError(-32700, f"Invalid JSON response from {self.params.url}: {e}") from e
+            messages = payload if isinstance(payload, list) else [payload]
+        for item in messages:
+            if not isinstance(item, dict):
+                continue
+            if "method" in item and "id" not in item and self.on_notification is not None:
+                self.on_notification(item["method"], item.get("params") or {})
+            elif item.get("id") == request_id:
+                if "error" in item:
+                    raise McpError.from_response(item["error"])
+                if method == "initialize":
+                    # Later requests carry the negotiated version header, even mid-handshake
+                    self._initialized(item.get("result"))
+                return item.get("result")
+        raise McpError(-32603, f"No response to request {request_id} in HTTP reply from {self.params.url}")
+
+    async def notify(self, method: str, params: Optional[dict] = None) -> None:
+        message: dict = {"jsonrpc": "2.0", "method": method}
+        if params is not None:
+            message["params"] = params
+        exchange = self._exchange("POST", self.codec.dumps(message), idempotent=True)
+        response = await asyncio.wait_for(exchange, self.timeout)
+        if response.status >= 400:
+            raise self._http_error(response)
+
+    async def _cancel(self, request_id: int, reason: str) -> None:
+        try:
+            body = self.codec.dumps(cancel_notification(request_id, reason))
+            await asyncio.wait_for(self._exchange("POST", body, idempotent=True), self.timeout)
+        except (OSError, asyncio.TimeoutError, TransportClosed, McpError):
+            pass
+
+    def _http_error(self, response: HttpResponse) -> McpError:
+        # Error responses may still carry a JSON-RPC error object
+        try:
+            payload = self.codec.loads(response.body)
+            if isinstance(payload, dict) and isinstance(payload.get("error"), dict):
+                return McpError.from_response(payload["error"])
+        except ValueError:
+            pass
+        detail = response.body[:200].decode(errors="replace").strip()
+        return McpError(-32000, f"HTTP {response.status} {response.reason}: {detail}")
+
+    # -- HTTP -------------------------------------------------------------
+
+    async def _exchange(self, method: str, body: bytes, *, idempotent: bool = False) -> HttpResponse:
+        if self._closed is not None:
+            raise self._closed
+        head = [
+            f"{method} {self.path} HTTP/1.1",
+            f"Host: {self.host}:{self.port}",
+            "Accept: application/json, text/event-stream",
+            "Content-Type: application/json",
+            f"Content-Length: {len(body)}",
+        ]
+        if self.session_id is not None:
+            head.append(f"Mcp-Session-Id: {self.session_id}")
+        if self.protocol_version is not None:
+            head.append(f"MCP-Protocol-Version: {self.protocol_version}")
+        data = ("\r\n".join(head) + "\r\n\r\n").encode() + body
+
+        async with self._slots:
+            while True:
+                reused = bool(self._idle)
+                reader, writer = self._idle.popleft() if reused else await self._connect()
+                written = False
+                try:
+                    writer.write(data)
+                    await writer.drain()
+                    written = True
+                    response = await self._read_response(reader, method)
+                except (OSError, asyncio.IncompleteReadError) as e:
+                    writer.close()
+                    # The server closed an idle keep-alive connection: retry on a fresh one, but
+                    # only if it can't have acted on the request, or acting twice is harmless
+                    if reused and (not written or (idempotent and isinstance(e, NoResponse))):
+                        continue
+                    raise TransportClosed(f"HTTP {method} to {self.params.url} failed: {e}") from e
+                except BaseException:
+                    writer.close()
+                    raise
+                if reused:
+                    self.connections_reused += 1
+                if response.keep_alive and self._closed is None:
+                    self._idle.append((reader, writer))
+                else:
+                    writer.close()
+                return response
+
+    async def _connect(self) -> Connection:
+        try:
+            connection = await asyncio.wait_for(
+                asyncio.open_connection(self.host, self.port, ssl=self.ssl, limit=1024 * 1024), self.timeout
+            )
+        except (OSError, asyncio.TimeoutError) as e:
+            raise TransportClosed(f"Could not connect to {self.params.url}: {e}") from e
+        self.connections_opened += 1
+        return connection
+
+    async def _read_response(self, reader: asyncio.StreamReader, method: str) -> HttpResponse:
+        try:
+            status_line = (await reader.readuntil(b"\r\n")).decode(errors="replace").rstrip()
+        except (OSError, asyncio.IncompleteReadError) as e:
+            if isinstance(e, asyncio.IncompleteReadError) and e.partial:
+                raise
+            raise NoResponse(f"connection closed before any response: {e}") from e
+        parts = status_line.split(" ", 2)
+        if len(parts) < 2 or not parts[0].startswith("HTTP/"):
+            raise TransportClosed(f"Malformed HTTP status line from {self.params.url}: {status_line!r}")
+        status, reason = int(parts[1]), parts[2] if len(parts) > 2 else ""
+        headers: dict[str, str] = {}
+        while True:
+            line = (await reader.readuntil(b"\r\n")).decode(errors="replace").rstrip("\r\n")
+            if not line:
+                break
+            name, _, value = line.partition(":")
+            headers[name.strip().lower()] = value.strip()
+
+        if status in (204, 304) or 100 <= status < 200:
+            body = b""
+        elif "chunked" in headers.get("transfer-encoding", "").lower():
+            body = await self._read_chunked(reader)
+        elif "content-length" in headers:
+            length = int(headers["content-length"])
+            if length > self.max_message_bytes:
+                raise self._too_large(length)
+            body = await reader.readexactly(length)
+        else:
+            # No framing: the body runs to the end of the connection
+            buffer = bytearray()
+            while True:
+                chunk = await reader.read(1024 * 1024)
+                if not chunk:
+                    break
+                buffer += chunk
+                if len(buffer) > self.max_message_bytes:
+                    raise self._too_large(len(buffer))
+            body = bytes(buffer)
+            headers["connection"] = "close"
+        if len(body) > self.max_message_bytes:
+            raise self._too_large(len(body))
+        return HttpResponse(status, reason, headers, body)
+
+    async def _read_chunked(self, reader: asyncio.StreamReader) -> bytes:
+        body = bytearray()
+        while True:
+            size_line = await reader.readuntil(b"\r\n")
+            size = int(size_line.split(b";", 1)[0].strip() or b"0", 16)
+            if size == 0:
+                # Trailers, if any, end with an empty line
+                while (await reader.readuntil(b"\r\n")) != b"\r\n":
+                    pass
+                return bytes(body)
+            if len(body) + size > self.max_message_bytes:
+                raise self._too_large(len(body) + size)
+            body += await reader.readexactly(size)
+            await reader.readexactly(2)
+
+    def _too_large(self, size: int) -> McpError:
+        # Not a transport failure: the connection is dropped but the client stays usable
+        return McpError(-32000, f"Response of {size}+ bytes exceeds max_message_bytes={self.max_message_bytes}")
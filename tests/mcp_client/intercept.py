@@ -0,0 +1,50 @@
+"""
+Interceptor hooks for the stdio proxy
+"""
+
+import asyncio
+from typing import Optional, Union
+
+
+class Interceptor:
+    """One concern of the proxy (caching, limits, ...); the defaults pass everything through
+
+    Only requests for the methods in `methods` (and their responses) are offered to an
+    interceptor.
+    """
+
+    name = "interceptor"
+    methods: tuple[str, ...] = ("tools/call",)
+
+    def rewrite_request(self, request: dict) -> dict:
+        """Return the request to pass on instead (later interceptors and the server see it)"""
+        return request
+
+    async def on_request(self, request: dict) -> Union[dict, "asyncio.Future[dict]", None]:
+        """Return a response to answer `request` without forwarding it to the server
+
+        A slow answer can be returned as a Task instead; the proxy writes its result when it
+        completes and keeps forwarding the requests behind it meanwhile.
+        """
+        return None
+
+    def on_response(self, request: dict, response: dict, size: int) -> dict:
+        """Return the response to send to the client; `size` is its encoded length in bytes"""
+        return response
+
+    def max_items(self, request: dict) -> Optional[int]:
+        """Content items of a response too large to decode that this interceptor needs
+
+        When any interceptor gives a number, the proxy decodes that many and drops the rest of
+        the response unread, then offers what it kept to on_response as usual.
+        """
+        return None
+
+    def on_unparsed_response(self, request: dict) -> None:
+        """The response to `request` was too large to decode and was forwarded as is"""
+
+    def report(self) -> dict:
+        return {}
+
+    async def close(self) -> None:
+        """The proxy is exiting"""
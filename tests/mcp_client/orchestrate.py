@@ -0,0 +1,187 @@
+#!/usr/bin/env python3
+"""
+Parallel test orchestrator for every tests/<db> backend
+Runs independent backends concurrently under a cap. Each backend gets its own compose
+project name and freshly allocated host ports, so two databases (or two runs of the same
+suite) never collide on 5432 and friends. Writes a combined JUnit and/or JSON report
+with setup, handshake, tools/list and tools/call durations.
+
+Usage (from tests/):
+    python3 -m mcp_client.orchestrate --jobs 4 --junit results.xml --json results.json
+    python3 -m mcp_client.orchestrate postgres mysql
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import socket
+import sys
+import time
+import xml.etree.ElementTree as ET
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Optional, Sequence
+
+from .backends import TESTS_DIR, discover_backends, load_backend
+from .errors import ConfigError
+from .readiness import DEFAULT_TIMEOUT, compose_command, format_report, wait_until_ready
+from .smoke import run_smoke_test
+
+
+@dataclass
+class BackendRun:
+    backend: str
+    status: str = "pending"  # passed | failed | skipped
+    message: str = ""
+    project: str = ""
+    ports: dict[str, int] = field(default_factory=dict)
+    durations: dict[str, float] = field(default_factory=dict)
+    log: list[str] = field(default_factory=list)
+
+    @property
+    def total_s(self) -> float:
+        return self.durations.get("total", 0.0)
+
+
+def free_port() -> int:
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
+        s.bind(("", 0))
+        return s.getsockname()[1]
+
+
+async def compose(compose_dir: Path, project: str, env: dict[str, str], *args: str) -> tuple[int, str]:
+    process = await asyncio.create_subprocess_exec(
+        *compose_command(), "-p", project, *args,
+        cwd=compose_dir,
+        env=env,
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.STDOUT,
+    )
+    output, _ = await process.communicate()
+    return process.returncode or 0, output.decode(errors="replace").strip()
+
+
+async def run_backend(backend: str, timeout: float, run_id: str) -> BackendRun:
+    run = BackendRun(backend, project=f"toolbox-{backend}-{run_id}")
+    started = time.perf_counter()
+    module = load_backend(backend)
+    compose_dir = TESTS_DIR / backend
+    has_compose = (compose_dir / "docker-compose.yml").exists()
+
+    compose_ports: dict[str, int] = getattr(module, "COMPOSE_PORTS", {})
+    run.ports = {name: free_port() for name in compose_ports} if has_compose else {}
+    try:
+        params = module.server_params(port=next(iter(run.ports.values()))) if run.ports else module.server_params()
+    except (ConfigError, FileNotFoundError) as e:
+        run.status, run.message = "skipped", str(e)
+        return run
+
+    env = {**os.environ, **{name: str(port) for name, port in run.ports.items()}}
+    try:
+        if has_compose:
+            step = time.perf_counter()
+            code, output = await compose(compose_dir, run.project, env, "up", "-d")
+            run.log.append(output)
+            if code != 0:
+                run.status, run.message = "failed", f"docker-compose up failed (exit {code})"
+                return run
+            ready = await wait_until_ready(backend, params, compose_dir, run.project, timeout)
+            run.log.append(format_report(ready))
+            run.durations["setup"] = time.perf_counter() - step
+            if ready.compose_ready_s is not None:
+                run.durations["compose_ready"] = ready.compose_ready_s
+            if not ready.ready:
+                run.status, run.message = "failed", ready.error
+                return run
+
+        # Lockstep, so the report keeps tools/list apart from the handshake
+        passed = await run_smoke_test(
+            params, getattr(module, "CHECKS", ()), timings=run.durations, log=run.log.append, pipelined=False
+        )
+        run.status = "passed" if passed else "failed"
+        if not passed:
+            run.message = next((line for line in reversed(run.log) if line.startswith("✗")), "smoke test failed")
+    except OSError as e:
+        run.status, run.message = "failed", str(e)
+    finally:
+        if has_compose:
+            try:
+                _, output = await compose(compose_dir, run.project, env, "down", "-v")
+                run.log.append(output)
+            except OSError:
+                pass
+        run.durations["total"] = time.perf_counter() - started
+    return run
+
+
+async def run_all(backends: Sequence[str], jobs: int, timeout: float) -> list[BackendRun]:
+    semaphore = asyncio.Semaphore(jobs)
+    run_id = f"{os.getpid()}"
+
+    async def limited(backend: str) -> BackendRun:
+        async with semaphore:
+            print(f"→ {backend} started")
+            run = await run_backend(backend, timeout, run_id)
+            mark = {"passed": "✓", "skipped": "•"}.get(run.status, "✗")
+            print(f"{mark} {backend} {run.status} in {run.total_s:.1f}s {run.message}".rstrip())
+            return run
+
+    return list(await asyncio.gather(*[limited(b) for b in backends]))
+
+
+def junit_xml(runs: Sequence[BackendRun], wall_s: float) -> ET.ElementTree:
+    suite = ET.Element(
+        "testsuite",
+        name="toolbox-backends",
+        tests=str(len(runs)),
+        failures=str(sum(r.status == "failed" for r in runs)),
+        skipped=str(sum(r.status == "skipped" for r in runs)),
+        time=f"{wall_s:.3f}",
+    )
+    for run in runs:
+        case = ET.SubElement(suite, "testcase", classname="toolbox", name=run.backend, time=f"{run.total_s:.3f}")
+        properties = ET.SubElement(case, "properties")
+        for name, value in run.durations.items():
+            ET.SubElement(properties, "property", name=f"duration.{name}", value=f"{value:.3f}")
+        if run.status == "failed":
+            ET.SubElement(case, "failure", message=run.message)
+        elif run.status == "skipped":
+            ET.SubElement(case, "skipped", message=run.message)
+        ET.SubElement(case, "system-out").text = "\n".join(line for line in run.log if line)
+    return ET.ElementTree(suite)
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("backends", nargs="*", help="Backends to run (default: every tests/<db> directory)")
+    parser.add_argument("--jobs", type=int, default=4, help="Maximum backends running at once")
+    parser.add_argument("--timeout", type=float, default=DEFAULT_TIMEOUT, help="Readiness deadline per backend")
+    parser.add_argument("--junit", type=Path, help="Write a JUnit XML report")
+    parser.add_argument("--json", type=Path, help="Write a JSON report")
+    args = parser.parse_args(argv)
+
+    backends = args.backends or discover_backends()
+    started = time.perf_counter()
+    runs = asyncio.run(run_all(backends, max(1, args.jobs), args.timeout))
+    wall_s = time.perf_counter() - started
+
+    print(f"\n{'backend':<12} {'status':<8} {'setup':>8} {'handshake':>10} {'tools/list':>11} {'total':>8}")
+    for run in runs:
+        d = run.durations
+        print(
+            f"{run.backend:<12} {run.status:<8} {d.get('setup', 0):>7.1f}s {d.get('handshake', 0):>9.2f}s "
+            f"{d.get('tools_list', 0):>10.3f}s {run.total_s:>7.1f}s"
+        )
+    print(f"Wall time {wall_s:.1f}s (sum of backends {sum(r.total_s for r in runs):.1f}s)")
+
+    if args.junit:
+        junit_xml(runs, wall_s).write(args.junit, encoding="unicode", xml_declaration=True)
+    if args.json:
+        report = {"wall_s": wall_s, "backends": [{**asdict(r), "total_s": r.total_s} for r in runs]}
+        args.json.write_text(json.dumps(report, indent=2))
+    return 1 if any(r.status == "failed" for r in runs) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,82 @@
+"""
+Launch configuration for toolbox MCP servers
+Builds the docker commands used in the main README and loads per-backend .env files.
+"""
+
+import atexit
+import hashlib
+import json
+import os
+import tempfile
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Iterable, Optional, Sequence
+
+DOCKER_IMAGE = "us-central1-docker.pkg.dev/database-toolbox/toolbox/toolbox:latest"
+
+
+@dataclass
+class ServerParams:
+    """How to reach one toolbox server
+
+    Either the command line (plus extra environment) of a stdio server, or the `url` of a
+    shared server in HTTP mode, e.g. http://127.0.0.1:5000/mcp.
+    """
+
+    name: str
+    command: list[str]
+    env: dict[str, str] = field(default_factory=dict)
+    url: Optional[str] = None
+
+    def full_env(self) -> dict[str, str]:
+        return {**os.environ, **self.env}
+
+    def key(self) -> str:
+        """Stable identifier for this configuration, used to share warm processes"""
+        payload = json.dumps({"command": self.command, "env": self.env, "url": self.url}, sort_keys=True)
+        return f"{self.name}-{hashlib.sha256(payload.encode()).hexdigest()[:12]}"
+
+
+def docker_run(
+    args: Sequence[str],
+    *,
+    env_names: Iterable[str] = (),
+    volumes: Iterable[str] = (),
+    network: Optional[str] = None,
+    image: str = DOCKER_IMAGE,
+) -> list[str]:
+    """Build a `docker run --rm -i ...` command in the same shape as the README examples"""
+    cmd = ["docker", "run", "--rm", "-i"]
+    if network:
+        cmd += ["--network", network]
+    for name in env_names:
+        cmd += ["-e", name]
+    for volume in volumes:
+        cmd += ["-v", volume]
+    return cmd + [image, *args]
+
+
+def load_env_file(env_path: Path) -> dict[str, str]:
+    values: dict[str, str] = {}
+    if not env_path.exists():
+        raise FileNotFoundError(f".env file not found at {env_path}")
+    for line in env_path.read_text().splitlines():
+        stripped = line.strip()
+        if not stripped or stripped.startswith("#"):
+            continue
+        if "=" not in stripped:
+            continue
+        key, value = stripped.split("=", 1)
+        key = key.strip()
+        value = value.strip().strip('"').strip("'")
+        values[key] = value
+    return values
+
+
+def write_temp_file(content: str, prefix: str, suffix: str = ".json") -> str:
+    """Write content to a private temp file that is removed when the interpreter exits"""
+    with tempfile.NamedTemporaryFile(mode="w", delete=False, prefix=prefix, suffix=suffix) as tf:
+        tf.write(content)
+    os.chmod(tf.name, 0o600)
+    atexit.register(lambda: Path(tf.name).unlink(missing_ok=True))
+    return tf.name
@@ -0,0 +1,175 @@
+#!/usr/bin/env python3
+"""
+Lockstep vs pipelined JSON-RPC benchmark
+Two phases, each run in every mode (lockstep, pipelined, and batch unless --no-batch):
+- session: start a server and time until initialize, tools/list and a first execute_sql have
+  all answered. Lockstep waits for each response before sending the next request; pipelined
+  writes all of them at once.
+- calls: on a warm server, time --calls independent execute_sql requests sent one at a time
+  vs written back to back.
+Modes are interleaved run by run so drift in the database or host affects them equally.
+
+Usage (from tests/, with the backend's docker-compose database already up):
+    cd postgres && docker-compose up -d && cd ..
+    python3 -m mcp_client.pipeline_bench --backend postgres --sessions 20 --rounds 200 --json pipeline.json
+"""
+
+import argparse
+import asyncio
+import json
+import sys
+import time
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any, Coroutine, Optional
+
+from .backends import backend_params
+from .base import McpClient
+from .client import make_client
+from .errors import McpError, TransportClosed
+from .params import ServerParams
+from .stats import summarize
+
+MODES = ("lockstep", "pipelined", "batch")
+TIMEOUT = 120.0
+
+
+@dataclass
+class ModeResult:
+    phase: str
+    mode: str
+    failures: int = 0
+    error: str = ""
+    samples: list[float] = field(default_factory=list)
+
+    def summary(self) -> dict[str, float]:
+        return summarize(self.samples)
+
+
+def execute(sql: str) -> tuple[str, dict]:
+    return "tools/call", {"name": "execute_sql", "arguments": {"sql": sql}}
+
+
+async def session(params: ServerParams, mode: str, sql: str) -> float:
+    """Seconds from server start until the first execute_sql result is back"""
+    client = make_client(params)
+    try:
+        started = time.perf_counter()
+        await client.start()
+        if mode == "lockstep":
+            await client.initialize()
+            await client.list_tools()
+            await client.call_tool("execute_sql", {"sql": sql})
+        else:
+            await client.request_many(
+                [client.initialize_call(), ("notifications/initialized", None), ("tools/list", None), execute(sql)],
+                batch=mode == "batch",
+            )
+        return time.perf_counter() - started
+    finally:
+        await client.close()
+
+
+async def calls(client: McpClient, mode: str, sql: str, count: int) -> float:
+    """Seconds for `count` independent execute_sql requests on a warm server"""
+    started = time.perf_counter()
+    if mode == "lockstep":
+        for _ in range(count):
+            await client.call_tool("execute_sql", {"sql": sql})
+    else:
+        await client.request_many([execute(sql)] * count, batch=mode == "batch")
+    return time.perf_counter() - started
+
+
+async def measure(result: ModeResult, run: Coroutine[Any, Any, float]) -> None:
+    if result.error:
+        run.close()
+        return
+    try:
+        result.samples.append(await asyncio.wait_for(run, TIMEOUT))
+    except McpError as e:
+        # Most likely a server that rejects batches; don't keep retrying it
+        result.failures += 1
+        result.error = str(e)
+    except (TransportClosed, OSError, asyncio.TimeoutError) as e:
+        result.failures += 1
+        result.error = str(e) or type(e).__name__
+
+
+async def run(params: ServerParams, modes: list[str], sessions: int, rounds: int, count: int, sql: str) -> list[ModeResult]:
+    session_results = {mode: ModeResult("session", mode) for mode in modes}
+    call_results = {mode: ModeResult("calls", mode) for mode in modes}
+
+    for i in range(sessions):
+        for mode in modes:
+            await measure(session_results[mode], session(params, mode, sql))
+        print(f"  session {i + 1}/{sessions}", end="\r", flush=True)
+
+    clients = {mode: make_client(params) for mode in modes}
+    try:
+        for client in clients.values():
+            await client.start()
+            await client.handshake()
+        # One untimed round per mode so the first timed one doesn't pay for connection setup
+        for mode in modes:
+            await measure(call_results[mode], calls(clients[mode], mode, sql, count))
+            call_results[mode].samples.clear()
+        for i in range(rounds):
+            for mode in modes:
+                await measure(call_results[mode], calls(clients[mode], mode, sql, count))
+            print(f"  round {i + 1}/{rounds}    ", end="\r", flush=True)
+    except (McpError, TransportClosed, OSError) as e:
+        for result in call_results.values():
+            result.error = result.error or str(e)
+    finally:
+        await asyncio.gather(*[c.close() for c in clients.values()])
+    print()
+    return list(session_results.values()) + list(call_results.values())
+
+
+def format_results(results: list[ModeResult]) -> list[str]:
+    lines = [f"{'phase':<9} {'mode':<10} {'p50 (ms)':>10} {'p95 (ms)':>10} {'mean (ms)':>10} {'vs lockstep':>12}"]
+    baseline = {r.phase: r.summary().get("p50_ms") for r in results if r.mode == "lockstep"}
+    for r in results:
+        s = r.summary()
+        if not r.samples:
+            lines.append(f"{r.phase:<9} {r.mode:<10} ✗ {r.error or 'no samples'}")
+            continue
+        base = baseline.get(r.phase)
+        speedup = f"{base / s['p50_ms']:.2f}x" if base and r.mode != "lockstep" else ""
+        lines.append(f"{r.phase:<9} {r.mode:<10} {s['p50_ms']:>10.2f} {s['p95_ms']:>10.2f} {s['mean_ms']:>10.2f} {speedup:>12}")
+    return lines
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--backend", default="postgres", help="Backend directory under tests/")
+    parser.add_argument("--url", help="Benchmark a shared HTTP-mode server instead of starting stdio ones")
+    parser.add_argument("--sessions", type=int, default=10, help="Server starts per mode")
+    parser.add_argument("--rounds", type=int, default=100, help="Warm rounds of --calls requests per mode")
+    parser.add_argument("--calls", type=int, default=8, help="Independent requests per warm round")
+    parser.add_argument("--sql", default="SELECT 1")
+    parser.add_argument("--no-batch", action="store_true", help="Skip the JSON-RPC batch mode")
+    parser.add_argument("--json", type=Path, help="Write every sample as JSON")
+    args = parser.parse_args(argv)
+
+    params = ServerParams(args.backend, [], url=args.url) if args.url else backend_params(args.backend)
+    modes = [m for m in MODES if not (args.no_batch and m == "batch")]
+    print(f"Benchmarking {args.backend}: {args.sessions} sessions, {args.rounds} rounds of {args.calls} calls")
+    results = asyncio.run(run(params, modes, args.sessions, args.rounds, args.calls, args.sql))
+    for line in format_results(results):
+        print(line)
+    if args.json:
+        report = {
+            "backend": args.backend,
+            "timestamp": time.time(),
+            "calls_per_round": args.calls,
+            "results": [{**asdict(r), "latency": r.summary()} for r in results],
+        }
+        args.json.write_text(json.dumps(report, indent=2))
+        print(f"✓ Wrote {args.json}")
+    return 0 if all(r.samples for r in results if r.mode != "batch") else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,268 @@
+"""
+Warm pool of initialized toolbox processes
+Keeps N stdio servers per launch configuration started and past `initialize`, so a caller
+only pays for its own requests instead of `docker run` plus the handshake. A `warmup` call
+runs on each new process before it is leased, so first-use costs (minting an OAuth token,
+opening the database connection) are paid there too.
+"""
+
+import asyncio
+import contextlib
+import time
+from dataclasses import dataclass, field
+from typing import AsyncIterator, Awaitable, Optional
+
+from .base import McpClient
+from .client import make_client
+from .errors import McpError, TransportClosed
+from .params import ServerParams
+
+
+@dataclass
+class PoolStats:
+    started: int = 0
+    recycled: int = 0
+    failed_health_checks: int = 0
+    leases: int = 0
+    lease_wait_seconds: float = 0.0
+    warm_start_seconds: list[float] = field(default_factory=list)
+    failed_warmups: int = 0
+
+
+# (tool, arguments) called once on every new process
+Warmup = tuple[str, Optional[dict]]
+
+
+class _Member:
+    def __init__(self, client: McpClient):
+        self.client = client
+        self.created = time.monotonic()
+        self.last_used = self.created
+
+    @property
+    def calls(self) -> int:
+        return self.client.requests_sent
+
+
+class ProcessPool:
+    """Fixed-size pool of warm clients for one ServerParams"""
+
+    def __init__(
+        self,
+        params: ServerParams,
+        size: int = 2,
+        *,
+        max_calls: int = 1000,
+        max_idle: float = 300.0,
+        health_interval: float = 30.0,
+        health_timeout: float = 5.0,
+        warmup: Optional[Warmup] = None,
+    ):
+        if size < 1:
+            raise ValueError("Pool size must be at least 1")
+        self.params = params
+        self.size = size
+        self.max_calls = max_calls
+        self.max_idle = max_idle
+        self.health_interval = health_interval
+        self.health_timeout = health_timeout
+        self.warmup = warmup
+        self.stats = PoolStats()
+        self._idle: asyncio.Queue = asyncio.Queue()
+        self._members: set[_Member] = set()
+        self._maintenance: Optional[asyncio.Task] = None
+        self._background: set[asyncio.Task] = set()  # recycles, refills and health checks
+        self._reserved = 0  # members being spawned (or replaced), counted toward `size`
+        self._waiters = 0  # lease() calls waiting for an idle member
+        self._closed = False
+
+    async def __aenter__(self) -> "ProcessPool":
+        await self.start()
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.close()
+
+    async def start(self) -> None:
+        await asyncio.gather(*[self._add_member() for _ in range(self.size)])
+        self._maintenance = asyncio.create_task(self._maintain())
+
+    async def close(self) -> None:
+        self._closed = True
+        background = list(self._background)
+        if self._maintenance is not None:
+            background.append(self._maintenance)
+        for task in background:
+            task.cancel()
+        await asyncio.gather(*background, return_exceptions=True)
+        while not self._idle.empty():
+            self._idle.get_nowait()
+        # Callers waiting for a member get None, and raise
+        for _ in range(self._waiters):
+            self._idle.put_nowait(None)
+        await asyncio.gather(*[m.client.close() for m in list(self._members)], return_exceptions=True)
+        self._members.clear()
+
+    @contextlib.asynccontextmanager
+    async def lease(self) -> AsyncIterator[McpClient]:
+        """Borrow an initialized client exclusively for the duration of the block"""
+        if self._closed:
+            raise RuntimeError("Pool is closed")
+        waited = time.monotonic()
+        self._waiters += 1
+        try:
+            member = await self._idle.get()
+        finally:
+            self._waiters -= 1
+        if member is None:
+            raise RuntimeError("Pool is closed")
+        if not self._usable(member):
+            member = await self._replace(member)
+        self.stats.leases += 1
+        self.stats.lease_wait_seconds += time.monotonic() - waited
+        try:
+            yield member.client
+        finally:
+            member.last_used = time.monotonic()
+            if self._closed:
+                await member.client.close()
+            elif self._usable(member):
+                self._idle.put_nowait(member)
+            else:
+                self._in_background(self._recycle(member))
+
+    # -- Member lifecycle -------------------------------------------------
+
+    def _usable(self, member: _Member) -> bool:
+        return member.client.running and member.calls < self.max_calls
+
+    async def _spawn(self) -> _Member:
+        started = time.monotonic()
+        client = make_client(self.params)
+        await client.start()
+        try:
+            await client.initialize()
+            if self.warmup is not None:
+                await self._warm(client)
+        except BaseException:
+            await client.close()
+            raise
+        self.stats.started += 1
+        self.stats.warm_start_seconds.append(time.monotonic() - started)
+        member = _Member(client)
+        self._members.add(member)
+        return member
+
+    async def _warm(self, client: McpClient) -> None:
+        tool, arguments = self.warmup
+        try:
+            result = await client.call_tool(tool, arguments)
+        except McpError:
+            # The process still answers; the caller's own request will report the problem
+            result = {"isError": True}
+        if result.get("isError"):
+            self.stats.failed_warmups += 1
+
+    async def _add_member(self) -> None:
+        self._reserved += 1
+        try:
+            self._idle.put_nowait(await self._spawn())
+        finally:
+            self._reserved -= 1
+
+    async def _replace(self, member: _Member) -> _Member:
+        # The slot stays reserved from the moment the old member leaves, so a maintenance pass
+        # in between doesn't spawn a member of its own for it
+        self._members.discard(member)
+        self.stats.recycled += 1
+        self._reserved += 1
+        try:
+            await member.client.close()
+            return await self._spawn()
+        finally:
+            self._reserved -= 1
+
+    async def _recycle(self, member: _Member) -> None:
+        try:
+            self._idle.put_nowait(await self._replace(member))
+        except (OSError, McpError):
+            # Keep capacity: retry on the next maintenance pass
+            pass
+
+    async def _refill(self) -> None:
+        try:
+            await self._add_member()
+        except (OSError, McpError):
+            pass
+
+    def _in_background(self, work: Awaitable[None]) -> None:
+        task = asyncio.ensure_future(work)
+        self._background.add(task)
+        task.add_done_callback(self._background.discard)
+
+    async def _maintain(self) -> None:
+        while not self._closed:
+            await asyncio.sleep(self.health_interval)
+            # Only idle members are checked; leased ones are proven healthy by their callers.
+            # One member at a time is out of the queue, so leases take the others meanwhile.
+            for _ in range(self._idle.qsize()):
+                if self._idle.empty():
+                    break
+                await self._check(self._idle.get_nowait())
+            missing = self.size - len(self._members) - self._reserved
+            for _ in range(missing):
+                self._in_background(self._refill())
+
+    async def _check(self, member: _Member) -> None:
+        if time.monotonic() - member.last_used > self.max_idle or not self._usable(member):
+            self._in_background(self._recycle(member))
+        elif await self._healthy(member):
+            self._idle.put_nowait(member)
+        else:
+            self.stats.failed_health_checks += 1
+            self._in_background(self._recycle(member))
+
+    async def _healthy(self, member: _Member) -> bool:
+        try:
+            await asyncio.wait_for(member.client.ping(), self.health_timeout)
+        except McpError:
+            # Answered, just without ping support: still alive
+            return True
+        except (asyncio.TimeoutError, TransportClosed):
+            return False
+        return True
+
+
+class PoolManager:
+    """One ProcessPool per distinct launch configuration, created on first use"""
+
+    def __init__(self, size: int = 2, **pool_options):
+        self.size = size
+        self.pool_options = pool_options
+        self._pools: dict[str, ProcessPool] = {}
+        self._lock = asyncio.Lock()
+
+    async def pool(self, params: ServerParams) -> ProcessPool:
+        key = params.key()
+        async with self._lock:
+            if key not in self._pools:
+                pool = ProcessPool(params, self.size, **self.pool_options)
+                await pool.start()
+                self._pools[key] = pool
+            return self._pools[key]
+
+    @contextlib.asynccontextmanager
+    async def lease(self, params: ServerParams) -> AsyncIterator[McpClient]:
+        pool = await self.pool(params)
+        async with pool.lease() as client:
+            yield client
+
+    async def close(self) -> None:
+        await asyncio.gather(*[pool.close() for pool in self._pools.values()])
+        self._pools.clear()
+
+    async def __aenter__(self) -> "PoolManager":
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.close()
@@ -0,0 +1,413 @@
+#!/usr/bin/env python3
+"""
+Stdio MCP proxy with pluggable interceptors
+Sits between an MCP client (an agent) and a toolbox server. Messages pass through
+untouched unless an interceptor answers a request itself or rewrites a response; the
+server's stderr is inherited. Interceptor stats go to stderr on exit and, with
+--stats-file, to a JSON file. --record tees the raw traffic between the client and the
+proxy into a recording that replay.py can re-issue.
+
+Usage (from tests/, as the command of an MCP server entry):
+    python3 -m mcp_client.proxy --backend redshift --result-cache
+    python3 -m mcp_client.proxy --backend bigquery --row-budget --max-rows 2000
+    python3 -m mcp_client.proxy --result-cache --cache-ttl 120 -- docker run --rm -i ... --stdio
+    python3 -m mcp_client.proxy --backend postgres --export-dir /tmp/exports
+    python3 -m mcp_client.proxy --backend redshift --capture /tmp/redshift-calls.jsonl
+    python3 -m mcp_client.proxy --backend postgres --record /tmp/postgres.mcprec
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import signal
+import sys
+import time
+from pathlib import Path
+from typing import Any, Optional, Sequence, Union
+
+from .backends import backend_params
+from .capture import CaptureInterceptor
+from .client import MAX_MESSAGE_BYTES
+from .codec import Codec, get_codec
+from .errors import ConfigError
+from .export import BATCH_ROWS, FORMATS, ExportInterceptor
+from .intercept import Interceptor
+from .params import ServerParams
+from .recording import Recorder
+from .result_cache import ResultCacheInterceptor, ttl_for
+from .row_budget import RowBudgetInterceptor
+from .streaming import IncrementalResponseParser
+
+STATS_INTERVAL = 60.0
+
+
+def log(message: str) -> None:
+    print(f"[{time.strftime('%Y-%m-%d %H:%M:%S')}] [MCP-PROXY] {message}", file=sys.stderr, flush=True)
+
+
+class StdioProxy:
+    def __init__(
+        self,
+        params: ServerParams,
+        interceptors: Sequence[Interceptor] = (),
+        *,
+        max_message_bytes: int = MAX_MESSAGE_BYTES,
+        stats_file: Optional[Path] = None,
+        stats_interval: float = STATS_INTERVAL,
+        codec: Union[Codec, str, None] = None,
+        recorder: Optional[Recorder] = None,
+    ):
+        self.params = params
+        self.recorder = recorder
+        self.codec = get_codec(codec)
+        self.interceptors = list(interceptors)
+        self.max_message_bytes = max_message_bytes
+        self.stats_file = stats_file
+        self.stats_interval = stats_interval
+        self._process: Optional[asyncio.subprocess.Process] = None
+        self._out: Optional[asyncio.StreamWriter] = None
+        self._out_lock = asyncio.Lock()
+        self._methods = {method for i in self.interceptors for method in i.methods}
+        self._requests: dict[Any, dict] = {}  # forwarded requests the interceptors watch, by id
+        self._deferred: dict[asyncio.Future, Any] = {}  # request ids of answers interceptors are still working on
+
+    def report(self) -> dict:
+        report = {i.name: i.report() for i in self.interceptors}
+        if self.recorder is not None:
+            report["record"] = self.recorder.report()
+        return report
+
+    async def run(self) -> int:
+        loop = asyncio.get_running_loop()
+        stdin = asyncio.StreamReader(limit=self.max_message_bytes)
+        await loop.connect_read_pipe(lambda: asyncio.StreamReaderProtocol(stdin), sys.stdin)
+        transport, protocol = await loop.connect_write_pipe(asyncio.streams.FlowControlMixin, sys.stdout)
+        self._out = asyncio.StreamWriter(transport, protocol, None, loop)
+
+        self._process = await asyncio.create_subprocess_exec(
+            *self.params.command,
+            stdin=asyncio.subprocess.PIPE,
+            stdout=asyncio.subprocess.PIPE,
+            env=self.params.full_env(),
+            limit=self.max_message_bytes,
+        )
+        if self.recorder is not None:
+            self.recorder.start(self.params.name, self.params.command)
+        # Pass termination on to the server; stats are still written once its output ends
+        for sig in (signal.SIGTERM, signal.SIGINT):
+            loop.add_signal_handler(sig, self._terminate)
+        upstream = asyncio.create_task(self._upstream(stdin))
+        downstream = asyncio.create_task(self._downstream())
+        reporter = asyncio.create_task(self._report_periodically())
+        try:
+            await downstream
+        finally:
+            upstream.cancel()
+            reporter.cancel()
+            for task in list(self._deferred):
+                task.cancel()
+            self._write_report()
+            for interceptor in self.interceptors:
+                await interceptor.close()
+            if self.recorder is not None:
+                self.recorder.close()
+        return await self._process.wait()
+
+    def _terminate(self) -> None:
+        if self._process is not None and self._process.returncode is None:
+            self._process.terminate()
+
+    async def _write(self, data: bytes) -> None:
+        assert self._out is not None
+        async with self._out_lock:
+            self._out.write(data)
+            if self.recorder is not None:
+                self.recorder.received(data)
+            await self._out.drain()
+
+    async def _upstream(self, stdin: asyncio.StreamReader) -> None:
+        """Client → server; a request answered by an interceptor never reaches the server"""
+        assert self._process is not None and self._process.stdin is not None
+        server = self._process.stdin
+        try:
+            while True:
+                try:
+                    line = await stdin.readuntil(b"\n")
+                except asyncio.IncompleteReadError as e:
+                    line = e.partial
+                    if not line:
+                        break
+                except asyncio.LimitOverrunError as e:
+                    await self._reject_oversized(stdin, await stdin.read(e.consumed))
+                    continue
+                if self.recorder is not None:
+                    # What the client sent, before any interceptor answers or rewrites it
+                    self.recorder.sent(line)
+                forward = await self._handle_request(line)
+                if forward is not None:
+                    server.write(forward)
+                    await server.drain()
+        except (BrokenPipeError, ConnectionResetError):
+            return
+        # Client went away: let the server finish and exit on EOF
+        server.close()
+
+    async def _reject_oversized(self, stdin: asyncio.StreamReader, chunk: bytes) -> None:
+        """Skip a client line longer than max_message_bytes and answer it with an error"""
+        parser = IncrementalResponseParser()
+        try:
+            parser.feed(chunk)
+        except ValueError:
+            pass
+        while not chunk.endswith(b"\n"):
+            try:
+                chunk = await stdin.readuntil(b"\n")
+            except asyncio.LimitOverrunError as e:
+                chunk = await stdin.read(e.consumed)
+            except asyncio.IncompleteReadError:
+                break
+        message = f"Message exceeds {self.max_message_bytes} bytes"
+        log(f"ERROR: {message}, dropped")
+        # The id is only known when it came before the oversized member
+        code = -32600 if "id" in parser.envelope else -32700
+        error = {"code": code, "message": message}
+        response = {"jsonrpc": "2.0", "id": parser.envelope.get("id"), "error": error}
+        await self._write(self.codec.dumps(response) + b"\n")
+
+    async def _handle_request(self, line: bytes) -> Optional[bytes]:
+        """The line to forward to the server, or None when an interceptor answered it"""
+        if not self.interceptors:
+            return line
+        try:
+            message = original = self.codec.loads(line)
+        except ValueError:
+            return line
+        # Batches and notifications pass straight through
+        if not isinstance(message, dict) or "id" not in message or message.get("method") not in self._methods:
+            return line
+        for interceptor in self.interceptors:
+            if message["method"] not in interceptor.methods:
+                continue
+            message = interceptor.rewrite_request(message)
+            response = await interceptor.on_request(message)
+            if asyncio.isfuture(response):
+                self._deferred[response] = message["id"]
+                response.add_done_callback(self._reply_later)
+                return None
+            if response is not None:
+                await self._write(self.codec.dumps(response) + b"\n")
+                return None
+        self._requests[message["id"]] = message
+        return line if message is original else self.codec.dumps(message) + b"\n"
+
+    def _reply_later(self, task: "asyncio.Future[dict]") -> None:
+        request_id = self._deferred.pop(task)
+        if task.cancelled():
+            return
+        error = task.exception()
+        if error is None:
+            response = task.result()
+        else:
+            log(f"ERROR: interceptor failed: {error!r}")
+            response = {"jsonrpc": "2.0", "id": request_id, "error": {"code": -32603, "message": str(error)}}
+        asyncio.ensure_future(self._write(self.codec.dumps(response) + b"\n"))
+
+    async def _downstream(self) -> None:
+        """Server → client; responses to watched requests are offered to the interceptors"""
+        assert self._process is not None and self._process.stdout is not None
+        stdout = self._process.stdout
+        while True:
+            try:
+                line = await stdout.readuntil(b"\n")
+            except asyncio.IncompleteReadError as e:
+                if e.partial:
+                    await self._write(e.partial)
+                return
+            except asyncio.LimitOverrunError as e:
+                await self._forward_oversized(stdout, await stdout.read(e.consumed))
+                continue
+            await self._write(self._handle_response(line))
+
+    def _handle_response(self, line: bytes) -> bytes:
+        if not self._requests:
+            return line
+        try:
+            message = self.codec.loads(line)
+        except ValueError:
+            return line
+        request = self._requests.pop(message.get("id"), None) if isinstance(message, dict) else None
+        if request is None:
+            return line
+        response = message
+        for interceptor in self.interceptors:
+            if request["method"] in interceptor.methods:
+                response = interceptor.on_response(request, response, len(line))
+        return line if response is message else self.codec.dumps(response) + b"\n"
+
+    async def _forward_oversized(self, stdout: asyncio.StreamReader, chunk: bytes) -> None:
+        """Pass a line too large to decode through in chunks, only peeking at its id"""
+        parser = IncrementalResponseParser()
+        try:
+            items = parser.feed(chunk)
+        except ValueError:
+            items = None
+        request = self._requests.pop(parser.envelope.get("id"), None)
+        limits = [
+            limit for limit in (i.max_items(request) for i in self.interceptors if request["method"] in i.methods)
+            if limit is not None
+        ] if request is not None else []
+        if items is not None and limits:
+            await self._truncate_oversized(stdout, chunk, parser, items, request, min(limits))
+            return
+        if request is not None:
+            for interceptor in self.interceptors:
+                if request["method"] in interceptor.methods:
+                    interceptor.on_unparsed_response(request)
+        await self._write(chunk)
+        while not chunk.endswith(b"\n"):
+            try:
+                chunk = await stdout.readuntil(b"\n")
+            except asyncio.LimitOverrunError as e:
+                chunk = await stdout.read(e.consumed)
+            except asyncio.IncompleteReadError as e:
+                await self._write(e.partial)
+                return
+            await self._write(chunk)
+
+    async def _truncate_oversized(
+        self,
+        stdout: asyncio.StreamReader,
+        chunk: bytes,
+        parser: IncrementalResponseParser,
+        items: list,
+        request: dict,
+        limit: int,
+    ) -> None:
+        """Decode the first `limit` content items of a line too large to decode, drop the rest"""
+        size = len(chunk)
+        parsing = True
+        while not chunk.endswith(b"\n"):
+            try:
+                chunk = await stdout.readuntil(b"\n")
+            except asyncio.LimitOverrunError as e:
+                chunk = await stdout.read(e.consumed)
+            except asyncio.IncompleteReadError as e:
+                chunk = e.partial + b"\n"  # server exited mid-line; answer with what arrived
+            size += len(chunk)
+            if parsing and len(items) < limit:
+                try:
+                    items += parser.feed(chunk)
+                except ValueError:
+                    parsing = False
+        if "error" in parser.envelope:
+            response = parser.envelope
+        else:
+            response = {**parser.envelope, "result": {**parser.result, "content": items[:limit]}}
+        for interceptor in self.interceptors:
+            if request["method"] in interceptor.methods:
+                response = interceptor.on_response(request, response, size)
+        await self._write(self.codec.dumps(response) + b"\n")
+
+    async def _report_periodically(self) -> None:
+        while self.stats_file is not None:
+            await asyncio.sleep(self.stats_interval)
+            self._write_report()
+
+    def _write_report(self) -> None:
+        report = self.report()
+        for name, stats in report.items():
+            log(f"{name}: " + ", ".join(f"{k}={v:.3f}" if isinstance(v, float) else f"{k}={v}" for k, v in stats.items()))
+        if self.stats_file is not None:
+            self.stats_file.write_text(json.dumps({"timestamp": time.time(), **report}, indent=2))
+
+
+def parse_args(argv: Optional[list[str]] = None) -> tuple[argparse.Namespace, list[str]]:
+    argv = list(sys.argv[1:] if argv is None else argv)
+    command: list[str] = []
+    if "--" in argv:
+        split = argv.index("--")
+        argv, command = argv[:split], argv[split + 1:]
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--backend", help="Launch tests/<backend>'s server_params(), or name the server given after --")
+    parser.add_argument("--stats-file", type=Path, help="Write interceptor stats as JSON (on exit and periodically)")
+    parser.add_argument("--stats-interval", type=float, default=STATS_INTERVAL)
+    parser.add_argument("--codec", help="JSON codec: json, orjson, msgspec or auto (default: $MCP_CLIENT_CODEC or json)")
+    cache = parser.add_argument_group("result cache")
+    cache.add_argument("--result-cache", action="store_true", help="Cache read-only execute_sql results")
+    cache.add_argument("--cache-ttl", type=float, help="Seconds to keep results (default: per backend)")
+    cache.add_argument("--cache-max-bytes", type=int, default=64 * 1024 * 1024)
+    cache.add_argument("--cache-max-entries", type=int, default=10000)
+    budget = parser.add_argument_group("row budget")
+    budget.add_argument("--row-budget", action="store_true", help="Limit and truncate execute_sql results")
+    budget.add_argument("--max-rows", type=int, help="Rows per result (default: per backend)")
+    budget.add_argument("--max-bytes", type=int, help="Bytes of rows per result (default: per backend)")
+    budget.add_argument("--no-rewrite", action="store_true", help="Only truncate; don't add LIMIT to queries")
+    export = parser.add_argument_group("export")
+    export.add_argument("--export-dir", type=Path, help="Offer an export_sql tool that writes rows to files here")
+    export.add_argument("--export-format", choices=list(FORMATS), default="parquet")
+    export.add_argument("--export-batch-rows", type=int, default=BATCH_ROWS, help="Rows per record batch / row group")
+    export.add_argument("--export-max-rows", type=int, help="Default row cap for export_sql")
+    capture = parser.add_argument_group("capture")
+    capture.add_argument("--capture", type=Path, help="Append every tools/call to this JSON-lines file (see workload.py)")
+    capture.add_argument("--record", type=Path, help="Append the raw traffic to this recording (see replay.py)")
+    args = parser.parse_args(argv)
+    if not command and not args.backend:
+        parser.error("give --backend or a server command after --")
+    return args, command
+
+
+def build_interceptors(args: argparse.Namespace, params: ServerParams) -> list[Interceptor]:
+    interceptors: list[Interceptor] = []
+    if args.capture:
+        # First, so it logs what the client sent before anything answers or rewrites it
+        interceptors.append(CaptureInterceptor(args.capture))
+    if args.export_dir:
+        interceptors.append(
+            ExportInterceptor(
+                params,
+                args.export_dir,
+                format=args.export_format,
+                batch_rows=args.export_batch_rows,
+                max_rows=args.export_max_rows,
+            )
+        )
+    if args.row_budget or args.max_rows or args.max_bytes:
+        # Ahead of the cache, so cached results are the truncated ones
+        budget = {"max_rows": args.max_rows, "max_bytes": args.max_bytes}
+        interceptors.append(
+            RowBudgetInterceptor.for_backend(
+                params.name, rewrite=not args.no_rewrite, **{k: v for k, v in budget.items() if v is not None}
+            )
+        )
+    if args.result_cache:
+        ttl = args.cache_ttl if args.cache_ttl is not None else ttl_for(params.name)
+        interceptors.append(ResultCacheInterceptor(ttl, max_bytes=args.cache_max_bytes, max_entries=args.cache_max_entries))
+    return interceptors
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    args, command = parse_args(argv)
+    try:
+        if command:
+            params = ServerParams(name=args.backend or os.path.basename(command[0]), command=command)
+        else:
+            params = backend_params(args.backend)
+        codec = get_codec(args.codec)
+    except (ConfigError, FileNotFoundError) as e:
+        log(f"ERROR: {e}")
+        return 1
+    proxy = StdioProxy(
+        params,
+        build_interceptors(args, params),
+        stats_file=args.stats_file,
+        stats_interval=args.stats_interval,
+        codec=codec,
+        recorder=Recorder(args.record) if args.record else None,
+    )
+    return asyncio.run(proxy.run())
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,192 @@
+#!/usr/bin/env python3
+"""
+Readiness probing for the test harnesses
+Waits for the backend's docker-compose services to report healthy, then for a toolbox
+server to complete the MCP `initialize` handshake, backing off exponentially up to a
+deadline. Replaces the fixed sleeps in tests/<db>/test.sh and reports time-to-ready.
+
+Usage (from tests/):
+    python3 -m mcp_client.readiness postgres mysql --timeout 180 --json ready.json
+    python3 -m mcp_client.readiness spanner --url http://127.0.0.1:5000/mcp
+"""
+
+import argparse
+import asyncio
+import json
+import shutil
+import sys
+import time
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Iterator, Optional, Sequence
+
+from .backends import TESTS_DIR, backend_params
+from .client import make_client
+from .errors import McpError, TransportClosed
+from .params import ServerParams
+
+DEFAULT_TIMEOUT = 180.0
+HANDSHAKE_TIMEOUT = 30.0
+# Compose label marking a setup service that runs once and exits, e.g. spanner-init
+ONE_SHOT_LABEL = "mcp-client.one-shot"
+
+
+class NotReady(TimeoutError):
+    """The deadline passed before the backend became ready"""
+
+
+@dataclass
+class ReadinessReport:
+    backend: str
+    compose_ready_s: Optional[float] = None
+    handshake_ready_s: Optional[float] = None
+    total_s: float = 0.0
+    handshake_attempts: int = 0
+    ready: bool = False
+    error: str = ""
+
+
+def backoff_delays(initial: float = 0.5, factor: float = 2.0, maximum: float = 10.0) -> Iterator[float]:
+    delay = initial
+    while True:
+        yield delay
+        delay = min(delay * factor, maximum)
+
+
+def compose_command() -> list[str]:
+    """The scripts use docker-compose v1; fall back to the v2 plugin when it's missing"""
+    return ["docker-compose"] if shutil.which("docker-compose") else ["docker", "compose"]
+
+
+async def _output(*cmd: str, cwd: Optional[Path] = None) -> str:
+    process = await asyncio.create_subprocess_exec(
+        *cmd, stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.DEVNULL, cwd=cwd
+    )
+    stdout, _ = await process.communicate()
+    return stdout.decode().strip() if process.returncode == 0 else ""
+
+
+async def compose_status(compose_dir: Path, project: Optional[str] = None) -> list[str]:
+    """Health status of each service container, or its state when it has no healthcheck
+
+    Containers that exited with status 0 report "completed". A one-shot setup service (labelled
+    ONE_SHOT_LABEL) still running reports "setting-up", since it isn't done until it exits.
+    """
+    cmd = compose_command()
+    if project:
+        cmd += ["-p", project]
+    # -a: one-shot services that already exited are listed too
+    ids = (await _output(*cmd, "ps", "-a", "-q", cwd=compose_dir)).split()
+    if not ids:
+        return []
+    template = (
+        "{{if .State.Health}}{{.State.Health.Status}}"
+        '{{else if and (eq .State.Status "exited") (eq .State.ExitCode 0)}}completed'
+        f'{{{{else if eq (index .Config.Labels "{ONE_SHOT_LABEL}") "true"}}}}setting-up'
+        "{{else}}{{.State.Status}}{{end}}"
+    )
+    return (await _output("docker", "inspect", "-f", template, *ids)).split()
+
+
+async def wait_for_compose(compose_dir: Path, deadline: float, project: Optional[str] = None) -> float:
+    """Block until every service is healthy (or running, without a healthcheck, or completed)
+
+    One-shot services must complete; one that exits with a non-zero status raises NotReady.
+    """
+    started = time.monotonic()
+    delays = backoff_delays()
+    while True:
+        statuses = await compose_status(compose_dir, project)
+        if statuses and all(s in ("healthy", "running", "completed") for s in statuses):
+            return time.monotonic() - started
+        # "unhealthy" can still recover while the database initializes, so only stop on exit
+        if any(s in ("exited", "dead") for s in statuses):
+            raise NotReady(f"compose services in {compose_dir} failed: {', '.join(statuses)}")
+        if time.monotonic() >= deadline:
+            raise NotReady(f"compose services in {compose_dir} not healthy: {', '.join(statuses) or 'none running'}")
+        await asyncio.sleep(min(next(delays), max(0.0, deadline - time.monotonic())))
+
+
+async def wait_for_handshake(params: ServerParams, deadline: float) -> tuple[float, int]:
+    """Connect (or start the server) until initialize + tools/list succeed; returns (seconds, attempts)"""
+    started = time.monotonic()
+    delays = backoff_delays()
+    attempts = 0
+    last_error = ""
+    while True:
+        attempts += 1
+        client = make_client(params)
+        try:
+            await client.start()
+            remaining = max(1.0, deadline - time.monotonic())
+            await asyncio.wait_for(client.initialize(), min(HANDSHAKE_TIMEOUT, remaining))
+            await asyncio.wait_for(client.list_tools(), min(HANDSHAKE_TIMEOUT, remaining))
+            return time.monotonic() - started, attempts
+        except (McpError, TransportClosed, OSError, asyncio.TimeoutError) as e:
+            last_error = str(e) or type(e).__name__
+        finally:
+            await client.close()
+        if time.monotonic() >= deadline:
+            raise NotReady(f"MCP handshake failed after {attempts} attempts: {last_error}")
+        await asyncio.sleep(min(next(delays), max(0.0, deadline - time.monotonic())))
+
+
+async def wait_until_ready(
+    backend: str,
+    params: Optional[ServerParams] = None,
+    compose_dir: Optional[Path] = None,
+    project: Optional[str] = None,
+    timeout: float = DEFAULT_TIMEOUT,
+) -> ReadinessReport:
+    report = ReadinessReport(backend)
+    started = time.monotonic()
+    deadline = started + timeout
+    compose_dir = compose_dir or TESTS_DIR / backend
+    try:
+        if (compose_dir / "docker-compose.yml").exists():
+            report.compose_ready_s = await wait_for_compose(compose_dir, deadline, project)
+        params = params or backend_params(backend)
+        report.handshake_ready_s, report.handshake_attempts = await wait_for_handshake(params, deadline)
+        report.ready = True
+    except (NotReady, ValueError, OSError) as e:
+        report.error = str(e)
+    report.total_s = time.monotonic() - started
+    return report
+
+
+def format_report(report: ReadinessReport) -> str:
+    if not report.ready:
+        return f"✗ {report.backend} not ready after {report.total_s:.1f}s: {report.error}"
+    compose = f"compose {report.compose_ready_s:.1f}s, " if report.compose_ready_s is not None else ""
+    return (
+        f"✓ {report.backend} ready in {report.total_s:.1f}s "
+        f"({compose}handshake {report.handshake_ready_s:.1f}s, {report.handshake_attempts} attempt(s))"
+    )
+
+
+async def run(backends: Sequence[str], timeout: float, url: Optional[str] = None) -> list[ReadinessReport]:
+    def params(backend: str) -> Optional[ServerParams]:
+        # A shared HTTP server is probed where it runs instead of starting a stdio one
+        return ServerParams(backend, [], url=url) if url else None
+
+    return list(await asyncio.gather(*[wait_until_ready(b, params(b), timeout=timeout) for b in backends]))
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("backends", nargs="+", help="Backend directories under tests/")
+    parser.add_argument("--timeout", type=float, default=DEFAULT_TIMEOUT, help="Overall deadline in seconds")
+    parser.add_argument("--json", type=Path, help="Write time-to-ready per backend as JSON")
+    parser.add_argument("--url", help="Probe a toolbox server already running in HTTP mode at this MCP url")
+    args = parser.parse_args(argv)
+
+    reports = asyncio.run(run(args.backends, args.timeout, args.url))
+    for report in reports:
+        print(format_report(report))
+    if args.json:
+        args.json.write_text(json.dumps([asdict(r) for r in reports], indent=2))
+    return 0 if all(r.ready for r in reports) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
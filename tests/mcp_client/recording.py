@@ -0,0 +1,183 @@
+"""
+Record the raw JSON-RPC stream of a stdio MCP session
+A Recorder tees both directions of the pipe into an append-only file of frames:
+- a file starts with MAGIC;
+- each frame is a 13-byte header (kind, seconds, payload length) and its payload;
+- a SESSION frame opens each server process (JSON: name, command, wall-clock start);
+- SENT / RECEIVED frames hold the bytes written to / read from the server at that offset
+  from the session start.
+Data frames are compressed with one deflate stream per session, flushed at each frame
+boundary, so lines compress against everything before them in the session. Each frame is
+flushed to the file as it is written, so a recording is readable while it grows, and one cut
+off mid-frame (a killed process) reads back up to its last whole frame.
+
+StdioClient records when given `recorder=`, or when MCP_CLIENT_RECORD_DIR is set (one file
+per client). proxy.py records with --record. replay.py re-issues a recording.
+"""
+
+import itertools
+import json
+import os
+import struct
+import time
+import zlib
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import IO, Any, Iterator, Optional, Sequence, Union
+
+RECORD_DIR_ENV = "MCP_CLIENT_RECORD_DIR"
+SUFFIX = ".mcprec"
+MAGIC = b"MCPREC1\n"
+HEADER = struct.Struct(">BdI")
+SESSION, SENT, RECEIVED = 0, 1, 2
+DIRECTIONS = {SENT: "sent", RECEIVED: "received"}
+
+
+class Recorder:
+    """Appends sessions to one recording file; not safe to share a file between recorders"""
+
+    def __init__(self, path: Union[str, Path], *, level: int = 6):
+        self.path = Path(path)
+        self.level = level
+        self.sessions = 0
+        self.frames = 0
+        self.bytes_in = 0  # stream bytes recorded
+        self.bytes_out = 0  # file bytes written
+        self._file: Optional[IO[bytes]] = None
+        self._compressor: Any = None
+        self._started = 0.0
+
+    def start(self, name: str, command: Sequence[str] = ()) -> None:
+        """Begin a session, e.g. for a newly started server process"""
+        if self._file is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._file = self.path.open("ab")
+            if self._file.tell() == 0:
+                self._file.write(MAGIC)
+                self.bytes_out += len(MAGIC)
+        self._started = time.perf_counter()
+        self._compressor = zlib.compressobj(self.level, zlib.DEFLATED, -zlib.MAX_WBITS)
+        info = json.dumps({"name": name, "command": list(command), "started": time.time()}).encode()
+        self._frame(SESSION, time.time(), info)
+        self._file.flush()
+        self.sessions += 1
+
+    def sent(self, data: bytes) -> None:
+        self._data(SENT, data)
+
+    def received(self, data: bytes) -> None:
+        self._data(RECEIVED, data)
+
+    def _data(self, kind: int, data: bytes) -> None:
+        if self._compressor is None or not data:
+            return
+        payload = self._compressor.compress(data) + self._compressor.flush(zlib.Z_SYNC_FLUSH)
+        self._frame(kind, time.perf_counter() - self._started, payload)
+        assert self._file is not None
+        self._file.flush()
+        self.bytes_in += len(data)
+
+    def _frame(self, kind: int, t: float, payload: bytes) -> None:
+        assert self._file is not None
+        self._file.write(HEADER.pack(kind, t, len(payload)) + payload)
+        self.frames += 1
+        self.bytes_out += HEADER.size + len(payload)
+
+    def report(self) -> dict:
+        return {
+            "path": str(self.path),
+            "sessions": self.sessions,
+            "frames": self.frames,
+            "bytes": self.bytes_in,
+            "written": self.bytes_out,
+        }
+
+    def close(self) -> None:
+        self._compressor = None
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+_sequence = itertools.count(1)
+
+
+def default_recorder(name: str) -> Optional[Recorder]:
+    """A Recorder writing a new file in MCP_CLIENT_RECORD_DIR; None when that isn't set"""
+    directory = os.environ.get(RECORD_DIR_ENV)
+    if not directory:
+        return None
+    stamp = time.strftime("%Y%m%d-%H%M%S")
+    return Recorder(Path(directory) / f"{name}-{stamp}-{os.getpid()}-{next(_sequence)}{SUFFIX}")
+
+
+# -- Reading ----------------------------------------------------------------
+
+
+@dataclass
+class Frame:
+    t: float  # seconds since the session started
+    direction: str  # sent | received
+    data: bytes
+
+
+@dataclass
+class Message:
+    t: float  # when its line was complete
+    direction: str
+    message: Any  # a JSON-RPC object, or a batch list
+    size: int
+
+
+@dataclass
+class Session:
+    name: str
+    command: list[str]
+    started: float  # wall clock
+    frames: list[Frame] = field(default_factory=list)
+
+    @property
+    def duration(self) -> float:
+        return self.frames[-1].t if self.frames else 0.0
+
+    def messages(self) -> Iterator[Message]:
+        """The JSON-RPC lines of both directions, in the order they completed"""
+        partial = {"sent": b"", "received": b""}
+        for frame in self.frames:
+            lines = (partial[frame.direction] + frame.data).split(b"\n")
+            partial[frame.direction] = lines.pop()
+            for line in lines:
+                if not line.strip():
+                    continue
+                try:
+                    message = json.loads(line)
+                except ValueError:
+                    continue  # servers sometimes log to stdout
+                yield Message(frame.t, frame.direction, message, len(line) + 1)
+
+
+def read_recording(path: Union[str, Path]) -> Iterator[Session]:
+    """The sessions of a recording file, in the order they were recorded"""
+    with Path(path).open("rb") as f:
+        if f.read(len(MAGIC)) != MAGIC:
+            raise ValueError(f"{path} is not an MCP recording")
+        session: Optional[Session] = None
+        decompressor: Any = None
+        while True:
+            header = f.read(HEADER.size)
+            if len(header) < HEADER.size:
+                break
+            kind, t, length = HEADER.unpack(header)
+            payload = f.read(length)
+            if len(payload) < length:
+                break
+            if kind == SESSION:
+                if session is not None:
+                    yield session
+                info = json.loads(payload)
+                session = Session(info.get("name", ""), info.get("command", []), info.get("started", t))
+                decompressor = zlib.decompressobj(-zlib.MAX_WBITS)
+            elif session is not None and kind in DIRECTIONS:
+                session.frames.append(Frame(t, DIRECTIONS[kind], decompressor.decompress(payload)))
+        if session is not None:
+            yield session
@@ -0,0 +1,333 @@
+#!/usr/bin/env python3
+"""
+Re-issue a recorded MCP session against a server
+Reads a recording (StdioClient with MCP_CLIENT_RECORD_DIR, or proxy --record) and sends the
+client side of each session again: requests, notifications and batches, at their recorded
+offsets. Responses the client sent to server requests are left out, and so are the recorded
+ids; the replaying client numbers its own.
+- --speed 1 (default) keeps the original timing; --speed 4 runs it four times as fast;
+- --fast sends each request as soon as the previous one was sent, up to --concurrency
+  in flight.
+initialize is always awaited before anything else is sent. Requests never wait for each
+other otherwise, so overlapping calls overlap again. A recorded notifications/cancelled isn't
+re-sent, since its requestId is a recorded id: it cancels the replayed request instead, and the
+client tells the server with that request's own id. The report compares recorded and
+replayed latency per method (per tool for tools/call).
+
+Usage (from tests/, with the backend's docker-compose database already up):
+    python3 -m mcp_client.replay /tmp/postgres.mcprec --list
+    python3 -m mcp_client.replay /tmp/postgres.mcprec --backend postgres --speed 2 --repeat 5
+    python3 -m mcp_client.replay /tmp/postgres.mcprec --backend postgres --fast --concurrency 16 --json replay.json
+    python3 -m mcp_client.replay /tmp/postgres.mcprec -- docker run --rm -i ... --stdio
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Optional
+
+from .backends import backend_params
+from .base import McpClient
+from .client import make_client
+from .errors import ConfigError, McpError, TransportClosed
+from .params import ServerParams
+from .recording import Message, Session, read_recording
+from .stats import summarize
+
+
+def label(message: dict) -> str:
+    if message.get("method") == "tools/call":
+        return f"tools/call {(message.get('params') or {}).get('name')}"
+    return str(message.get("method"))
+
+
+def is_request(message: Any) -> bool:
+    return isinstance(message, dict) and "method" in message and "id" in message
+
+
+def client_messages(session: Session) -> list[Message]:
+    """What the client sent: requests, notifications and batches, not its replies to the server"""
+    sent = []
+    for m in session.messages():
+        if m.direction != "sent":
+            continue
+        if isinstance(m.message, list):
+            items = [item for item in m.message if isinstance(item, dict) and "method" in item]
+            if items:
+                sent.append(Message(m.t, m.direction, items, m.size))
+        elif isinstance(m.message, dict) and "method" in m.message:
+            sent.append(m)
+    return sent
+
+
+def recorded_latencies(session: Session) -> dict[str, list[float]]:
+    """Seconds from each recorded request to its response, by label"""
+    asked: dict[Any, tuple[float, str]] = {}
+    latencies: dict[str, list[float]] = {}
+    for m in session.messages():
+        items = m.message if isinstance(m.message, list) else [m.message]
+        for item in items:
+            if not isinstance(item, dict):
+                continue
+            if m.direction == "sent" and is_request(item):
+                asked[item["id"]] = (m.t, label(item))
+            elif m.direction == "received" and "method" not in item and item.get("id") in asked:
+                t, name = asked.pop(item["id"])
+                latencies.setdefault(name, []).append(m.t - t)
+    return latencies
+
+
+@dataclass
+class ReplayResult:
+    session: int
+    name: str
+    recorded_duration: float
+    duration: float = 0.0
+    max_lag: float = 0.0  # how far behind the recorded schedule a send went
+    cancelled: int = 0  # replayed requests cancelled as the recording did
+    errors: dict[str, int] = field(default_factory=dict)
+    latencies: dict[str, list[float]] = field(default_factory=dict)
+    recorded: dict[str, list[float]] = field(default_factory=dict)
+
+
+class Replayer:
+    def __init__(self, client: McpClient, result: ReplayResult, *, speed: Optional[float], concurrency: int):
+        self.client = client
+        self.result = result
+        self.speed = speed
+        self.slots = asyncio.Semaphore(concurrency if speed is None else 1 << 30)
+        self.tasks: list[asyncio.Task] = []
+        self.running: dict[Any, asyncio.Task] = {}  # recorded id -> its replay, while in flight
+
+    async def run(self, messages: list[Message]) -> None:
+        started = time.perf_counter()
+        for m in messages:
+            if self.speed is not None:
+                delay = started + m.t / self.speed - time.perf_counter()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+                else:
+                    self.result.max_lag = max(self.result.max_lag, -delay)
+            await self.slots.acquire()
+            if isinstance(m.message, list):
+                self._spawn(self._batch(m.message))
+            elif not is_request(m.message):
+                self.slots.release()
+                if m.message["method"] == "notifications/cancelled":
+                    self._cancel(m.message.get("params") or {})
+                else:
+                    await self.client.notify(m.message["method"], m.message.get("params"))
+            elif m.message["method"] == "initialize":
+                try:
+                    await self._request(m.message)
+                finally:
+                    self.slots.release()
+            else:
+                recorded_id = m.message["id"]
+                self._spawn(self._request(m.message))
+                self.running[recorded_id] = self.tasks[-1]
+                self.tasks[-1].add_done_callback(lambda _, i=recorded_id: self.running.pop(i, None))
+        # A request cancelled before its task ran ends as cancelled; that's not a failure
+        for outcome in await asyncio.gather(*self.tasks, return_exceptions=True):
+            if isinstance(outcome, Exception):
+                raise outcome
+        self.result.duration = time.perf_counter() - started
+
+    def _spawn(self, call: Any) -> None:
+        task = asyncio.create_task(call)
+        # Released when the task ends, even one cancelled before it started
+        task.add_done_callback(lambda _: self.slots.release())
+        self.tasks.append(task)
+
+    def _cancel(self, params: dict) -> None:
+        """Cancel the replay of the recorded request; one already answered needs nothing"""
+        task = self.running.pop(params.get("requestId"), None)
+        if task is not None:
+            self.result.cancelled += 1
+            task.cancel()
+
+    async def _request(self, message: dict) -> None:
+        name = label(message)
+        started = time.perf_counter()
+        try:
+            result = await self.client.request(message["method"], message.get("params"))
+        except McpError:
+            self._count_error(name)
+            return
+        except asyncio.CancelledError:
+            if message.get("id") in self.running:
+                raise
+            return  # cancelled by _cancel, as in the recording
+        if isinstance(result, dict) and result.get("isError"):
+            self._count_error(name)
+            return
+        self.result.latencies.setdefault(name, []).append(time.perf_counter() - started)
+
+    async def _batch(self, items: list[dict]) -> None:
+        calls = [(item["method"], item.get("params")) for item in items]
+        started = time.perf_counter()
+        outcomes = await self.client.request_many(calls, batch=True, return_exceptions=True)
+        elapsed = time.perf_counter() - started
+        for item, outcome in zip(items, outcomes):
+            if not is_request(item):
+                continue
+            if isinstance(outcome, McpError) or (isinstance(outcome, dict) and outcome.get("isError")):
+                self._count_error(label(item))
+            else:
+                self.result.latencies.setdefault(label(item), []).append(elapsed)
+
+    def _count_error(self, name: str) -> None:
+        self.result.errors[name] = self.result.errors.get(name, 0) + 1
+
+
+async def replay(
+    params: ServerParams, number: int, session: Session, *, speed: Optional[float], concurrency: int
+) -> ReplayResult:
+    result = ReplayResult(number, session.name, session.duration, recorded=recorded_latencies(session))
+    async with make_client(params) as client:
+        await Replayer(client, result, speed=speed, concurrency=concurrency).run(client_messages(session))
+    return result
+
+
+def format_results(results: list[ReplayResult]) -> list[str]:
+    recorded: dict[str, list[float]] = {}
+    replayed: dict[str, list[float]] = {}
+    errors: dict[str, int] = {}
+    for r in results:
+        for name, samples in r.recorded.items():
+            recorded.setdefault(name, []).extend(samples)
+        for name, samples in r.latencies.items():
+            replayed.setdefault(name, []).extend(samples)
+        for name, count in r.errors.items():
+            errors[name] = errors.get(name, 0) + count
+    lines = [
+        f"{'request':<36} {'calls':>7} {'errors':>7} {'p50 (ms)':>20} {'p95 (ms)':>20}",
+        f"{'':<36} {'':>7} {'':>7} {'recorded → replay':>20} {'recorded → replay':>20}",
+    ]
+    for name in sorted(set(recorded) | set(replayed)):
+        before, after = summarize(recorded.get(name, [])), summarize(replayed.get(name, []))
+        lines.append(
+            f"{name[:36]:<36} {len(replayed.get(name, [])):>7} {errors.get(name, 0):>7} "
+            f"{before.get('p50_ms', float('nan')):>8.1f} → {after.get('p50_ms', float('nan')):<8.1f} "
+            f"{before.get('p95_ms', float('nan')):>8.1f} → {after.get('p95_ms', float('nan')):<8.1f}"
+        )
+    for r in results:
+        lag = f", up to {r.max_lag * 1000:.0f} ms behind schedule" if r.max_lag >= 0.001 else ""
+        cancelled = f", {r.cancelled} cancelled" if r.cancelled else ""
+        lines.append(
+            f"  session {r.session} ({r.name}): {r.recorded_duration:.2f}s recorded, {r.duration:.2f}s replayed{lag}{cancelled}"
+        )
+    return lines
+
+
+def describe(sessions: list[Session]) -> list[str]:
+    lines = []
+    for number, session in enumerate(sessions, 1):
+        messages = list(session.messages())
+        sent = sum(m.size for m in messages if m.direction == "sent")
+        received = sum(m.size for m in messages if m.direction == "received")
+        started = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(session.started))
+        lines.append(
+            f"{number:>3}  {session.name:<16} {started}  {session.duration:>8.2f}s  "
+            f"{len(client_messages(session)):>6} request(s)  {sent:>10} B sent  {received:>10} B received"
+        )
+    return lines
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    argv = list(sys.argv[1:] if argv is None else argv)
+    command: list[str] = []
+    if "--" in argv:
+        split = argv.index("--")
+        argv, command = argv[:split], argv[split + 1:]
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("recording", type=Path)
+    parser.add_argument("--list", action="store_true", help="Describe the recorded sessions and exit")
+    parser.add_argument("--session", type=int, action="append", help="Replay only this session (1-based; repeatable)")
+    parser.add_argument("--backend", help="Replay against tests/<backend>'s server_params()")
+    parser.add_argument("--url", help="Replay against a shared HTTP-mode server")
+    parser.add_argument("--speed", type=float, default=1.0, help="Multiple of the recorded speed")
+    parser.add_argument("--fast", action="store_true", help="Ignore the recorded timing")
+    parser.add_argument("--concurrency", type=int, default=8, help="Requests in flight with --fast")
+    parser.add_argument("--repeat", type=int, default=1, help="Replay the sessions this many times")
+    parser.add_argument("--json", type=Path, help="Write every result as JSON")
+    args = parser.parse_args(argv)
+
+    try:
+        sessions = list(read_recording(args.recording))
+    except (OSError, ValueError) as e:
+        print(f"✗ {e}")
+        return 1
+    if args.list:
+        for line in describe(sessions):
+            print(line)
+        return 0
+    if args.speed <= 0:
+        parser.error("--speed must be positive (use --fast for no delays)")
+    if not (command or args.url or args.backend) or (command and args.url):
+        parser.error("give --backend, --url or a server command after --")
+    chosen = [(n, s) for n, s in enumerate(sessions, 1) if not args.session or n in args.session]
+    if not chosen:
+        print(f"✗ No session to replay in {args.recording}")
+        return 1
+    try:
+        if command:
+            params = ServerParams(args.backend or os.path.basename(command[0]), command)
+        elif args.url:
+            params = ServerParams(args.backend or "http", [], url=args.url)
+        else:
+            params = backend_params(args.backend)
+    except (ConfigError, FileNotFoundError, ValueError) as e:
+        print(f"✗ {e}")
+        return 1
+
+    speed = None if args.fast else args.speed
+    pace = "as fast as possible" if speed is None else f"at {speed:g}x"
+    print(f"Replaying {len(chosen)} session(s) {pace}, {args.repeat} time(s)")
+
+    async def run_all() -> list[ReplayResult]:
+        results = []
+        for _ in range(args.repeat):
+            for number, session in chosen:
+                results.append(await replay(params, number, session, speed=speed, concurrency=args.concurrency))
+        return results
+
+    try:
+        results = asyncio.run(run_all())
+    except (TransportClosed, OSError) as e:
+        print(f"✗ {e}")
+        return 1
+    for line in format_results(results):
+        print(line)
+    if args.json:
+        report = {
+            "recording": str(args.recording),
+            "timestamp": time.time(),
+            "speed": speed,
+            "results": [
+                {
+                    "session": r.session,
+                    "name": r.name,
+                    "recorded_duration": r.recorded_duration,
+                    "duration": r.duration,
+                    "max_lag": r.max_lag,
+                    "cancelled": r.cancelled,
+                    "errors": r.errors,
+                    "latency": {name: summarize(samples) for name, samples in r.latencies.items()},
+                    "recorded_latency": {name: summarize(samples) for name, samples in r.recorded.items()},
+                }
+                for r in results
+            ],
+        }
+        args.json.write_text(json.dumps(report, indent=2))
+        print(f"✓ Wrote {args.json}")
+    return 1 if any(r.errors for r in results) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
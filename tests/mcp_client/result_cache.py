@@ -0,0 +1,110 @@
+"""
+Result-set cache for read-only execute_sql calls
+Keys on the normalized SQL (see sqltext.normalize_sql) plus the other tool arguments and
+only stores statements classified as deterministic reads. Memory is bounded by the encoded
+size of the cached responses. Any statement that may write drops the whole cache, since
+the proxy can't tell which tables it touched.
+"""
+
+import json
+from typing import Any, Optional
+
+from .cache import TTLCache
+from .intercept import Interceptor
+from .sqltext import classify, normalize_sql
+
+DEFAULT_TTL = 60.0
+
+# Warehouses are loaded in batches and bill per scan, so results are kept longer there
+BACKEND_TTLS = {
+    "bigquery": 900.0,
+    "redshift": 600.0,
+    "spanner": 120.0,
+    "postgres": 60.0,
+    "mysql": 60.0,
+    "sqlserver": 60.0,
+    "sqlite": 60.0,
+}
+
+
+def ttl_for(backend: str) -> float:
+    return BACKEND_TTLS.get(backend, DEFAULT_TTL)
+
+
+class ResultCacheInterceptor(Interceptor):
+    name = "result_cache"
+
+    def __init__(
+        self,
+        ttl: float = DEFAULT_TTL,
+        *,
+        max_bytes: int = 64 * 1024 * 1024,
+        max_entries: int = 10000,
+        max_entry_bytes: Optional[int] = None,
+        tool: str = "execute_sql",
+    ):
+        self.cache = TTLCache(max_entries, ttl, max_bytes=max_bytes)
+        # One huge result shouldn't flush everything else
+        self.max_entry_bytes = max_entry_bytes if max_entry_bytes is not None else max_bytes // 8
+        self.tool = tool
+        self.uncacheable = 0
+        self.too_large = 0
+        self._pending: dict[Any, tuple[Optional[str], int]] = {}
+        self._generation = 0
+
+    def _arguments(self, request: dict) -> Optional[dict]:
+        params = request.get("params") or {}
+        if params.get("name") != self.tool:
+            return None
+        arguments = params.get("arguments") or {}
+        return arguments if isinstance(arguments.get("sql"), str) else None
+
+    async def on_request(self, request: dict) -> Optional[dict]:
+        arguments = self._arguments(request)
+        if arguments is None:
+            return None
+        kind = classify(arguments["sql"])
+        key = None
+        if kind == "read":
+            key = json.dumps({**arguments, "sql": normalize_sql(arguments["sql"])}, sort_keys=True, default=str)
+            cached = self.cache.get(key)
+            if cached is not None:
+                return {"jsonrpc": "2.0", "id": request["id"], "result": cached}
+        else:
+            self.uncacheable += 1
+        if kind == "write":
+            # Writes invalidate on the way out too, so reads racing with them aren't cached
+            self._invalidate()
+        self._pending[request["id"]] = (key, self._generation)
+        return None
+
+    def on_response(self, request: dict, response: dict, size: int) -> dict:
+        key, generation = self._pending.pop(request.get("id"), (None, -1))
+        arguments = self._arguments(request)
+        if arguments is not None and key is None and classify(arguments["sql"]) == "write":
+            self._invalidate()
+        result = response.get("result")
+        if key is None or generation != self._generation or not isinstance(result, dict) or result.get("isError"):
+            return response
+        if size > self.max_entry_bytes:
+            self.too_large += 1
+        else:
+            self.cache.put(key, result, size=size)
+        return response
+
+    def on_unparsed_response(self, request: dict) -> None:
+        if self._pending.pop(request.get("id"), (None, -1))[0] is not None:
+            self.too_large += 1
+
+    def _invalidate(self) -> None:
+        self._generation += 1
+        self.cache.invalidate()
+
+    def report(self) -> dict:
+        return {
+            **self.cache.stats.as_dict(),
+            "entries": len(self.cache),
+            "bytes": self.cache.size_bytes,
+            "uncacheable": self.uncacheable,
+            "too_large": self.too_large,
+        }
@@ -0,0 +1,132 @@
+"""
+Row and byte budget for execute_sql results
+Read queries are rewritten to fetch at most one row more than the budget (see
+sqltext.limit_rows), so the database stops early. A result over the row or byte budget is cut
+down, and a text item saying so is appended with the number of rows kept. The same numbers
+are in `result._meta.truncated`. An oversized response is not decoded in full: the proxy
+keeps the first rows and drops the rest unread (see Interceptor.max_items).
+"""
+
+from dataclasses import dataclass
+from typing import Any, Optional
+
+from .dialects import dialect_for
+from .intercept import Interceptor
+from .sqltext import limit_rows
+
+
+@dataclass(frozen=True)
+class RowBudget:
+    rows: int
+    bytes: int
+
+
+DEFAULT_BUDGET = RowBudget(10_000, 8 * 1024 * 1024)
+
+# Warehouses bill per byte scanned and hold a slot while results drain, so their budgets are tighter
+BACKEND_BUDGETS = {
+    "bigquery": RowBudget(5_000, 4 * 1024 * 1024),
+    "redshift": RowBudget(5_000, 4 * 1024 * 1024),
+    "spanner": RowBudget(10_000, 8 * 1024 * 1024),
+    "postgres": RowBudget(50_000, 16 * 1024 * 1024),
+    "mysql": RowBudget(50_000, 16 * 1024 * 1024),
+    "sqlserver": RowBudget(50_000, 16 * 1024 * 1024),
+    "sqlite": RowBudget(50_000, 16 * 1024 * 1024),
+}
+
+# Per content item on top of its text: {"type":"text","text":""} and the separator
+ITEM_OVERHEAD = 27
+
+
+def budget_for(backend: str) -> RowBudget:
+    return BACKEND_BUDGETS.get(backend, DEFAULT_BUDGET)
+
+
+class RowBudgetInterceptor(Interceptor):
+    name = "row_budget"
+
+    def __init__(
+        self,
+        max_rows: int = DEFAULT_BUDGET.rows,
+        max_bytes: int = DEFAULT_BUDGET.bytes,
+        *,
+        top_n: bool = False,
+        rewrite: bool = True,
+        tool: str = "execute_sql",
+    ):
+        self.max_rows = max_rows
+        self.max_bytes = max_bytes
+        self.top_n = top_n
+        self.rewrite = rewrite
+        self.tool = tool
+        self.rewritten = 0
+        self.truncated = 0
+
+    @classmethod
+    def for_backend(cls, backend: str, **kwargs: Any) -> "RowBudgetInterceptor":
+        budget = budget_for(backend)
+        dialect = dialect_for(backend)
+        kwargs.setdefault("max_rows", budget.rows)
+        kwargs.setdefault("max_bytes", budget.bytes)
+        return cls(top_n=dialect is not None and dialect.top_n, **kwargs)
+
+    def _watched(self, request: dict) -> bool:
+        params = request.get("params") or {}
+        return params.get("name") == self.tool and isinstance((params.get("arguments") or {}).get("sql"), str)
+
+    def rewrite_request(self, request: dict) -> dict:
+        if not self.rewrite or not self._watched(request):
+            return request
+        params = request["params"]
+        # One row over the budget tells a result that was cut apart from one that fits exactly
+        sql = limit_rows(params["arguments"]["sql"], self.max_rows + 1, self.top_n)
+        if sql is None:
+            return request
+        self.rewritten += 1
+        return {**request, "params": {**params, "arguments": {**params["arguments"], "sql": sql}}}
+
+    def max_items(self, request: dict) -> Optional[int]:
+        return self.max_rows + 1 if self._watched(request) else None
+
+    def on_response(self, request: dict, response: dict, size: int) -> dict:
+        if not self._watched(request):
+            return response
+        result = response.get("result")
+        if not isinstance(result, dict) or result.get("isError") or not isinstance(result.get("content"), list):
+            return response
+        content = result["content"]
+        reason = None
+        kept = content
+        if len(content) > self.max_rows:
+            reason, kept = "rows", content[:self.max_rows]
+        if size > self.max_bytes:
+            total = 0
+            for count, item in enumerate(kept):
+                total += len(item.get("text", "")) + ITEM_OVERHEAD if isinstance(item, dict) else ITEM_OVERHEAD
+                if total > self.max_bytes:
+                    reason, kept = "bytes", kept[:count]
+                    break
+        if reason is None:
+            return response
+        self.truncated += 1
+        limit = f"{self.max_rows} rows" if reason == "rows" else f"{self.max_bytes} bytes"
+        marker = {
+            "type": "text",
+            "text": (
+                f"[Result truncated after {len(kept)} rows: the proxy's budget of {limit} was reached. "
+                "Add a LIMIT or a narrower filter to see the rest.]"
+            ),
+        }
+        meta = {
+            **(result.get("_meta") or {}),
+            "truncated": {"rows": len(kept), "reason": reason, "max_rows": self.max_rows, "max_bytes": self.max_bytes},
+        }
+        return {**response, "result": {**result, "content": [*kept, marker], "_meta": meta}}
+
+    def report(self) -> dict:
+        return {
+            "max_rows": self.max_rows,
+            "max_bytes": self.max_bytes,
+            "rewritten": self.rewritten,
+            "truncated": self.truncated,
+        }
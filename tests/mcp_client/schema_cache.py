@@ -0,0 +1,135 @@
+"""
+Schema metadata cache in front of a toolbox client
+`list_tables` (and the catalog tools of the prebuilt sources) scan information_schema on
+every call; on large Redshift clusters that is seconds of leader-node work per call.
+SchemaCachingClient memoizes those tools per source and arguments, and drops a source's
+entries as soon as DDL goes through `execute_sql` on it.
+"""
+
+import asyncio
+import contextlib
+import copy
+import json
+from typing import Any, AsyncIterator, Optional, Sequence
+
+from .base import Call, McpClient
+from .cache import TTLCache
+from .sqltext import is_ddl
+
+# Catalog tools of the tools files in images/ and of the --prebuilt sources
+SCHEMA_TOOLS = frozenset({
+    "list_tables",
+    "list_dataset_ids",
+    "list_table_ids",
+    "get_dataset_info",
+    "get_table_info",
+})
+
+class SchemaCachingClient:
+    """Wraps a StdioClient (or a pool lease) and caches catalog tool results
+
+    Results are keyed by the client's ServerParams.key(), the tool name and its arguments, so
+    one `cache` can be shared by clients for several sources. Concurrent misses for the same
+    key share one call. Tool errors are never cached, and callers get their own copy of a
+    cached result. DDL is noticed whichever way it is sent: call_tool, request, request_many,
+    stream_tool and the helpers built on them. Everything else is delegated to the wrapped
+    client.
+    """
+
+    # The base helpers, bound to the wrapper so they call its call_tool and stream_tool
+    call_rows = McpClient.call_rows
+    call_columnar = McpClient.call_columnar
+    export_tool = McpClient.export_tool
+
+    def __init__(
+        self,
+        client: Any,
+        *,
+        ttl: float = 300.0,
+        max_entries: int = 256,
+        schema_tools: frozenset = SCHEMA_TOOLS,
+        cache: Optional[TTLCache] = None,
+    ):
+        self.client = client
+        self.source = client.params.key()
+        self.schema_tools = schema_tools
+        self.cache = cache if cache is not None else TTLCache(max_entries, ttl)
+        self._inflight: dict[tuple, asyncio.Future] = {}
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self.client, name)
+
+    @property
+    def stats(self):
+        return self.cache.stats
+
+    def invalidate(self) -> int:
+        """Forget every cached result for this client's source"""
+        # Counted in the cache, so a call in flight on another client of the source sees it too
+        self.cache.generations[self.source] += 1
+        return self.cache.invalidate(lambda key: key[0] == self.source)
+
+    async def call_tool(self, name: str, arguments: Optional[dict] = None, *, timeout: Optional[float] = None) -> dict:
+        if name in self.schema_tools:
+            return await self._cached_call(name, arguments or {}, timeout)
+        try:
+            return await self.client.call_tool(name, arguments, timeout=timeout)
+        finally:
+            # Even when the call failed: part of a multi-statement batch may have run
+            self._after(name, arguments)
+
+    async def request(self, method: str, params: Optional[dict] = None, *, timeout: Optional[float] = None) -> Any:
+        if method == "tools/call" and params is not None:
+            return await self.call_tool(params.get("name", ""), params.get("arguments"), timeout=timeout)
+        return await self.client.request(method, params, timeout=timeout)
+
+    async def request_many(self, calls: Sequence[Call], **options: Any) -> list[Any]:
+        try:
+            return await self.client.request_many(calls, **options)
+        finally:
+            for method, params in calls:
+                if method == "tools/call" and params is not None:
+                    self._after(params.get("name", ""), params.get("arguments"))
+
+    @contextlib.asynccontextmanager
+    async def stream_tool(self, name: str, arguments: Optional[dict] = None, **options: Any) -> AsyncIterator[Any]:
+        try:
+            async with self.client.stream_tool(name, arguments, **options) as rows:
+                yield rows
+        finally:
+            self._after(name, arguments)
+
+    def _after(self, name: str, arguments: Optional[dict]) -> None:
+        if name == "execute_sql" and is_ddl(str((arguments or {}).get("sql", ""))):
+            self.invalidate()
+
+    async def _cached_call(self, name: str, arguments: dict, timeout: Optional[float] = None) -> dict:
+        key = (self.source, name, json.dumps(arguments, sort_keys=True, default=str))
+        cached = self.cache.get(key)
+        if cached is not None:
+            return copy.deepcopy(cached)
+        inflight = self._inflight.get(key)
+        if inflight is not None:
+            self.cache.stats.coalesced += 1
+            return copy.deepcopy(await asyncio.shield(inflight))
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        generation = self.cache.generations[self.source]
+        try:
+            result = await self.client.call_tool(name, arguments, timeout=timeout)
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            # Waiters re-raise it; mark it retrieved so an unwaited future doesn't log a warning
+            future.exception()
+            raise
+        finally:
+            self._inflight.pop(key, None)
+        # A result fetched across a DDL statement may already be stale
+        if not result.get("isError") and generation == self.cache.generations[self.source]:
+            self.cache.put(key, copy.deepcopy(result))
+        future.set_result(copy.deepcopy(result))
+        return result
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Refresh the schema index served by the Redshift image's lookup_schema tool
+Streams `list_tables` from a running toolbox (the backend's server_params(), so .env
+settings apply) into a compact SQLite snapshot using images/redshift/schema-index.sql.
+Bake it into the image by writing it next to the Dockerfile before `docker build`, or
+mount it over /config/schema-index.sqlite and restart the server.
+
+Usage (from tests/):
+    python3 -m mcp_client.schema_index --output ../images/redshift/schema-index.sqlite
+"""
+
+import argparse
+import asyncio
+import collections
+import datetime
+import os
+import sqlite3
+import sys
+import time
+from pathlib import Path
+from typing import Any, AsyncIterable, AsyncIterator, Optional
+
+from .backends import TESTS_DIR, backend_params
+from .client import make_client
+from .errors import ConfigError, McpError, TransportClosed
+
+SCHEMA_SQL = TESTS_DIR.parent / "images" / "redshift" / "schema-index.sql"
+DEFAULT_OUTPUT = SCHEMA_SQL.with_suffix(".sqlite")
+COLUMN_FIELDS = ("table_name", "schema_name", "column_position", "column_name", "data_type", "is_nullable", "column_default")
+
+
+async def build_index(rows: AsyncIterable[dict], path: Path, meta: Optional[dict[str, str]] = None) -> tuple[int, int]:
+    """Write list_tables rows to a fresh index at `path` as they arrive; returns (tables, columns)
+
+    The file is built next to `path` and renamed over it, so readers never see a partial index;
+    if `rows` raises, the partial file is removed and `path` is left as it was.
+    """
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    tmp.unlink(missing_ok=True)
+    conn = sqlite3.connect(tmp)
+    try:
+        with conn:
+            conn.executescript(SCHEMA_SQL.read_text())
+            counts: collections.Counter = collections.Counter()
+            batch: list[tuple] = []
+            async for row in rows:
+                batch.append(tuple(row.get(f) for f in COLUMN_FIELDS))
+                counts[(row.get("table_name"), row.get("schema_name"))] += 1
+                if len(batch) >= 5000:
+                    conn.executemany("INSERT OR REPLACE INTO columns VALUES (?, ?, ?, ?, ?, ?, ?)", batch)
+                    batch.clear()
+            conn.executemany("INSERT OR REPLACE INTO columns VALUES (?, ?, ?, ?, ?, ?, ?)", batch)
+            conn.executemany("INSERT INTO tables VALUES (?, ?, ?)", ((t, s, n) for (t, s), n in counts.items()))
+            meta = {
+                "refreshed_at": datetime.datetime.now(datetime.timezone.utc).isoformat(timespec="seconds"),
+                **(meta or {}),
+            }
+            conn.executemany("INSERT OR REPLACE INTO index_meta VALUES (?, ?)", meta.items())
+        conn.execute("VACUUM")
+    except BaseException:
+        conn.close()
+        tmp.unlink(missing_ok=True)
+        raise
+    conn.close()
+    tmp.chmod(0o644)
+    os.replace(tmp, path)
+    return len(counts), sum(counts.values())
+
+
+async def fetch_catalog(client: Any) -> AsyncIterator[dict]:
+    """Every column from list_tables, yielded as it is decoded so huge catalogs are never buffered"""
+    async with client.stream_tool("list_tables", {"table_names": ""}) as rows:
+        async for row in rows:
+            if isinstance(row, dict):
+                yield row
+    if rows.is_error:
+        raise McpError(-32000, "list_tables failed", rows.result)
+
+
+async def refresh(backend: str, output: Path) -> tuple[int, int, float]:
+    params = backend_params(backend)
+    started = time.perf_counter()
+    async with make_client(params) as client:
+        await client.initialize()
+        database = params.env.get("POSTGRES_DATABASE", "")
+        tables, columns = await build_index(fetch_catalog(client), output, {"database": database, "source": backend})
+    return tables, columns, time.perf_counter() - started
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--backend", default="redshift", help="tests/<backend> whose server_params() to use")
+    parser.add_argument("--output", type=Path, default=DEFAULT_OUTPUT, help=f"Index file (default: {DEFAULT_OUTPUT})")
+    args = parser.parse_args(argv)
+
+    try:
+        tables, columns, seconds = asyncio.run(refresh(args.backend, args.output))
+    except (ConfigError, FileNotFoundError, McpError, TransportClosed, OSError) as e:
+        print(f"✗ Schema index refresh failed: {e}")
+        return 1
+    print(f"✓ Indexed {tables} tables / {columns} columns into {args.output} in {seconds:.1f}s")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
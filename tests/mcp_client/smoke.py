@@ -0,0 +1,156 @@
+"""
+Shared smoke test used by every tests/<db>/test_mcp.py
+initialize -> tools/list -> a few tools/call checks, printing the familiar ✓/✗ lines.
+export_test runs a query through the proxy's export_sql tool and reads the files back.
+"""
+
+import asyncio
+import json
+import math
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Callable, Optional, Sequence
+
+from .client import make_client
+from .errors import McpError, TransportClosed
+from .export import FORMATS
+from .params import ServerParams
+
+
+def first_text_line(result: object) -> str:
+    """First non-empty line of the first text content item in a tool result"""
+    items = result.get("content", []) if isinstance(result, dict) else result
+    if not isinstance(items, list):
+        return ""
+    for item in items:
+        if isinstance(item, dict) and item.get("type") == "text":
+            text = item.get("text", "").strip()
+            if text:
+                return text.splitlines()[0]
+    return ""
+
+
+async def run_smoke_test(
+    params: ServerParams,
+    checks: Sequence[tuple[str, dict]] = (),
+    only_if_listed: bool = True,
+    timings: Optional[dict[str, float]] = None,
+    log: Callable[[str], None] = print,
+    pipelined: bool = True,
+) -> bool:
+    """Run the handshake and tool checks; checks for tools the server doesn't list are skipped
+
+    The handshake pipelines initialize and tools/list into one round trip unless
+    `pipelined` is False. When `timings` is given it receives the duration in seconds of
+    each step: `handshake` (process start + initialize, plus tools/list when pipelined),
+    `tools_list` (lockstep only) and `call:<tool>`.
+    """
+    timings = {} if timings is None else timings
+    client = make_client(params)
+    try:
+        started = time.perf_counter()
+        await client.start()
+        if pipelined:
+            tools = await client.handshake()
+            timings["handshake"] = time.perf_counter() - started
+            log(f"✓ Initialize response: {client.server_info.get('name', 'Unknown')}")
+        else:
+            await client.initialize()
+            timings["handshake"] = time.perf_counter() - started
+            log(f"✓ Initialize response: {client.server_info.get('name', 'Unknown')}")
+            started = time.perf_counter()
+            tools = await client.list_tools()
+            timings["tools_list"] = time.perf_counter() - started
+        tool_names = [tool.get("name", "unknown") for tool in tools]
+        log("✓ Available tools: " + ", ".join(tool_names))
+
+        for tool, arguments in checks:
+            if only_if_listed and tool not in tool_names:
+                continue
+            started = time.perf_counter()
+            try:
+                result = await client.call_tool(tool, arguments)
+            except McpError as e:
+                log(f"✗ {tool} call failed: {e}")
+                return False
+            finally:
+                timings[f"call:{tool}"] = time.perf_counter() - started
+            log(f"✓ {tool} call successful")
+            preview = first_text_line(result)
+            if preview:
+                log(f"  First result: {preview[:120]}")
+
+        return len(tools) > 0
+
+    except (McpError, TransportClosed, OSError) as e:
+        log(f"✗ Error: {e}")
+        if client.stray_lines:
+            log("✗ Non-JSON output: " + " | ".join(client.stray_lines))
+        return False
+    finally:
+        await client.close()
+
+
+def smoke_test(params: ServerParams, checks: Sequence[tuple[str, dict]] = ()) -> bool:
+    """Synchronous entry point for the per-backend scripts"""
+    return asyncio.run(run_smoke_test(params, checks))
+
+
+async def run_export_test(
+    params: ServerParams,
+    sql: str,
+    rows: int,
+    *,
+    batch_rows: int = 1000,
+    log: Callable[[str], None] = print,
+) -> bool:
+    """Export `sql` (expected to return `rows` rows) in every format via the proxy; checks the files"""
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError:
+        log("- Skipping export check (pip install pyarrow)")
+        return True
+    with tempfile.TemporaryDirectory(prefix="mcp-export-") as directory:
+        proxy = ServerParams(
+            name=f"{params.name}-proxy",
+            command=[
+                sys.executable, "-m", "mcp_client.proxy", "--backend", params.name,
+                "--export-dir", directory, "--export-batch-rows", str(batch_rows), "--", *params.command,
+            ],
+            env={**params.env, "PYTHONPATH": str(Path(__file__).resolve().parent.parent)},
+        )
+        client = make_client(proxy)
+        try:
+            await client.start()
+            await client.handshake()
+            for format in FORMATS:
+                result = await client.call_tool("export_sql", {"sql": sql, "format": format})
+                if result.get("isError"):
+                    log(f"✗ export_sql ({format}) failed: {first_text_line(result)}")
+                    return False
+                summary = json.loads(first_text_line(result))
+                if format == "parquet":
+                    metadata = pq.ParquetFile(summary["path"]).metadata
+                    found, batches = metadata.num_rows, metadata.num_row_groups
+                else:
+                    reader = pa.ipc.open_file(summary["path"])
+                    found, batches = reader.read_all().num_rows, reader.num_record_batches
+                if found != rows or batches != math.ceil(rows / batch_rows) or summary["rows"] != rows:
+                    log(f"✗ export_sql ({format}): {found} rows in {batches} batches, expected {rows} rows")
+                    return False
+                columns = ", ".join(f"{c['name']} {c['type']}" for c in summary["columns"])
+                log(f"✓ export_sql ({format}): {found} rows in {batches} batches, {summary['bytes']} bytes ({columns})")
+            return True
+        except (McpError, TransportClosed, OSError, ValueError, KeyError) as e:
+            log(f"✗ Export error: {e}")
+            return False
+        finally:
+            await client.close()
+
+
+def export_test(params: ServerParams, sql: str, rows: int, *, batch_rows: int = 1000) -> bool:
+    """Synchronous entry point for the per-backend scripts"""
+    return asyncio.run(run_export_test(params, sql, rows, batch_rows=batch_rows))
@@ -0,0 +1,241 @@
+"""
+Lightweight SQL text handling shared by the caching and rewriting proxies
+Not a parser: a tokenizer that knows enough about literals, quoted identifiers and
+comments to normalize statements, tell reads from writes (and DDL from other writes) and
+bound a read's row count across the toolbox dialects.
+"""
+
+import re
+from typing import Iterator, NamedTuple, Optional
+
+_TOKEN = re.compile(
+    r"""
+    (?P<space>\s+)
+    | (?P<comment>--[^\n]*|/\*.*?(?:\*/|\Z))
+    | (?P<dollar>\$(?P<tag>[A-Za-z_]*)\$.*?(?:\$(?P=tag)\$|\Z))
+    | (?P<string>[EeNnBbXx]?'(?:[^'\\]|\\.|'')*(?:'|\Z))
+    | (?P<quoted>"(?:[^"]|"")*(?:"|\Z)|`(?:[^`]|``)*(?:`|\Z))
+    | (?P<word>[A-Za-z_][A-Za-z0-9_$]*)
+    | (?P<other>.)
+    """,
+    re.VERBOSE | re.DOTALL,
+)
+
+KEYWORDS = frozenset("""
+    ALL AND ANY AS ASC BETWEEN BY CASE CROSS DESC DESCRIBE DISTINCT ELSE END EXCEPT EXISTS EXPLAIN
+    FALSE FETCH FIRST FROM FULL GROUP HAVING IN INNER INTERSECT IS JOIN LEFT LIKE LIMIT NOT NULL
+    OFFSET ON OR ORDER OUTER OVER PARTITION RIGHT ROWS SELECT SHOW THEN TOP TRUE UNION USING
+    VALUES WHEN WHERE WINDOW WITH
+""".split())
+
+READ_STARTS = frozenset({"SELECT", "WITH", "SHOW", "DESCRIBE", "DESC", "EXPLAIN", "VALUES", "TABLE"})
+
+# Statements that change data, where a statement can start inside a read: a writable CTE
+# (WITH gone AS (DELETE ... RETURNING *) SELECT ...) or the body after a WITH list
+MODIFYING_STARTS = frozenset({"DELETE", "INSERT", "MERGE", "UPDATE", "UPSERT"})
+
+# Statements that change what catalog queries return
+DDL_STARTS = frozenset({"ALTER", "COMMENT", "CREATE", "DROP", "RENAME", "TRUNCATE"})
+
+# Functions that change data even when called from a SELECT
+WRITE_FUNCTIONS = frozenset({"NEXTVAL", "SETVAL"})
+
+# What EXPLAIN can be followed by, after its options
+EXPLAINABLE = READ_STARTS | MODIFYING_STARTS | {"CREATE", "DECLARE", "EXECUTE", "REPLACE"}
+
+# Reads whose result changes from one call to the next
+VOLATILE_WORDS = frozenset("""
+    CLOCK_TIMESTAMP CURDATE CURRENT_DATE CURRENT_TIME CURRENT_TIMESTAMP CURTIME GENERATE_UUID
+    GEN_RANDOM_UUID GETDATE GETUTCDATE LOCALTIME LOCALTIMESTAMP NEWID NOW RAND RANDOM
+    STATEMENT_TIMESTAMP SYSDATE SYSDATETIME TIMEOFDAY TRANSACTION_TIMESTAMP UTC_DATE UTC_TIMESTAMP
+    UUID UUID_GENERATE_V4
+""".split())
+
+
+class Token(NamedTuple):
+    kind: str  # space | comment | dollar | string | quoted | word | other
+    text: str
+
+
+def tokenize(sql: str) -> Iterator[Token]:
+    for match in _TOKEN.finditer(sql):
+        yield Token(match.lastgroup, match.group())
+
+
+def _positioned(sql: str) -> list[tuple[int, Token]]:
+    """Significant tokens with their offsets into `sql`"""
+    return [(m.start(), Token(m.lastgroup, m.group())) for m in _TOKEN.finditer(sql) if m.lastgroup not in ("space", "comment")]
+
+
+def _significant(sql: str) -> list[Token]:
+    return [t for t in tokenize(sql) if t.kind not in ("space", "comment")]
+
+
+def split_statements(sql: str) -> list[list[Token]]:
+    """Significant tokens of each non-empty statement"""
+    statements: list[list[Token]] = [[]]
+    for token in _significant(sql):
+        if token.kind == "other" and token.text == ";":
+            statements.append([])
+        else:
+            statements[-1].append(token)
+    return [s for s in statements if s]
+
+
+def normalize_sql(sql: str) -> str:
+    """Canonical text for cache keys: comments dropped, whitespace collapsed, keywords uppercased
+
+    Literals and identifiers keep their case, since identifier case matters on some backends.
+    """
+    parts: list[str] = []
+    pending_space = False
+    for token in tokenize(sql):
+        if token.kind in ("space", "comment"):
+            pending_space = bool(parts)
+            continue
+        if pending_space:
+            parts.append(" ")
+            pending_space = False
+        if token.kind == "word" and token.text.upper() in KEYWORDS:
+            parts.append(token.text.upper())
+        else:
+            parts.append(token.text)
+    text = "".join(parts).rstrip()
+    while text.endswith(";"):
+        text = text[:-1].rstrip()
+    return text
+
+
+def classify(sql: str) -> str:
+    """Kind of statement: read, volatile (a read that depends on time or randomness) or write
+
+    Goes by where statements start, not by words anywhere: a column named `comment` or
+    `share` is still a read. Locking reads (FOR UPDATE / FOR SHARE) and EXPLAIN ANALYZE of a
+    read are volatile. Multiple statements and anything unrecognized count as writes.
+    """
+    statements = split_statements(sql)
+    if len(statements) != 1:
+        return "write"
+    return _classify(statements[0])
+
+
+def _classify(tokens: list[Token]) -> str:
+    words = [t.text.upper() for t in tokens if t.kind == "word"]
+    if not words or words[0] not in READ_STARTS:
+        return "write"
+    if words[0] == "EXPLAIN":
+        return _classify_explain(tokens)
+    if MODIFYING_STARTS.intersection(_statement_starts(tokens)) or "INTO" in words:
+        return "write"
+    if any(t.kind == "word" and t.text.upper() in WRITE_FUNCTIONS and _is_call(tokens, i) for i, t in enumerate(tokens)):
+        return "write"
+    if VOLATILE_WORDS.intersection(words) or _locks_rows(tokens):
+        return "volatile"
+    return "read"
+
+
+def _statement_starts(tokens: list[Token]) -> list[str]:
+    """Words in a position where a statement can begin: first, or right after a parenthesis
+
+    After "(" is a subquery or CTE body; after ")" is the statement following a WITH list.
+    """
+    starts = []
+    for i, token in enumerate(tokens):
+        if token.kind != "word":
+            continue
+        previous = tokens[i - 1] if i else None
+        if previous is None or (previous.kind == "other" and previous.text in "()"):
+            starts.append(token.text.upper())
+    return starts
+
+
+def _is_call(tokens: list[Token], index: int) -> bool:
+    return index + 1 < len(tokens) and tokens[index + 1].text == "("
+
+
+def _locks_rows(tokens: list[Token]) -> bool:
+    """FOR UPDATE, FOR NO KEY UPDATE, FOR SHARE, FOR KEY SHARE, at any depth"""
+    words = [t.text.upper() for t in tokens if t.kind == "word"]
+    return any(word == "FOR" and after in ("UPDATE", "SHARE", "NO", "KEY") for word, after in zip(words, words[1:]))
+
+
+def _classify_explain(tokens: list[Token]) -> str:
+    """Plain EXPLAIN only plans, so it reads; EXPLAIN ANALYZE runs the statement"""
+    for i, token in enumerate(tokens[1:], 1):
+        if token.kind == "word" and token.text.upper() in EXPLAINABLE:
+            break
+    else:
+        return "read"
+    options = {t.text.upper() for t in tokens[1:i] if t.kind == "word"}
+    if not options & {"ANALYZE", "ANALYSE"}:
+        return "read"
+    return "write" if _classify(tokens[i:]) == "write" else "volatile"
+
+
+def is_read_only(sql: str) -> bool:
+    return classify(sql) == "read"
+
+
+def is_ddl(sql: str) -> bool:
+    """Whether any statement in `sql` may change the catalog: DDL, or SELECT ... INTO a new table"""
+    for statement in split_statements(sql):
+        words = [t.text.upper() for t in statement if t.kind == "word"]
+        if not words:
+            continue
+        if words[0] in DDL_STARTS and (words[0] != "COMMENT" or words[1:2] == ["ON"]):
+            return True
+        if words[0] in ("SELECT", "WITH") and "INTO" in words:
+            # ... unless the INTO belongs to an INSERT or MERGE after a WITH list
+            if not MODIFYING_STARTS.intersection(_statement_starts(statement)):
+                return True
+    return False
+
+
+_LIMIT_TAIL = re.compile(r"LIMIT\s+(\d+)(?:\s+OFFSET\s+\d+)?", re.IGNORECASE)
+
+
+def limit_rows(sql: str, rows: int, top_n: bool = False) -> Optional[str]:
+    """`sql` rewritten to return at most `rows` rows, or None when it needn't or can't be
+
+    Only single SELECT/WITH reads are rewritten. Without a LIMIT of its own the statement gets
+    one appended; one with a larger or non-literal LIMIT (or OFFSET/FETCH) is wrapped in a
+    subquery. With `top_n` (SQL Server) a plain SELECT gets TOP, and anything else is left alone.
+    """
+    if classify(sql) == "write":
+        return None
+    tokens = _positioned(sql)
+    words = [(i, t.text.upper()) for i, (_, t) in enumerate(tokens) if t.kind == "word"]
+    if not words or words[0][1] not in ("SELECT", "WITH"):
+        return None
+    # Top level only: LIMIT inside a subquery doesn't bound the result
+    depth = 0
+    top_level: dict[str, int] = {}
+    for i, (_, token) in enumerate(tokens):
+        if token.kind == "other" and token.text in "()":
+            depth += 1 if token.text == "(" else -1
+        elif depth == 0 and token.kind == "word":
+            top_level.setdefault(token.text.upper(), i)
+    while tokens and tokens[-1][1].text == ";":
+        tokens.pop()
+    last_offset, last = tokens[-1]
+    body = sql[:last_offset + len(last.text)]
+
+    if top_n:
+        if words[0][1] != "SELECT" or top_level.keys() & {"TOP", "OFFSET", "FETCH", "UNION", "EXCEPT", "INTERSECT"}:
+            return None
+        # After SELECT [DISTINCT | ALL]
+        index = 1 if len(words) > 1 and words[1][1] in ("DISTINCT", "ALL") and words[1][0] == 1 else 0
+        offset, token = tokens[index]
+        insert = offset + len(token.text)
+        return f"{body[:insert]} TOP ({rows}){body[insert:]}"
+
+    if "FOR" in top_level:
+        # A locking clause (or FOR SYSTEM_TIME) has to stay last; leave the statement alone
+        return None
+    if not top_level.keys() & {"LIMIT", "OFFSET", "FETCH"}:
+        return f"{body} LIMIT {rows}"
+    if "LIMIT" in top_level:
+        match = _LIMIT_TAIL.fullmatch(body, tokens[top_level["LIMIT"]][0])
+        if match and int(match.group(1)) <= rows:
+            return None
+    return f"SELECT * FROM ({body}) AS limited_rows LIMIT {rows}"
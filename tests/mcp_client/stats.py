@@ -0,0 +1,30 @@
+"""
+Latency summaries shared by the benchmark and timing reports
+"""
+
+import math
+from typing import Sequence
+
+
+def percentile(samples: Sequence[float], pct: float) -> float:
+    """Nearest-rank percentile; samples need not be sorted"""
+    if not samples:
+        return float("nan")
+    ordered = sorted(samples)
+    rank = max(1, math.ceil(pct / 100.0 * len(ordered)))
+    return ordered[rank - 1]
+
+
+def summarize(samples: Sequence[float]) -> dict[str, float]:
+    """Count, mean and p50/p95/p99/max of latency samples in seconds, reported in ms"""
+    if not samples:
+        return {"count": 0}
+    ordered = sorted(samples)
+    return {
+        "count": len(ordered),
+        "mean_ms": 1000 * sum(ordered) / len(ordered),
+        "p50_ms": 1000 * percentile(ordered, 50),
+        "p95_ms": 1000 * percentile(ordered, 95),
+        "p99_ms": 1000 * percentile(ordered, 99),
+        "max_ms": 1000 * ordered[-1],
+    }
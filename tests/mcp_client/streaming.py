@@ -0,0 +1,230 @@
+"""
+Incremental decoding of large tools/call responses
+The toolbox returns one `{"type": "text", "text": "<row json>"}` item per row in
+`result.content`, all on a single stdout line. IncrementalResponseParser pulls those items
+out as the bytes arrive and ResultStream hands them to the caller as rows, so neither the
+raw line nor the fully parsed response has to be held in memory.
+"""
+
+import asyncio
+import codecs
+import collections
+import json
+import re
+from typing import Any, Callable, Optional
+
+from .codec import RowDecoder
+
+_WS = re.compile(r"[ \t\n\r]*")
+_decoder = json.JSONDecoder()
+
+
+class _NeedMore(Exception):
+    pass
+
+
+class IncrementalResponseParser:
+    """Push parser for one JSON-RPC response that emits `result.content` items as they complete
+
+    Everything outside the content array is small and kept: top-level members land in
+    `envelope` (id, error, ...) and other result members (isError, ...) in `result`.
+    """
+
+    def __init__(self) -> None:
+        self.envelope: dict = {}
+        self.result: dict = {}
+        self.done = False
+        self._utf8 = codecs.getincrementaldecoder("utf-8")()
+        self._buf = ""
+        self._pos = 0
+        self._stack: list[str] = []
+        self._state = "start"
+        self._key: Optional[str] = None
+        self._final = False
+
+    @property
+    def in_content(self) -> bool:
+        return self._state == "items"
+
+    def feed(self, data: bytes, final: bool = False) -> list:
+        """Consume more bytes; returns content items completed by this chunk"""
+        self._buf = self._buf[self._pos:] + self._utf8.decode(data, final)
+        self._pos = 0
+        self._final = final
+        items: list = []
+        while not self.done:
+            checkpoint = self._pos
+            try:
+                self._step(items)
+            except _NeedMore:
+                # Steps are atomic: rewind and retry once more bytes have arrived
+                self._pos = checkpoint
+                if not final:
+                    break
+                raise ValueError(f"Truncated JSON-RPC message near: {self._buf[self._pos:self._pos + 80]!r}")
+        return items
+
+    def _peek(self) -> str:
+        self._pos = _WS.match(self._buf, self._pos).end()
+        if self._pos >= len(self._buf):
+            raise _NeedMore
+        return self._buf[self._pos]
+
+    def _value(self) -> Any:
+        try:
+            value, end = _decoder.raw_decode(self._buf, self._pos)
+        except json.JSONDecodeError:
+            raise _NeedMore from None
+        # A number at the very end of the buffer may still be growing
+        if end >= len(self._buf) and not self._final:
+            raise _NeedMore
+        self._pos = end
+        return value
+
+    def _step(self, items: list) -> None:
+        c = self._peek()
+        if self._state == "start":
+            if c != "{":
+                raise ValueError(f"Expected a JSON object, got {c!r}")
+            self._pos += 1
+            self._stack.append("top")
+            self._state = "member"
+        elif self._state == "member":
+            if c == ",":
+                self._pos += 1
+            elif c == "}":
+                self._pos += 1
+                self._stack.pop()
+                self.done = not self._stack
+            else:
+                key = self._value()
+                if self._peek() != ":":
+                    raise ValueError("Expected ':' after object key")
+                self._pos += 1
+                self._key = key
+                self._state = "value"
+        elif self._state == "value":
+            context = self._stack[-1]
+            if context == "top" and self._key == "result" and c == "{":
+                self._pos += 1
+                self._stack.append("result")
+                self._state = "member"
+            elif context == "result" and self._key == "content" and c == "[":
+                self._pos += 1
+                self._state = "items"
+            else:
+                target = self.envelope if context == "top" else self.result
+                target[self._key] = self._value()
+                self._state = "member"
+        elif self._state == "items":
+            if c == ",":
+                self._pos += 1
+            elif c == "]":
+                self._pos += 1
+                self._state = "member"
+            else:
+                items.append(self._value())
+
+
+# A content item as a row: the parsed JSON inside text items, else the item itself
+decode_row = RowDecoder()
+
+
+def item_size(item: Any) -> int:
+    if isinstance(item, dict) and isinstance(item.get("text"), str):
+        return len(item["text"])
+    return len(json.dumps(item))
+
+
+_END = object()
+
+
+class ResultStream:
+    """Rows of one streamed tools/call, with row/byte caps and a bounded queue
+
+    When `max_queued` decoded rows are waiting, the client stops reading stdout until the
+    consumer catches up, which in turn blocks the server on the pipe. Other requests on the
+    same process wait too, so consume promptly or use a dedicated client for bulk reads.
+    `decode` turns each content item into a row (see codec.RowDecoder).
+    """
+
+    def __init__(
+        self,
+        max_rows: Optional[int] = None,
+        max_bytes: Optional[int] = None,
+        max_queued: int = 1000,
+        decode: Callable[[Any], Any] = decode_row,
+    ):
+        self.max_rows = max_rows
+        self.max_bytes = max_bytes
+        self.max_queued = max(1, max_queued)
+        self.decode = decode
+        self.rows_seen = 0
+        self.bytes_seen = 0
+        self.truncated = False
+        self.is_error = False
+        self.result: dict = {}
+        self.error: Optional[Exception] = None
+        self.finished = False
+        self.abandoned = False
+        self._queue: collections.deque = collections.deque()
+        self._data = asyncio.Event()
+        self._space = asyncio.Event()
+
+    @property
+    def accepting(self) -> bool:
+        return not (self.truncated or self.abandoned or self.finished)
+
+    async def put_item(self, item: Any) -> None:
+        if not self.accepting:
+            return
+        size = item_size(item)
+        if (self.max_rows is not None and self.rows_seen >= self.max_rows) or (
+            self.max_bytes is not None and self.bytes_seen + size > self.max_bytes
+        ):
+            self.truncated = True
+            return
+        self.rows_seen += 1
+        self.bytes_seen += size
+        self._queue.append(self.decode(item))
+        self._data.set()
+        while len(self._queue) >= self.max_queued and not (self.abandoned or self.finished):
+            self._space.clear()
+            await self._space.wait()
+
+    def finish(self, result: Optional[dict] = None, error: Optional[Exception] = None) -> None:
+        if self.finished:
+            return
+        self.result = result or {}
+        self.is_error = bool(self.result.get("isError"))
+        self.error = error
+        self.finished = True
+        self._queue.append(_END)
+        self._data.set()
+        # A reader waiting for room stops; nothing more is accepted
+        self._space.set()
+
+    def abandon(self) -> None:
+        """Consumer is done early: drop queued rows and unblock the reader"""
+        self.abandoned = True
+        self._queue.clear()
+        self._space.set()
+
+    def __aiter__(self) -> "ResultStream":
+        return self
+
+    async def __anext__(self) -> Any:
+        while not self._queue:
+            self._data.clear()
+            await self._data.wait()
+        row = self._queue[0]
+        if row is _END:
+            if self.error is not None:
+                raise self.error
+            raise StopAsyncIteration
+        self._queue.popleft()
+        self._space.set()
+        return row
+
+    async def collect(self) -> list:
+        return [row async for row in self]
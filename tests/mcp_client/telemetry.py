@@ -0,0 +1,392 @@
+"""
+Per-call latency and payload metrics for the MCP clients
+Every JSON-RPC request a client sends (and its server start) becomes a Span with the method,
+tool name, backend, transport, bytes sent and received, rows returned and the error, if any.
+Finished spans go into histograms labelled by method, tool, backend and error:
+- mcp_client_request_duration_seconds
+- mcp_client_request_bytes
+- mcp_client_response_bytes
+- mcp_client_response_rows (tools/call only)
+
+Telemetry is off unless configured, and then costs nothing beyond a None check per call.
+- MCP_CLIENT_METRICS_PORT=9464 serves the histograms as Prometheus text on
+  http://127.0.0.1:9464/metrics.
+- OTEL_EXPORTER_OTLP_ENDPOINT=http://127.0.0.1:4318 sends spans and histograms to an
+  OpenTelemetry collector over OTLP/HTTP JSON, every OTEL_METRIC_EXPORT_INTERVAL ms (default
+  5000) and when the interpreter exits. OTEL_SERVICE_NAME sets service.name.
+Or pass `telemetry=Telemetry(...)` to a client. Stdlib only: no OpenTelemetry SDK needed.
+"""
+
+import asyncio
+import atexit
+import collections
+import json
+import os
+import secrets
+import sys
+import threading
+import time
+import urllib.error
+import urllib.request
+from dataclasses import dataclass, field
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Optional
+
+from .errors import McpError, RequestTimeout, TransportClosed
+
+METRICS_PORT_ENV = "MCP_CLIENT_METRICS_PORT"
+OTLP_ENDPOINT_ENV = "OTEL_EXPORTER_OTLP_ENDPOINT"
+OTLP_INTERVAL_ENV = "OTEL_METRIC_EXPORT_INTERVAL"
+SERVICE_NAME_ENV = "OTEL_SERVICE_NAME"
+SERVICE_NAME = "mcp-client"
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 300.0)
+BYTES_BUCKETS = tuple(float(4**n) for n in range(4, 14))  # 256 B .. 64 MiB
+ROWS_BUCKETS = (0.0, 1.0, 10.0, 100.0, 1_000.0, 10_000.0, 100_000.0, 1_000_000.0)
+
+# Spans waiting for the next OTLP export; the oldest are dropped past this
+MAX_QUEUED_SPANS = 10_000
+LABELS = ("method", "tool", "backend", "error")
+
+
+def error_kind(outcome: Any) -> str:
+    """Short error label for a request's result or exception; "" for success"""
+    if isinstance(outcome, dict):
+        return "tool_error" if outcome.get("isError") else ""
+    if outcome is None:
+        return ""
+    if isinstance(outcome, RequestTimeout):
+        return "timeout"
+    if isinstance(outcome, TransportClosed):
+        return "transport"
+    if isinstance(outcome, McpError):
+        return str(outcome.code)
+    if isinstance(outcome, BaseException):
+        return "cancelled" if isinstance(outcome, asyncio.CancelledError) else type(outcome).__name__
+    return ""
+
+
+def result_rows(method: str, outcome: Any) -> Optional[int]:
+    """Rows in a tools/call result: one content item per row"""
+    if method != "tools/call" or not isinstance(outcome, dict) or outcome.get("isError"):
+        return None
+    content = outcome.get("content")
+    return len(content) if isinstance(content, list) else None
+
+
+@dataclass
+class Span:
+    method: str
+    backend: str
+    transport: str
+    tool: str = ""
+    trace_id: str = ""
+    span_id: str = field(default_factory=lambda: secrets.token_hex(8))
+    start_ns: int = field(default_factory=time.time_ns)
+    end_ns: int = 0
+    bytes_out: int = 0
+    bytes_in: int = 0
+    rows: Optional[int] = None
+    error: str = ""
+    message: str = ""
+    _started: float = field(default_factory=time.perf_counter, repr=False)
+
+    @property
+    def seconds(self) -> float:
+        return (self.end_ns - self.start_ns) / 1e9
+
+    def labels(self) -> tuple[str, ...]:
+        return (self.method, self.tool, self.backend, self.error)
+
+    def attributes(self) -> dict[str, Any]:
+        attributes: dict[str, Any] = {
+            "rpc.system": "jsonrpc",
+            "rpc.method": self.method,
+            "db.system": self.backend,
+            "network.transport": self.transport,
+            "mcp.request.bytes": self.bytes_out,
+            "mcp.response.bytes": self.bytes_in,
+        }
+        if self.tool:
+            attributes["mcp.tool.name"] = self.tool
+        if self.rows is not None:
+            attributes["mcp.response.rows"] = self.rows
+        if self.error:
+            attributes["error.type"] = self.error
+        return attributes
+
+
+class Histogram:
+    """Cumulative bucket counts per label set, in the Prometheus / OTLP explicit-bucket shape"""
+
+    def __init__(self, name: str, unit: str, description: str, bounds: tuple[float, ...]):
+        self.name = name
+        self.unit = unit
+        self.description = description
+        self.bounds = bounds
+        self.series: dict[tuple[str, ...], list] = {}  # labels -> [bucket counts, sum, count]
+
+    def observe(self, labels: tuple[str, ...], value: float) -> None:
+        series = self.series.get(labels)
+        if series is None:
+            series = self.series[labels] = [[0] * (len(self.bounds) + 1), 0.0, 0]
+        index = next((i for i, bound in enumerate(self.bounds) if value <= bound), len(self.bounds))
+        series[0][index] += 1
+        series[1] += value
+        series[2] += 1
+
+
+class Telemetry:
+    """Collects finished spans into histograms and exports them; safe to share across threads"""
+
+    def __init__(
+        self,
+        service_name: Optional[str] = None,
+        *,
+        otlp_endpoint: Optional[str] = None,
+        export_interval: float = 5.0,
+    ):
+        self.service_name = service_name or os.environ.get(SERVICE_NAME_ENV) or SERVICE_NAME
+        self.otlp_endpoint = otlp_endpoint.rstrip("/") if otlp_endpoint else None
+        self.export_interval = export_interval
+        self.started_ns = time.time_ns()
+        self.spans_recorded = 0
+        self.export_failures = 0
+        self.duration = Histogram(
+            "mcp_client_request_duration_seconds", "s", "JSON-RPC request latency", LATENCY_BUCKETS
+        )
+        self.request_bytes = Histogram("mcp_client_request_bytes", "By", "Encoded request size", BYTES_BUCKETS)
+        self.response_bytes = Histogram("mcp_client_response_bytes", "By", "Encoded response size", BYTES_BUCKETS)
+        self.rows = Histogram("mcp_client_response_rows", "{row}", "Rows in a tools/call result", ROWS_BUCKETS)
+        self._lock = threading.Lock()
+        self._queue: collections.deque = collections.deque(maxlen=MAX_QUEUED_SPANS)
+        self._server: Optional[ThreadingHTTPServer] = None
+        self._exporter: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        if self.otlp_endpoint:
+            self._exporter = threading.Thread(target=self._export_periodically, name="otlp-export", daemon=True)
+            self._exporter.start()
+            atexit.register(self.close)
+
+    @property
+    def histograms(self) -> list[Histogram]:
+        return [self.duration, self.request_bytes, self.response_bytes, self.rows]
+
+    def start(
+        self,
+        method: str,
+        *,
+        backend: str,
+        transport: str,
+        tool: str = "",
+        trace_id: str = "",
+        bytes_out: int = 0,
+    ) -> Span:
+        return Span(method, backend, transport, tool=tool, trace_id=trace_id or secrets.token_hex(16), bytes_out=bytes_out)
+
+    def finish(
+        self,
+        span: Span,
+        outcome: Any = None,
+        *,
+        bytes_in: Optional[int] = None,
+        rows: Optional[int] = None,
+    ) -> None:
+        """End the span with a request's result or exception and record it"""
+        span.end_ns = span.start_ns + int((time.perf_counter() - span._started) * 1e9)
+        if bytes_in is not None:
+            span.bytes_in = bytes_in
+        span.rows = rows if rows is not None else result_rows(span.method, outcome)
+        span.error = error_kind(outcome)
+        if isinstance(outcome, BaseException):
+            span.message = str(outcome)
+        self.record(span)
+
+    def record(self, span: Span) -> None:
+        labels = span.labels()
+        with self._lock:
+            self.spans_recorded += 1
+            self.duration.observe(labels, span.seconds)
+            # No bytes: a server start, or a request that got no response
+            if span.bytes_out:
+                self.request_bytes.observe(labels, span.bytes_out)
+            if span.bytes_in:
+                self.response_bytes.observe(labels, span.bytes_in)
+            if span.rows is not None:
+                self.rows.observe(labels, span.rows)
+            if self.otlp_endpoint:
+                self._queue.append(span)
+
+    # -- Prometheus -------------------------------------------------------
+
+    def prometheus_text(self) -> str:
+        """The histograms in the Prometheus text exposition format"""
+        lines: list[str] = []
+        with self._lock:
+            for histogram in self.histograms:
+                lines.append(f"# HELP {histogram.name} {histogram.description}")
+                lines.append(f"# TYPE {histogram.name} histogram")
+                for labels, (counts, total, count) in sorted(histogram.series.items()):
+                    base = ",".join(f'{name}="{_escape(value)}"' for name, value in zip(LABELS, labels))
+                    cumulative = 0
+                    for bound, bucket in zip(histogram.bounds + (float("inf"),), counts):
+                        cumulative += bucket
+                        le = "+Inf" if bound == float("inf") else f"{bound:g}"
+                        lines.append(f'{histogram.name}_bucket{{{base},le="{le}"}} {cumulative}')
+                    lines.append(f"{histogram.name}_sum{{{base}}} {total:g}")
+                    lines.append(f"{histogram.name}_count{{{base}}} {count}")
+        return "\n".join(lines) + "\n"
+
+    def serve(self, port: int, host: str = "127.0.0.1") -> int:
+        """Serve /metrics from a daemon thread; returns the port (useful with port=0)"""
+        telemetry = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self) -> None:
+                if self.path.split("?")[0] not in ("/", "/metrics"):
+                    self.send_error(404)
+                    return
+                body = telemetry.prometheus_text().encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format: str, *args: Any) -> None:
+                pass
+
+        self._server = ThreadingHTTPServer((host, port), Handler)
+        self._server.daemon_threads = True
+        threading.Thread(target=self._server.serve_forever, name="metrics-endpoint", daemon=True).start()
+        return self._server.server_address[1]
+
+    # -- OTLP -------------------------------------------------------------
+
+    def flush(self) -> None:
+        """Send queued spans and the current histograms to the OTLP endpoint"""
+        if not self.otlp_endpoint:
+            return
+        with self._lock:
+            spans = list(self._queue)
+            self._queue.clear()
+            metrics = self._otlp_metrics()
+        resource = {"attributes": _otlp_attributes({"service.name": self.service_name})}
+        scope = {"name": __name__}
+        if spans:
+            self._post("/v1/traces", {
+                "resourceSpans": [{"resource": resource, "scopeSpans": [{"scope": scope, "spans": [_otlp_span(s) for s in spans]}]}]
+            })
+        if metrics:
+            self._post("/v1/metrics", {
+                "resourceMetrics": [{"resource": resource, "scopeMetrics": [{"scope": scope, "metrics": metrics}]}]
+            })
+
+    def close(self) -> None:
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+        if self._exporter is not None and not self._stop.is_set():
+            self._stop.set()
+            self._exporter.join(self.export_interval + 5)
+            self.flush()
+
+    def _export_periodically(self) -> None:
+        while not self._stop.wait(self.export_interval):
+            self.flush()
+
+    def _otlp_metrics(self) -> list[dict]:
+        now = str(time.time_ns())
+        metrics = []
+        for histogram in self.histograms:
+            if not histogram.series:
+                continue
+            points = [
+                {
+                    "attributes": _otlp_attributes({k: v for k, v in zip(LABELS, labels) if v}),
+                    "startTimeUnixNano": str(self.started_ns),
+                    "timeUnixNano": now,
+                    "count": str(count),
+                    "sum": total,
+                    "bucketCounts": [str(c) for c in counts],
+                    "explicitBounds": list(histogram.bounds),
+                }
+                for labels, (counts, total, count) in histogram.series.items()
+            ]
+            metrics.append({
+                "name": histogram.name,
+                "unit": histogram.unit,
+                "description": histogram.description,
+                # 2 = cumulative, matching the Prometheus endpoint
+                "histogram": {"aggregationTemporality": 2, "dataPoints": points},
+            })
+        return metrics
+
+    def _post(self, path: str, payload: dict) -> None:
+        request = urllib.request.Request(
+            self.otlp_endpoint + path,
+            data=json.dumps(payload).encode(),
+            headers={"Content-Type": "application/json"},
+            method="POST",
+        )
+        try:
+            with urllib.request.urlopen(request, timeout=10) as response:
+                response.read()
+        except (OSError, urllib.error.URLError) as e:
+            # Never fail the caller over metrics; say so once
+            if not self.export_failures:
+                print(f"OTLP export to {self.otlp_endpoint}{path} failed: {e}", file=sys.stderr)
+            self.export_failures += 1
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _otlp_value(value: Any) -> dict:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+def _otlp_attributes(attributes: dict[str, Any]) -> list[dict]:
+    return [{"key": key, "value": _otlp_value(value)} for key, value in attributes.items()]
+
+
+def _otlp_span(span: Span) -> dict:
+    return {
+        "traceId": span.trace_id,
+        "spanId": span.span_id,
+        "name": span.method,
+        "kind": 3,  # client
+        "startTimeUnixNano": str(span.start_ns),
+        "endTimeUnixNano": str(span.end_ns),
+        "attributes": _otlp_attributes(span.attributes()),
+        # 2 = error, 0 = unset
+        "status": {"code": 2, "message": span.message or span.error} if span.error else {"code": 0},
+    }
+
+
+_default: Optional[Telemetry] = None
+_default_lock = threading.Lock()
+
+
+def default_telemetry() -> Optional[Telemetry]:
+    """The process-wide Telemetry configured from the environment; None when it isn't"""
+    global _default
+    port = os.environ.get(METRICS_PORT_ENV)
+    endpoint = os.environ.get(OTLP_ENDPOINT_ENV)
+    if not port and not endpoint:
+        return None
+    with _default_lock:
+        if _default is None:
+            interval = float(os.environ.get(OTLP_INTERVAL_ENV) or 5000) / 1000
+            _default = Telemetry(otlp_endpoint=endpoint, export_interval=interval)
+            if port:
+                _default.serve(int(port))
+        return _default
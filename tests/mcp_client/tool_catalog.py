@@ -0,0 +1,337 @@
+"""
+On-disk cache of tools/list results, and diffs between them
+A server's tools only change when its image or its tools file does. So a ToolCatalog keys each
+tools/list result by the image digest (`docker image inspect`), the toolbox arguments and the
+sha256 of every tools file they name (-v mounts resolved to host paths). McpClient.handshake()
+then sends initialize alone and takes the tools from the cache. The prebuilt BigQuery and
+Dataplex schemas run to tens of KB per session. Commands other than `docker run` are keyed by
+the content of every file on their command line. HTTP servers are never cached.
+
+Turned on per client (`tool_catalog=ToolCatalog()`) or for every client with
+MCP_CLIENT_TOOL_CATALOG_DIR. diff_tools() compares two tool lists; `python3 -m
+mcp_client.tool_diff` runs it between images.
+"""
+
+import asyncio
+import hashlib
+import json
+import os
+import shutil
+import time
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any, Optional, Sequence, Union
+
+from .cache import CacheStats, TTLCache
+from .errors import ConfigError
+from .params import ServerParams
+
+TOOL_CATALOG_DIR_ENV = "MCP_CLIENT_TOOL_CATALOG_DIR"
+DEFAULT_DIR = Path(os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache") / "mcp-client" / "tools"
+# A re-tagged image is noticed this long after the tag moves
+DIGEST_TTL = 60.0
+
+# `docker run` options followed by a value; everything else starting with - is a flag
+_DOCKER_VALUE_OPTIONS = frozenset({
+    "-e", "--env", "--env-file", "-v", "--volume", "--mount", "--network", "--net", "-p", "--publish",
+    "--name", "--platform", "--entrypoint", "-w", "--workdir", "-u", "--user", "-h", "--hostname",
+    "-l", "--label", "--add-host", "-m", "--memory", "--cpus", "--pull", "--userns", "--ipc",
+})
+TOOLS_FILE_FLAGS = ("--tools-file", "--tools-files", "--tools-folder")
+
+_digests = TTLCache(64, DIGEST_TTL)
+_file_hashes: dict[tuple[str, int, int], str] = {}
+
+
+@dataclass
+class CatalogEntry:
+    key: str
+    backend: str
+    fingerprint: dict
+    server_info: dict = field(default_factory=dict)
+    tools: list[dict] = field(default_factory=list)
+    fetched_at: float = 0.0
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "CatalogEntry":
+        return cls(**{k: data[k] for k in ("key", "backend", "fingerprint", "server_info", "tools", "fetched_at") if k in data})
+
+    def as_dict(self) -> dict:
+        return asdict(self)
+
+
+def split_docker_run(command: Sequence[str]) -> Optional[tuple[list[str], str, list[str]]]:
+    """(docker options, image, toolbox arguments) of a `docker run` command, else None"""
+    if len(command) < 3 or Path(command[0]).name != "docker" or command[1] != "run":
+        return None
+    i = 2
+    while i < len(command):
+        arg = command[i]
+        if not arg.startswith("-"):
+            return list(command[2:i]), arg, list(command[i + 1:])
+        i += 2 if arg in _DOCKER_VALUE_OPTIONS else 1
+    return None
+
+
+def with_image(params: ServerParams, image: str) -> ServerParams:
+    """The same launch configuration on another image"""
+    parts = split_docker_run(params.command)
+    if parts is None:
+        raise ConfigError(f"{params.name} isn't started with `docker run`, so it has no image to replace")
+    options, _, args = parts
+    return ServerParams(params.name, [*params.command[:2], *options, image, *args], dict(params.env), params.url)
+
+
+def _option_values(args: Sequence[str], names: Sequence[str]) -> list[tuple[str, str]]:
+    """(option, value) for every `--name value` or `--name=value` in args"""
+    found = []
+    for i, arg in enumerate(args):
+        name, equals, value = arg.partition("=")
+        if name in names:
+            if equals:
+                found.append((name, value))
+            elif i + 1 < len(args):
+                found.append((name, args[i + 1]))
+    return found
+
+
+def _mounts(options: Sequence[str]) -> list[tuple[str, str]]:
+    """(container path, host path) of each -v mount"""
+    mounts = []
+    for _, spec in _option_values(options, ("-v", "--volume")):
+        parts = spec.split(":")
+        if len(parts) >= 2 and parts[0].startswith(("/", ".", "~")):
+            mounts.append((parts[1].rstrip("/"), str(Path(parts[0]).expanduser())))
+    return mounts
+
+
+def _host_path(path: str, mounts: Sequence[tuple[str, str]]) -> Optional[str]:
+    for container, host in sorted(mounts, key=lambda m: -len(m[0])):
+        if path == container or path.startswith(container + "/"):
+            return host + path[len(container):]
+    return None
+
+
+def file_sha256(path: Union[str, Path]) -> Optional[str]:
+    """sha256 of a file (every *.yaml of a directory), memoized by size and mtime"""
+    path = Path(path)
+    try:
+        if path.is_dir():
+            digest = hashlib.sha256()
+            for child in sorted(path.glob("*.y*ml")):
+                digest.update(child.name.encode() + b"\0" + (file_sha256(child) or "").encode())
+            return digest.hexdigest()
+        stat = path.stat()
+    except OSError:
+        return None
+    memo = (str(path.resolve()), stat.st_size, stat.st_mtime_ns)
+    if memo not in _file_hashes:
+        _file_hashes[memo] = hashlib.sha256(path.read_bytes()).hexdigest()
+    return _file_hashes[memo]
+
+
+async def image_digest(image: str) -> Optional[str]:
+    """The local image ID of `image`, or None without docker or before it's pulled"""
+    digest = _digests.get(image)
+    if digest is None:
+        try:
+            process = await asyncio.create_subprocess_exec(
+                "docker", "image", "inspect", "--format", "{{.Id}}", image,
+                stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.DEVNULL,
+            )
+        except OSError:
+            return None
+        stdout, _ = await process.communicate()
+        if process.returncode != 0 or not stdout.strip():
+            return None
+        digest = stdout.decode().strip()
+        _digests.put(image, digest)
+    return digest
+
+
+async def fingerprint(params: ServerParams) -> Optional[dict]:
+    """What the server's tools depend on, or None when that can't be pinned down"""
+    if params.url or not params.command:
+        return None
+    parts = split_docker_run(params.command)
+    if parts is not None:
+        options, image, args = parts
+        digest = await image_digest(image)
+        if digest is None:
+            return None
+        tools_files = {}
+        mounts = _mounts(options)
+        for flag, value in _option_values(args, TOOLS_FILE_FLAGS):
+            for path in value.split(",") if flag == "--tools-files" else [value]:
+                host = _host_path(path, mounts)
+                # A tools file that isn't mounted is baked into the image, so the digest covers it
+                if host is not None:
+                    tools_files[path] = file_sha256(host)
+                    if tools_files[path] is None:
+                        return None
+        return {"image": image, "digest": digest, "args": args, "tools_files": tools_files}
+    executable = shutil.which(params.command[0]) or params.command[0]
+    files = {}
+    for arg in [executable, *params.command[1:]]:
+        if os.path.exists(arg):
+            files[arg] = file_sha256(arg)
+    if executable not in files:
+        return None
+    return {"command": list(params.command), "files": files}
+
+
+class ToolCatalog:
+    """tools/list results on disk, one JSON file per fingerprint
+
+    Entries are never expired: a new image or tools file gives a new key. Writes go to a
+    temporary file that is renamed into place, so concurrent clients never read half an entry.
+    """
+
+    def __init__(self, directory: Union[str, Path, None] = None):
+        self.directory = Path(directory or os.environ.get(TOOL_CATALOG_DIR_ENV) or DEFAULT_DIR)
+        self.stats = CacheStats()
+        self._fingerprints: dict[str, dict] = {}
+
+    async def key_for(self, params: ServerParams) -> Optional[str]:
+        fp = await fingerprint(params)
+        if fp is None:
+            return None
+        key = hashlib.sha256(json.dumps(fp, sort_keys=True).encode()).hexdigest()
+        self._fingerprints[key] = fp
+        return key
+
+    def _path(self, key: str) -> Path:
+        return self.directory / f"{key[:32]}.json"
+
+    def get(self, key: Optional[str]) -> Optional[CatalogEntry]:
+        entry = self.load(key) if key is not None else None
+        if entry is None:
+            self.stats.misses += 1
+        else:
+            self.stats.hits += 1
+        return entry
+
+    def load(self, key: str) -> Optional[CatalogEntry]:
+        try:
+            data = json.loads(self._path(key).read_text())
+        except (OSError, ValueError):
+            return None
+        return CatalogEntry.from_dict(data) if data.get("key") == key else None
+
+    def put(self, key: str, backend: str, tools: list[dict], server_info: Optional[dict] = None) -> CatalogEntry:
+        entry = CatalogEntry(key, backend, self._fingerprints.get(key, {}), dict(server_info or {}), tools, time.time())
+        path = self._path(key)
+        partial = path.with_name(f".{path.name}.{os.getpid()}.partial")
+        try:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            partial.write_text(json.dumps(entry.as_dict()))
+            partial.replace(path)
+        except OSError:
+            # A read-only or full cache directory only costs the next session a tools/list
+            partial.unlink(missing_ok=True)
+        return entry
+
+    def entries(self) -> list[CatalogEntry]:
+        found = []
+        for path in sorted(self.directory.glob("*.json")):
+            try:
+                found.append(CatalogEntry.from_dict(json.loads(path.read_text())))
+            except (OSError, ValueError, TypeError):
+                continue
+        return sorted(found, key=lambda e: e.fetched_at)
+
+    def find(self, prefix: str) -> Optional[CatalogEntry]:
+        matches = [e for e in self.entries() if e.key.startswith(prefix)]
+        if len(matches) > 1:
+            raise ConfigError(f"Key prefix {prefix!r} matches {len(matches)} entries")
+        return matches[0] if matches else None
+
+    def clear(self) -> int:
+        removed = 0
+        for path in self.directory.glob("*.json"):
+            path.unlink(missing_ok=True)
+            removed += 1
+        return removed
+
+
+_default: Optional[ToolCatalog] = None
+
+
+def default_tool_catalog() -> Optional[ToolCatalog]:
+    """The process-wide ToolCatalog in MCP_CLIENT_TOOL_CATALOG_DIR; None when that isn't set"""
+    global _default
+    directory = os.environ.get(TOOL_CATALOG_DIR_ENV)
+    if not directory:
+        return None
+    if _default is None or _default.directory != Path(directory):
+        _default = ToolCatalog(directory)
+    return _default
+
+
+# -- Diffs ------------------------------------------------------------------
+
+
+@dataclass
+class CatalogDiff:
+    added: list[str] = field(default_factory=list)
+    removed: list[str] = field(default_factory=list)
+    changed: dict[str, list[str]] = field(default_factory=dict)
+
+    def __bool__(self) -> bool:
+        return bool(self.added or self.removed or self.changed)
+
+    def lines(self) -> list[str]:
+        return [
+            *(f"+ {name}" for name in self.added),
+            *(f"- {name}" for name in self.removed),
+            *(f"~ {name}: {change}" for name, changes in self.changed.items() for change in changes),
+        ]
+
+
+def _short(value: Any) -> str:
+    text = json.dumps(value, sort_keys=True)
+    return text if len(text) <= 60 else text[:57] + "..."
+
+
+def _schema_changes(old: dict, new: dict) -> list[str]:
+    changes = []
+    old_properties, new_properties = old.get("properties") or {}, new.get("properties") or {}
+    for name in sorted(new_properties.keys() - old_properties.keys()):
+        changes.append(f"parameter {name} added ({new_properties[name].get('type', '?')})")
+    for name in sorted(old_properties.keys() - new_properties.keys()):
+        changes.append(f"parameter {name} removed")
+    for name in sorted(old_properties.keys() & new_properties.keys()):
+        before, after = old_properties[name], new_properties[name]
+        for attribute in sorted(before.keys() | after.keys()):
+            if before.get(attribute) != after.get(attribute):
+                changes.append(f"parameter {name}: {attribute} {_short(before.get(attribute))} → {_short(after.get(attribute))}")
+    old_required, new_required = set(old.get("required") or ()), set(new.get("required") or ())
+    if old_required != new_required:
+        delta = [f"+{n}" for n in sorted(new_required - old_required)] + [f"-{n}" for n in sorted(old_required - new_required)]
+        changes.append(f"required {' '.join(delta)}")
+    for attribute in sorted((old.keys() | new.keys()) - {"properties", "required"}):
+        if old.get(attribute) != new.get(attribute):
+            changes.append(f"inputSchema.{attribute} {_short(old.get(attribute))} → {_short(new.get(attribute))}")
+    return changes
+
+
+def diff_tools(old: Sequence[dict], new: Sequence[dict]) -> CatalogDiff:
+    """Tools added, removed and changed (description, parameters, other fields) from old to new"""
+    before = {t.get("name"): t for t in old}
+    after = {t.get("name"): t for t in new}
+    diff = CatalogDiff(
+        added=sorted(n for n in after if n not in before),
+        removed=sorted(n for n in before if n not in after),
+    )
+    for name in sorted(n for n in before if n in after):
+        old_tool, new_tool = before[name], after[name]
+        changes = []
+        if old_tool.get("description") != new_tool.get("description"):
+            changes.append("description changed")
+        changes += _schema_changes(old_tool.get("inputSchema") or {}, new_tool.get("inputSchema") or {})
+        for attribute in sorted((old_tool.keys() | new_tool.keys()) - {"name", "description", "inputSchema"}):
+            if old_tool.get(attribute) != new_tool.get(attribute):
+                changes.append(f"{attribute} changed")
+        if changes:
+            diff.changed[name] = changes
+    return diff
@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+Compare toolbox tool catalogs between images, and manage the cached ones
+Each side of `diff` is a JSON file (a tools/list result, a cached entry or a bare list), the
+key prefix of a cached catalog, or `backend[@image]`: that backend's server_params() started
+on `image` (default: its own) and asked for tools/list, going through the tool catalog cache
+(see tool_catalog.py). Changes are reported per tool: description, parameters added, removed
+or retyped, required parameters, and any other field.
+
+Usage (from tests/):
+    python3 -m mcp_client.tool_diff fetch bigquery --image us-central1-docker.pkg.dev/database-toolbox/toolbox/toolbox:0.9.0
+    python3 -m mcp_client.tool_diff diff bigquery@us-central1-docker.pkg.dev/database-toolbox/toolbox/toolbox:0.9.0 bigquery
+    python3 -m mcp_client.tool_diff diff old-tools.json new-tools.json --exit-code
+    python3 -m mcp_client.tool_diff list
+"""
+
+import argparse
+import asyncio
+import json
+import sys
+import time
+from pathlib import Path
+from typing import Any, Optional
+
+from .backends import backend_params
+from .client import make_client
+from .errors import ConfigError, McpError, TransportClosed
+from .params import ServerParams
+from .tool_catalog import DEFAULT_DIR, TOOL_CATALOG_DIR_ENV, ToolCatalog, diff_tools, with_image
+
+
+async def fetch_tools(params: ServerParams, catalog: Optional[ToolCatalog]) -> list[dict]:
+    async with make_client(params, tool_catalog=catalog) as client:
+        return await client.handshake()
+
+
+def _tools_of(data: Any) -> list[dict]:
+    """The tools of a tools/list result, a CatalogEntry file or a bare list"""
+    if isinstance(data, dict):
+        data = data.get("tools", (data.get("result") or {}).get("tools"))
+    if not isinstance(data, list):
+        raise ConfigError("Expected a tools/list result, a catalog entry or a list of tools")
+    return data
+
+
+async def resolve(spec: str, catalog: ToolCatalog) -> list[dict]:
+    """Tools for a JSON file, a cached entry's key prefix, or a backend[@image] fetched live"""
+    if Path(spec).is_file():
+        return _tools_of(json.loads(Path(spec).read_text()))
+    entry = catalog.find(spec) if all(c in "0123456789abcdef" for c in spec) else None
+    if entry is not None:
+        return entry.tools
+    backend, _, image = spec.partition("@")
+    params = backend_params(backend)
+    return await fetch_tools(with_image(params, image) if image else params, catalog)
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--dir", type=Path, help=f"Cache directory (default: ${TOOL_CATALOG_DIR_ENV} or {DEFAULT_DIR})")
+    commands = parser.add_subparsers(dest="command", required=True)
+    fetch = commands.add_parser("fetch", help="Start a backend and cache its tools")
+    fetch.add_argument("backend")
+    fetch.add_argument("--image", help="Run this image instead of the backend's own")
+    fetch.add_argument("--output", type=Path, help="Also write the tools as JSON")
+    diff = commands.add_parser("diff", help="Compare two catalogs: JSON files, cached key prefixes or backend[@image]")
+    diff.add_argument("old")
+    diff.add_argument("new")
+    diff.add_argument("--exit-code", action="store_true", help="Exit 1 when they differ")
+    commands.add_parser("list", help="Show cached catalogs")
+    commands.add_parser("clear", help="Delete cached catalogs")
+    args = parser.parse_args(argv)
+
+    catalog = ToolCatalog(args.dir)
+    try:
+        if args.command == "fetch":
+            params = backend_params(args.backend)
+            params = with_image(params, args.image) if args.image else params
+            tools = asyncio.run(fetch_tools(params, catalog))
+            key = asyncio.run(catalog.key_for(params))
+            if args.output:
+                args.output.write_text(json.dumps({"tools": tools}, indent=2))
+            print(f"✓ {args.backend}: {len(tools)} tools ({len(json.dumps(tools))} bytes), key {key[:12] if key else 'none (not cacheable)'}")
+        elif args.command == "diff":
+            old = asyncio.run(resolve(args.old, catalog))
+            new = asyncio.run(resolve(args.new, catalog))
+            changes = diff_tools(old, new)
+            for line in changes.lines():
+                print(line)
+            print(
+                f"{len(changes.added)} added, {len(changes.removed)} removed, {len(changes.changed)} changed, "
+                f"{len(new) - len(changes.added) - len(changes.changed)} unchanged"
+            )
+            return 1 if args.exit_code and changes else 0
+        elif args.command == "list":
+            for entry in catalog.entries():
+                where = entry.fingerprint.get("image") or " ".join(entry.fingerprint.get("command", []))
+                fetched = time.strftime("%Y-%m-%d %H:%M", time.localtime(entry.fetched_at))
+                print(f"{entry.key[:12]}  {entry.backend:<12} {len(entry.tools):>4} tools  {fetched}  {where}")
+        else:
+            print(f"✓ Removed {catalog.clear()} cached catalog(s) from {catalog.directory}")
+    except (ConfigError, ValueError, McpError, TransportClosed, OSError) as e:
+        print(f"✗ {e}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
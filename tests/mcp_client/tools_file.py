@@ -0,0 +1,580 @@
+#!/usr/bin/env python3
+"""
+Check and precompile toolbox tools files before a container loads them
+The toolbox reads --tools-file only when it starts, so a mistyped source kind or a placeholder
+that doesn't match `parameters` takes a whole container start to find. compile_tools_file()
+loads one or more tools files (a repeated key is an error, not last-one-wins) and checks:
+- sources have a known kind and the fields that kind needs, and are used by some tool
+  (the toolbox connects to every source at startup);
+- tools have a kind that fits their source, a description and well-formed parameters;
+- statement placeholders agree with `parameters`: $1..$n for the Postgres kinds, ? for MySQL,
+  :name for SQLite and @name for Spanner, BigQuery and SQL Server, plus {{name}} templates;
+- ${VAR} references: listed, and checked or substituted when an environment is given;
+- toolsets only name tools that exist, and no tool is defined twice across files.
+The normalized file it writes has the comments dropped, sections and fields in a fixed order
+and trailing whitespace trimmed from statements and descriptions. With --toolset it keeps only
+that toolset's tools and the sources they use. --profile starts a server on the original
+and on the compiled file and reports the time to `initialize` and to tools/list.
+
+Usage (from tests/):
+    python3 -m mcp_client.tools_file ../images/redshift/redshift.yaml
+    python3 -m mcp_client.tools_file ../images/redshift/redshift.yaml toolsets.yaml --toolset lookups -o /tmp/lookups.yaml
+    python3 -m mcp_client.tools_file sqlite/sqlite.yaml -o /tmp/sqlite.yaml --profile \\
+        --env SQLITE_FILE=/data/test.db --volume "$PWD/sqlite/test.db:/data/test.db"
+"""
+
+import argparse
+import asyncio
+import hashlib
+import json
+import re
+import sys
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Mapping, Optional, Sequence, Union
+
+from .client import make_client
+from .errors import ConfigError, McpError, TransportClosed
+from .params import DOCKER_IMAGE, ServerParams, docker_run, load_env_file
+from .sqltext import tokenize
+from .stats import summarize
+
+SECTIONS = ("sources", "authServices", "tools", "toolsets")
+TOOL_FIELDS = ("kind", "source", "description", "parameters", "templateParameters", "authRequired", "statement")
+PARAMETER_FIELDS = ("name", "type", "description", "required", "default", "items", "authServices")
+PARAMETER_TYPES = frozenset({"string", "integer", "float", "boolean", "array", "map"})
+
+# Fields the toolbox refuses to start without, per source kind
+SOURCE_FIELDS = {
+    "postgres": ("host", "database", "user", "password"),
+    "alloydb-postgres": ("project", "region", "cluster", "instance", "database", "user", "password"),
+    "cloud-sql-postgres": ("project", "region", "instance", "database", "user", "password"),
+    "mysql": ("host", "database", "user", "password"),
+    "cloud-sql-mysql": ("project", "region", "instance", "database", "user", "password"),
+    "mssql": ("host", "database", "user", "password"),
+    "cloud-sql-mssql": ("project", "region", "instance", "database", "user", "password"),
+    "sqlite": ("database",),
+    "spanner": ("project", "instance", "database"),
+    "bigquery": ("project",),
+    "dataplex": ("project",),
+    "firestore": ("project",),
+}
+
+POSTGRES_SOURCES = ("postgres", "alloydb-postgres", "cloud-sql-postgres")
+MYSQL_SOURCES = ("mysql", "cloud-sql-mysql")
+MSSQL_SOURCES = ("mssql", "cloud-sql-mssql")
+
+# How each placeholder style is spelled, matched against statement text outside literals
+PLACEHOLDERS = {
+    "positional": re.compile(r"\$(\d+)"),
+    "question": re.compile(r"\?"),
+    "colon": re.compile(r"(?<![:\w]):([A-Za-z_]\w*)"),
+    "at": re.compile(r"(?<![@\w])@([A-Za-z_]\w*)"),
+}
+TEMPLATE = re.compile(r"\{\{\s*\.?([A-Za-z_]\w*)\s*\}\}")
+ENV_REFERENCE = re.compile(r"\$\{(\w+)(?::([^}]*))?\}")
+
+
+@dataclass(frozen=True)
+class ToolKind:
+    sources: tuple[str, ...]
+    placeholders: Optional[str] = None  # None: runs caller-supplied SQL, no statement
+
+
+TOOL_KINDS = {
+    "postgres-sql": ToolKind(POSTGRES_SOURCES, "positional"),
+    "postgres-execute-sql": ToolKind(POSTGRES_SOURCES),
+    "alloydb-ai-nl": ToolKind(("alloydb-postgres",)),
+    "mysql-sql": ToolKind(MYSQL_SOURCES, "question"),
+    "mysql-execute-sql": ToolKind(MYSQL_SOURCES),
+    "mssql-sql": ToolKind(MSSQL_SOURCES, "at"),
+    "mssql-execute-sql": ToolKind(MSSQL_SOURCES),
+    "sqlite-sql": ToolKind(("sqlite",), "colon"),
+    "sqlite-execute-sql": ToolKind(("sqlite",)),
+    "spanner-sql": ToolKind(("spanner",), "at"),
+    "spanner-execute-sql": ToolKind(("spanner",)),
+    "bigquery-sql": ToolKind(("bigquery",), "at"),
+    "bigquery-execute-sql": ToolKind(("bigquery",)),
+}
+
+
+@dataclass
+class Issue:
+    level: str  # error | warning
+    where: str  # e.g. tools.list_tables
+    message: str
+    path: str = ""
+    line: Optional[int] = None
+
+    def __str__(self) -> str:
+        location = f"{self.path}:{self.line}" if self.line else self.path
+        return f"{location}: {self.where}: {self.message}" if location else f"{self.where}: {self.message}"
+
+
+@dataclass
+class CompiledToolsFile:
+    paths: list[str]
+    config: dict
+    sha256: str
+    issues: list[Issue] = field(default_factory=list)
+    env_vars: list[str] = field(default_factory=list)
+
+    @property
+    def errors(self) -> list[Issue]:
+        return [i for i in self.issues if i.level == "error"]
+
+    @property
+    def warnings(self) -> list[Issue]:
+        return [i for i in self.issues if i.level == "warning"]
+
+    @property
+    def ok(self) -> bool:
+        return not self.errors
+
+    def dump(self) -> str:
+        """The normalized file, headed by the inputs' names and hash"""
+        import yaml
+
+        header = (
+            f"# Compiled by mcp_client.tools_file from {', '.join(Path(p).name for p in self.paths)} "
+            f"(sha256 {self.sha256[:12]}); edit those instead\n"
+        )
+        return header + yaml.dump(self.config, Dumper=block_dumper(), sort_keys=False, allow_unicode=True, width=1000)
+
+    def write(self, path: Union[str, Path]) -> None:
+        path = Path(path)
+        partial = path.with_name(path.name + ".partial")
+        partial.write_text(self.dump())
+        partial.replace(path)
+
+
+# -- Loading ----------------------------------------------------------------
+
+
+def _loader_class(issues: list[Issue], path: str) -> Any:
+    import yaml
+
+    class Loader(yaml.SafeLoader):
+        pass
+
+    def construct_mapping(loader: Any, node: Any, deep: bool = False) -> dict:
+        first: dict[Any, int] = {}
+        for key_node, _ in node.value:
+            key = loader.construct_object(key_node, deep=True)
+            line = key_node.start_mark.line + 1
+            if key in first:
+                issues.append(Issue("error", str(key), f"defined twice (first at line {first[key]})", path, line))
+            first.setdefault(key, line)
+        return yaml.SafeLoader.construct_mapping(loader, node, deep=deep)
+
+    Loader.add_constructor(yaml.resolver.BaseResolver.DEFAULT_MAPPING_TAG, construct_mapping)
+    return Loader
+
+
+def load_tools_file(path: Union[str, Path], issues: list[Issue]) -> tuple[dict, dict[tuple[str, str], int]]:
+    """The file's mapping and the line of every entry in each section"""
+    import yaml
+
+    path = str(path)
+    loader = _loader_class(issues, path)(Path(path).read_text())
+    try:
+        node = loader.get_single_node()
+        config = loader.construct_document(node) if node is not None else {}
+    except yaml.YAMLError as e:
+        mark = getattr(e, "problem_mark", None)
+        issues.append(Issue("error", "yaml", str(getattr(e, "problem", None) or e), path, mark.line + 1 if mark else None))
+        return {}, {}
+    finally:
+        loader.dispose()
+    if not isinstance(config, dict):
+        issues.append(Issue("error", "yaml", "expected a mapping with sources and tools", path))
+        return {}, {}
+    lines: dict[tuple[str, str], int] = {}
+    for key_node, value_node in node.value:
+        if isinstance(value_node, yaml.MappingNode):
+            for entry_node, _ in value_node.value:
+                lines[(key_node.value, entry_node.value)] = entry_node.start_mark.line + 1
+    return config, lines
+
+
+# -- Checks -----------------------------------------------------------------
+
+
+def env_references(value: Any) -> list[tuple[str, Optional[str]]]:
+    """(name, default) of every ${NAME} / ${NAME:default} in the strings under `value`"""
+    if isinstance(value, str):
+        return [(m.group(1), m.group(2)) for m in ENV_REFERENCE.finditer(value)]
+    if isinstance(value, Mapping):
+        return [ref for v in value.values() for ref in env_references(v)]
+    if isinstance(value, list):
+        return [ref for v in value for ref in env_references(v)]
+    return []
+
+
+def substitute_env(value: Any, env: Mapping[str, str]) -> Any:
+    if isinstance(value, str):
+        return ENV_REFERENCE.sub(lambda m: env.get(m.group(1), m.group(2) if m.group(2) is not None else m.group()), value)
+    if isinstance(value, Mapping):
+        return {k: substitute_env(v, env) for k, v in value.items()}
+    if isinstance(value, list):
+        return [substitute_env(v, env) for v in value]
+    return value
+
+
+def _code_only(statement: str) -> str:
+    """The statement with literals, quoted identifiers and comments blanked out"""
+    return "".join(
+        " " * len(token.text) if token.kind in ("comment", "dollar", "string", "quoted") else token.text
+        for token in tokenize(statement)
+    )
+
+
+def statement_placeholders(statement: str, style: str) -> list[str]:
+    """Placeholders in `statement` in order of appearance: numbers, names or "?" """
+    pattern = PLACEHOLDERS[style]
+    return [m.group(1) if pattern.groups else m.group() for m in pattern.finditer(_code_only(statement))]
+
+
+def _check_parameters(where: str, parameters: Any, report: Any) -> list[str]:
+    if parameters is None:
+        return []
+    if not isinstance(parameters, list):
+        report("error", where, "must be a list of {name, type, description}")
+        return []
+    names: list[str] = []
+    for index, parameter in enumerate(parameters):
+        if not isinstance(parameter, dict) or not isinstance(parameter.get("name"), str):
+            report("error", f"{where}[{index}]", "needs a name")
+            continue
+        name = parameter["name"]
+        if name in names:
+            report("error", f"{where}.{name}", "defined twice")
+        names.append(name)
+        kind = parameter.get("type")
+        if kind not in PARAMETER_TYPES:
+            report("error", f"{where}.{name}", f"type {kind!r} is not one of {', '.join(sorted(PARAMETER_TYPES))}")
+        elif kind == "array" and not isinstance(parameter.get("items"), dict):
+            report("error", f"{where}.{name}", "array parameters need `items`")
+        if not parameter.get("description"):
+            report("error", f"{where}.{name}", "needs a description")
+    return names
+
+
+def _check_statement(where: str, tool: dict, kind: ToolKind, parameters: list[str], templates: list[str], report: Any) -> None:
+    statement = tool.get("statement")
+    if kind.placeholders is None:
+        if statement is not None:
+            report("warning", where, "statement is ignored by this kind, which runs the caller's SQL")
+        return
+    if not isinstance(statement, str) or not statement.strip():
+        report("error", where, "needs a statement")
+        return
+    used_templates = {m.group(1) for m in TEMPLATE.finditer(statement)}
+    for name in sorted(used_templates - set(templates) - set(parameters)):
+        report("error", where, f"template {{{{{name}}}}} is not a parameter")
+    # Templates are expanded before the statement reaches the database
+    found = statement_placeholders(TEMPLATE.sub(" ", statement), kind.placeholders)
+    if kind.placeholders == "positional":
+        positions = {int(n) for n in found}
+        for position in sorted(p for p in positions if not 1 <= p <= len(parameters)):
+            report("error", where, f"${position} has no parameter (there are {len(parameters)})")
+        used = {parameters[p - 1] for p in positions if 1 <= p <= len(parameters)}
+    elif kind.placeholders == "question":
+        if len(found) != len(parameters):
+            report("error", where, f"{len(found)} ? placeholder(s) for {len(parameters)} parameter(s)")
+        used = set(parameters[:len(found)])
+    else:
+        sigil = ":" if kind.placeholders == "colon" else "@"
+        for name in sorted(set(found) - set(parameters)):
+            report("error", where, f"{sigil}{name} is not a parameter")
+        used = set(found)
+    for name in parameters:
+        if name not in used and name not in used_templates:
+            report("warning", f"{where}.parameters.{name}", "is never used in the statement")
+
+
+def _normalize_text(value: Any) -> Any:
+    """Trailing whitespace trimmed per line, unless a literal spans lines"""
+    if not isinstance(value, str) or "\n" not in value:
+        return value.strip() if isinstance(value, str) else value
+    if any(t.kind in ("string", "dollar", "quoted") and "\n" in t.text for t in tokenize(value)):
+        return value
+    return "\n".join(line.rstrip() for line in value.strip("\n").splitlines()).strip() + "\n"
+
+
+def _ordered(entry: dict, fields: Sequence[str]) -> dict:
+    return {**{k: entry[k] for k in fields if k in entry}, **{k: v for k, v in entry.items() if k not in fields}}
+
+
+def compile_tools_file(
+    paths: Union[str, Path, Sequence[Union[str, Path]]],
+    *,
+    env: Optional[Mapping[str, str]] = None,
+    substitute: bool = False,
+    toolset: Optional[str] = None,
+) -> CompiledToolsFile:
+    """Load, merge and check tools files; `env` turns missing ${VAR}s into errors
+
+    With `substitute`, ${VAR}s are replaced by their values from `env` in the output (which
+    then holds secrets such as passwords). `toolset` keeps only that toolset's tools.
+    """
+    paths = [str(paths)] if isinstance(paths, (str, Path)) else [str(p) for p in paths]
+    issues: list[Issue] = []
+    merged: dict[str, dict] = {section: {} for section in SECTIONS}
+    lines: dict[tuple[str, str], tuple[str, int]] = {}
+    digest = hashlib.sha256()
+    for path in paths:
+        digest.update(Path(path).read_bytes())
+        config, file_lines = load_tools_file(path, issues)
+        for section, entries in config.items():
+            if section not in SECTIONS:
+                issues.append(Issue("error", str(section), f"unknown section (expected {', '.join(SECTIONS)})", path))
+                continue
+            if not isinstance(entries, dict):
+                issues.append(Issue("error", section, "must be a mapping of name to definition", path))
+                continue
+            for name, entry in entries.items():
+                line = file_lines.get((section, name))
+                if name in merged[section]:
+                    first_path, first_line = lines[(section, name)]
+                    issues.append(Issue("error", f"{section}.{name}", f"already defined in {first_path}:{first_line}", path, line))
+                    continue
+                merged[section][name] = entry
+                lines[(section, name)] = (path, line or 0)
+
+    def report(level: str, where: str, message: str) -> None:
+        section, _, rest = where.partition(".")
+        path, line = lines.get((section, rest.split(".")[0].split("[")[0]), ("", 0))
+        issues.append(Issue(level, where, message, path or (paths[0] if len(paths) == 1 else ""), line or None))
+
+    sources, tools, toolsets = merged["sources"], merged["tools"], merged["toolsets"]
+    for name, source in sources.items():
+        where = f"sources.{name}"
+        if not isinstance(source, dict) or not source.get("kind"):
+            report("error", where, "needs a kind")
+            continue
+        required = SOURCE_FIELDS.get(source["kind"])
+        if required is None:
+            report("warning", where, f"kind {source['kind']!r} isn't one this checker knows; its fields aren't checked")
+            continue
+        missing = [f for f in required if source.get(f) in (None, "")]
+        if missing:
+            report("error", where, f"{source['kind']} sources need {', '.join(missing)}")
+
+    for name, tool in tools.items():
+        where = f"tools.{name}"
+        if not isinstance(tool, dict):
+            report("error", where, "must be a mapping")
+            continue
+        unknown = [k for k in tool if k not in TOOL_FIELDS]
+        if unknown:
+            report("warning", where, f"unknown field(s) {', '.join(map(str, unknown))}")
+        if not tool.get("description"):
+            report("error", where, "needs a description")
+        parameters = _check_parameters(f"{where}.parameters", tool.get("parameters"), report)
+        templates = _check_parameters(f"{where}.templateParameters", tool.get("templateParameters"), report)
+        source = sources.get(tool.get("source"))
+        if tool.get("source") is None:
+            report("error", where, "needs a source")
+        elif source is None:
+            report("error", where, f"source {tool['source']!r} is not defined")
+        kind = TOOL_KINDS.get(tool.get("kind"))
+        if kind is None:
+            report("warning", where, f"kind {tool.get('kind')!r} isn't one this checker knows; its statement isn't checked")
+            continue
+        if isinstance(source, dict) and source.get("kind") in SOURCE_FIELDS and source["kind"] not in kind.sources:
+            report("error", where, f"{tool['kind']} tools need a {' or '.join(kind.sources)} source, not {source['kind']}")
+        _check_statement(where, tool, kind, parameters, templates, report)
+
+    for name, members in toolsets.items():
+        if not isinstance(members, list):
+            report("error", f"toolsets.{name}", "must be a list of tool names")
+            continue
+        for tool_name in members:
+            if tool_name not in tools:
+                report("error", f"toolsets.{name}", f"tool {tool_name!r} is not defined")
+
+    if toolset is not None:
+        if toolset not in toolsets:
+            raise ConfigError(f"No toolset {toolset!r}; defined: {', '.join(toolsets) or 'none'}")
+        keep = [t for t in toolsets[toolset] if t in tools]
+        tools = {t: tools[t] for t in keep}
+        toolsets = {toolset: keep}
+        used = {t.get("source") for t in tools.values() if isinstance(t, dict)}
+        sources = {n: s for n, s in sources.items() if n in used}
+    else:
+        used = {t.get("source") for t in tools.values() if isinstance(t, dict)}
+        for name in sources:
+            if name not in used:
+                report("warning", f"sources.{name}", "is not used by any tool, but the server still connects to it at startup")
+
+    config: dict = {}
+    if sources:
+        config["sources"] = {n: s for n, s in sorted(sources.items())}
+    if merged["authServices"]:
+        config["authServices"] = dict(sorted(merged["authServices"].items()))
+    if tools:
+        config["tools"] = {
+            n: {k: _normalize_text(v) if k in ("statement", "description") else v for k, v in _ordered(t, TOOL_FIELDS).items()}
+            if isinstance(t, dict) else t
+            for n, t in sorted(tools.items())
+        }
+        for tool in config["tools"].values():
+            for key in ("parameters", "templateParameters"):
+                if isinstance(tool, dict) and isinstance(tool.get(key), list):
+                    tool[key] = [
+                        {k: _normalize_text(v) if k == "description" else v for k, v in _ordered(p, PARAMETER_FIELDS).items()}
+                        if isinstance(p, dict) else p
+                        for p in tool[key]
+                    ]
+    if toolsets:
+        config["toolsets"] = dict(sorted(toolsets.items()))
+
+    references = env_references(config)
+    env_vars = sorted({name for name, _ in references})
+    if env is not None:
+        for name in sorted({n for n, default in references if default is None and n not in env}):
+            issues.append(Issue("error", "env", f"${{{name}}} is not set"))
+    if substitute:
+        config = substitute_env(config, env or {})
+    return CompiledToolsFile(paths, config, digest.hexdigest(), issues, env_vars)
+
+
+def block_dumper() -> Any:
+    """Multi-line strings as | blocks, so statements stay readable"""
+    import yaml
+
+    class Dumper(yaml.SafeDumper):
+        pass
+
+    def represent_str(dumper: Any, value: str) -> Any:
+        style = "|" if "\n" in value else None
+        return dumper.represent_scalar("tag:yaml.org,2002:str", value, style=style)
+
+    Dumper.add_representer(str, represent_str)
+    return Dumper
+
+
+# -- Startup profiling ------------------------------------------------------
+
+
+async def time_startup(params: ServerParams, runs: int) -> dict:
+    """Seconds from process start to `initialize`, and for tools/list, over `runs` starts"""
+    initialize: list[float] = []
+    tools_list: list[float] = []
+    tools = 0
+    for _ in range(runs):
+        client = make_client(params)
+        started = time.perf_counter()
+        try:
+            await client.start()
+            await client.initialize()
+            initialize.append(time.perf_counter() - started)
+            listed = time.perf_counter()
+            tools = len(await client.list_tools())
+            tools_list.append(time.perf_counter() - listed)
+        finally:
+            await client.close()
+    return {"tools": tools, "initialize": summarize(initialize), "tools_list": summarize(tools_list)}
+
+
+def profile_params(path: Path, env: Mapping[str, str], args: argparse.Namespace) -> ServerParams:
+    """A stdio server on `path`: the local --toolbox binary, or the image with the file mounted"""
+    if args.toolbox:
+        command = [args.toolbox, "--tools-file", str(path), "--stdio"]
+    else:
+        command = docker_run(
+            ["--tools-file", "/config/tools.yaml", "--stdio"],
+            env_names=env,
+            volumes=[f"{path.resolve()}:/config/tools.yaml:ro", *args.volume],
+            network=args.network,
+            image=args.image,
+        )
+    return ServerParams("tools-file", command, env=dict(env))
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("paths", nargs="+", type=Path, help="Tools files, merged in order")
+    parser.add_argument("-o", "--output", type=Path, help="Write the normalized file here")
+    parser.add_argument("--toolset", help="Keep only this toolset's tools and their sources")
+    parser.add_argument("--env-file", type=Path, help="Check ${VAR}s against this .env (and --env)")
+    parser.add_argument("--env", action="append", default=[], metavar="NAME=VALUE")
+    parser.add_argument("--substitute", action="store_true", help="Write ${VAR} values into the output (secrets included)")
+    parser.add_argument("--strict", action="store_true", help="Fail on warnings too")
+    parser.add_argument("--profile", action="store_true", help="Time server startup on the original and compiled files")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--toolbox", help="Local toolbox binary to profile instead of the docker image")
+    parser.add_argument("--image", default=DOCKER_IMAGE)
+    parser.add_argument("--network")
+    parser.add_argument("--volume", action="append", default=[], help="Extra docker -v mounts for --profile")
+    parser.add_argument("--json", type=Path, help="Write the issues and profile as JSON")
+    args = parser.parse_args(argv)
+
+    env: Optional[dict[str, str]] = None
+    try:
+        if args.env_file or args.env:
+            env = load_env_file(args.env_file) if args.env_file else {}
+            for pair in args.env:
+                name, separator, value = pair.partition("=")
+                if not separator:
+                    raise ConfigError(f"--env needs NAME=VALUE, got {pair!r}")
+                env[name] = value
+        compiled = compile_tools_file(args.paths, env=env, substitute=args.substitute, toolset=args.toolset)
+    except ImportError as e:
+        print(f"✗ {e.name or 'PyYAML'} is required: pip install pyyaml")
+        return 1
+    except (ConfigError, OSError) as e:
+        print(f"✗ {e}")
+        return 1
+
+    for issue in compiled.errors:
+        print(f"✗ {issue}")
+    for issue in compiled.warnings:
+        print(f"⚠ {issue}")
+    tools = compiled.config.get("tools", {})
+    print(
+        f"{'✓' if compiled.ok else '✗'} {len(compiled.config.get('sources', {}))} source(s), {len(tools)} tool(s), "
+        f"{len(compiled.errors)} error(s), {len(compiled.warnings)} warning(s)"
+    )
+    if compiled.env_vars:
+        print(f"  Environment: {', '.join(compiled.env_vars)}")
+    failed = not compiled.ok or (args.strict and compiled.warnings)
+    if args.output and not failed:
+        compiled.write(args.output)
+        print(f"✓ Wrote {args.output} ({args.output.stat().st_size} bytes)")
+
+    profile: dict[str, dict] = {}
+    if args.profile and not failed:
+        targets = {}
+        if len(args.paths) == 1:
+            targets["original"] = args.paths[0]
+        if args.output:
+            targets["compiled"] = args.output
+        for label, path in targets.items():
+            try:
+                profile[label] = asyncio.run(time_startup(profile_params(path, env or {}, args), args.runs))
+            except (McpError, TransportClosed, OSError) as e:
+                print(f"✗ {label}: server failed to start: {e}")
+                failed = True
+                continue
+            result = profile[label]
+            print(
+                f"  {label:<9} initialize p50 {result['initialize'].get('p50_ms', float('nan')):7.0f} ms   "
+                f"tools/list p50 {result['tools_list'].get('p50_ms', float('nan')):6.1f} ms   {result['tools']} tools"
+            )
+    if args.json:
+        args.json.write_text(json.dumps({
+            "paths": compiled.paths,
+            "sha256": compiled.sha256,
+            "env": compiled.env_vars,
+            "issues": [vars(i) for i in compiled.issues],
+            "profile": profile,
+        }, indent=2))
+        print(f"✓ Wrote {args.json}")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
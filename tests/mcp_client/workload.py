@@ -0,0 +1,445 @@
+#!/usr/bin/env python3
+"""
+Turn repeated ad-hoc execute_sql queries into parameterized tools
+Reads captured tools/call traffic (proxy --capture, see capture.py), replaces the literals of
+each read query with placeholders and groups the calls by the resulting shape. Each shape seen
+at least --min-calls times becomes a `<dialect>-sql` tool, e.g. postgres-sql with $1..$n:
+- literals that vary between calls become typed `parameters` (integer, float or string);
+- literals that never vary stay inline.
+A parameterized statement is prepared once per connection and its plan reused. Ad-hoc SQL is
+planned on every call, and each call sends the whole statement.
+
+Left alone: writes, multi-statement calls, ORDER/GROUP BY positions, type modifiers such as
+varchar(64), typed literals such as DATE '2024-01-01', and TOP n.
+
+With --base, the tools are merged into that tools file (e.g. images/redshift/redshift.yaml),
+checked with tools_file.compile_tools_file and written normalized. workload_bench.py compares
+the generated tools with the execute_sql calls they replace.
+
+Usage (from tests/):
+    python3 -m mcp_client.workload /tmp/redshift-calls.jsonl
+    python3 -m mcp_client.workload /tmp/redshift-calls.jsonl --backend redshift \\
+        --base ../images/redshift/redshift.yaml -o /tmp/redshift-generated.yaml
+"""
+
+import argparse
+import re
+import sys
+import tempfile
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Iterable, Optional, Union
+
+from .capture import read_capture
+from .errors import ConfigError
+from .sqltext import KEYWORDS, classify, split_statements, tokenize
+from .tools_file import TOOL_KINDS, block_dumper, compile_tools_file
+
+MIN_CALLS = 5
+MAX_TOOLS = 20
+
+# Tool kind generated per backend; its placeholder style comes from tools_file.TOOL_KINDS
+BACKEND_TOOL_KINDS = {
+    "postgres": "postgres-sql",
+    "redshift": "postgres-sql",
+    "mysql": "mysql-sql",
+    "sqlserver": "mssql-sql",
+    "sqlite": "sqlite-sql",
+    "spanner": "spanner-sql",
+    "bigquery": "bigquery-sql",
+}
+
+# A literal right after one of these (or in its parentheses) is part of a type, not a value
+TYPE_WORDS = frozenset("""
+    BIT CHAR CHARACTER DATE DATETIME DATETIME2 DATETIMEOFFSET DECIMAL FLOAT INTERVAL NCHAR NUMERIC
+    NVARCHAR TIME TIMESTAMP TIMESTAMPTZ VARBINARY VARCHAR
+""".split())
+CLAUSE_WORDS = frozenset({"FROM", "WHERE", "HAVING", "LIMIT", "OFFSET", "FETCH", "UNION", "EXCEPT", "INTERSECT", "WINDOW"})
+NOT_NAMES = KEYWORDS | frozenset({"ILIKE", "SIMILAR", "CAST", "COALESCE", "LOWER", "UPPER"})
+_NAME = re.compile(r"[^a-z0-9_]+")
+_NUMBER = re.compile(r"(?:\d+(?:\.\d*)?|\.\d+)(?:[eE][+-]?\d+)?")
+
+
+@dataclass
+class Literal:
+    kind: str  # string | integer | float
+    value: Any
+    text: str  # as written in the statement
+    hint: str  # name guessed from the surrounding SQL
+
+
+@dataclass
+class Parameterized:
+    shape: str  # normalized statement with ? for each literal
+    parts: list[Union[str, int]]  # text pieces and literal indexes, to render placeholders into
+    literals: list[Literal]
+
+
+def _literal(token_kind: str, text: str) -> Optional[tuple[str, Any]]:
+    if token_kind == "string":
+        # Plain '...' strings only; E'', N'', X'' and friends keep their prefix semantics
+        return ("string", text[1:-1].replace("''", "'")) if text.startswith("'") and text.endswith("'") and len(text) > 1 else None
+    if not _NUMBER.fullmatch(text):
+        # e.g. a hex 0x1F or a number glued to a name: left inline
+        return None
+    if text.isdigit():
+        return "integer", int(text)
+    return "float", float(text)
+
+
+def parameterize(sql: str) -> Optional[Parameterized]:
+    """The statement with its literals taken out, or None when it can't be (writes, several statements)"""
+    if len(split_statements(sql)) != 1 or classify(sql) == "write":
+        return None
+    tokens = [t for t in tokenize(sql) if t.kind != "comment"]
+    # Numbers are single-character "other" tokens; join runs like 1 2 . 5 or 1 e + 5 into one,
+    # along with any name glued to a number (0x1F), which _literal then leaves inline
+    merged: list[tuple[str, str]] = []
+    for token in tokens:
+        previous = merged[-1] if merged else None
+        number = previous is not None and previous[0] == "number"
+        if number and (token.kind == "word" or (token.text in ("+", "-") and previous[1][-1] in "eE")):
+            merged[-1] = ("number", previous[1] + token.text)
+            continue
+        if token.kind == "other" and (token.text.isdigit() or token.text == "."):
+            if number and (token.text.isdigit() or not re.search(r"[.eE]", previous[1])):
+                merged[-1] = ("number", previous[1] + token.text)
+                continue
+            if token.text.isdigit() and previous == ("other", "."):
+                merged[-1] = ("number", "." + token.text)
+                continue
+            if token.text.isdigit():
+                merged.append(("number", token.text))
+                continue
+        merged.append((token.kind, token.text))
+
+    parts: list[Union[str, int]] = []
+    literals: list[Literal] = []
+    shape: list[str] = []
+    significant: list[tuple[str, str]] = []  # (kind, upper-cased text) of tokens so far
+    depth = 0
+    type_parens: list[int] = []  # depths of parentheses opened right after a type word
+    positions_at: Optional[int] = None  # depth of an ORDER/GROUP BY list
+    pending_space = False
+    for kind, text in merged:
+        if kind == "space":
+            pending_space = bool(shape)
+            continue
+        if pending_space:
+            parts.append(" ")
+            shape.append(" ")
+            pending_space = False
+        upper = text.upper()
+        previous = significant[-1] if significant else ("", "")
+        literal = None
+        if kind in ("number", "string") and previous[1] not in ("$", ":", "@", "?") and not type_parens:
+            after_by = positions_at == depth and previous[1] in ("BY", ",")
+            typed = previous[0] == "word" and previous[1] in TYPE_WORDS
+            top = previous[1] == "TOP"
+            if not (after_by or typed or top):
+                literal = _literal(kind, text)
+        if literal is not None:
+            literals.append(Literal(literal[0], literal[1], text, _hint(significant)))
+            parts.append(len(literals) - 1)
+            shape.append("?")
+        else:
+            if kind == "word" and upper in KEYWORDS:
+                text = upper
+            parts.append(text)
+            shape.append(text)
+        if text == "(":
+            depth += 1
+            if previous[0] == "word" and previous[1] in TYPE_WORDS:
+                type_parens.append(depth)
+        elif text == ")":
+            if type_parens and type_parens[-1] == depth:
+                type_parens.pop()
+            if positions_at == depth:
+                positions_at = None
+            depth -= 1
+        elif kind == "word" and upper == "BY" and previous[1] in ("ORDER", "GROUP"):
+            positions_at = depth
+        elif kind == "word" and upper in CLAUSE_WORDS and positions_at == depth:
+            positions_at = None
+        significant.append((kind, upper))
+    while parts and parts[-1] in (";", " "):
+        parts.pop()
+        shape.pop()
+    return Parameterized("".join(shape), parts, literals)
+
+
+def _hint(significant: list[tuple[str, str]]) -> str:
+    """Column a literal is compared with (or LIMIT / OFFSET), from the few tokens before it"""
+    for kind, text in reversed(significant[-6:]):
+        if kind == "word" and text in ("LIMIT", "OFFSET"):
+            return text.lower()
+        if kind in ("word", "quoted") and text not in NOT_NAMES:
+            name = _NAME.sub("_", text.strip('"`').lower()).strip("_")
+            return name if name and not name[0].isdigit() else "value"
+    return "value"
+
+
+# -- Workload analysis -------------------------------------------------------
+
+
+@dataclass
+class Observed:
+    sql: str
+    literals: list[Literal]
+
+
+@dataclass
+class Shape:
+    shape: str
+    parts: list[Union[str, int]]
+    calls: list[Observed] = field(default_factory=list)
+
+    @property
+    def count(self) -> int:
+        return len(self.calls)
+
+    def varying(self, index: int) -> bool:
+        first = self.calls[0].literals[index].text
+        return any(call.literals[index].text != first for call in self.calls)
+
+    def slot_type(self, index: int) -> str:
+        """integer or float when every call had a number there, otherwise string"""
+        kinds = {call.literals[index].kind for call in self.calls}
+        if "string" in kinds:
+            return "string"
+        return "float" if "float" in kinds else "integer"
+
+
+@dataclass
+class Workload:
+    tool: str
+    shapes: dict[str, Shape] = field(default_factory=dict)
+    calls: int = 0
+    skipped: int = 0  # writes, multi-statement and non-SQL calls of `tool`
+    other_tools: dict[str, int] = field(default_factory=dict)
+
+    def hot(self, min_calls: int = MIN_CALLS, limit: int = MAX_TOOLS) -> list[Shape]:
+        ranked = sorted(self.shapes.values(), key=lambda s: -s.count)
+        return [s for s in ranked if s.count >= min_calls][:limit]
+
+
+def analyze(calls: Iterable[tuple[str, dict]], *, tool: str = "execute_sql") -> Workload:
+    """Group the `tool` calls by statement shape"""
+    workload = Workload(tool)
+    for name, arguments in calls:
+        if name != tool:
+            workload.other_tools[name] = workload.other_tools.get(name, 0) + 1
+            continue
+        workload.calls += 1
+        sql = arguments.get("sql")
+        parameterized = parameterize(sql) if isinstance(sql, str) else None
+        if parameterized is None:
+            workload.skipped += 1
+            continue
+        shape = workload.shapes.get(parameterized.shape)
+        if shape is None:
+            shape = workload.shapes[parameterized.shape] = Shape(parameterized.shape, parameterized.parts)
+        shape.calls.append(Observed(sql, parameterized.literals))
+    return workload
+
+
+# -- Tool generation ---------------------------------------------------------
+
+
+@dataclass
+class GeneratedTool:
+    name: str
+    shape: Shape
+    statement: str
+    parameters: list[dict]
+    slots: dict[int, str]  # literal index -> parameter name, for the varying literals
+
+    def arguments(self, call: Observed) -> dict:
+        """The tool arguments that reproduce one observed call"""
+        arguments = {}
+        for index, name in self.slots.items():
+            literal = call.literals[index]
+            # A number in a slot other calls filled with strings is passed as written
+            mixed = literal.kind != "string" and self.shape.slot_type(index) == "string"
+            arguments[name] = literal.text if mixed else literal.value
+        return arguments
+
+    def definition(self, source: str, kind: str, tool: str) -> dict:
+        return {
+            "kind": kind,
+            "source": source,
+            "description": (
+                f"Parameterized form of a query seen {self.shape.count} times in {tool} calls. "
+                f"Prefer it to {tool} for this query shape.\n"
+            ),
+            "parameters": self.parameters,
+            "statement": self.statement + "\n",
+        }
+
+
+def _tool_name(shape: Shape, taken: set[str], prefix: str) -> str:
+    words = [p for p in shape.parts if isinstance(p, str) and p.strip()]
+    table = "rows"
+    for i, word in enumerate(words[:-1]):
+        if word == "FROM":
+            # schema.table -> table
+            following = words[i + 1:i + 4]
+            candidate = following[2] if len(following) == 3 and following[1] == "." else following[0]
+            table = _NAME.sub("_", candidate.strip('"`').lower()).strip("_") or table
+            break
+    base = f"{prefix}query_{table}"
+    name, n = base, 2
+    while name in taken:
+        name, n = f"{base}_{n}", n + 1
+    taken.add(name)
+    return name
+
+
+def generate_tools(
+    workload: Workload,
+    backend: str,
+    *,
+    min_calls: int = MIN_CALLS,
+    max_tools: int = MAX_TOOLS,
+    prefix: str = "",
+    taken: Iterable[str] = (),
+) -> list[GeneratedTool]:
+    """A tool per hot shape, in `backend`'s placeholder style; `taken` names are avoided"""
+    kind = BACKEND_TOOL_KINDS.get(backend)
+    if kind is None:
+        raise ConfigError(f"No parameterized tool kind for {backend!r}; expected one of {', '.join(BACKEND_TOOL_KINDS)}")
+    style = TOOL_KINDS[kind].placeholders
+    names = set(taken)
+    generated = []
+    for shape in workload.hot(min_calls, max_tools):
+        slots: dict[int, str] = {}
+        parameters: list[dict] = []
+        for index in range(len(shape.calls[0].literals)):
+            if not shape.varying(index):
+                continue
+            hint = shape.calls[0].literals[index].hint
+            name, n = hint, 2
+            while name in slots.values():
+                name, n = f"{hint}_{n}", n + 1
+            slots[index] = name
+            examples = sorted({repr(c.literals[index].value) for c in shape.calls[:20]})[:3]
+            parameters.append({
+                "name": name,
+                "type": shape.slot_type(index),
+                "description": f"{hint.replace('_', ' ').capitalize()}, e.g. {', '.join(examples)}",
+            })
+        if not slots:
+            # The same statement every time: better served by the result cache than a tool
+            continue
+        order = list(slots)
+        pieces = []
+        for part in shape.parts:
+            if isinstance(part, str):
+                pieces.append(part)
+            elif part not in slots:
+                pieces.append(shape.calls[0].literals[part].text)
+            elif style == "positional":
+                pieces.append(f"${order.index(part) + 1}")
+            elif style == "question":
+                pieces.append("?")
+            else:
+                pieces.append(f"{':' if style == 'colon' else '@'}{slots[part]}")
+        tool = GeneratedTool(_tool_name(shape, names, prefix), shape, "".join(pieces), parameters, slots)
+        generated.append(tool)
+    return generated
+
+
+def tools_config(tools: list[GeneratedTool], source: str, backend: str, tool: str = "execute_sql") -> dict:
+    kind = BACKEND_TOOL_KINDS[backend]
+    return {"tools": {t.name: t.definition(source, kind, tool) for t in tools}}
+
+
+def _base_source(base: dict, backend: str) -> Optional[str]:
+    """First source in `base` that the backend's generated tool kind can run against"""
+    kinds = TOOL_KINDS[BACKEND_TOOL_KINDS[backend]].sources
+    for name, source in (base.get("sources") or {}).items():
+        if isinstance(source, dict) and source.get("kind") in kinds:
+            return name
+    return None
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("captures", nargs="+", type=Path, help="Capture files (JSON lines)")
+    parser.add_argument("--backend", default="postgres", help=f"Dialect of the tools: {', '.join(BACKEND_TOOL_KINDS)}")
+    parser.add_argument("--tool", default="execute_sql", help="The free-form SQL tool whose calls to analyze")
+    parser.add_argument("--min-calls", type=int, default=MIN_CALLS)
+    parser.add_argument("--max-tools", type=int, default=MAX_TOOLS)
+    parser.add_argument("--prefix", default="", help="Prefix for generated tool names")
+    parser.add_argument("--base", type=Path, help="Tools file to merge the generated tools into")
+    parser.add_argument("--source", help="Source for the generated tools (default: the first fitting one in --base)")
+    parser.add_argument("-o", "--output", type=Path, help="Write the tools file here")
+    parser.add_argument("--top", type=int, default=10, help="Shapes to list")
+    args = parser.parse_args(argv)
+
+    calls = [call for path in args.captures for call in read_capture(path)]
+    workload = analyze(calls, tool=args.tool)
+    print(
+        f"{workload.calls} {args.tool} call(s), {len(workload.shapes)} shape(s), "
+        f"{workload.skipped} skipped (writes, several statements)"
+    )
+    for shape in workload.hot(1, args.top):
+        share = 100 * shape.count / max(workload.calls, 1)
+        text = shape.shape if len(shape.shape) <= 100 else shape.shape[:97] + "..."
+        print(f"  {shape.count:>6} {share:5.1f}%  {text}")
+
+    try:
+        base: dict = {}
+        if args.base:
+            import yaml
+
+            base = yaml.safe_load(args.base.read_text()) or {}
+        tools = generate_tools(
+            workload,
+            args.backend,
+            min_calls=args.min_calls,
+            max_tools=args.max_tools,
+            prefix=args.prefix,
+            taken=(base.get("tools") or {}).keys(),
+        )
+        covered = sum(t.shape.count for t in tools)
+        print(f"✓ {len(tools)} tool(s) covering {covered} of {workload.calls} call(s)")
+        for tool in tools:
+            print(f"  {tool.name}({', '.join(p['name'] + ': ' + p['type'] for p in tool.parameters)})")
+        if not args.output:
+            return 0
+        source = args.source or _base_source(base, args.backend)
+        if source is None:
+            raise ConfigError("Give --source, or a --base with a source the generated tools can use")
+        config = tools_config(tools, source, args.backend, args.tool)
+        if not args.base:
+            args.output.write_text(_dump(config))
+            print(f"✓ Wrote {args.output} (tools only; add them to a file that defines {source!r})")
+            return 0
+        with tempfile.TemporaryDirectory() as tmp:
+            generated = Path(tmp) / f"{args.output.stem}-generated.yaml"
+            generated.write_text(_dump(config))
+            compiled = compile_tools_file([args.base, generated])
+    except ImportError as e:
+        print(f"✗ {e.name or 'PyYAML'} is required: pip install pyyaml")
+        return 1
+    except (ConfigError, OSError) as e:
+        print(f"✗ {e}")
+        return 1
+    for issue in compiled.errors:
+        print(f"✗ {issue}")
+    if not compiled.ok:
+        return 1
+    compiled.write(args.output)
+    print(f"✓ Wrote {args.output}")
+    return 0
+
+
+def _dump(config: dict) -> str:
+    import yaml
+
+    return yaml.dump(config, Dumper=block_dumper(), sort_keys=False, allow_unicode=True, width=1000)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,193 @@
+#!/usr/bin/env python3
+"""
+Generated parameterized tools vs the execute_sql calls they replace
+Re-analyzes a capture the way workload.py does, then replays up to --calls observed calls per
+generated tool against one server, each call twice:
+- execute_sql with the SQL as captured;
+- the generated tool with the literals of that call as arguments.
+The two run back to back, alternating which goes first, so drift affects both equally. The
+server must have the generated tools loaded (toolbox --tools-file with the file workload.py
+wrote); tools it doesn't list are skipped.
+
+Usage (from tests/):
+    python3 -m mcp_client.workload_bench /tmp/redshift-calls.jsonl --backend redshift -- \\
+        docker run --rm -i --env-file redshift/.env -v /tmp/redshift-generated.yaml:/config/tools.yaml \\
+        us-central1-docker.pkg.dev/database-toolbox/toolbox/toolbox:latest --tools-file /config/tools.yaml --stdio
+    python3 -m mcp_client.workload_bench /tmp/redshift-calls.jsonl --backend redshift --url http://127.0.0.1:5000/mcp
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Optional
+
+from .base import McpClient
+from .capture import read_capture
+from .client import make_client
+from .errors import ConfigError, McpError, TransportClosed
+from .params import ServerParams
+from .stats import summarize
+from .workload import MAX_TOOLS, MIN_CALLS, GeneratedTool, analyze, generate_tools
+
+VARIANTS = ("execute_sql", "tool")
+TIMEOUT = 120.0
+
+
+@dataclass
+class VariantResult:
+    samples: list[float] = field(default_factory=list)
+    bytes_out: int = 0
+    bytes_in: int = 0
+    failures: int = 0
+
+    def summary(self) -> dict[str, float]:
+        return summarize(self.samples)
+
+
+@dataclass
+class ToolResult:
+    tool: str
+    shape: str
+    observed: int
+    execute_sql: VariantResult = field(default_factory=VariantResult)
+    generated: VariantResult = field(default_factory=VariantResult)
+
+    def speedup(self) -> Optional[float]:
+        before, after = self.execute_sql.summary().get("p50_ms"), self.generated.summary().get("p50_ms")
+        return before / after if before and after else None
+
+
+async def timed_call(client: McpClient, result: VariantResult, name: str, arguments: dict) -> None:
+    request = json.dumps({"name": name, "arguments": arguments}, default=str)
+    started = time.perf_counter()
+    try:
+        response = await client.call_tool(name, arguments, timeout=TIMEOUT)
+    except (McpError, asyncio.TimeoutError):
+        result.failures += 1
+        return
+    elapsed = time.perf_counter() - started
+    if response.get("isError"):
+        result.failures += 1
+        return
+    result.samples.append(elapsed)
+    result.bytes_out += len(request)
+    result.bytes_in += len(json.dumps(response, default=str))
+
+
+async def run(params: ServerParams, tools: list[GeneratedTool], sql_tool: str, per_tool: int) -> list[ToolResult]:
+    results = []
+    async with make_client(params) as client:
+        await client.handshake()
+        listed = {t["name"] for t in await client.list_tools()}
+        for tool in tools:
+            if tool.name not in listed:
+                print(f"✗ {tool.name}: not listed by the server (was it started with the generated tools file?)")
+                continue
+            result = ToolResult(tool.name, tool.shape.shape, tool.shape.count)
+            # One untimed pair so the first timed one doesn't pay for a cold plan or connection
+            warmup = tool.shape.calls[0]
+            await timed_call(client, VariantResult(), sql_tool, {"sql": warmup.sql})
+            await timed_call(client, VariantResult(), tool.name, tool.arguments(warmup))
+            for i, call in enumerate(tool.shape.calls[:per_tool]):
+                pair = [
+                    (result.execute_sql, sql_tool, {"sql": call.sql}),
+                    (result.generated, tool.name, tool.arguments(call)),
+                ]
+                for variant, name, arguments in pair if i % 2 == 0 else reversed(pair):
+                    await timed_call(client, variant, name, arguments)
+            results.append(result)
+            print(f"✓ {tool.name}: {len(result.generated.samples)} call(s)")
+    return results
+
+
+def format_results(results: list[ToolResult]) -> list[str]:
+    lines = [
+        f"{'tool':<30} {'p50 (ms)':>20} {'p95 (ms)':>20} {'speedup':>8} {'bytes/call':>20}",
+        f"{'':<30} {'sql → tool':>20} {'sql → tool':>20} {'':>8} {'sql → tool':>20}",
+    ]
+    for r in results:
+        before, after = r.execute_sql.summary(), r.generated.summary()
+        if not before or not after:
+            lines.append(f"{r.tool:<30} ✗ no successful calls ({r.execute_sql.failures} sql, {r.generated.failures} tool failure(s))")
+            continue
+        per_call = [
+            (v.bytes_out + v.bytes_in) / len(v.samples) for v in (r.execute_sql, r.generated)
+        ]
+        speedup = r.speedup()
+        lines.append(
+            f"{r.tool:<30} "
+            f"{before['p50_ms']:>9.2f} → {after['p50_ms']:<8.2f} "
+            f"{before['p95_ms']:>9.2f} → {after['p95_ms']:<8.2f} "
+            f"{speedup or 0:>7.2f}x "
+            f"{per_call[0]:>9.0f} → {per_call[1]:<8.0f}"
+        )
+        for label, variant in (("execute_sql", r.execute_sql), ("tool", r.generated)):
+            if variant.failures:
+                lines.append(f"  ✗ {label}: {variant.failures} failed call(s)")
+    return lines
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    argv = list(sys.argv[1:] if argv is None else argv)
+    command: list[str] = []
+    if "--" in argv:
+        split = argv.index("--")
+        argv, command = argv[:split], argv[split + 1:]
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("captures", nargs="+", type=Path, help="Capture files (JSON lines)")
+    parser.add_argument("--backend", default="postgres", help="Dialect of the generated tools, as for workload.py")
+    parser.add_argument("--url", help="Benchmark a shared HTTP-mode server instead of the command after --")
+    parser.add_argument("--tool", default="execute_sql", help="The free-form SQL tool whose calls to replay")
+    parser.add_argument("--min-calls", type=int, default=MIN_CALLS)
+    parser.add_argument("--max-tools", type=int, default=MAX_TOOLS)
+    parser.add_argument("--prefix", default="", help="Prefix the tools were generated with")
+    parser.add_argument("--calls", type=int, default=50, help="Observed calls to replay per tool")
+    parser.add_argument("--json", type=Path, help="Write every result as JSON")
+    args = parser.parse_args(argv)
+    if not command and not args.url:
+        parser.error("give --url or the command of a server that has the generated tools after --")
+
+    workload = analyze((call for path in args.captures for call in read_capture(path)), tool=args.tool)
+    try:
+        tools = generate_tools(workload, args.backend, min_calls=args.min_calls, max_tools=args.max_tools, prefix=args.prefix)
+    except ConfigError as e:
+        print(f"✗ {e}")
+        return 1
+    if not tools:
+        print(f"✗ No shape was seen {args.min_calls} times with varying literals")
+        return 1
+    if args.url:
+        params = ServerParams(args.backend, [], url=args.url)
+    else:
+        params = ServerParams(os.path.basename(command[0]), command)
+
+    print(f"Replaying up to {args.calls} call(s) for each of {len(tools)} tool(s)")
+    try:
+        results = asyncio.run(run(params, tools, args.tool, args.calls))
+    except (McpError, TransportClosed, OSError) as e:
+        print(f"✗ {e}")
+        return 1
+    print()
+    for line in format_results(results):
+        print(line)
+    if args.json:
+        report = {
+            "backend": args.backend,
+            "timestamp": time.time(),
+            "results": [
+                {**asdict(r), "latency": {"execute_sql": r.execute_sql.summary(), "tool": r.generated.summary()}}
+                for r in results
+            ],
+        }
+        args.json.write_text(json.dumps(report, indent=2))
+        print(f"✓ Wrote {args.json}")
+    return 0 if results and all(r.generated.samples for r in results) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,6 +1,10 @@
 #!/bin/bash
 set -e
 
+# Always run from this script's directory
+SCRIPT_DIR="$(cd "$(dirname "${BASH_SOURCE[0]}")" && pwd)"
+cd "$SCRIPT_DIR"
+
 echo "=== MySQL MCP Server Test ==="
 echo
 
@@ -8,7 +12,8 @@ echo
 echo "1. Starting MySQL container..."
 docker-compose up -d
 echo "   Waiting for MySQL to be ready..."
-sleep 10  # MySQL takes longer to start than PostgreSQL
+# Waits on the compose healthcheck, then on an MCP initialize handshake
+(cd .. && python3 -m mcp_client.readiness mysql)
 
 # Check if mysql is healthy
 docker-compose ps
@@ -1,6 +1,10 @@
 #!/bin/bash
 set -e
 
+# Always run from this script's directory
+SCRIPT_DIR="$(cd "$(dirname "${BASH_SOURCE[0]}")" && pwd)"
+cd "$SCRIPT_DIR"
+
 echo "=== PostgreSQL MCP Server Test ==="
 echo
 
@@ -8,7 +12,8 @@ echo
 echo "1. Starting PostgreSQL container..."
 docker-compose up -d
 echo "   Waiting for PostgreSQL to be ready..."
-sleep 5
+# Waits on the compose healthcheck, then on an MCP initialize handshake
+(cd .. && python3 -m mcp_client.readiness postgres)
 
 # Check if postgres is healthy
 docker-compose ps
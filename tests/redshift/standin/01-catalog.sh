@@ -0,0 +1,56 @@
+#!/bin/sh
+# Seeds the Redshift stand-in with a catalog shaped like a warehouse, so list_tables and
+# lookup_schema have realistic work to do: CATALOG_SCHEMAS schemas of CATALOG_TABLES tables
+# with CATALOG_COLUMNS columns each, of the types Redshift tables commonly use.
+# Also adds a few Redshift functions that plain PostgreSQL lacks.
+set -e
+
+psql -v ON_ERROR_STOP=1 -U "$POSTGRES_USER" -d "$POSTGRES_DB" \
+    -v schemas="${CATALOG_SCHEMAS:-20}" -v tables="${CATALOG_TABLES:-100}" -v columns="${CATALOG_COLUMNS:-20}" <<'EOSQL'
+CREATE FUNCTION getdate() RETURNS timestamp LANGUAGE sql STABLE AS 'SELECT now()::timestamp';
+CREATE FUNCTION nvl(anyelement, anyelement) RETURNS anyelement LANGUAGE sql IMMUTABLE AS 'SELECT coalesce($1, $2)';
+CREATE FUNCTION len(text) RETURNS integer LANGUAGE sql IMMUTABLE AS 'SELECT length($1)';
+
+CREATE FUNCTION pg_temp.seed_catalog(schemas int, tables int, columns int) RETURNS void LANGUAGE plpgsql AS $$
+DECLARE
+    areas text[] := ARRAY['sales', 'marketing', 'finance', 'product', 'ops', 'support', 'analytics', 'hr'];
+    kinds text[] := ARRAY['fact', 'dim', 'stg', 'agg', 'raw'];
+    subjects text[] := ARRAY['orders', 'customers', 'events', 'sessions', 'invoices', 'products', 'payments', 'shipments'];
+    -- Column types Redshift tables commonly use, and a default for each
+    types text[] := ARRAY[
+        'bigint', 'integer', 'varchar(256)', 'numeric(18,2)', 'timestamp', 'date', 'boolean', 'varchar(65535)',
+        'double precision', 'char(2)'
+    ];
+    defaults text[] := ARRAY['0', '0', '''''', '0', 'now()', 'current_date', 'false', '''''', '0', ''''''];
+    k int;
+    schema_name text;
+    definition text;
+BEGIN
+    FOR s IN 1..schemas LOOP
+        schema_name := format('%s_%s', areas[1 + (s - 1) % array_length(areas, 1)], lpad(s::text, 2, '0'));
+        EXECUTE format('CREATE SCHEMA %I', schema_name);
+        FOR t IN 1..tables LOOP
+            definition := 'id bigint NOT NULL';
+            FOR c IN 2..columns LOOP
+                k := 1 + (c * 7 + t) % array_length(types, 1);
+                definition := definition || format(
+                    ', %I %s%s',
+                    format('%s_%s', subjects[1 + (c + t) % array_length(subjects, 1)], c),
+                    types[k],
+                    CASE WHEN c % 5 = 0 THEN ' NOT NULL DEFAULT ' || defaults[k] ELSE '' END
+                );
+            END LOOP;
+            EXECUTE format(
+                'CREATE TABLE %I.%I (%s)',
+                schema_name,
+                format('%s_%s_%s', kinds[1 + t % array_length(kinds, 1)], subjects[1 + t % array_length(subjects, 1)], lpad(t::text, 4, '0')),
+                definition
+            );
+        END LOOP;
+    END LOOP;
+END
+$$;
+
+SELECT pg_temp.seed_catalog(:schemas, :tables, :columns);
+ANALYZE;
+EOSQL
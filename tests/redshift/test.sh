@@ -8,13 +8,27 @@ cd "$SCRIPT_DIR"
 echo "=== Redshift MCP Server Test ==="
 echo
 
-echo "1. Testing MCP server (stdio) using tools file and .env (real Redshift)..."
-python3 test_mcp.py
+if [ -f .env ]; then
+    echo "1. Testing MCP server (stdio) using tools file and .env (real Redshift)..."
+    python3 test_mcp.py
 
-echo -e "\n2. Test completed!"
+    echo -e "\n2. Test completed!"
 
-echo -e "\n3. No containers to clean up."
+    echo -e "\n3. No containers to clean up."
+else
+    # No cluster configured: run against the local stand-in (PostgreSQL with a large catalog)
+    echo "1. Starting the Redshift stand-in (no .env found)..."
+    docker-compose up -d
+    # Waits for seeding to finish (the healthcheck), then on an MCP initialize handshake
+    (cd .. && python3 -m mcp_client.readiness redshift)
 
-echo -e "\n✅ Redshift test passed!"
+    echo -e "\n2. Testing MCP server (stdio) with images/redshift/redshift.yaml..."
+    python3 test_mcp.py
+
+    echo -e "\n3. Test completed!"
 
+    echo -e "\n4. Cleaning up..."
+    docker-compose down -v
+fi
 
+echo -e "\n✅ Redshift test passed!"
@@ -2,38 +2,78 @@
 """
 Simple MCP test for Amazon Redshift
 Uses a custom tools file as described in README and tests stdio mode.
+Without a .env (or when given a port), runs against the local stand-in from docker-compose.yml:
+PostgreSQL seeded with a large catalog, served with images/redshift/redshift.yaml.
 """
 
-import json
+import functools
 import os
-import subprocess
+import sqlite3
 import sys
 from pathlib import Path
+from typing import Optional
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from mcp_client import (  # noqa: E402
+    ConfigError,
+    ServerParams,
+    docker_run,
+    load_env_file,
+    smoke_test,
+    write_temp_file,
+)
+
+SCRIPT_DIR = Path(__file__).resolve().parent
+IMAGE_DIR = SCRIPT_DIR.parent.parent / "images" / "redshift"
+
+# Host ports published by docker-compose.yml (the stand-in); the first is the database port
+COMPOSE_PORTS = {"REDSHIFT_PORT": 5439}
+
+CHECKS = [
+    ("execute_sql", {"sql": "SELECT current_date;"}),
+]
+
+
+@functools.lru_cache(maxsize=None)
+def empty_schema_index() -> str:
+    """An empty schema index, as the image is built with, so lookup_schema has its source"""
+    path = write_temp_file("", prefix="redshift-schema-index-", suffix=".sqlite")
+    conn = sqlite3.connect(path)
+    conn.executescript((IMAGE_DIR / "schema-index.sql").read_text())
+    conn.close()
+    return path
+
+
+def standin_params(port: Optional[int] = None) -> ServerParams:
+    """The image's redshift.yaml, pointed at the docker-compose stand-in"""
+    env = {
+        "POSTGRES_HOST": "localhost",
+        "POSTGRES_DATABASE": "dev",
+        "POSTGRES_USER": "testuser",
+        "POSTGRES_PASSWORD": "testpass",
+        "POSTGRES_PORT": str(port or os.environ.get("REDSHIFT_PORT", "5439")),
+        "REDSHIFT_SCHEMA_INDEX": "/config/schema-index.sqlite",
+    }
+    return ServerParams(
+        name="redshift",
+        command=docker_run(
+            ["--tools-file", "/config/redshift.yaml", "--stdio"],
+            env_names=env,
+            volumes=[
+                f"{IMAGE_DIR / 'redshift.yaml'}:/config/redshift.yaml:ro",
+                f"{empty_schema_index()}:/config/schema-index.sqlite",
+            ],
+            network="host",
+        ),
+        env=env,
+    )
 
 
-def load_env_file(env_path: Path) -> dict:
-    values: dict[str, str] = {}
-    if not env_path.exists():
-        raise FileNotFoundError(f".env file not found at {env_path}")
-    for line in env_path.read_text().splitlines():
-        stripped = line.strip()
-        if not stripped or stripped.startswith("#"):
-            continue
-        if "=" not in stripped:
-            continue
-        key, value = stripped.split("=", 1)
-        key = key.strip()
-        value = value.strip().strip('"').strip("'")
-        values[key] = value
-    return values
-
-
-def test_mcp_redshift() -> bool:
-    print("Testing Redshift MCP server (stdio)...")
-
-    script_dir = Path(__file__).resolve().parent
-    env_path = script_dir / ".env"
-    env_file = load_env_file(env_path)
+def server_params(port: Optional[int] = None) -> ServerParams:
+    if port is not None or not (SCRIPT_DIR / ".env").exists():
+        return standin_params(port)
+    env_file = load_env_file(SCRIPT_DIR / ".env")
 
     # Allow POSTGRES_* aliases for local testing
     redshift_host = (env_file.get("REDSHIFT_HOST") or env_file.get("POSTGRES_HOST") or "").strip()
@@ -51,145 +91,36 @@ def test_mcp_redshift() -> bool:
         ("REDSHIFT_TOOLS_FILE", redshift_tools_file),
     ] if not val]
     if missing:
-        print(f"✗ Missing required variables in .env: {', '.join(missing)}")
-        return False
+        raise ConfigError(f"Missing required variables in .env: {', '.join(missing)}")
 
-    DOCKER_IMAGE = "us-central1-docker.pkg.dev/database-toolbox/toolbox/toolbox:latest"
-
-    # Build docker run command
-    cmd = [
-        "docker", "run", "--rm", "-i",
-        "-e", "POSTGRES_HOST",
-        "-e", "POSTGRES_DATABASE",
-        "-e", "POSTGRES_USER",
-        "-e", "POSTGRES_PASSWORD",
-        "-e", "POSTGRES_PORT",
-        "-v", f"{redshift_tools_file}:/config/redshift.yaml",
-        DOCKER_IMAGE,
-        "--tools-file", "/config/redshift.yaml",
-        "--stdio",
-    ]
-
-    child_env = {
-        **os.environ,
+    env = {
         "POSTGRES_HOST": redshift_host,
         "POSTGRES_DATABASE": redshift_database,
         "POSTGRES_USER": redshift_user,
         "POSTGRES_PASSWORD": redshift_password,
         "POSTGRES_PORT": redshift_port,
     }
-
-    process = subprocess.Popen(
-        cmd,
-        stdin=subprocess.PIPE,
-        stdout=subprocess.PIPE,
-        stderr=subprocess.PIPE,
-        text=True,
-        env=child_env,
+    return ServerParams(
+        name="redshift",
+        command=docker_run(
+            ["--tools-file", "/config/redshift.yaml", "--stdio"],
+            env_names=env,
+            volumes=[f"{redshift_tools_file}:/config/redshift.yaml"],
+        ),
+        env=env,
     )
 
+
+def test_mcp_redshift() -> bool:
+    print("Testing Redshift MCP server (stdio)...")
     try:
-        # Send initialize request
-        initialize_request = {
-            "jsonrpc": "2.0",
-            "method": "initialize",
-            "params": {
-                "protocolVersion": "1.0.0",
-                "capabilities": {},
-                "clientInfo": {"name": "test-client", "version": "1.0.0"},
-            },
-            "id": 1,
-        }
-        assert process.stdin is not None
-        process.stdin.write(json.dumps(initialize_request) + "\n")
-        process.stdin.flush()
-
-        # Read initialize response
-        assert process.stdout is not None
-        response_line = process.stdout.readline()
-        if not response_line:
-            stderr_output = process.stderr.read() if process.stderr else ""
-            print("✗ No response from server during initialize")
-            if stderr_output:
-                print(f"✗ Stderr: {stderr_output}")
-            return False
-        try:
-            response = json.loads(response_line)
-            print(
-                f"✓ Initialize response: "
-                f"{response.get('result', {}).get('serverInfo', {}).get('name', 'Unknown')}"
-            )
-        except json.JSONDecodeError:
-            stderr_output = process.stderr.read() if process.stderr else ""
-            print(f"✗ Failed to parse initialize response. Raw: {response_line}")
-            if stderr_output:
-                print(f"✗ Stderr: {stderr_output}")
-            return False
-
-        # List available tools
-        list_tools_request = {
-            "jsonrpc": "2.0",
-            "method": "tools/list",
-            "params": {},
-            "id": 2,
-        }
-        process.stdin.write(json.dumps(list_tools_request) + "\n")
-        process.stdin.flush()
-
-        response_line = process.stdout.readline()
-        if not response_line:
-            print("✗ No response to tools/list")
-            return False
-
-        response = json.loads(response_line)
-        if "result" not in response:
-            print(f"✗ Failed to list tools: {response.get('error', 'Unknown error')}")
-            return False
-
-        tools = response.get("result", {}).get("tools", [])
-        tool_names = [tool.get("name", "unknown") for tool in tools]
-        print("✓ Available tools: " + ", ".join(tool_names))
-
-        # Optionally try execute_sql if present
-        if "execute_sql" in tool_names:
-            execute_sql_request = {
-                "jsonrpc": "2.0",
-                "method": "tools/call",
-                "params": {
-                    "name": "execute_sql",
-                    "arguments": {"sql": "SELECT current_date;"},
-                },
-                "id": 3,
-            }
-            process.stdin.write(json.dumps(execute_sql_request) + "\n")
-            process.stdin.flush()
-            exec_line = process.stdout.readline()
-            if exec_line:
-                try:
-                    exec_resp = json.loads(exec_line)
-                    if "result" in exec_resp:
-                        print("✓ execute_sql call successful")
-                except json.JSONDecodeError:
-                    print(f"✗ execute_sql returned non-JSON: {exec_line[:200]}")
-
-        return len(tools) > 0
-
-    except Exception as e:
-        print(f"✗ Error: {e}")
-        stderr_output = process.stderr.read() if process.stderr else ""
-        if stderr_output:
-            print(f"✗ Stderr: {stderr_output}")
+        params = server_params()
+    except (ConfigError, FileNotFoundError) as e:
+        print(f"✗ {e}")
         return False
-    finally:
-        try:
-            process.terminate()
-            process.wait(timeout=5)
-        except Exception:
-            pass
+    return smoke_test(params, CHECKS)
 
 
 if __name__ == "__main__":
     success = test_mcp_redshift()
     sys.exit(0 if success else 1)
-
-
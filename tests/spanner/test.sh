@@ -1,17 +1,23 @@
 #!/bin/bash
 set -e
 
+# Always run from this script's directory
+SCRIPT_DIR="$(cd "$(dirname "${BASH_SOURCE[0]}")" && pwd)"
+cd "$SCRIPT_DIR"
+
 echo -e "\n=== Spanner MCP Server Test ==="
 
 # 1. Start Spanner emulator
 echo -e "\n1. Starting Spanner emulator..."
 docker-compose up -d
-sleep 10  # Give emulator time to start
+# Waits for the emulator container, then on an MCP initialize handshake against it
+(cd .. && python3 -m mcp_client.readiness spanner)
 
 # Check if emulator is running
 docker-compose ps
 
-# 2. Start MCP server - for emulator we set SPANNER_EMULATOR_HOST
+# 2. Start a shared MCP server in HTTP mode - for emulator we set SPANNER_EMULATOR_HOST
+# (listens on 127.0.0.1:5000 of the host network; test_mcp.py also tests a stdio server)
 echo -e "\n2. Testing MCP server..."
 SPANNER_PROJECT=test-project \
 SPANNER_INSTANCE=test-instance \
@@ -27,8 +33,8 @@ docker run --rm -d \
   us-central1-docker.pkg.dev/database-toolbox/toolbox/toolbox:latest \
   --prebuilt spanner
 
-# Give MCP server a moment to start
-sleep 5
+export SPANNER_MCP_URL=http://127.0.0.1:5000/mcp
+(cd .. && python3 -m mcp_client.readiness spanner --url "$SPANNER_MCP_URL")
 
 # Run the Python test script
 python3 test_mcp.py
@@ -4,121 +4,55 @@ Simple MCP test for Spanner
 Tests the MCP server can connect to Spanner emulator
 """
 
-import json
-import subprocess
+import os
 import sys
+from pathlib import Path
+from typing import Optional
 
-def test_mcp_spanner():
-    """Test Spanner MCP server connection"""
-    print("Testing Spanner MCP server...")
-    
-    # Environment variables for Spanner
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from mcp_client import ServerParams, docker_run, smoke_test  # noqa: E402
+
+# Host ports published by docker-compose.yml; the first is the emulator gRPC port
+COMPOSE_PORTS = {"SPANNER_GRPC_PORT": 9010, "SPANNER_REST_PORT": 9020}
+
+# For Spanner, we just check that we got some tools
+CHECKS: list = []
+
+
+def server_params(port: Optional[int] = None) -> ServerParams:
+    """Docker command for Spanner, using the emulator from docker-compose"""
     env = {
-        "SPANNER_PROJECT": "test-project",
-        "SPANNER_INSTANCE": "test-instance",
-        "SPANNER_DATABASE": "test-database",
-        "SPANNER_EMULATOR_HOST": "localhost:9010"
+        "SPANNER_PROJECT": os.environ.get("SPANNER_PROJECT", "test-project"),
+        "SPANNER_INSTANCE": os.environ.get("SPANNER_INSTANCE", "test-instance"),
+        "SPANNER_DATABASE": os.environ.get("SPANNER_DATABASE", "test-database"),
+        "SPANNER_EMULATOR_HOST": f"localhost:{port}" if port else os.environ.get("SPANNER_EMULATOR_HOST", "localhost:9010"),
     }
-    
-    # Docker command for Spanner
-    cmd = [
-        "docker", "run", "--rm", "-i",
-        "--network", "host",
-        "-e", "SPANNER_PROJECT",
-        "-e", "SPANNER_INSTANCE",
-        "-e", "SPANNER_DATABASE",
-        "-e", "SPANNER_EMULATOR_HOST",
-        "us-central1-docker.pkg.dev/database-toolbox/toolbox/toolbox:latest",
-        "--prebuilt", "spanner",
-        "--stdio"
-    ]
-    
-    # Start the process
-    process = subprocess.Popen(
-        cmd,
-        stdin=subprocess.PIPE,
-        stdout=subprocess.PIPE,
-        stderr=subprocess.PIPE,
-        text=True,
-        env={**env, **subprocess.os.environ}
+    return ServerParams(
+        name="spanner",
+        command=docker_run(["--prebuilt", "spanner", "--stdio"], env_names=env, network="host"),
+        env=env,
     )
-    
-    try:
-        # Send initialize request
-        initialize_request = {
-            "jsonrpc": "2.0",
-            "method": "initialize",
-            "params": {
-                "protocolVersion": "1.0.0",
-                "capabilities": {},
-                "clientInfo": {
-                    "name": "test-client",
-                    "version": "1.0.0"
-                }
-            },
-            "id": 1
-        }
-        
-        process.stdin.write(json.dumps(initialize_request) + "\n")
-        process.stdin.flush()
-        
-        # Read initialize response
-        response_line = process.stdout.readline()
-        if response_line:
-            try:
-                response = json.loads(response_line)
-                print(f"✓ Initialize response: {response.get('result', {}).get('serverInfo', {}).get('name', 'Unknown')}")
-            except json.JSONDecodeError:
-                # Check stderr for errors
-                stderr_output = process.stderr.read()
-                print(f"✗ Failed to parse response. Raw output: {response_line}")
-                if stderr_output:
-                    print(f"✗ Stderr: {stderr_output}")
-                return False
-        else:
-            print("✗ No response from server")
-            return False
-        
-        # List available tools
-        list_tools_request = {
-            "jsonrpc": "2.0",
-            "method": "tools/list",
-            "params": {},
-            "id": 2
-        }
-        
-        process.stdin.write(json.dumps(list_tools_request) + "\n")
-        process.stdin.flush()
-        
-        # Read tools list response
-        response_line = process.stdout.readline()
-        if response_line:
-            response = json.loads(response_line)
-            if "result" in response:
-                tools = response.get("result", {}).get("tools", [])
-                print(f"✓ Available tools: {', '.join([tool.get('name', 'unknown') for tool in tools])}")
-                
-                # For Spanner, we'll just check that we got some tools
-                if len(tools) > 0:
-                    print("✓ Spanner MCP server is operational")
-                    return True
-                else:
-                    print("✗ No tools available")
-                    return False
-            else:
-                print(f"✗ Failed to list tools: {response.get('error', 'Unknown error')}")
-                return False
-        
-    except Exception as e:
-        print(f"✗ Error: {e}")
-        stderr_output = process.stderr.read()
-        if stderr_output:
-            print(f"✗ Stderr: {stderr_output}")
-        return False
-    finally:
-        # Terminate the process
-        process.terminate()
-        process.wait()
+
+
+def http_params() -> Optional[ServerParams]:
+    """The shared HTTP-mode server started by test.sh, if SPANNER_MCP_URL points at one"""
+    url = os.environ.get("SPANNER_MCP_URL")
+    return ServerParams(name="spanner", command=[], url=url) if url else None
+
+
+def test_mcp_spanner():
+    """Test Spanner MCP server connection"""
+    print("Testing Spanner MCP server...")
+    success = smoke_test(server_params(), CHECKS)
+    shared = http_params()
+    if success and shared is not None:
+        print(f"Testing shared Spanner MCP server at {shared.url}...")
+        success = smoke_test(shared, CHECKS)
+    if success:
+        print("✓ Spanner MCP server is operational")
+    return success
+
 
 if __name__ == "__main__":
     success = test_mcp_spanner()
@@ -11,7 +11,8 @@ echo
 echo "1. Starting SQL Server container..."
 docker-compose up -d
 echo "   Waiting for SQL Server to be ready..."
-sleep 90
+# Waits on the compose healthcheck, then on an MCP initialize handshake
+(cd .. && python3 -m mcp_client.readiness --timeout 300 sqlserver)
 docker-compose ps
 
 echo -e "\n2. Testing MCP server (stdio) with prebuilt target..."
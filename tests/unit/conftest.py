@@ -0,0 +1,59 @@
+"""
+Fake stdio MCP servers for the unit tests
+"""
+
+import sys
+import textwrap
+from pathlib import Path
+from typing import Callable, Optional
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from mcp_client import ServerParams  # noqa: E402
+
+# Answers initialize, ping, tools/list (execute_sql) and any tools/call with ROWS small JSON
+# rows in one response line. The "slow" tool answers after SLOW_DELAY seconds; START_DELAY
+# and PING_DELAY slow down the start and pings.
+FAKE_SERVER = textwrap.dedent('''
+    import json, os, sys, time
+    ROWS = int(os.environ.get("ROWS", "5000"))
+    time.sleep(float(os.environ.get("START_DELAY", "0")))
+    for line in sys.stdin:
+        message = json.loads(line)
+        if "id" not in message:
+            continue
+        if message["method"] == "initialize":
+            result = {"protocolVersion": "1.0.0", "serverInfo": {"name": "fake", "version": "1"}, "capabilities": {}}
+        elif message["method"] == "ping":
+            time.sleep(float(os.environ.get("PING_DELAY", "0")))
+            result = {}
+        elif message["method"] == "tools/list":
+            result = {"tools": [{"name": "execute_sql", "inputSchema": {"type": "object"}}]}
+        elif message["method"] == "tools/call":
+            if message["params"]["name"] == "slow":
+                time.sleep(float(os.environ.get("SLOW_DELAY", "0.5")))
+            content = [{"type": "text", "text": json.dumps({"id": i, "name": f"row {i}"})} for i in range(ROWS)]
+            result = {"content": content}
+        else:
+            result = {}
+        sys.stdout.write(json.dumps({"jsonrpc": "2.0", "id": message["id"], "result": result}) + "\\n")
+        sys.stdout.flush()
+''')
+
+
+@pytest.fixture
+def fake_server(tmp_path: Path) -> Callable[..., ServerParams]:
+    """Writes a server script (FAKE_SERVER unless given) and returns the params that run it"""
+    def write(source: str = FAKE_SERVER, env: Optional[dict[str, str]] = None) -> ServerParams:
+        script = tmp_path / "server.py"
+        script.write_text(source)
+        return ServerParams("fake", [sys.executable, str(script)], dict(env or {}))
+
+    return write
+
+
+@pytest.fixture
+def params(fake_server: Callable[..., ServerParams]) -> ServerParams:
+    return fake_server()
@@ -0,0 +1,63 @@
+"""
+codec.get_codec and RowDecoder
+"""
+
+import sys
+from dataclasses import dataclass
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from mcp_client import ConfigError, RowDecoder, get_codec  # noqa: E402
+from mcp_client.codec import CODEC_ENV, available_codecs  # noqa: E402
+
+BIG = 123456789012345678901234567890
+
+
+def text(row: str) -> dict:
+    return {"type": "text", "text": row}
+
+
+def test_default_is_stdlib_json(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.delenv(CODEC_ENV, raising=False)
+    assert get_codec().name == "json"
+
+
+def test_env_selects_a_codec(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setenv(CODEC_ENV, "auto")
+    assert get_codec().name == available_codecs()[0]
+
+
+def test_unknown_codec() -> None:
+    with pytest.raises(ConfigError):
+        get_codec("yaml")
+
+
+def test_large_numeric_keeps_every_digit(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.delenv(CODEC_ENV, raising=False)
+    decode = RowDecoder(get_codec())
+    row = decode(text(f'{{"id": {BIG}, "amount": 12345678901234567890.5}}'))
+    assert row["id"] == BIG
+    assert isinstance(row["id"], int)
+
+
+@pytest.mark.parametrize("name", available_codecs())
+def test_codecs_round_trip(name: str) -> None:
+    codec = get_codec(name)
+    message = {"jsonrpc": "2.0", "id": 7, "result": {"content": [text('{"a": 1}')], "isError": False}}
+    assert codec.loads(codec.dumps(message)) == message
+
+
+def test_row_types() -> None:
+    @dataclass
+    class Row:
+        id: int
+        name: str
+
+    item = text('{"id": 1, "name": "a", "extra": true}')
+    assert RowDecoder(row_type=Row)(item) == Row(1, "a")
+    assert RowDecoder(row_type=tuple)(item) == (1, "a", True)
+    assert RowDecoder()(text("not json")) == "not json"
+    assert RowDecoder().rows({"content": [item, {"type": "image"}]}) == [{"id": 1, "name": "a", "extra": True}, {"type": "image"}]
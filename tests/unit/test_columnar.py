@@ -0,0 +1,85 @@
+"""
+ColumnarResult built from rows, tool results and a streamed tools/call
+"""
+
+import asyncio
+import json
+import sys
+from pathlib import Path
+from typing import Callable
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from mcp_client import ServerParams, StdioClient  # noqa: E402
+from mcp_client.columnar import FLOAT, INT, OBJECT, ColumnarResult  # noqa: E402
+
+ROWS = [
+    {"id": 1, "schema": "public", "price": 10, "note": None},
+    {"id": 2, "schema": "public", "price": 2.5, "note": "sale"},
+    {"id": 3, "schema": "sales", "price": None, "note": "x", "added": True},
+    {"id": 2**70, "schema": "public", "price": 4, "note": None},
+]
+
+
+def test_rows_round_trip_with_types_and_nulls() -> None:
+    result = ColumnarResult.from_rows(ROWS)
+    assert len(result) == 4
+    assert result.column_names == ["id", "schema", "price", "note", "added"]
+    # Missing before and after its first row: NULL
+    assert result.to_rows() == [{**row, "added": row.get("added")} for row in ROWS]
+    assert result.column("price") == [10.0, 2.5, None, 4.0]
+    kinds = {name: column.kind for name, column in result.columns.items()}
+    assert kinds == {"id": OBJECT, "schema": OBJECT, "price": FLOAT, "note": OBJECT, "added": OBJECT}
+    # Past int64: kept exact rather than wrapped
+    assert result[-1]["id"] == 2**70
+
+
+def test_int_column_stays_typed_with_nulls() -> None:
+    result = ColumnarResult.from_rows({"n": n if n % 3 else None} for n in range(20))
+    column = result.columns["n"]
+    assert column.kind == INT
+    assert column.null_count == 7
+    assert result.column("n") == [n if n % 3 else None for n in range(20)]
+    assert dict(result[4]) == {"n": 4}
+
+
+def test_repeated_strings_share_one_object() -> None:
+    result = ColumnarResult.from_rows({"schema": "".join(["pub", "lic"])} for _ in range(3))
+    values = result.columns["schema"].values
+    assert values[0] is values[1] is values[2]
+
+
+def test_from_result_keeps_text_lines_apart() -> None:
+    content = [{"type": "text", "text": json.dumps(row)} for row in ROWS[:2]]
+    content.append({"type": "text", "text": "2 rows"})
+    result = ColumnarResult.from_result({"content": content})
+    assert result.to_rows() == ROWS[:2]
+    assert result.extra == ["2 rows"]
+
+
+def test_call_columnar_from_a_streamed_call(fake_server: Callable[..., ServerParams]) -> None:
+    async def run() -> ColumnarResult:
+        async with StdioClient(fake_server(env={"ROWS": "1000"})) as client:
+            return await client.call_columnar("execute_sql", {"sql": "SELECT"}, max_rows=600)
+
+    result = asyncio.run(run())
+    assert len(result) == 600 and result.truncated
+    assert result.columns["id"].kind == INT
+    assert result.column("id") == list(range(600))
+    assert result[599]["name"] == "row 599"
+
+
+def test_conversions_keep_values_and_nulls() -> None:
+    pa = pytest.importorskip("pyarrow")
+    result = ColumnarResult.from_rows(ROWS[:3])
+    table = result.to_arrow()
+    assert table.column("price").type == pa.float64()
+    assert table.column("price").to_pylist() == [10.0, 2.5, None]
+    assert table.column("id").to_pylist() == [1, 2, 3]
+    assert table.column("note").to_pylist() == [None, "sale", "x"]
+    np = pytest.importorskip("numpy")
+    prices = result.to_numpy("price")
+    assert prices.mask.tolist() == [False, False, True]
+    assert np.array_equal(result.to_numpy("id"), [1, 2, 3])
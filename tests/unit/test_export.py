@@ -0,0 +1,77 @@
+"""
+export.export_tool and ExportInterceptor against a fake stdio server
+"""
+
+import asyncio
+import json
+import sys
+import textwrap
+from pathlib import Path
+from typing import Callable
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from mcp_client import ServerParams, StdioClient  # noqa: E402
+from mcp_client.export import ExportInterceptor, export_tool  # noqa: E402
+
+pa = pytest.importorskip("pyarrow")
+pq = pytest.importorskip("pyarrow.parquet")
+
+# Any tools/call gets ROWS rows; the first few leave `note` NULL
+FAKE_SERVER = textwrap.dedent('''
+    import json, sys
+    ROWS = 1000
+    for line in sys.stdin:
+        message = json.loads(line)
+        if "id" not in message:
+            continue
+        if message["method"] == "tools/call":
+            rows = [{"id": i, "name": f"row {i}", "note": None if i < 5 else "x"} for i in range(ROWS)]
+            result = {"content": [{"type": "text", "text": json.dumps(row)} for row in rows]}
+        else:
+            result = {}
+        sys.stdout.write(json.dumps({"jsonrpc": "2.0", "id": message["id"], "result": result}) + "\\n")
+        sys.stdout.flush()
+''')
+
+
+@pytest.fixture
+def params(fake_server: Callable[..., ServerParams]) -> ServerParams:
+    return fake_server(FAKE_SERVER)
+
+
+@pytest.mark.parametrize("format", ["parquet", "arrow"])
+def test_export_writes_every_row_in_batches(params: ServerParams, tmp_path: Path, format: str) -> None:
+    path = tmp_path / f"out.{format}"
+
+    async def run():
+        async with StdioClient(params) as client:
+            return await export_tool(client, "execute_sql", {"sql": "SELECT"}, path, format=format, batch_rows=300)
+
+    summary = asyncio.run(run())
+    assert (summary.rows, summary.batches) == (1000, 4)
+    assert not path.with_name(path.name + ".partial").exists()
+    table = pq.read_table(path) if format == "parquet" else pa.ipc.open_file(str(path)).read_all()
+    assert table.column("id").to_pylist() == list(range(1000))
+    assert table.column("name")[999].as_py() == "row 999"
+    assert table.column("note").to_pylist()[4:6] == [None, "x"]
+
+
+def test_export_sql_refuses_writes(tmp_path: Path) -> None:
+    # The server is never started: the statement is turned away first
+    interceptor = ExportInterceptor(ServerParams("fake", [sys.executable, "-c", "pass"]), tmp_path)
+    request = {"jsonrpc": "2.0", "id": 7, "method": "tools/call",
+               "params": {"name": "export_sql", "arguments": {"sql": "DELETE FROM t; SELECT 1"}}}
+
+    async def run():
+        answer = await interceptor.on_request(request)
+        assert answer is not None
+        return await answer
+
+    response = asyncio.run(run())
+    assert response["id"] == 7 and response["result"]["isError"]
+    assert "read-only" in json.dumps(response)
+    assert interceptor.report()["failures"] == 1
+    assert list(tmp_path.iterdir()) == []
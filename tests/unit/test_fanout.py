@@ -0,0 +1,78 @@
+"""
+FanoutSession against fake stdio servers: per-server limits, partial failure and merge_rows
+"""
+
+import asyncio
+import json
+import sys
+from pathlib import Path
+from typing import Callable
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from mcp_client import FanoutResult, FanoutSession, RequestTimeout, ServerParams, TransportClosed, merge_rows  # noqa: E402
+
+
+def text_rows(*rows: dict) -> dict:
+    return {"content": [{"type": "text", "text": json.dumps(row)} for row in rows]}
+
+
+def test_calls_are_limited_per_server(fake_server: Callable[..., ServerParams]) -> None:
+    params = fake_server(env={"ROWS": "1", "SLOW_DELAY": "0.05"})
+
+    async def run() -> None:
+        async with FanoutSession({"narrow": params, "wide": params}, limits={"narrow": 1, "wide": 3}) as session:
+            results = await session.call_many([(server, "slow", None) for server in ("narrow", "wide") * 4])
+            assert all(r.ok for r in results)
+            await asyncio.gather(*[session.call_tool("wide__slow") for _ in range(6)])
+            report = session.report()
+            assert (report["narrow"]["limit"], report["wide"]["limit"]) == (1, 3)
+            assert (report["narrow"]["max_in_flight"], report["wide"]["max_in_flight"]) == (1, 3)
+            assert (report["narrow"]["calls"], report["wide"]["calls"]) == (4, 10)
+
+    asyncio.run(run())
+
+
+def test_a_failed_server_or_call_doesnt_fail_the_others(fake_server: Callable[..., ServerParams]) -> None:
+    params = fake_server(env={"ROWS": "2"})
+    broken = ServerParams("broken", [sys.executable, "-c", "import sys; sys.exit(1)"])
+
+    async def run() -> None:
+        async with FanoutSession({"good": params, "bad": broken}, allow_partial=True, timeout=5) as session:
+            assert session.servers == ["good"]
+            assert set(session.unavailable) == {"bad"}
+            results = await session.call_many([
+                ("good", "execute_sql", {"sql": "SELECT 1"}),
+                ("bad", "execute_sql", {"sql": "SELECT 1"}),
+                ("good", "slow", None),
+            ], timeout=0.1)
+            assert [r.ok for r in results] == [True, False, False]
+            assert isinstance(results[1].error, TransportClosed)
+            assert isinstance(results[2].error, RequestTimeout)
+            assert merge_rows(results) == [{"id": 0, "name": "row 0", "_server": "good"}, {"id": 1, "name": "row 1", "_server": "good"}]
+            assert session.report()["good"]["failures"] == 1
+
+        with pytest.raises(TransportClosed):
+            async with FanoutSession({"good": params, "bad": broken}):
+                pass
+
+    asyncio.run(run())
+
+
+def test_merge_rows_tags_dict_rows() -> None:
+    results = [
+        FanoutResult("pg", "execute_sql", text_rows({"n": 1}, {"n": 2})),
+        FanoutResult("bq", "execute_sql", {"content": [{"type": "text", "text": "no rows"}]}),
+        FanoutResult("spanner", "execute_sql", text_rows({"n": 3}), error=TransportClosed("gone")),
+        FanoutResult("mysql", "execute_sql", {**text_rows({"n": 4}), "isError": True}),
+    ]
+    assert merge_rows(results, server_key="source") == [{"n": 1, "source": "pg"}, {"n": 2, "source": "pg"}, "no rows"]
+
+
+def test_merge_rows_refuses_to_overwrite_a_column() -> None:
+    results = [FanoutResult("pg", "execute_sql", text_rows({"_server": "replica-2", "n": 1}))]
+    with pytest.raises(ValueError, match="_server"):
+        merge_rows(results)
+    assert merge_rows(results, server_key="source") == [{"_server": "replica-2", "n": 1, "source": "pg"}]
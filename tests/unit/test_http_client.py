@@ -0,0 +1,101 @@
+"""
+HttpClient against an in-process HTTP server that misbehaves on cue
+"""
+
+import asyncio
+import json
+import sys
+from pathlib import Path
+from typing import Optional
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from mcp_client import HttpClient, ServerParams, TransportClosed  # noqa: E402
+
+
+class FakeServer:
+    """Answers every JSON-RPC request with an empty result
+    - drop: closes the first connection after reading a request, without replying;
+    - unframed: sends bodies without Content-Length, a few bytes at a time, then closes.
+    """
+
+    def __init__(self, *, drop: bool = False, unframed: bool = False):
+        self.drop = drop
+        self.unframed = unframed
+        self.requests: list[str] = []
+        self.server: Optional[asyncio.AbstractServer] = None
+
+    async def __aenter__(self) -> ServerParams:
+        self.server = await asyncio.start_server(self._serve, "127.0.0.1", 0)
+        port = self.server.sockets[0].getsockname()[1]
+        return ServerParams("fake", [], url=f"http://127.0.0.1:{port}/mcp")
+
+    async def __aexit__(self, *exc_info: object) -> None:
+        assert self.server is not None
+        self.server.close()
+        await self.server.wait_closed()
+
+    async def _serve(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            while True:
+                head = await reader.readuntil(b"\r\n\r\n")
+                length = int(head.lower().split(b"content-length:")[1].split(b"\r\n")[0])
+                message = json.loads(await reader.readexactly(length))
+                self.requests.append(message["method"])
+                if self.drop:
+                    self.drop = False
+                    break
+                body = json.dumps({"jsonrpc": "2.0", "id": message.get("id"), "result": {"ok": True}}).encode()
+                if self.unframed:
+                    writer.write(b"HTTP/1.1 200 OK\r\nContent-Type: application/json\r\n\r\n")
+                    for i in range(0, len(body), 4):
+                        writer.write(body[i:i + 4])
+                        await writer.drain()
+                        await asyncio.sleep(0)
+                    break
+                writer.write(b"HTTP/1.1 200 OK\r\nContent-Type: application/json\r\n")
+                writer.write(f"Content-Length: {len(body)}\r\n\r\n".encode() + body)
+                await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        writer.close()
+
+
+def test_idempotent_request_is_retried_when_reused_connection_closes() -> None:
+    async def run() -> None:
+        fake = FakeServer(drop=True)
+        async with fake as params:
+            client = HttpClient(params, timeout=5)
+            await client.start()
+            assert await client.request("tools/list") == {"ok": True}
+            await client.close()
+        assert fake.requests == ["tools/list", "tools/list"]
+
+    asyncio.run(run())
+
+
+def test_tool_call_is_not_retried_after_it_was_sent() -> None:
+    async def run() -> None:
+        fake = FakeServer(drop=True)
+        async with fake as params:
+            client = HttpClient(params, timeout=5)
+            await client.start()
+            with pytest.raises(TransportClosed):
+                await client.request("tools/call", {"name": "execute_sql", "arguments": {"sql": "DELETE FROM t"}})
+            await client.close()
+        assert fake.requests == ["tools/call"]
+
+    asyncio.run(run())
+
+
+def test_unframed_body_is_read_to_the_end_of_the_connection() -> None:
+    async def run() -> None:
+        async with FakeServer(unframed=True) as params:
+            client = HttpClient(params, timeout=5)
+            await client.start()
+            assert await client.request("ping") == {"ok": True}
+            await client.close()
+
+    asyncio.run(run())
@@ -0,0 +1,83 @@
+"""
+ProcessPool shutdown against a fake stdio server
+"""
+
+import asyncio
+import sys
+import time
+from pathlib import Path
+from typing import Callable
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from mcp_client import ServerParams  # noqa: E402
+from mcp_client.pool import ProcessPool  # noqa: E402
+
+
+def test_close_wakes_waiting_leases(params: ServerParams) -> None:
+    async def run() -> None:
+        pool = ProcessPool(params, 1)
+        await pool.start()
+
+        async def wait_for_member() -> None:
+            async with pool.lease():
+                pass
+
+        async with pool.lease():
+            waiting = asyncio.ensure_future(wait_for_member())
+            await asyncio.sleep(0.05)
+            await pool.close()
+        with pytest.raises(RuntimeError, match="closed"):
+            await asyncio.wait_for(waiting, 5)
+
+    asyncio.run(run())
+
+
+def test_close_stops_background_recycling(params: ServerParams) -> None:
+    async def run() -> None:
+        pool = ProcessPool(params, 1, max_calls=1)
+        await pool.start()
+        async with pool.lease() as client:
+            await client.ping()
+        # Past max_calls: replaced in the background
+        assert len(pool._background) == 1
+        await pool.close()
+        assert not pool._background
+        assert not pool._members
+        others = [t for t in asyncio.all_tasks() if t is not asyncio.current_task()]
+        assert not [t for t in others if not t.done()]
+
+    asyncio.run(run())
+
+
+def test_replacing_a_member_doesnt_grow_the_pool(fake_server: Callable[..., ServerParams]) -> None:
+    slow = fake_server(env={"START_DELAY": "0.3"})
+
+    async def run() -> None:
+        # initialize and one ping use up a member
+        async with ProcessPool(slow, 1, max_calls=2, health_interval=0.02) as pool:
+            async with pool.lease() as client:
+                await client.ping()
+            # Maintenance passes run while the replacement starts
+            for _ in range(50):
+                await asyncio.sleep(0.01)
+                assert len(pool._members) <= 1
+            assert pool.stats.recycled >= 1
+
+    asyncio.run(run())
+
+
+def test_health_check_doesnt_hold_up_leases(fake_server: Callable[..., ServerParams]) -> None:
+    slow = fake_server(env={"PING_DELAY": "1"})
+
+    async def run() -> None:
+        async with ProcessPool(slow, 2, health_interval=0.05, health_timeout=5) as pool:
+            await asyncio.sleep(0.15)  # a check is in flight
+            started = time.monotonic()
+            async with pool.lease():
+                pass
+            assert time.monotonic() - started < 0.5
+
+    asyncio.run(run())
@@ -0,0 +1,83 @@
+"""
+StdioProxy against a fake stdio server
+"""
+
+import json
+import subprocess
+import sys
+import textwrap
+from pathlib import Path
+from typing import Callable
+
+import pytest
+
+TESTS = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(TESTS))
+
+from mcp_client import ServerParams  # noqa: E402
+from mcp_client.capture import read_capture  # noqa: E402
+
+# Echoes each request's params back as its result
+FAKE_SERVER = textwrap.dedent('''
+    import json, sys
+    for line in sys.stdin:
+        message = json.loads(line)
+        if "id" in message:
+            response = {"jsonrpc": "2.0", "id": message["id"], "result": message.get("params", {})}
+            sys.stdout.write(json.dumps(response) + "\\n")
+            sys.stdout.flush()
+''')
+
+# Proxies the fake server at argv[1], capturing tools/call to argv[2] when given
+PROXY = textwrap.dedent('''
+    import asyncio, sys
+    from mcp_client.capture import CaptureInterceptor
+    from mcp_client.params import ServerParams
+    from mcp_client.proxy import StdioProxy
+    params = ServerParams("fake", [sys.executable, sys.argv[1]])
+    interceptors = [CaptureInterceptor(path) for path in sys.argv[2:]]
+    sys.exit(asyncio.run(StdioProxy(params, interceptors, max_message_bytes=1024).run()))
+''')
+
+
+@pytest.fixture
+def server(fake_server: Callable[..., ServerParams]) -> Path:
+    return Path(fake_server(FAKE_SERVER).command[-1])
+
+
+def request(request_id: int, text: str) -> str:
+    return json.dumps({"jsonrpc": "2.0", "id": request_id, "method": "echo", "params": {"text": text}}) + "\n"
+
+
+def tool_call(request_id: int, sql: str) -> str:
+    params = {"name": "execute_sql", "arguments": {"sql": sql}}
+    return json.dumps({"jsonrpc": "2.0", "id": request_id, "method": "tools/call", "params": params}) + "\n"
+
+
+def run_proxy(server: Path, lines: str, *args: str) -> subprocess.CompletedProcess:
+    return subprocess.run(
+        [sys.executable, "-c", PROXY, str(server), *args],
+        input=lines.encode(), capture_output=True, cwd=TESTS, timeout=30,
+    )
+
+
+def test_oversized_request_gets_an_error_and_the_proxy_keeps_going(server: Path) -> None:
+    lines = request(1, "small") + request(2, "x" * 10000) + "{" + "x" * 10000 + "\n" + request(3, "after")
+    proxy = run_proxy(server, lines)
+    assert proxy.returncode == 0, proxy.stderr.decode()
+    # The proxy answers oversized lines itself, so they may overtake the server's answers
+    responses = {r["id"]: r for r in map(json.loads, proxy.stdout.splitlines())}
+    assert set(responses) == {1, 2, 3, None}
+    assert responses[1]["result"] == {"text": "small"}
+    assert responses[2]["error"]["code"] == -32600
+    assert responses[None]["error"]["code"] == -32700
+    assert responses[3]["result"] == {"text": "after"}
+
+
+def test_capture_logs_calls_untouched(server: Path, tmp_path: Path) -> None:
+    capture = tmp_path / "captures" / "calls.jsonl"
+    proxy = run_proxy(server, tool_call(1, "SELECT 1") + request(2, "not a call") + tool_call(3, "SELECT 2"), str(capture))
+    assert proxy.returncode == 0, proxy.stderr.decode()
+    responses = {r["id"]: r for r in map(json.loads, proxy.stdout.splitlines())}
+    assert responses[1]["result"] == {"name": "execute_sql", "arguments": {"sql": "SELECT 1"}}
+    assert list(read_capture(capture)) == [("execute_sql", {"sql": "SELECT 1"}), ("execute_sql", {"sql": "SELECT 2"})]
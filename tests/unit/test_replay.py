@@ -0,0 +1,77 @@
+"""
+A session recorded by StdioClient, read back and replayed against the same fake server
+"""
+
+import asyncio
+import sys
+from pathlib import Path
+from typing import Callable
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from mcp_client import RequestTimeout, ServerParams, StdioClient  # noqa: E402
+from mcp_client.recording import Recorder, read_recording  # noqa: E402
+from mcp_client.replay import client_messages, recorded_latencies, replay  # noqa: E402
+
+
+@pytest.fixture
+def params(fake_server: Callable[..., ServerParams]) -> ServerParams:
+    return fake_server(env={"ROWS": "3", "SLOW_DELAY": "0.3"})
+
+
+@pytest.fixture
+def recording(params: ServerParams, tmp_path: Path) -> Path:
+    path = tmp_path / "session.mcprec"
+
+    async def run() -> None:
+        async with StdioClient(params, recorder=Recorder(path)) as client:
+            await client.handshake(pipelined=False)
+            await client.call_tool("execute_sql", {"sql": "SELECT 1"})
+            await client.request_many([("ping", None), ("tools/call", {"name": "execute_sql", "arguments": {}})])
+            with pytest.raises(RequestTimeout):
+                await client.call_tool("slow", timeout=0.1)
+            await asyncio.sleep(0.05)  # notifications/cancelled goes out in the background
+            await client.call_tool("execute_sql", {"sql": "SELECT 2"})
+
+    asyncio.run(run())
+    return path
+
+
+def test_recording_reads_back(params: ServerParams, recording: Path) -> None:
+    [session] = read_recording(recording)
+    assert (session.name, session.command) == ("fake", params.command)
+    sent = [m.message for m in client_messages(session)]
+    methods = [[i["method"] for i in m] if isinstance(m, list) else m["method"] for m in sent]
+    assert methods == [
+        "initialize", "notifications/initialized", "tools/list", "tools/call",
+        "ping", "tools/call", "tools/call", "notifications/cancelled", "tools/call",
+    ]
+    latencies = recorded_latencies(session)
+    # The slow call's late answer is matched up too
+    assert {name: len(samples) for name, samples in latencies.items()} == {
+        "initialize": 1, "tools/list": 1, "tools/call execute_sql": 3, "ping": 1, "tools/call slow": 1,
+    }
+    received = [m for m in session.messages() if m.direction == "received"]
+    assert len(received[-1].message["result"]["content"]) == 3
+
+
+def test_recording_cut_off_mid_frame_reads_up_to_it(recording: Path) -> None:
+    [whole] = read_recording(recording)
+    recording.write_bytes(recording.read_bytes()[:-5])
+    [cut] = read_recording(recording)
+    assert len(cut.frames) == len(whole.frames) - 1
+    assert cut.frames == whole.frames[:-1]
+
+
+@pytest.mark.parametrize("speed", [None, 4.0])
+def test_replay_reissues_the_session(params: ServerParams, recording: Path, speed: float) -> None:
+    [session] = read_recording(recording)
+    result = asyncio.run(replay(params, 1, session, speed=speed, concurrency=4))
+    assert result.errors == {}
+    assert result.cancelled == 1
+    assert {name: len(samples) for name, samples in result.latencies.items()} == {
+        "initialize": 1, "tools/list": 1, "tools/call execute_sql": 3, "ping": 1,
+    }
+    assert result.recorded_duration == session.duration
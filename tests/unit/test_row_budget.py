@@ -0,0 +1,101 @@
+"""
+RowBudgetInterceptor: LIMIT and TOP rewrites, and truncation to the row and byte budgets
+"""
+
+import json
+import sys
+from pathlib import Path
+from typing import Optional
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from mcp_client.row_budget import ITEM_OVERHEAD, RowBudgetInterceptor  # noqa: E402
+from mcp_client.sqltext import limit_rows  # noqa: E402
+
+
+def call(sql: str, tool: str = "execute_sql") -> dict:
+    return {"jsonrpc": "2.0", "id": 1, "method": "tools/call", "params": {"name": tool, "arguments": {"sql": sql}}}
+
+
+def rows(count: int, width: int = 10) -> dict:
+    content = [{"type": "text", "text": json.dumps({"id": i, "v": "x" * width})} for i in range(count)]
+    return {"jsonrpc": "2.0", "id": 1, "result": {"content": content}}
+
+
+def size(response: dict) -> int:
+    return len(json.dumps(response))
+
+
+def rewritten_sql(interceptor: RowBudgetInterceptor, sql: str) -> Optional[str]:
+    request = interceptor.rewrite_request(call(sql))
+    return request["params"]["arguments"]["sql"]
+
+
+@pytest.mark.parametrize("sql, expected", [
+    ("SELECT * FROM t;", "SELECT * FROM t LIMIT 11"),
+    ("WITH a AS (SELECT 1) SELECT * FROM a", "WITH a AS (SELECT 1) SELECT * FROM a LIMIT 11"),
+    ("SELECT * FROM (SELECT * FROM t LIMIT 1) x", "SELECT * FROM (SELECT * FROM t LIMIT 1) x LIMIT 11"),
+    ("SELECT * FROM t LIMIT 500", "SELECT * FROM (SELECT * FROM t LIMIT 500) AS limited_rows LIMIT 11"),
+    ("SELECT * FROM t LIMIT 5", "SELECT * FROM t LIMIT 5"),
+    ("SELECT * FROM t FOR UPDATE", "SELECT * FROM t FOR UPDATE"),
+    ("DELETE FROM t WHERE id = 1", "DELETE FROM t WHERE id = 1"),
+])
+def test_limit_is_one_row_over_the_budget(sql: str, expected: str) -> None:
+    interceptor = RowBudgetInterceptor(max_rows=10)
+    assert rewritten_sql(interceptor, sql) == expected
+    assert interceptor.rewritten == (sql != expected)
+
+
+@pytest.mark.parametrize("sql, expected", [
+    ("SELECT * FROM t", "SELECT TOP (11) * FROM t"),
+    ("SELECT DISTINCT a FROM t;", "SELECT DISTINCT TOP (11) a FROM t"),
+    ("SELECT TOP 5 * FROM t", "SELECT TOP 5 * FROM t"),
+    ("SELECT a FROM t UNION SELECT b FROM u", "SELECT a FROM t UNION SELECT b FROM u"),
+    ("SELECT * FROM t ORDER BY a OFFSET 5 ROWS", "SELECT * FROM t ORDER BY a OFFSET 5 ROWS"),
+])
+def test_top_for_sql_server(sql: str, expected: str) -> None:
+    interceptor = RowBudgetInterceptor.for_backend("sqlserver", max_rows=10)
+    assert interceptor.top_n
+    assert rewritten_sql(interceptor, sql) == expected
+
+
+def test_only_the_budgeted_tool_is_rewritten() -> None:
+    interceptor = RowBudgetInterceptor(max_rows=10)
+    request = call("SELECT * FROM t", tool="list_tables")
+    assert interceptor.rewrite_request(request) is request
+    assert interceptor.max_items(request) is None
+    assert interceptor.max_items(call("SELECT 1")) == 11
+    no_rewrite = RowBudgetInterceptor(max_rows=10, rewrite=False)
+    assert rewritten_sql(no_rewrite, "SELECT * FROM t") == "SELECT * FROM t"
+    assert limit_rows("SELECT * FROM t", 11) == "SELECT * FROM t LIMIT 11"
+
+
+def test_rows_over_the_budget_are_cut() -> None:
+    interceptor = RowBudgetInterceptor(max_rows=10)
+    response = rows(11)
+    result = interceptor.on_response(call("SELECT 1"), response, size(response))["result"]
+    assert [json.loads(item["text"])["id"] for item in result["content"][:-1]] == list(range(10))
+    assert result["content"][-1]["text"].startswith("[Result truncated after 10 rows")
+    assert result["_meta"]["truncated"] == {"rows": 10, "reason": "rows", "max_rows": 10, "max_bytes": interceptor.max_bytes}
+    assert interceptor.report()["truncated"] == 1
+
+
+def test_a_result_that_fits_is_untouched() -> None:
+    interceptor = RowBudgetInterceptor(max_rows=10)
+    response = rows(10)
+    assert interceptor.on_response(call("SELECT 1"), response, size(response)) is response
+    error = {"jsonrpc": "2.0", "id": 1, "result": {"content": rows(20)["result"]["content"], "isError": True}}
+    assert interceptor.on_response(call("SELECT 1"), error, size(error)) is error
+    assert interceptor.truncated == 0
+
+
+def test_bytes_over_the_budget_are_cut() -> None:
+    response = rows(100, width=100)
+    item = len(response["result"]["content"][0]["text"]) + ITEM_OVERHEAD
+    interceptor = RowBudgetInterceptor(max_rows=1000, max_bytes=item * 5 + item // 2)
+    result = interceptor.on_response(call("SELECT 1"), response, size(response))["result"]
+    assert len(result["content"]) == 5 + 1
+    assert result["_meta"]["truncated"]["reason"] == "bytes"
+    assert f"budget of {interceptor.max_bytes} bytes" in result["content"][-1]["text"]
@@ -0,0 +1,128 @@
+"""
+SchemaCachingClient invalidation across clients sharing one cache
+"""
+
+import asyncio
+import json
+import sys
+from pathlib import Path
+from typing import Any, Optional
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from mcp_client import McpClient, SchemaCachingClient, ServerParams, TTLCache  # noqa: E402
+
+
+class SlowCatalogClient:
+    """Answers list_tables with the number of tables, slowly; execute_sql runs instantly"""
+
+    def __init__(self, params: ServerParams):
+        self.params = params
+        self.tables = 1
+        self.listing = asyncio.Event()
+
+    async def call_tool(self, name: str, arguments: Optional[dict] = None, *, timeout: Optional[float] = None) -> dict:
+        if name == "list_tables":
+            tables = self.tables
+            self.listing.set()
+            await asyncio.sleep(0.05)
+            return {"content": [{"type": "text", "text": str(tables)}]}
+        self.tables += 1
+        return {"content": []}
+
+
+def test_ddl_on_one_client_keeps_another_from_caching_a_stale_listing() -> None:
+    async def run() -> None:
+        params = ServerParams("postgres", ["toolbox"])
+        cache = TTLCache()
+        server = SlowCatalogClient(params)
+        reader, writer = SchemaCachingClient(server, cache=cache), SchemaCachingClient(server, cache=cache)
+
+        listing = asyncio.ensure_future(reader.call_tool("list_tables"))
+        await server.listing.wait()
+        await writer.call_tool("execute_sql", {"sql": "CREATE TABLE t2 (id int)"})
+        assert (await listing)["content"][0]["text"] == "1"
+        # Fetched across the DDL, so not cached: the next call sees the new table
+        assert (await reader.call_tool("list_tables"))["content"][0]["text"] == "2"
+
+    asyncio.run(run())
+
+
+class CatalogServer(McpClient):
+    """In-memory transport: list_tables returns the table count, CREATE TABLE adds one"""
+
+    def __init__(self) -> None:
+        super().__init__(ServerParams("postgres", ["toolbox"]))
+        self.tables = 1
+
+    @property
+    def running(self) -> bool:
+        return True
+
+    async def start(self) -> None:
+        pass
+
+    async def close(self, timeout: float = 5.0) -> None:
+        pass
+
+    async def request(self, method: str, params: Optional[dict] = None, *, timeout: Optional[float] = None) -> Any:
+        params = params or {}
+        if params.get("name") == "list_tables":
+            return {"content": [{"type": "text", "text": f'{{"tables": {self.tables}}}'}]}
+        if "CREATE" in params.get("arguments", {}).get("sql", ""):
+            self.tables += 1
+        return {"content": []}
+
+    async def notify(self, method: str, params: Optional[dict] = None) -> None:
+        pass
+
+
+async def tables(client: SchemaCachingClient) -> int:
+    result = await client.call_tool("list_tables")
+    return json.loads(result["content"][0]["text"])["tables"]
+
+
+async def create_via_request(client: SchemaCachingClient, sql: str) -> None:
+    await client.request("tools/call", {"name": "execute_sql", "arguments": {"sql": sql}})
+
+
+async def create_via_request_many(client: SchemaCachingClient, sql: str) -> None:
+    await client.request_many([("tools/call", {"name": "execute_sql", "arguments": {"sql": sql}})])
+
+
+async def create_via_call_rows(client: SchemaCachingClient, sql: str) -> None:
+    await client.call_rows("execute_sql", {"sql": sql})
+
+
+async def create_via_stream_tool(client: SchemaCachingClient, sql: str) -> None:
+    async with client.stream_tool("execute_sql", {"sql": sql}) as rows:
+        async for _ in rows:
+            pass
+
+
+@pytest.mark.parametrize("create", [create_via_request, create_via_request_many, create_via_call_rows, create_via_stream_tool])
+def test_ddl_through_any_entry_point_invalidates(create: Any) -> None:
+    async def run() -> None:
+        client = SchemaCachingClient(CatalogServer())
+        assert await tables(client) == 1
+        assert await tables(client) == 1
+        await create(client, "CREATE TABLE t2 (id int)")
+        assert await tables(client) == 2
+        assert client.stats.hits == 1
+
+    asyncio.run(run())
+
+
+def test_callers_get_their_own_copy() -> None:
+    async def run() -> None:
+        client = SchemaCachingClient(CatalogServer())
+        first = await client.call_tool("list_tables")
+        first["content"].clear()
+        second = await client.call_tool("list_tables")
+        second["content"][0]["text"] = "changed"
+        assert (await client.call_tool("list_tables"))["content"][0]["text"] == '{"tables": 1}'
+        assert client.stats.hits == 2
+
+    asyncio.run(run())
@@ -0,0 +1,66 @@
+"""
+schema_index.build_index fed from a streamed list_tables
+"""
+
+import asyncio
+import sqlite3
+import sys
+import textwrap
+from pathlib import Path
+from typing import Callable
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from mcp_client import McpError, ServerParams, StdioClient  # noqa: E402
+from mcp_client.schema_index import build_index, fetch_catalog  # noqa: E402
+
+# list_tables answers with TABLES tables of three columns each, or an error result with FAIL=1
+FAKE_SERVER = textwrap.dedent('''
+    import json, os, sys
+    TABLES = 100
+    for line in sys.stdin:
+        message = json.loads(line)
+        if "id" not in message:
+            continue
+        if message["method"] == "tools/call" and os.environ.get("FAIL"):
+            result = {"content": [{"type": "text", "text": "permission denied"}], "isError": True}
+        elif message["method"] == "tools/call":
+            rows = [
+                {"table_name": f"t{t}", "schema_name": "public", "column_position": c, "column_name": f"c{c}",
+                 "data_type": "integer", "is_nullable": "YES", "column_default": None}
+                for t in range(TABLES) for c in (1, 2, 3)
+            ]
+            result = {"content": [{"type": "text", "text": json.dumps(row)} for row in rows]}
+        else:
+            result = {}
+        sys.stdout.write(json.dumps({"jsonrpc": "2.0", "id": message["id"], "result": result}) + "\\n")
+        sys.stdout.flush()
+''')
+
+
+async def refresh(params: ServerParams, output: Path) -> tuple[int, int]:
+    async with StdioClient(params) as client:
+        return await build_index(fetch_catalog(client), output, {"source": "fake"})
+
+
+def test_build_index_from_streamed_catalog(fake_server: Callable[..., ServerParams], tmp_path: Path) -> None:
+    output = tmp_path / "index.sqlite"
+    assert asyncio.run(refresh(fake_server(FAKE_SERVER), output)) == (100, 300)
+    conn = sqlite3.connect(output)
+    try:
+        assert conn.execute("SELECT column_count FROM tables WHERE table_name = 't7'").fetchone() == (3,)
+        assert conn.execute("SELECT count(*) FROM columns").fetchone() == (300,)
+        assert conn.execute("SELECT value FROM index_meta WHERE key = 'source'").fetchone() == ("fake",)
+    finally:
+        conn.close()
+
+
+def test_failed_catalog_leaves_the_old_index(fake_server: Callable[..., ServerParams], tmp_path: Path) -> None:
+    output = tmp_path / "index.sqlite"
+    output.write_text("previous index")
+    with pytest.raises(McpError):
+        asyncio.run(refresh(fake_server(FAKE_SERVER, {"FAIL": "1"}), output))
+    assert output.read_text() == "previous index"
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["index.sqlite", "server.py"]
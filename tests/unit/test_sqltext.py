@@ -0,0 +1,90 @@
+"""
+sqltext.classify, is_ddl and limit_rows: reads, writes and the words in between
+"""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from mcp_client.sqltext import classify, is_ddl, limit_rows  # noqa: E402
+
+
+@pytest.mark.parametrize("sql", [
+    "SELECT 1",
+    "select id, name from users where id = 3;",
+    # Column and alias names that are also SQL words
+    "SELECT comment FROM reviews",
+    "SELECT share, into_date FROM t",
+    "SELECT analyze, lock, grant, copy, execute FROM audit",
+    "SELECT u.update_count, u.delete_flag FROM users u",
+    "SELECT 'DELETE FROM t' AS example",
+    "SELECT \"insert\" FROM t -- UPDATE t SET x = 1",
+    "WITH recent AS (SELECT * FROM orders) SELECT count(*) FROM recent",
+    "WITH a AS (SELECT 1), b AS (SELECT 2) SELECT * FROM a, b",
+    "(SELECT 1) UNION (SELECT 2)",
+    "EXPLAIN SELECT * FROM t",
+    "EXPLAIN DELETE FROM t",
+    "SHOW TABLES",
+    "VALUES (1), (2)",
+])
+def test_reads(sql: str) -> None:
+    assert classify(sql) == "read"
+
+
+@pytest.mark.parametrize("sql", [
+    "SELECT x FROM t FOR SHARE",
+    "SELECT x FROM t FOR UPDATE",
+    "SELECT x FROM t FOR NO KEY UPDATE SKIP LOCKED",
+    "SELECT now()",
+    "SELECT * FROM events WHERE day = CURRENT_DATE",
+    "EXPLAIN ANALYZE SELECT * FROM t",
+    "EXPLAIN (ANALYZE, BUFFERS) SELECT * FROM t",
+])
+def test_volatile(sql: str) -> None:
+    assert classify(sql) == "volatile"
+
+
+@pytest.mark.parametrize("sql", [
+    "INSERT INTO t VALUES (1)",
+    "UPDATE t SET x = 1",
+    "DROP TABLE t",
+    "CREATE TABLE t (id int)",
+    "SELECT 1; SELECT 2",
+    "SELECT * INTO backup FROM t",
+    "SELECT x INTO OUTFILE '/tmp/x' FROM t",
+    "SELECT nextval('ids')",
+    "SELECT pg_catalog.setval('ids', 10)",
+    "WITH gone AS (DELETE FROM t WHERE old RETURNING *) SELECT count(*) FROM gone",
+    "WITH moved AS (UPDATE t SET x = 1 RETURNING id) SELECT * FROM moved",
+    "WITH src AS (SELECT 1 AS id) INSERT INTO t SELECT id FROM src",
+    "WITH RECURSIVE n (i) AS (SELECT 1) DELETE FROM t WHERE id IN (SELECT i FROM n)",
+    "EXPLAIN ANALYZE DELETE FROM t",
+    "",
+    "-- just a comment",
+])
+def test_writes(sql: str) -> None:
+    assert classify(sql) == "write"
+
+
+def test_limit_rows_leaves_locking_reads_alone() -> None:
+    assert limit_rows("SELECT x FROM t FOR UPDATE", 10) is None
+    assert limit_rows("SELECT comment FROM reviews", 10) == "SELECT comment FROM reviews LIMIT 10"
+
+
+@pytest.mark.parametrize("sql, ddl", [
+    ("CREATE TABLE t (id int)", True),
+    ("select 1; drop table t", True),
+    ("/* cleanup */ TRUNCATE t", True),
+    ("COMMENT ON TABLE t IS 'x'", True),
+    ("SELECT * INTO backup FROM t", True),
+    ("SELECT comment FROM reviews", False),
+    ("SELECT 'DROP TABLE t'", False),
+    ("INSERT INTO t VALUES (1)", False),
+    ("WITH src AS (SELECT 1) INSERT INTO t SELECT * FROM src", False),
+    ("UPDATE t SET created = now()", False),
+])
+def test_is_ddl(sql: str, ddl: bool) -> None:
+    assert is_ddl(sql) is ddl
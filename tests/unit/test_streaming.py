@@ -0,0 +1,70 @@
+"""
+StdioClient.stream_tool against a fake stdio server
+"""
+
+import asyncio
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from mcp_client import RequestTimeout, ServerParams, StdioClient  # noqa: E402
+
+
+def test_stream_deadline_then_early_exit_leaves_client_usable(params: ServerParams) -> None:
+    async def run() -> None:
+        async with StdioClient(params, hard_timeout=0) as client:
+            with pytest.raises(RuntimeError):
+                async with client.stream_tool("execute_sql", {"sql": "SELECT"}, max_queued=10, timeout=0.2) as rows:
+                    async for _ in rows:
+                        # Reader is parked on the full queue when the deadline passes
+                        await asyncio.sleep(0.5)
+                        raise RuntimeError("consumer gave up")
+            await asyncio.wait_for(client.ping(), 5)
+
+    asyncio.run(run())
+
+
+def test_stream_deadline_ends_iteration(params: ServerParams) -> None:
+    async def run() -> None:
+        async with StdioClient(params, hard_timeout=0) as client:
+            received = 0
+            with pytest.raises(RequestTimeout):
+                async with client.stream_tool("execute_sql", {"sql": "SELECT"}, max_queued=10, timeout=0.2) as rows:
+                    async for _ in rows:
+                        received += 1
+                        await asyncio.sleep(0.05)
+            assert 0 < received < 5000
+            await asyncio.wait_for(client.ping(), 5)
+
+    asyncio.run(run())
+
+
+def test_early_exit_without_deadline_leaves_client_usable(params: ServerParams) -> None:
+    async def run() -> None:
+        async with StdioClient(params, hard_timeout=0) as client:
+            async with client.stream_tool("execute_sql", {"sql": "SELECT"}, max_queued=10, timeout=0) as rows:
+                async for _ in rows:
+                    break
+            await asyncio.wait_for(client.ping(), 5)
+
+    asyncio.run(run())
+
+
+@pytest.mark.parametrize("chunk_size", [4096, 1024 * 1024])
+def test_expired_stream_is_unregistered_and_its_late_answer_dropped(params: ServerParams, chunk_size: int) -> None:
+    async def run() -> None:
+        async with StdioClient(params, hard_timeout=0, chunk_size=chunk_size) as client:
+            with pytest.raises(RequestTimeout):
+                async with client.stream_tool("slow", timeout=0.1) as rows:
+                    async for _ in rows:
+                        pass
+            assert client._streams == {}
+            # The answer arrives after the deadline, in chunks or in one line
+            await asyncio.sleep(0.6)
+            await asyncio.wait_for(client.ping(), 5)
+            assert not client.stray_lines
+
+    asyncio.run(run())
@@ -0,0 +1,131 @@
+"""
+Telemetry: spans from a client, histogram buckets, and the Prometheus and OTLP exports
+"""
+
+import asyncio
+import json
+import sys
+import threading
+import urllib.error
+import urllib.request
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Callable, Iterator
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from mcp_client import RequestTimeout, ServerParams, StdioClient  # noqa: E402
+from mcp_client.telemetry import Histogram, Span, Telemetry  # noqa: E402
+
+
+@pytest.fixture
+def collector() -> Iterator[tuple[str, list[tuple[str, Any]]]]:
+    """An OTLP/HTTP endpoint that keeps every (path, payload) posted to it"""
+    received: list[tuple[str, Any]] = []
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_POST(self) -> None:
+            body = self.rfile.read(int(self.headers["Content-Length"]))
+            received.append((self.path, json.loads(body)))
+            self.send_response(200)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+
+        def log_message(self, format: str, *args: Any) -> None:
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{server.server_address[1]}", received
+    server.shutdown()
+    server.server_close()
+
+
+def test_client_requests_become_spans(fake_server: Callable[..., ServerParams]) -> None:
+    telemetry = Telemetry()
+
+    async def run() -> None:
+        async with StdioClient(fake_server(env={"ROWS": "20"}), telemetry=telemetry) as client:
+            await client.initialize()
+            await client.call_tool("execute_sql", {"sql": "SELECT 1"})
+            with pytest.raises(RequestTimeout):
+                await client.call_tool("slow", timeout=0.1)
+
+    asyncio.run(run())
+    call = ("tools/call", "execute_sql", "fake", "")
+    timed_out = ("tools/call", "slow", "fake", "timeout")
+    assert telemetry.duration.series[call][2] == 1
+    assert telemetry.duration.series[timed_out][2] == 1
+    assert telemetry.duration.series[("initialize", "", "fake", "")][2] == 1
+    assert telemetry.rows.series[call][1] == 20
+    assert telemetry.request_bytes.series[call][2] == 1
+    assert telemetry.response_bytes.series[call][1] > 20 * len('{"id": 0, "name": "row 0"}')
+    # No response, so no response size and no rows
+    assert timed_out not in telemetry.response_bytes.series
+    assert timed_out not in telemetry.rows.series
+
+
+def test_histogram_buckets() -> None:
+    histogram = Histogram("h", "s", "test", (1.0, 5.0))
+    for value in (0.5, 1.0, 3.0, 7.0, 9.0):
+        histogram.observe(("a",), value)
+    assert histogram.series[("a",)] == [[2, 1, 2], 20.5, 5]
+
+
+def test_prometheus_endpoint_is_cumulative() -> None:
+    telemetry = Telemetry()
+    for seconds in (0.0005, 0.003, 0.003, 400.0):
+        span = Span("tools/call", "postgres", "stdio", tool='say "hi"', bytes_out=300)
+        span.end_ns = span.start_ns + int(seconds * 1e9)
+        telemetry.record(span)
+    port = telemetry.serve(0)
+    try:
+        with urllib.request.urlopen(f"http://127.0.0.1:{port}/metrics", timeout=5) as response:
+            text = response.read().decode()
+        with pytest.raises(urllib.error.HTTPError):
+            urllib.request.urlopen(f"http://127.0.0.1:{port}/other", timeout=5)
+    finally:
+        telemetry.close()
+    labels = 'method="tools/call",tool="say \\"hi\\"",backend="postgres",error=""'
+    assert "# TYPE mcp_client_request_duration_seconds histogram" in text
+    assert f'mcp_client_request_duration_seconds_bucket{{{labels},le="0.001"}} 1' in text
+    assert f'mcp_client_request_duration_seconds_bucket{{{labels},le="0.005"}} 3' in text
+    assert f'mcp_client_request_duration_seconds_bucket{{{labels},le="300"}} 3' in text
+    assert f'mcp_client_request_duration_seconds_bucket{{{labels},le="+Inf"}} 4' in text
+    assert f"mcp_client_request_duration_seconds_count{{{labels}}} 4" in text
+    assert f'mcp_client_request_bytes_bucket{{{labels},le="256"}} 0' in text
+    assert f'mcp_client_request_bytes_bucket{{{labels},le="1024"}} 4' in text
+
+
+def test_otlp_export(collector: tuple[str, list[tuple[str, Any]]]) -> None:
+    endpoint, received = collector
+    telemetry = Telemetry("unit", otlp_endpoint=endpoint + "/", export_interval=60)
+    ok = telemetry.start("tools/call", backend="mysql", transport="stdio", tool="execute_sql", bytes_out=10)
+    telemetry.finish(ok, {"content": [{"type": "text", "text": "{}"}] * 3}, bytes_in=100)
+    failed = telemetry.start("tools/call", backend="mysql", transport="stdio", tool="execute_sql")
+    telemetry.finish(failed, RequestTimeout("tools/call", 1.0))
+    telemetry.close()
+
+    payloads = dict(received)
+    assert set(payloads) == {"/v1/traces", "/v1/metrics"}
+    resource = payloads["/v1/traces"]["resourceSpans"][0]
+    assert resource["resource"]["attributes"] == [{"key": "service.name", "value": {"stringValue": "unit"}}]
+    spans = resource["scopeSpans"][0]["spans"]
+    assert [(s["spanId"], s["status"]["code"]) for s in spans] == [(ok.span_id, 0), (failed.span_id, 2)]
+    attributes = {a["key"]: a["value"] for a in spans[0]["attributes"]}
+    assert attributes["mcp.response.rows"] == {"intValue": "3"}
+    assert attributes["mcp.tool.name"] == {"stringValue": "execute_sql"}
+    assert {a["key"]: a["value"] for a in spans[1]["attributes"]}["error.type"] == {"stringValue": "timeout"}
+
+    metrics = {m["name"]: m for m in payloads["/v1/metrics"]["resourceMetrics"][0]["scopeMetrics"][0]["metrics"]}
+    assert set(metrics) == {
+        "mcp_client_request_duration_seconds", "mcp_client_request_bytes", "mcp_client_response_bytes",
+        "mcp_client_response_rows",
+    }
+    [rows] = metrics["mcp_client_response_rows"]["histogram"]["dataPoints"]
+    assert rows["count"] == "1" and rows["sum"] == 3.0
+    assert rows["bucketCounts"][rows["explicitBounds"].index(10.0)] == "1"
+    durations = metrics["mcp_client_request_duration_seconds"]["histogram"]["dataPoints"]
+    assert sorted(p["count"] for p in durations) == ["1", "1"]
@@ -0,0 +1,38 @@
+"""
+McpClient.handshake with a ToolCatalog against a fake stdio server
+"""
+
+import asyncio
+import sys
+from pathlib import Path
+from typing import Optional
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from mcp_client import ServerParams, StdioClient, ToolCatalog  # noqa: E402
+
+
+class CountingCatalog(ToolCatalog):
+    def __init__(self, directory: Path):
+        super().__init__(directory)
+        self.keyed = 0
+
+    async def key_for(self, params: ServerParams) -> Optional[str]:
+        self.keyed += 1
+        return await super().key_for(params)
+
+
+def test_catalog_key_is_worked_out_once_per_client(params: ServerParams, tmp_path: Path) -> None:
+    catalog = CountingCatalog(tmp_path / "catalog")
+
+    async def run() -> None:
+        async with StdioClient(params, tool_catalog=catalog) as client:
+            for _ in range(3):
+                tools = await client.handshake()
+                assert [t["name"] for t in tools] == ["execute_sql"]
+            await client.recycle("test")
+            await client.handshake()
+
+    asyncio.run(run())
+    assert catalog.keyed == 1
+    assert (catalog.stats.misses, catalog.stats.hits) == (1, 3)
@@ -0,0 +1,51 @@
+"""
+workload.parameterize and the tools generated from a workload
+"""
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from mcp_client.workload import analyze, generate_tools, parameterize  # noqa: E402
+
+
+def literals(sql: str) -> list[tuple[str, str]]:
+    parameterized = parameterize(sql)
+    assert parameterized is not None
+    return [(literal.kind, literal.text) for literal in parameterized.literals]
+
+
+def test_exponent_is_one_literal() -> None:
+    parameterized = parameterize("SELECT * FROM t WHERE x=1e5 AND y = 2.5E-3 AND z = 1e+2")
+    assert parameterized is not None
+    assert parameterized.shape == "SELECT * FROM t WHERE x=? AND y = ? AND z = ?"
+    assert [literal.value for literal in parameterized.literals] == [1e5, 2.5e-3, 1e2]
+
+
+def test_number_glued_to_a_name_stays_inline() -> None:
+    assert literals("SELECT * FROM t WHERE flags = 0x1F AND id = 7") == [("integer", "7")]
+
+
+def test_leading_dot_float() -> None:
+    assert literals("SELECT * FROM t WHERE ratio > .5") == [("float", ".5")]
+
+
+def test_column_named_like_a_keyword_is_still_a_read() -> None:
+    assert literals("SELECT comment FROM reviews WHERE id = 3") == [("integer", "3")]
+
+
+def test_mixed_slot_is_a_string() -> None:
+    calls = [("execute_sql", {"sql": f"SELECT * FROM t WHERE code = {value}"}) for value in ("'a'", "1", "'b'", "2", "'c'")]
+    (tool,) = generate_tools(analyze(calls), "postgres")
+    assert [p["type"] for p in tool.parameters] == ["string"]
+    assert [tool.arguments(call) for call in tool.shape.calls] == [
+        {"code": "a"}, {"code": "1"}, {"code": "b"}, {"code": "2"}, {"code": "c"},
+    ]
+
+
+def test_integer_and_float_slot_is_a_float() -> None:
+    calls = [("execute_sql", {"sql": f"SELECT * FROM t WHERE x > {value}"}) for value in ("1", "2.5", "3", "1e3", "5")]
+    (tool,) = generate_tools(analyze(calls), "postgres")
+    assert tool.statement == "SELECT * FROM t WHERE x > $1"
+    assert [p["type"] for p in tool.parameters] == ["float"]